@@ -5,7 +5,15 @@ the database :func:`get_session` function for interacting with
 the project's persistence layer.
 """
 
-from .db import get_session
-
 __all__ = ["get_session"]
 
+
+def __getattr__(name):
+    # Resolved lazily so `import ispec.<submodule>` (e.g. the CLI) does not
+    # load SQLAlchemy and every ORM model up front.
+    if name == "get_session":
+        from .db import get_session
+
+        return get_session
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
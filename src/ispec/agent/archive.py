@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from contextlib import contextmanager, nullcontext
+from contextlib import contextmanager
 from datetime import UTC, datetime, timedelta
 from functools import lru_cache
+import json
 import os
 from pathlib import Path
-from typing import Any, Iterator
+import time
+from typing import Any, Callable, Iterator
 
-from sqlalchemy.engine import Engine
+from sqlalchemy import JSON, MetaData, Table, and_, delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from ispec.agent.connect import get_agent_db_uri, get_agent_session
+from ispec.agent.connect import get_agent_db_uri, get_agent_engine
 from ispec.agent.models import AgentBase, AgentCommand, AgentEvent, AgentRun, AgentStep
 from ispec.db.models import sqlite_engine
 from ispec.logging import get_logger
@@ -81,7 +85,7 @@ def _archive_sqlite_journal_mode(raw: str | None = None) -> str | None:
 
 @lru_cache(maxsize=None)
 def _get_archive_engine(db_uri: str, journal_mode: str | None) -> Engine:
-    engine = sqlite_engine(db_uri)
+    engine = sqlite_engine(db_uri, json_deserializer=load_archive_json)
     AgentBase.metadata.create_all(bind=engine)
     if journal_mode:
         try:
@@ -142,11 +146,6 @@ def get_agent_archive_session_if_available(
         session.close()
 
 
-def _clone_row(model_cls: type[Any], row: Any) -> Any:
-    payload = {column.name: getattr(row, column.name) for column in model_cls.__table__.columns}
-    return model_cls(**payload)
-
-
 def _same_sqlite_target(a: str | None, b: str | None) -> bool:
     if not a or not b:
         return False
@@ -169,9 +168,154 @@ def _empty_summary(*, selected: bool) -> dict[str, Any]:
         "archived": 0,
         "pruned": 0,
         "batches": 0,
+        "seconds": 0.0,
+        "rows_per_second": None,
     }
 
 
+# Values written by ``--compress-json`` start with the zstd frame magic number.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_COMPRESS_MIN_BYTES = 1024
+_ARCHIVE_SCHEMA = "archive"
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError("Compressed agent archives require zstandard (pip install zstandard).") from exc
+    return zstandard
+
+
+def load_archive_json(value: Any) -> Any:
+    """JSON deserializer for archive engines; inflates ``--compress-json`` values."""
+
+    if isinstance(value, (bytes, memoryview)):
+        raw = bytes(value)
+        if raw.startswith(_ZSTD_MAGIC):
+            raw = _zstd().ZstdDecompressor().decompress(raw)
+        value = raw.decode("utf-8")
+    return json.loads(value)
+
+
+def _pack_json_factory() -> Callable[[Any], Any]:
+    compressor = _zstd().ZstdCompressor(level=3)
+
+    def pack(value: Any) -> Any:
+        if not isinstance(value, str) or len(value) < _COMPRESS_MIN_BYTES:
+            return value
+        return compressor.compress(value.encode("utf-8"))
+
+    return pack
+
+
+def _archive_table(model_cls: type[Any]) -> Table:
+    return model_cls.__table__.to_metadata(MetaData(), schema=_ARCHIVE_SCHEMA)
+
+
+def _copy_rows(conn: Connection, model_cls: type[Any], where: Any, *, compress: bool) -> None:
+    """Upsert the live rows matching ``where`` into the attached archive.
+
+    ``ON CONFLICT DO UPDATE`` keeps ``merge`` semantics without the delete
+    that ``INSERT OR REPLACE`` would issue against referenced run rows.
+    """
+
+    source = model_cls.__table__
+    target = _archive_table(model_cls)
+    names = [column.name for column in source.columns]
+    selected = [
+        func.ispec_archive_pack(column).label(column.name)
+        if compress and isinstance(column.type, JSON)
+        else column
+        for column in source.columns
+    ]
+    stmt = sqlite_insert(target).from_select(names, select(*selected).where(where))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[target.c.id],
+        set_={name: stmt.excluded[name] for name in names if name != "id"},
+    )
+    conn.execute(stmt)
+
+
+def _archive_table_rows(
+    conn: Connection,
+    model_cls: type[Any],
+    selector: Any,
+    stats: dict[str, Any],
+    *,
+    batch_size: int,
+    max_batches: int | None,
+    dry_run: bool,
+    prune_live: bool,
+    compress: bool,
+    archived_run_ids: set[int],
+) -> None:
+    """Move rows matching ``selector`` in id-ranged batches, one transaction each.
+
+    Each batch copies the id range into the attached archive and deletes it
+    from the live DB in the same transaction, so the live write lock is held
+    for one bounded batch at a time and nothing is ever half-moved.
+    """
+
+    table_name = model_cls.__tablename__
+    started = time.monotonic()
+    last_id = 0
+    while max_batches is None or stats["batches"] < max_batches:
+        with conn.begin():
+            window = (
+                select(model_cls.id)
+                .where(selector, model_cls.id > last_id)
+                .order_by(model_cls.id.asc())
+                .limit(batch_size)
+                .subquery()
+            )
+            count, high_id = conn.execute(select(func.count(), func.max(window.c.id))).one()
+            if not count:
+                break
+            stats["batches"] += 1
+            stats["matched"] += int(count)
+            batch = and_(selector, model_cls.id > last_id, model_cls.id <= int(high_id))
+            last_id = int(high_id)
+            if dry_run:
+                continue
+
+            if model_cls is AgentStep:
+                run_ids = select(AgentStep.run_pk).where(batch).distinct()
+                archived_run_ids.update(int(run_id) for run_id in conn.execute(run_ids).scalars())
+                _copy_rows(conn, AgentRun, AgentRun.id.in_(run_ids), compress=compress)
+            _copy_rows(conn, model_cls, batch, compress=compress)
+            stats["archived"] += int(count)
+            if prune_live:
+                conn.execute(delete(model_cls).where(batch))
+                stats["pruned"] += int(count)
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            "Archived %s batch %s: %s rows so far (%.0f rows/s)",
+            table_name,
+            stats["batches"],
+            stats["matched"],
+            stats["matched"] / elapsed if elapsed > 0 else 0.0,
+        )
+
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    if stats["seconds"] > 0 and stats["matched"]:
+        stats["rows_per_second"] = round(stats["matched"] / stats["seconds"], 1)
+
+
+def _incremental_vacuum(conn: Connection, *, pages: int | None) -> dict[str, Any]:
+    mode = int(conn.exec_driver_sql("PRAGMA main.auto_vacuum").scalar() or 0)
+    before = int(conn.exec_driver_sql("PRAGMA main.freelist_count").scalar() or 0)
+    if mode != 2:
+        # Switching an existing DB to INCREMENTAL needs a full VACUUM; leave that to the operator.
+        return {"mode": "none" if mode == 0 else "full", "freelist_pages": before, "vacuumed": False}
+    limit = "" if pages is None else f"({max(1, int(pages))})"
+    conn.exec_driver_sql(f"PRAGMA main.incremental_vacuum{limit}").fetchall()
+    after = int(conn.exec_driver_sql("PRAGMA main.freelist_count").scalar() or 0)
+    conn.commit()
+    return {"mode": "incremental", "freelist_pages": after, "pages_released": before - after, "vacuumed": True}
+
+
 def archive_agent_logs(
     *,
     agent_db_file_path: str | None = None,
@@ -185,7 +329,21 @@ def archive_agent_logs(
     archive_events: bool = True,
     archive_commands: bool = True,
     archive_journal_mode: str | None = None,
+    compress_json: bool = False,
+    vacuum_pages: int | None = None,
+    vacuum: bool = True,
 ) -> dict[str, Any]:
+    """Move terminal agent rows older than ``older_than_days`` to the archive DB.
+
+    The archive database is ATTACHed to a live connection and rows move with
+    ``INSERT ... SELECT`` / ``DELETE`` in id-ranged batches, so JSON payloads
+    never pass through Python. ``compress_json`` stores JSON values of 1 KiB
+    or more zstd-compressed (requires ``zstandard``; archive sessions inflate
+    them transparently). After pruning, ``vacuum`` releases up to
+    ``vacuum_pages`` free pages (all when ``None``) from a live DB in
+    ``auto_vacuum=INCREMENTAL`` mode.
+    """
+
     normalized_batch_size = max(1, int(batch_size))
     normalized_max_batches = None if max_batches is None else max(1, int(max_batches))
     normalized_days = max(1, int(older_than_days))
@@ -195,8 +353,13 @@ def archive_agent_logs(
     archive_db_uri = get_agent_archive_db_uri(archive_db_file_path, required=not bool(dry_run))
     if archive_db_uri is not None and _same_sqlite_target(live_db_uri, archive_db_uri):
         raise ValueError("Archive database must differ from the live agent database.")
+    archive_path = _sqlite_path_from_uri(archive_db_uri) if archive_db_uri else None
+    if not dry_run and archive_path is None:
+        raise ValueError("Archive database must be a SQLite file path or sqlite:/// URI.")
 
     journal_mode = _archive_sqlite_journal_mode(archive_journal_mode)
+    compress = bool(compress_json) and not dry_run
+    pack = _pack_json_factory() if compress else None
 
     summary: dict[str, Any] = {
         "ok": True,
@@ -209,127 +372,65 @@ def archive_agent_logs(
         "live_database": live_db_uri,
         "archive_database": archive_db_uri,
         "archive_journal_mode": journal_mode,
+        "compress_json": compress,
         "steps": _empty_summary(selected=archive_steps),
         "events": _empty_summary(selected=archive_events),
         "commands": _empty_summary(selected=archive_commands),
         "runs_archived": 0,
+        "vacuum": None,
     }
 
-    archived_run_ids: set[int] = set()
+    selectors = {
+        "steps": (AgentStep, and_(AgentStep.ended_at.is_not(None), AgentStep.ended_at < cutoff)),
+        "events": (AgentEvent, AgentEvent.received_at < cutoff),
+        "commands": (
+            AgentCommand,
+            and_(
+                AgentCommand.status.in_(sorted(_TERMINAL_COMMAND_STATUSES)),
+                AgentCommand.ended_at.is_not(None),
+                AgentCommand.ended_at < cutoff,
+            ),
+        ),
+    }
+    selected = {"steps": archive_steps, "events": archive_events, "commands": archive_commands}
 
-    with get_agent_session(agent_db_file_path) as live_db:
-        archive_db_cm = (
-            get_agent_archive_session(archive_db_file_path, journal_mode=journal_mode)
-            if not dry_run
-            else nullcontext(None)
-        )
-        with archive_db_cm as archive_db:
-            if archive_steps:
-                last_id = 0
-                while True:
-                    if normalized_max_batches is not None and summary["steps"]["batches"] >= normalized_max_batches:
-                        break
-                    rows = (
-                        live_db.query(AgentStep)
-                        .filter(AgentStep.ended_at.is_not(None))
-                        .filter(AgentStep.ended_at < cutoff)
-                        .filter(AgentStep.id > int(last_id))
-                        .order_by(AgentStep.id.asc())
-                        .limit(normalized_batch_size)
-                        .all()
-                    )
-                    if not rows:
-                        break
-                    summary["steps"]["batches"] += 1
-                    summary["steps"]["matched"] += len(rows)
-                    last_id = int(rows[-1].id)
-
-                    if dry_run:
-                        continue
-
-                    run_ids = sorted({int(row.run_pk) for row in rows})
-                    run_rows = live_db.query(AgentRun).filter(AgentRun.id.in_(run_ids)).all() if run_ids else []
-                    for run in run_rows:
-                        archive_db.merge(_clone_row(AgentRun, run))
-                        archived_run_ids.add(int(run.id))
-                    for row in rows:
-                        archive_db.merge(_clone_row(AgentStep, row))
-                    archive_db.commit()
-                    summary["steps"]["archived"] += len(rows)
-
-                    if prune_live:
-                        ids = [int(row.id) for row in rows]
-                        live_db.query(AgentStep).filter(AgentStep.id.in_(ids)).delete(synchronize_session=False)
-                        live_db.commit()
-                        summary["steps"]["pruned"] += len(ids)
-
-            if archive_events:
-                last_id = 0
-                while True:
-                    if normalized_max_batches is not None and summary["events"]["batches"] >= normalized_max_batches:
-                        break
-                    rows = (
-                        live_db.query(AgentEvent)
-                        .filter(AgentEvent.received_at < cutoff)
-                        .filter(AgentEvent.id > int(last_id))
-                        .order_by(AgentEvent.id.asc())
-                        .limit(normalized_batch_size)
-                        .all()
-                    )
-                    if not rows:
-                        break
-                    summary["events"]["batches"] += 1
-                    summary["events"]["matched"] += len(rows)
-                    last_id = int(rows[-1].id)
-
-                    if dry_run:
-                        continue
-
-                    for row in rows:
-                        archive_db.merge(_clone_row(AgentEvent, row))
-                    archive_db.commit()
-                    summary["events"]["archived"] += len(rows)
-
-                    if prune_live:
-                        ids = [int(row.id) for row in rows]
-                        live_db.query(AgentEvent).filter(AgentEvent.id.in_(ids)).delete(synchronize_session=False)
-                        live_db.commit()
-                        summary["events"]["pruned"] += len(ids)
-
-            if archive_commands:
-                last_id = 0
-                while True:
-                    if normalized_max_batches is not None and summary["commands"]["batches"] >= normalized_max_batches:
-                        break
-                    rows = (
-                        live_db.query(AgentCommand)
-                        .filter(AgentCommand.status.in_(sorted(_TERMINAL_COMMAND_STATUSES)))
-                        .filter(AgentCommand.ended_at.is_not(None))
-                        .filter(AgentCommand.ended_at < cutoff)
-                        .filter(AgentCommand.id > int(last_id))
-                        .order_by(AgentCommand.id.asc())
-                        .limit(normalized_batch_size)
-                        .all()
-                    )
-                    if not rows:
-                        break
-                    summary["commands"]["batches"] += 1
-                    summary["commands"]["matched"] += len(rows)
-                    last_id = int(rows[-1].id)
-
-                    if dry_run:
-                        continue
-
-                    for row in rows:
-                        archive_db.merge(_clone_row(AgentCommand, row))
-                    archive_db.commit()
-                    summary["commands"]["archived"] += len(rows)
-
-                    if prune_live:
-                        ids = [int(row.id) for row in rows]
-                        live_db.query(AgentCommand).filter(AgentCommand.id.in_(ids)).delete(synchronize_session=False)
-                        live_db.commit()
-                        summary["commands"]["pruned"] += len(ids)
+    archived_run_ids: set[int] = set()
+    if not dry_run:
+        assert archive_db_uri is not None
+        _get_archive_engine(archive_db_uri, journal_mode)  # creates the archive schema
+
+    with get_agent_engine(agent_db_file_path).connect() as conn:
+        if not dry_run:
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {_ARCHIVE_SCHEMA}", (str(archive_path),))
+            conn.commit()
+            if pack is not None:
+                conn.connection.driver_connection.create_function(
+                    "ispec_archive_pack", 1, pack, deterministic=True
+                )
+        try:
+            for key, (model_cls, selector) in selectors.items():
+                if not selected[key]:
+                    continue
+                _archive_table_rows(
+                    conn,
+                    model_cls,
+                    selector,
+                    summary[key],
+                    batch_size=normalized_batch_size,
+                    max_batches=normalized_max_batches,
+                    dry_run=bool(dry_run),
+                    prune_live=bool(prune_live),
+                    compress=compress,
+                    archived_run_ids=archived_run_ids,
+                )
+        finally:
+            if not dry_run:
+                conn.rollback()
+                conn.exec_driver_sql(f"DETACH DATABASE {_ARCHIVE_SCHEMA}")
+                conn.commit()
+
+        if vacuum and not dry_run and prune_live:
+            summary["vacuum"] = _incremental_vacuum(conn, pages=vacuum_pages)
 
     summary["runs_archived"] = len(archived_run_ids)
     return summary
@@ -5,6 +5,7 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Iterator
 
+from sqlalchemy import inspect, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -46,9 +47,40 @@ def get_agent_db_uri(file: str | Path | None = None) -> str:
 def _get_engine(db_uri: str) -> Engine:
     engine = sqlite_engine(db_uri)
     AgentBase.metadata.create_all(bind=engine)
+    _ensure_agent_command_schema(engine)
     return engine
 
 
+def get_agent_engine(file_path: str | Path | None = None) -> Engine:
+    """Return the shared engine for the agent DB (for bulk, Core-level work)."""
+
+    return _get_engine(get_agent_db_uri(file_path))
+
+
+def _ensure_agent_command_schema(engine: Engine) -> None:
+    """Best-effort SQLite upgrades for command leasing on existing agent DBs.
+
+    ``create_all`` skips tables that already exist (and their indexes), so the
+    lease column and the covering claim index are added here when missing.
+    """
+
+    try:
+        columns = {col["name"] for col in inspect(engine).get_columns("agent_command")}
+    except Exception:
+        return
+
+    with engine.begin() as conn:
+        if "lease_expires_at" not in columns:
+            conn.execute(text('ALTER TABLE agent_command ADD COLUMN "lease_expires_at" DATETIME'))
+            logger.info("Added missing column agent_command.lease_expires_at")
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_agent_command_claim "
+                "ON agent_command (status, available_at, priority, id)"
+            )
+        )
+
+
 @contextmanager
 def get_agent_session(file_path: str | Path | None = None) -> Iterator[Session]:
     """Context-managed SQLAlchemy session for the agent DB."""
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import Any
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, JSON, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, JSON, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -103,6 +103,11 @@ class AgentStep(AgentBase):
 
 class AgentCommand(AgentBase):
     __tablename__ = "agent_command"
+    __table_args__ = (
+        # Covers the claim query: queued + available, highest priority first.
+        Index("ix_agent_command_claim", "status", "available_at", "priority", "id"),
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     command_type: Mapped[str] = mapped_column(Text, index=True)
@@ -116,6 +121,7 @@ class AgentCommand(AgentBase):
     claimed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
     claimed_by_agent_id: Mapped[str | None] = mapped_column(Text, nullable=True, index=True)
     claimed_by_run_id: Mapped[str | None] = mapped_column(Text, nullable=True, index=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
     ended_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
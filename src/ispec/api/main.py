@@ -14,7 +14,7 @@ from ispec.api.routes.routes import router as crud_router
 from ispec.api.routes.schedule import router as schedule_router
 from ispec.api.routes.support import router as support_router
 from ispec.api.security import require_access, require_api_key
-from ispec.logging import get_logger
+from ispec.logging import flush_log_writers, get_logger
 
 logger = get_logger(__name__)
 
@@ -151,3 +151,11 @@ def _bootstrap_dev_admin_user() -> None:
         )
     except Exception:
         logger.exception("Failed to bootstrap dev admin user.")
+
+
+@app.on_event("shutdown")
+def _flush_log_writers() -> None:
+    """Write out queued log records and usage events before the process exits."""
+
+    if not flush_log_writers():
+        logger.warning("Log writers did not finish flushing before API shutdown.")
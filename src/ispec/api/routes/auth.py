@@ -13,6 +13,7 @@ from ispec.api.security import (
     create_session,
     delete_session,
     hash_password,
+    invalidate_user_auth_cache,
     require_admin,
     require_staff,
     require_user,
@@ -117,6 +118,7 @@ def _user_out(user: AuthUser, *, project_count: int | None = None) -> UserOut:
 
 def _invalidate_user_sessions(db: Session, *, user_id: int) -> None:
     db.query(AuthSession).filter(AuthSession.user_id == user_id).delete()
+    invalidate_user_auth_cache(user_id, db=db)
 
 
 @router.post("/bootstrap", response_model=UserOut, status_code=201)
@@ -366,6 +368,7 @@ def update_user_projects(
             )
 
     db.query(AuthUserProject).filter(AuthUserProject.user_id == user_id).delete()
+    invalidate_user_auth_cache(user_id, db=db)
     for project_id in desired:
         db.add(
             AuthUserProject(
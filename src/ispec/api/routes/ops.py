@@ -3,11 +3,13 @@ from __future__ import annotations
 import json
 import hashlib
 import os
+import threading
+import time
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -22,7 +24,14 @@ from ispec.api.models.modelmaker import make_pydantic_model_from_sqlalchemy
 from ispec.api.routes.schema import build_form_schema
 from ispec.api.security import require_assistant_access
 from ispec.assistant.connect import get_assistant_session_dep
-from ispec.assistant.models import SupportMessage, SupportSession, SupportSessionReview
+from ispec.assistant.models import (
+    SupportMessage,
+    SupportOpsCounter,
+    SupportSession,
+    SupportSessionReview,
+)
+from ispec.assistant.tools import tool_stats
+from ispec.assistant.usage_report import load_usage_summary, usage_summary_digest
 from ispec.db.models import AuthUser, LegacySyncState, UserRole
 
 
@@ -337,6 +346,7 @@ class OpsSnapshotResponse(BaseModel):
     ts: datetime
     assistant: AssistantSnapshot
     agent: AgentSnapshot
+    inference_usage: dict[str, Any] | None = None
 
 
 @router.post("/legacy-sync/run", response_model=LegacySyncRunResponse)
@@ -411,6 +421,16 @@ def schema_catalog(
     return catalog
 
 
+@router.get("/tools/stats")
+def assistant_tool_stats(
+    user: AuthUser | None = Depends(require_assistant_access),
+) -> dict[str, Any]:
+    """Per-tool invocation counts and wall time for this API process."""
+
+    _require_schema_staff(user)
+    return {"ok": True, "tools": tool_stats()}
+
+
 @router.post("/schema/snapshot")
 def snapshot_schema_catalog(
     user: AuthUser | None = Depends(require_assistant_access),
@@ -443,6 +463,49 @@ def snapshot_schema_catalog(
     }
 
 
+def _snapshot_cache_seconds() -> float:
+    raw = (os.getenv("ISPEC_OPS_SNAPSHOT_CACHE_SECONDS") or "").strip()
+    if not raw:
+        return 2.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 2.0
+
+
+_snapshot_cache_lock = threading.Lock()
+_snapshot_cache: dict[tuple[str | None, ...], tuple[float, str, OpsSnapshotResponse]] = {}
+_COUNTED_MODELS = {
+    "sessions_total": SupportSession,
+    "messages_total": SupportMessage,
+    "reviews_total": SupportSessionReview,
+}
+
+
+def _bind_key(db: Any) -> str | None:
+    if not isinstance(db, Session):
+        return None
+    return str(db.get_bind().url)
+
+
+def _snapshot_etag(result: OpsSnapshotResponse) -> str:
+    body = result.model_dump_json(exclude={"ts"})
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _assistant_counters(assistant_db: Session) -> dict[str, int]:
+    """Totals from the trigger-maintained counter rows, counting only if one is missing."""
+
+    rows = dict(assistant_db.query(SupportOpsCounter.name, SupportOpsCounter.value).all())
+    counters: dict[str, int] = {}
+    for name, model in _COUNTED_MODELS.items():
+        value = rows.get(name)
+        if value is None:
+            value = assistant_db.query(func.count(model.id)).scalar()
+        counters[name] = int(value or 0)
+    return counters
+
+
 @router.get("/snapshot", response_model=OpsSnapshotResponse)
 def snapshot(
     assistant_db: Session = Depends(get_assistant_session_dep),
@@ -450,19 +513,60 @@ def snapshot(
     agent_state_db: Session = Depends(get_agent_state_session_dep),
     core_db: Session = Depends(get_session_dep),
     user: AuthUser | None = Depends(require_assistant_access),
-) -> OpsSnapshotResponse:
+    request: Request = None,  # type: ignore[assignment]
+    response: Response = None,  # type: ignore[assignment]
+) -> OpsSnapshotResponse | Response:
+    """Dashboard snapshot, shared across pollers for ``ISPEC_OPS_SNAPSHOT_CACHE_SECONDS``.
+
+    Responses carry an ``ETag`` over everything but ``ts``; a matching
+    ``If-None-Match`` gets an empty 304.
+    """
+
     _ = user  # reserved for future access control
+    ttl = _snapshot_cache_seconds()
+    key = tuple(_bind_key(db) for db in (assistant_db, agent_db, agent_state_db, core_db))
+    now = time.monotonic()
+    cached = None
+    if ttl > 0:
+        with _snapshot_cache_lock:
+            cached = _snapshot_cache.get(key)
+        if cached is not None and now - cached[0] >= ttl:
+            cached = None
+    if cached is not None:
+        _, etag, result = cached
+    else:
+        result = _build_snapshot(
+            assistant_db=assistant_db,
+            agent_db=agent_db,
+            agent_state_db=agent_state_db,
+            core_db=core_db,
+        )
+        etag = _snapshot_etag(result)
+        if ttl > 0:
+            with _snapshot_cache_lock:
+                _snapshot_cache[key] = (now, etag, result)
+
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={int(ttl)}"}
+    if request is not None and etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return result
+
+
+def _build_snapshot(
+    *,
+    assistant_db: Session,
+    agent_db: Session,
+    agent_state_db: Session,
+    core_db: Session,
+) -> OpsSnapshotResponse:
     now = utcnow()
 
-    sessions_total = int(
-        assistant_db.query(func.count(SupportSession.id)).scalar() or 0
-    )
-    messages_total = int(
-        assistant_db.query(func.count(SupportMessage.id)).scalar() or 0
-    )
-    reviews_total = int(
-        assistant_db.query(func.count(SupportSessionReview.id)).scalar() or 0
-    )
+    counters = _assistant_counters(assistant_db)
+    sessions_total = counters["sessions_total"]
+    messages_total = counters["messages_total"]
+    reviews_total = counters["reviews_total"]
 
     latest_review_id = 0
     latest_review_at: str | None = None
@@ -485,6 +589,9 @@ def snapshot(
     )
     session_pks = [int(s.id) for s in sessions]
     review_by_session_pk: dict[int, dict[str, Any]] = {}
+    # session_pk -> role -> (message count, newest message id)
+    message_stats: dict[int, dict[str, tuple[int, int]]] = {}
+    last_user_content: dict[int, str] = {}
     if session_pks:
         review_rows = (
             assistant_db.query(
@@ -510,34 +617,39 @@ def snapshot(
                 "review_updated_at": updated_at.isoformat() if updated_at else None,
             }
 
+        stat_rows = (
+            assistant_db.query(
+                SupportMessage.session_pk,
+                SupportMessage.role,
+                func.count(SupportMessage.id),
+                func.max(SupportMessage.id),
+            )
+            .filter(SupportMessage.session_pk.in_(session_pks))
+            .group_by(SupportMessage.session_pk, SupportMessage.role)
+            .all()
+        )
+        for session_pk, role, count, max_id in stat_rows:
+            message_stats.setdefault(int(session_pk), {})[str(role)] = (int(count or 0), int(max_id or 0))
+
+        last_user_ids = [
+            by_role["user"][1] for by_role in message_stats.values() if "user" in by_role
+        ]
+        if last_user_ids:
+            for session_pk, content in (
+                assistant_db.query(SupportMessage.session_pk, SupportMessage.content)
+                .filter(SupportMessage.id.in_(last_user_ids))
+                .all()
+            ):
+                last_user_content[int(session_pk)] = content
+
     recent_sessions: list[AssistantSessionItem] = []
     sessions_needing_review = 0
     for session in sessions:
-        msg_count = int(
-            assistant_db.query(func.count(SupportMessage.id))
-            .filter(SupportMessage.session_pk == session.id)
-            .scalar()
-            or 0
-        )
-        last_message = (
-            assistant_db.query(SupportMessage)
-            .filter(SupportMessage.session_pk == session.id)
-            .order_by(SupportMessage.id.desc())
-            .first()
-        )
-        last_user = (
-            assistant_db.query(SupportMessage)
-            .filter(SupportMessage.session_pk == session.id)
-            .filter(SupportMessage.role == "user")
-            .order_by(SupportMessage.id.desc())
-            .first()
-        )
-        last_assistant = (
-            assistant_db.query(SupportMessage)
-            .filter(SupportMessage.session_pk == session.id)
-            .filter(SupportMessage.role == "assistant")
-            .order_by(SupportMessage.id.desc())
-            .first()
+        by_role = message_stats.get(int(session.id), {})
+        msg_count = sum(count for count, _ in by_role.values())
+        last_id, last_role = max(
+            ((max_id, role) for role, (_, max_id) in by_role.items()),
+            default=(0, None),
         )
 
         review_info = review_by_session_pk.get(int(session.id))
@@ -552,11 +664,7 @@ def snapshot(
             else None
         )
 
-        last_id = int(last_message.id) if last_message is not None else 0
-        last_role = (
-            getattr(last_message, "role", None) if last_message is not None else None
-        )
-        last_assistant_id = int(last_assistant.id) if last_assistant is not None else 0
+        last_assistant_id = by_role.get("assistant", (0, 0))[1]
 
         needs_review = bool(
             last_role == "assistant"
@@ -578,7 +686,7 @@ def snapshot(
                 last_message_role=last_role,
                 last_assistant_message_id=last_assistant_id,
                 last_user_message=_truncate_text(
-                    getattr(last_user, "content", None), limit=240
+                    last_user_content.get(int(session.id)), limit=240
                 ),
                 reviewed_up_to_id=reviewed_up_to_id,
                 review_updated_at=review_updated_at,
@@ -586,24 +694,15 @@ def snapshot(
             )
         )
 
-    commands_queued = int(
-        agent_db.query(func.count(AgentCommand.id))
-        .filter(AgentCommand.status == "queued")
-        .scalar()
-        or 0
-    )
-    commands_running = int(
-        agent_db.query(func.count(AgentCommand.id))
-        .filter(AgentCommand.status == "running")
-        .scalar()
-        or 0
-    )
-    commands_failed = int(
-        agent_db.query(func.count(AgentCommand.id))
-        .filter(AgentCommand.status == "failed")
-        .scalar()
-        or 0
+    command_counts = dict(
+        agent_db.query(AgentCommand.status, func.count(AgentCommand.id))
+        .filter(AgentCommand.status.in_(["queued", "running", "failed"]))
+        .group_by(AgentCommand.status)
+        .all()
     )
+    commands_queued = int(command_counts.get("queued") or 0)
+    commands_running = int(command_counts.get("running") or 0)
+    commands_failed = int(command_counts.get("failed") or 0)
 
     command_rows = (
         agent_db.query(AgentCommand).order_by(AgentCommand.id.desc()).limit(25).all()
@@ -784,4 +883,5 @@ def snapshot(
             legacy_sync_cursors=legacy_cursors,
             latest_legacy_sync=latest_legacy_sync,
         ),
+        inference_usage=usage_summary_digest(load_usage_summary()),
     )
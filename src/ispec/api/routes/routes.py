@@ -1,5 +1,6 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, create_model as pydantic_create_model
 from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
@@ -43,6 +44,18 @@ from ispec.db.crud import (
 from ispec.omics.labels import experiment_run_legacy_key
 
 from ispec.api.routes.schema import build_form_schema
+from ispec.api.routes.utils.pagination import (
+    COUNT_MODES,
+    CountEstimator,
+    OrderKey,
+    csv_lines,
+    decode_cursor,
+    iter_keyset,
+    keyset_filter,
+    ndjson_lines,
+    order_signature,
+    row_cursor,
+)
 
 from ispec.api.models.modelmaker import make_pydantic_model_from_sqlalchemy
 
@@ -177,28 +190,75 @@ def _parse_order_part(part: str) -> tuple[str, str] | None:
     return raw, direction
 
 
-def _apply_ordering(query, model, order: str | None):
-    order = (order or "").strip()
-    if not order:
-        return query.order_by(getattr(model, "id").asc())
+def _order_keys(model, order: str | None) -> list[OrderKey]:
+    """Resolve ``order`` to ``(column, direction)`` pairs ending in ``id``.
+
+    The trailing ``id`` tiebreak makes the ordering total, which keyset
+    cursors rely on.
+    """
 
     columns = set(getattr(model.__table__, "columns").keys())  # type: ignore[attr-defined]
-    parts = [p.strip() for p in order.split(",") if p.strip()]
-    order_by = []
-    for part in parts:
+    keys: list[OrderKey] = []
+    for part in (order or "").split(","):
         parsed = _parse_order_part(part)
         if not parsed:
             continue
         field, direction = parsed
-        if field not in columns:
+        if field not in columns or any(name == field for name, _ in keys):
             continue
+        keys.append((field, direction))
+    if not any(name == "id" for name, _ in keys):
+        keys.append(("id", "asc"))
+    return keys
+
+
+def _apply_ordering(query, model, order: str | None):
+    order_by = []
+    for field, direction in _order_keys(model, order):
         expr = getattr(model, field)
         order_by.append(expr.desc() if direction == "desc" else expr.asc())
+    return query.order_by(*order_by)
 
-    if not order_by:
-        return query.order_by(getattr(model, "id").asc())
 
-    return query.order_by(*order_by)
+_COUNT_ESTIMATOR = CountEstimator()
+
+
+def _decode_cursor_or_400(cursor: str, *, signature: str, width: int) -> list[object]:
+    try:
+        return decode_cursor(cursor, signature=signature, width=width)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {exc}") from exc
+
+
+def _page_by_id(
+    query,
+    model,
+    *,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+    response: Response | None,
+):
+    """Return one ``id``-ordered page, preferring the keyset ``cursor`` over ``offset``.
+
+    ``X-Next-Cursor`` is set when more rows follow so clients can switch from
+    offsets to cursors at any page.
+    """
+
+    keys: list[OrderKey] = [("id", "asc")]
+    signature = order_signature(model, keys)
+    query = query.order_by(getattr(model, "id").asc())
+    if cursor:
+        values = _decode_cursor_or_400(cursor, signature=signature, width=len(keys))
+        query = query.filter(keyset_filter(model, keys, values))
+    elif offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if response is not None:
+            response.headers["X-Next-Cursor"] = row_cursor(rows[-1], keys, signature=signature)
+    return rows
 
 
 # The router previously relied on a module level ROUTE_PREFIX_BY_TABLE for
@@ -270,19 +330,13 @@ def _add_crud_endpoints(
             status_code=400, detail=f"{tag} violates database constraints."
         )
 
-    @router.get("")
-    @router.get("/")
-    def list_items(
+    def _filtered_query(
         request: Request,
-        response: Response,
-        q: str | None = None,
-        limit: int = Query(default=50, ge=1, le=1000),
-        offset: int = Query(default=0, ge=0),
-        order: str | None = None,
-        ids: list[int] | None = Query(default=None),
-        exclude_ids: list[int] | None = Query(default=None),
-        wrap: bool = Query(default=False, description="Wrap response as {items,total}"),
-        db: Session = Depends(session_dep),
+        db: Session,
+        *,
+        q: str | None,
+        ids: list[int] | None,
+        exclude_ids: list[int] | None,
     ):
         query = db.query(model)
 
@@ -310,7 +364,7 @@ def _add_crud_endpoints(
                     q_int = None
             predicate = None
             try:
-                predicate = crud.search_predicate(q)
+                predicate = crud.search_predicate(q, session=db)
             except Exception:
                 predicate = None
 
@@ -322,28 +376,101 @@ def _add_crud_endpoints(
                     query = query.filter(id_match)
             elif predicate is not None:
                 query = query.filter(predicate)
+        return query
 
-        query = _apply_ordering(query, model, order)
+    @router.get("")
+    @router.get("/")
+    def list_items(
+        request: Request,
+        response: Response,
+        q: str | None = None,
+        limit: int = Query(default=50, ge=1, le=1000),
+        offset: int = Query(default=0, ge=0),
+        order: str | None = None,
+        ids: list[int] | None = Query(default=None),
+        exclude_ids: list[int] | None = Query(default=None),
+        wrap: bool = Query(default=False, description="Wrap response as {items,total}"),
+        cursor: str | None = Query(
+            default=None,
+            description="Opaque next_cursor from a previous page; replaces offset.",
+        ),
+        count: str = Query(
+            default="exact",
+            pattern="^(" + "|".join(COUNT_MODES) + ")$",
+            description="Total row count: exact, estimate (cached per query), or none.",
+        ),
+        db: Session = Depends(session_dep),
+    ):
+        query = _filtered_query(request, db, q=q, ids=ids, exclude_ids=exclude_ids)
+
+        keys = _order_keys(model, order)
+        signature = order_signature(model, keys)
 
         # compute total before pagination
-        try:
-            total = query.order_by(None).count()
-        except Exception:
-            # fallback if order_by(None) unsupported
-            total = query.count()
+        total, estimated = _COUNT_ESTIMATOR.count(query, mode=count)
 
-        rows = query.offset(offset).limit(limit).all()
+        query = _apply_ordering(query, model, order)
+        if cursor:
+            values = _decode_cursor_or_400(cursor, signature=signature, width=len(keys))
+            query = query.filter(keyset_filter(model, keys, values))
+        elif offset:
+            query = query.offset(offset)
+
+        # One extra row tells us whether a next page exists without a count.
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = row_cursor(rows[-1], keys, signature=signature)
         payload = [_serialize_row(r) for r in rows]
-        # attach total via header for simple lists
+        # attach total/cursor via headers for simple lists
         try:
             if response is not None:
-                response.headers["X-Total-Count"] = str(total)
+                if total is not None:
+                    response.headers["X-Total-Count"] = str(total)
+                    if estimated:
+                        response.headers["X-Total-Count-Estimated"] = "1"
+                if next_cursor is not None:
+                    response.headers["X-Next-Cursor"] = next_cursor
         except Exception:
             pass
         if wrap:
-            return {"items": payload, "total": total}
+            wrapped: dict[str, object] = {
+                "items": payload,
+                "total": total,
+                "next_cursor": next_cursor,
+            }
+            if estimated:
+                wrapped["total_estimated"] = True
+            return wrapped
         return payload
 
+    @router.get("/export")
+    def export_items(
+        request: Request,
+        q: str | None = None,
+        order: str | None = None,
+        ids: list[int] | None = Query(default=None),
+        exclude_ids: list[int] | None = Query(default=None),
+        format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+        db: Session = Depends(session_dep),
+    ):
+        """Stream every matching row as NDJSON or CSV without paging."""
+
+        query = _filtered_query(request, db, q=q, ids=ids, exclude_ids=exclude_ids)
+        keys = _order_keys(model, order)
+        rows = iter_keyset(_apply_ordering(query, model, order), model, keys)
+        filename = f"{model.__table__.name}.{format}"
+        if format == "csv":
+            body, media_type = csv_lines(rows, _serialize_row), "text/csv"
+        else:
+            body, media_type = ndjson_lines(rows, _serialize_row), "application/x-ndjson"
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
     @router.get(
         "/{item_id}",
         response_model=read_response_model,
@@ -519,6 +646,9 @@ def generate_crud_router(
     models for reading and creating objects, and wires them into standard
     REST-style endpoints:
 
+      - `GET /` – List objects; pages by `offset` or by the opaque
+        `next_cursor` (keyset) token, with `count=exact|estimate|none`.
+      - `GET /export` – Stream all matching rows as NDJSON or CSV.
       - `GET /schema` – Return the Pydantic create model's JSON schema,
         annotated with UI metadata from `ui_from_column()` (or from
         model-level metadata such as `col.info["group"]`).
@@ -624,6 +754,8 @@ def generate_crud_router(
             geneidtype: str | None = None,
             limit: int = Query(default=100, ge=1, le=1000),
             offset: int = Query(default=0, ge=0),
+            cursor: str | None = None,
+            response: Response = None,  # type: ignore[assignment]
             db: Session = Depends(session_dep),
         ):
             _reject_scoped_user(request)
@@ -632,7 +764,9 @@ def generate_crud_router(
                 query = query.filter(E2G.gene.ilike(f"%{q}%"))
             if geneidtype:
                 query = query.filter(E2G.geneidtype == geneidtype)
-            rows = query.order_by(E2G.id.asc()).limit(limit).offset(offset).all()
+            rows = _page_by_id(
+                query, E2G, limit=limit, offset=offset, cursor=cursor, response=response
+            )
             return [ReadModel.model_validate(r).model_dump() for r in rows]
 
     if model is PSM:
@@ -644,6 +778,8 @@ def generate_crud_router(
             q: str | None = None,
             limit: int = Query(default=200, ge=1, le=5000),
             offset: int = Query(default=0, ge=0),
+            cursor: str | None = None,
+            response: Response = None,  # type: ignore[assignment]
             db: Session = Depends(session_dep),
         ):
             _reject_scoped_user(request)
@@ -653,7 +789,9 @@ def generate_crud_router(
                 query = query.filter(
                     (PSM.peptide.ilike(f"%{q}%")) | (PSM.protein.ilike(f"%{q}%"))
                 )
-            rows = query.order_by(PSM.id.asc()).limit(limit).offset(offset).all()
+            rows = _page_by_id(
+                query, PSM, limit=limit, offset=offset, cursor=cursor, response=response
+            )
             return [ReadModel.model_validate(r).model_dump() for r in rows]
 
     if model is MSRawFile:
@@ -665,13 +803,17 @@ def generate_crud_router(
             q: str | None = None,
             limit: int = Query(default=200, ge=1, le=5000),
             offset: int = Query(default=0, ge=0),
+            cursor: str | None = None,
+            response: Response = None,  # type: ignore[assignment]
             db: Session = Depends(session_dep),
         ):
             _reject_scoped_user(request)
             query = db.query(MSRawFile).filter(MSRawFile.experiment_run_id == run_id)
             if q:
                 query = query.filter(MSRawFile.uri.ilike(f"%{q}%"))
-            rows = query.order_by(MSRawFile.id.asc()).limit(limit).offset(offset).all()
+            rows = _page_by_id(
+                query, MSRawFile, limit=limit, offset=offset, cursor=cursor, response=response
+            )
             return [ReadModel.model_validate(r).model_dump() for r in rows]
 
     # Register the options endpoints *before* CRUD handlers so that the
@@ -1370,6 +1512,8 @@ if _enabled("experiment_to_gene"):
         geneidtype: str | None = None,
         limit: int = Query(default=200, ge=1, le=2000),
         offset: int = Query(default=0, ge=0),
+        cursor: str | None = None,
+        response: Response = None,  # type: ignore[assignment]
         core_db: Session = Depends(get_session_dep),
         omics_db: Session = Depends(get_omics_session_dep),
     ):
@@ -1388,7 +1532,9 @@ if _enabled("experiment_to_gene"):
             query = query.filter(E2G.gene.ilike(f"%{q}%"))
         if geneidtype:
             query = query.filter(E2G.geneidtype == geneidtype)
-        rows = query.order_by(E2G.id.asc()).limit(limit).offset(offset).all()
+        rows = _page_by_id(
+            query, E2G, limit=limit, offset=offset, cursor=cursor, response=response
+        )
         return [E2GRead.model_validate(r).model_dump() for r in rows]
 
     @router.get(
@@ -1401,6 +1547,8 @@ if _enabled("experiment_to_gene"):
         geneidtype: str | None = None,
         limit: int = Query(default=500, ge=1, le=5000),
         offset: int = Query(default=0, ge=0),
+        cursor: str | None = None,
+        response: Response = None,  # type: ignore[assignment]
         core_db: Session = Depends(get_session_dep),
         omics_db: Session = Depends(get_omics_session_dep),
     ):
@@ -1420,7 +1568,9 @@ if _enabled("experiment_to_gene"):
             query = query.filter(E2G.gene.ilike(f"%{q}%"))
         if geneidtype:
             query = query.filter(E2G.geneidtype == geneidtype)
-        rows = query.order_by(E2G.id.asc()).limit(limit).offset(offset).all()
+        rows = _page_by_id(
+            query, E2G, limit=limit, offset=offset, cursor=cursor, response=response
+        )
         return [E2GRead.model_validate(r).model_dump() for r in rows]
 
 
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 from functools import cache
 import os
+import queue
 import re
 import json
+import threading
 import time
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -19,7 +22,11 @@ from ispec.agent.commands import COMMAND_COMPACT_SESSION_MEMORY, COMMAND_ORCHEST
 from ispec.agent.models import AgentCommand, AgentRun
 from ispec.assistant.comment_intent import decide_project_comment_intent_vllm
 from ispec.assistant.classifier_service import generate_classifier_reply
-from ispec.assistant.context import build_ispec_context, extract_project_ids
+from ispec.assistant.context import (
+    build_ispec_context,
+    extract_project_ids,
+    project_summary_cache_stats,
+)
 from ispec.assistant.compaction import normalize_conversation_memory
 from ispec.assistant.connect import get_assistant_session_dep
 from ispec.assistant.controller import (
@@ -43,7 +50,11 @@ from ispec.assistant.project_comment_approval import (
 )
 from ispec.assistant.reply_interpretation import interpret_reply_for_project_comment_save
 from ispec.assistant.prompt_header import build_prompt_header, prompt_header_enabled
-from ispec.assistant.prompting import estimate_tokens_for_messages, summarize_messages
+from ispec.assistant.prompting import (
+    estimate_tokens_for_messages,
+    estimate_tokens_per_message,
+    summarize_messages,
+)
 from ispec.assistant.response_contracts import (
     response_contracts_mode,
     response_contract_names,
@@ -58,6 +69,7 @@ from ispec.assistant.support_policies import (
     hinted_support_tool_groups,
     select_support_tool_policy,
 )
+from ispec.assistant.tool_executor import ToolInvocation, execute_tool_calls, tool_deadline_seconds
 from ispec.assistant.tool_routing import (
     route_tool_groups_vllm,
     tool_groups_for_available_tools,
@@ -89,7 +101,10 @@ from ispec.db.models import AuthUser, UserRole
 from ispec.omics.connect import get_omics_session_dep
 from ispec.prompt import prompt_observability_context
 from ispec.schedule.connect import get_schedule_session_dep
+from ispec.logging import get_logger
+
 
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/support", tags=["Support"])
 
@@ -1373,6 +1388,47 @@ def _chat_via_queue(*, payload: ChatRequest, assistant_db: Session, agent_db: Se
     )
 
 
+class _ChatEventStream:
+    """Hands chat-turn events from the worker thread to a streaming response.
+
+    Events are NDJSON objects with a ``type``: ``stage`` (pipeline progress),
+    ``delta`` (answer text fragments of one LLM round), ``reset`` (drop the
+    deltas of a round that turned into a tool call or retry), then exactly
+    one of ``done`` (the persisted ``ChatResponse``) or ``error``.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue()
+
+    def emit(self, event_type: str, **fields: Any) -> None:
+        self._queue.put({"type": event_type, **fields})
+
+    def delta_callback(self, llm_round: int):
+        return lambda text: self.emit("delta", round=llm_round, text=text)
+
+    def close(self) -> None:
+        self._queue.put(None)
+
+    def lines(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+
+def _emit_stage(events: _ChatEventStream | None, stage: str, **fields: Any) -> None:
+    if events is not None:
+        events.emit("stage", stage=stage, **fields)
+
+
+def _stream_kwargs(events: _ChatEventStream | None, llm_round: int) -> dict[str, Any]:
+    # Only streamed turns pass `on_delta`, so the blocking path calls generate_reply unchanged.
+    if events is None:
+        return {}
+    return {"on_delta": events.delta_callback(llm_round)}
+
+
 @router.post("/chat", response_model=ChatResponse)
 def chat(
     payload: ChatRequest,
@@ -1399,6 +1455,120 @@ def chat(
                 pass
         return response
 
+    return _chat_inline(
+        payload=payload,
+        request=request,
+        assistant_db=assistant_db,
+        agent_db=agent_db,
+        core_db=core_db,
+        omics_db=omics_db,
+        schedule_db=schedule_db,
+        user=user,
+    )
+
+
+@router.post("/chat/stream")
+def chat_stream(
+    payload: ChatRequest,
+    request: Request = None,
+    assistant_db: Session = Depends(get_assistant_session_dep),
+    agent_db: Session = Depends(get_agent_session_dep),
+    core_db: Session = Depends(get_session_dep),
+    omics_db: Session = Depends(get_omics_session_dep),
+    schedule_db: Session = Depends(get_schedule_session_dep),
+    user: AuthUser | None = Depends(require_assistant_access),
+):
+    """Run a chat turn like ``/chat`` but stream NDJSON progress events.
+
+    Answer tokens are forwarded as the provider produces them. The final
+    ``done`` event carries the same body ``/chat`` would return, sent after
+    the assistant message is committed; clients should render its message
+    rather than the concatenated deltas, since review may rewrite the draft.
+    Queue mode has no token stream and yields just the ``done`` event.
+    """
+
+    existing = (
+        assistant_db.query(SupportSession)
+        .filter(SupportSession.session_id == payload.sessionId)
+        .first()
+    )
+    if existing is not None:
+        _enforce_session_access(existing, user)
+
+    events = _ChatEventStream()
+    queued = (
+        _chat_queue_enabled() and not _queue_force_inline(payload) and _supervisor_heartbeat_ok(agent_db=agent_db)
+    )
+
+    # The request's sessions are closed by FastAPI once the response ends,
+    # including when the client disconnects mid-stream, so the turn runs on
+    # sessions of its own bound to the same engines.
+    binds = {
+        key: db.get_bind() if isinstance(db, Session) else None
+        for key, db in (
+            ("assistant_db", assistant_db),
+            ("agent_db", agent_db),
+            ("core_db", core_db),
+            ("omics_db", omics_db),
+            ("schedule_db", schedule_db),
+        )
+    }
+
+    def _run() -> None:
+        sessions = {key: Session(bind=bind) for key, bind in binds.items() if bind is not None}
+        dbs: dict[str, Any] = {
+            "assistant_db": assistant_db,
+            "agent_db": agent_db,
+            "core_db": core_db,
+            "omics_db": omics_db,
+            "schedule_db": schedule_db,
+            **sessions,
+        }
+        turn_user = user
+        if user is not None and "core_db" in sessions:
+            turn_user = sessions["core_db"].merge(user, load=False)
+        try:
+            if queued:
+                response = chat(payload=payload, request=request, user=turn_user, **dbs)
+            else:
+                response = _chat_inline(payload=payload, request=request, user=turn_user, events=events, **dbs)
+            dbs["assistant_db"].commit()
+            dbs["agent_db"].commit()
+            events.emit("done", response=response.model_dump())
+        except HTTPException as exc:
+            dbs["assistant_db"].rollback()
+            dbs["agent_db"].rollback()
+            events.emit("error", status_code=exc.status_code, detail=exc.detail)
+        except Exception as exc:
+            dbs["assistant_db"].rollback()
+            dbs["agent_db"].rollback()
+            logger.exception("Streamed support chat turn failed (session_id=%s)", payload.sessionId)
+            events.emit("error", status_code=500, detail=f"{type(exc).__name__}: {exc}")
+        finally:
+            for db in sessions.values():
+                db.close()
+            events.close()
+
+    threading.Thread(target=_run, name="support-chat-stream", daemon=True).start()
+    return StreamingResponse(
+        events.lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _chat_inline(
+    *,
+    payload: ChatRequest,
+    request: Request | None,
+    assistant_db: Session,
+    agent_db: Session,
+    core_db: Session,
+    omics_db: Session,
+    schedule_db: Session,
+    user: AuthUser | None,
+    events: _ChatEventStream | None = None,
+) -> ChatResponse:
     api_schema: dict[str, Any] | None = None
     if request is not None:
         try:
@@ -1508,6 +1678,7 @@ def chat(
         .first()
     )
     assistant_db.commit()
+    _emit_stage(events, "received", userMessageId=int(user_message.id))
 
     prepared_followup_message = None
     prepared_followup_consumed = False
@@ -1571,6 +1742,7 @@ def chat(
     confirmation_reply = reply_interpretation.is_confirmation_reply
     awaiting_reply_state = reply_interpretation.awaiting_state_dict()
     if assistant_provider == "vllm" and turn_decision_mode != "off":
+        _emit_stage(events, "turn_decision")
         turn_decision_result = run_turn_decision_pipeline(
             generate_reply_fn=generate_reply,
             mode=turn_decision_mode,
@@ -1723,6 +1895,7 @@ def chat(
             payload.message, candidates=available_tool_names
         )
         groups = turn_decision_groups or tool_groups_for_available_tools(available_tool_names)
+        _emit_stage(events, "tool_routing")
         support_policy_selection = select_support_tool_policy(
             message=payload.message,
             focused_project_id=focused_project_id,
@@ -1927,6 +2100,8 @@ def chat(
 
     selected_history: list[SupportMessage] = []
     context_message = ""
+    # Shared across both passes so the reported counts cover the whole turn.
+    context_cache_stats: dict[str, int] = {}
 
     # Iterate twice to account for summary growth impacting the budget.
     for _ in range(2):
@@ -1953,7 +2128,13 @@ def chat(
             and row.content
         ]
 
-        ispec_context = build_ispec_context(core_db, message=payload.message, state=state, user=user)
+        ispec_context = build_ispec_context(
+            core_db,
+            message=payload.message,
+            state=state,
+            user=user,
+            cache_stats=context_cache_stats,
+        )
         state_for_context = _prompt_state_from_session_state(state)
         context_payload: dict[str, Any] = {
             "schema_version": _CONTEXT_SCHEMA_VERSION,
@@ -1977,8 +2158,10 @@ def chat(
         tokens = estimate_tokens_for_messages(base_messages)
 
         selected_rev: list[SupportMessage] = []
-        for row in reversed(history_rows):
-            message_tokens = estimate_tokens_for_messages([{"role": row.role, "content": row.content}])
+        history_tokens = estimate_tokens_per_message(
+            {"role": row.role, "content": row.content} for row in history_rows
+        )
+        for row, message_tokens in zip(reversed(history_rows), reversed(history_tokens)):
             if tokens + message_tokens > max_tokens:
                 break
             tokens += message_tokens
@@ -2239,8 +2422,12 @@ def chat(
     }
 
     llm_round = 0
+    tool_deadline = time.monotonic() + tool_deadline_seconds()
 
     while True:
+        if llm_round and events is not None:
+            # The previous round ended in a tool call or a retry; its streamed text is not the answer.
+            events.emit("reset", round=llm_round)
         llm_round += 1
         agent_state = context_payload.get("agent") if isinstance(context_payload.get("agent"), dict) else None
         if agent_state is not None:
@@ -2272,8 +2459,8 @@ def chat(
         ]
         tokens = estimate_tokens_for_messages(base_messages)
         trimmed_rev: list[dict[str, Any]] = []
-        for item in reversed(history_payload):
-            message_tokens = estimate_tokens_for_messages([item])
+        history_tokens = estimate_tokens_per_message(history_payload)
+        for item, message_tokens in zip(reversed(history_payload), reversed(history_tokens)):
             if tokens + message_tokens > max_tokens:
                 break
             tokens += message_tokens
@@ -2320,6 +2507,7 @@ def chat(
         }
         final_prompt_observability = dict(system_prompt_observability)
         final_prompt_stage = "planner" if tools_enabled else "answer"
+        _emit_stage(events, final_prompt_stage, round=llm_round)
         reply = generate_reply(
             messages=messages_for_llm,
             tools=tools_for_call,
@@ -2331,6 +2519,7 @@ def chat(
                     "stage": final_prompt_stage,
                 },
             ),
+            **_stream_kwargs(events, llm_round),
         )
         trace_step["provider"] = reply.provider
         trace_step["model"] = reply.model
@@ -2369,6 +2558,8 @@ def chat(
                 }
             )
             executed_openai_tools: list[str] = []
+            # (call_id, name, args, payload or None when the call should run)
+            planned_calls: list[tuple[str, str, dict[str, Any], dict[str, Any] | None]] = []
             for tool_call in reply.tool_calls:
                 if not isinstance(tool_call, dict):
                     continue
@@ -2393,49 +2584,81 @@ def chat(
                 if (
                     policy_override_tool_args
                     and not tool_calls
+                    and not planned_calls
                     and tool_name == policy_tool_name
                     and isinstance(parsed_args, dict)
                 ):
                     parsed_args = dict(policy_tool_args)
 
                 unavailable_tool_payload = _blocked_or_unavailable_tool_payload(tool_name)
+                planned_payload: dict[str, Any] | None = None
                 if used_tool_calls >= max_tool_calls:
-                    tool_payload = {
+                    planned_payload = {
                         "ok": False,
                         "tool": tool_name or None,
                         "error": "Tool call limit exceeded; no further tools executed.",
                     }
                     tools_enabled = False
                 elif unavailable_tool_payload is not None:
-                    tool_payload = unavailable_tool_payload
+                    planned_payload = unavailable_tool_payload
                 else:
                     used_tool_calls += 1
-                    tool_payload = run_tool(
-                        name=tool_name,
-                        args=parsed_args if isinstance(parsed_args, dict) else {},
-                        core_db=core_db,
-                        assistant_db=assistant_db,
-                        agent_db=agent_db,
-                        schedule_db=schedule_db,
-                        omics_db=omics_db,
-                        user=user,
-                        api_schema=api_schema,
-                        user_message=payload.message,
-                        project_comment_save_authorized=project_comment_save_authorized,
-                        support_session_id=session.session_id,
-                    )
-                    _maybe_block_write_tools_for_turn(tool_name, tool_payload)
                     if used_tool_calls >= max_tool_calls:
                         tools_enabled = False
+                planned_calls.append(
+                    (call_id, tool_name, parsed_args if isinstance(parsed_args, dict) else {}, planned_payload)
+                )
+
+            runnable = [
+                ToolInvocation(name=tool_name, args=tool_args)
+                for _, tool_name, tool_args, planned_payload in planned_calls
+                if planned_payload is None
+            ]
+            for invocation in runnable:
+                _emit_stage(events, "tool", name=invocation.name)
+            outcomes = iter(
+                execute_tool_calls(
+                    runnable,
+                    run=run_tool,
+                    sessions={
+                        "core_db": core_db,
+                        "assistant_db": assistant_db,
+                        "agent_db": agent_db,
+                        "schedule_db": schedule_db,
+                        "omics_db": omics_db,
+                    },
+                    run_kwargs={
+                        "user": user,
+                        "api_schema": api_schema,
+                        "user_message": payload.message,
+                        "project_comment_save_authorized": project_comment_save_authorized,
+                        "support_session_id": session.session_id,
+                    },
+                    deadline=tool_deadline,
+                    before_write=lambda invocation: _blocked_or_unavailable_tool_payload(invocation.name),
+                    after_write=lambda invocation, result: _maybe_block_write_tools_for_turn(
+                        invocation.name, result
+                    ),
+                )
+            )
+            for call_id, tool_name, tool_args, planned_payload in planned_calls:
+                elapsed_ms: int | None = None
+                if planned_payload is None:
+                    outcome = next(outcomes)
+                    tool_payload = outcome.payload
+                    elapsed_ms = outcome.elapsed_ms
+                else:
+                    tool_payload = planned_payload
 
                 tool_calls.append(
                     {
                         "name": tool_name,
-                        "arguments": parsed_args if isinstance(parsed_args, dict) else {},
+                        "arguments": tool_args,
                         "ok": bool(tool_payload.get("ok")),
                         "error": tool_payload.get("error"),
                         "result_preview": _tool_result_preview(tool_payload),
                         "protocol": "openai",
+                        "elapsed_ms": elapsed_ms,
                     }
                 )
                 tool_result_text = format_tool_result_message(tool_name, tool_payload)
@@ -2469,6 +2692,8 @@ def chat(
                 used_tool_calls += 1
                 tool_name = suggested_tool_name
                 tool_args: dict[str, Any] = {}
+                _emit_stage(events, "tool", name=tool_name)
+                tool_started = time.monotonic()
                 tool_payload = run_tool(
                     name=tool_name,
                     args=tool_args,
@@ -2483,6 +2708,7 @@ def chat(
                     project_comment_save_authorized=project_comment_save_authorized,
                     support_session_id=session.session_id,
                 )
+                tool_elapsed_ms = int((time.monotonic() - tool_started) * 1000)
                 tool_calls.append(
                     {
                         "name": tool_name,
@@ -2491,6 +2717,7 @@ def chat(
                         "error": tool_payload.get("error"),
                         "result_preview": _tool_result_preview(tool_payload),
                         "protocol": "suggested",
+                        "elapsed_ms": tool_elapsed_ms,
                     }
                 )
                 tool_call_line = TOOL_CALL_PREFIX + " " + json.dumps(
@@ -2521,6 +2748,8 @@ def chat(
                 used_tool_calls += 1
                 tool_name = policy_tool_name
                 tool_args: dict[str, Any] = dict(policy_tool_args)
+                _emit_stage(events, "tool", name=tool_name)
+                tool_started = time.monotonic()
                 tool_payload = run_tool(
                     name=tool_name,
                     args=tool_args,
@@ -2535,6 +2764,7 @@ def chat(
                     project_comment_save_authorized=project_comment_save_authorized,
                     support_session_id=session.session_id,
                 )
+                tool_elapsed_ms = int((time.monotonic() - tool_started) * 1000)
                 tool_calls.append(
                     {
                         "name": tool_name,
@@ -2543,6 +2773,7 @@ def chat(
                         "error": tool_payload.get("error"),
                         "result_preview": _tool_result_preview(tool_payload),
                         "protocol": "policy",
+                        "elapsed_ms": tool_elapsed_ms,
                     }
                 )
                 tool_call_line = TOOL_CALL_PREFIX + " " + json.dumps(
@@ -2624,9 +2855,12 @@ def chat(
         tool_name, tool_args = tool_call
         unavailable_tool_payload = _blocked_or_unavailable_tool_payload(tool_name)
         used_tool_calls += 1
+        tool_elapsed_ms: int | None = None
         if unavailable_tool_payload is not None:
             tool_payload = unavailable_tool_payload
         else:
+            _emit_stage(events, "tool", name=tool_name)
+            tool_started = time.monotonic()
             tool_payload = run_tool(
                 name=tool_name,
                 args=tool_args,
@@ -2641,6 +2875,7 @@ def chat(
                 project_comment_save_authorized=project_comment_save_authorized,
                 support_session_id=session.session_id,
             )
+            tool_elapsed_ms = int((time.monotonic() - tool_started) * 1000)
             _maybe_block_write_tools_for_turn(tool_name, tool_payload)
         tool_calls.append(
             {
@@ -2650,6 +2885,7 @@ def chat(
                 "error": tool_payload.get("error"),
                 "result_preview": _tool_result_preview(tool_payload),
                 "protocol": "line",
+                "elapsed_ms": tool_elapsed_ms,
             }
         )
         tool_call_line = extract_tool_call_line(reply.content) or reply.content.strip()
@@ -2667,6 +2903,9 @@ def chat(
 
     if reply is None:
         history_for_llm = history_payload
+        if events is not None:
+            events.emit("reset", round=llm_round)
+        _emit_stage(events, "answer", round=llm_round + 1)
         reply = generate_reply(
             messages=[
                 {"role": "system", "content": answer_prompt.text},
@@ -2684,6 +2923,7 @@ def chat(
                 answer_prompt,
                 extra={**llm_observability_context, "stage": "answer"},
             ),
+            **_stream_kwargs(events, llm_round + 1),
         )
         final_prompt_observability = dict(answer_prompt.observability_fields())
         final_prompt_stage = "answer"
@@ -2718,6 +2958,7 @@ def chat(
         request_meta=payload.meta if isinstance(payload.meta, dict) else None,
         contract_cap=turn_decision_contract_cap if turn_decision_runtime_applied else None,
     )
+    _emit_stage(events, "review")
     controller_pre_send = run_message_pre_send_controller(
         generate_reply_fn=generate_reply,
         source="support_chat",
@@ -2935,6 +3176,10 @@ def chat(
         "used_conversation_summary": bool(state_for_context.get("conversation_summary")),
         "context_state_keys": sorted(state_for_context.keys()),
         "time": context_payload.get("time"),
+        "project_cache": {
+            **context_cache_stats,
+            "process_hit_rate": project_summary_cache_stats()["hit_rate"],
+        },
     }
     meta["response_contract"] = response_contract_meta
     if tool_router:
@@ -0,0 +1,211 @@
+# utils/pagination.py
+"""Keyset (cursor) pagination and streaming export helpers for list routes.
+
+Cursors are opaque base64url tokens holding the order-column values of the
+last row on a page plus a signature of the ordering, so a token minted for one
+ordering is rejected by another. Filtering on ``(order cols) > (last values)``
+keeps deep pages as cheap as the first one, unlike ``OFFSET``.
+"""
+
+from __future__ import annotations
+
+import base64
+import csv
+import enum
+import io
+import json
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from sqlalchemy import and_, false, or_
+
+
+OrderKey = tuple[str, str]  # (column name, "asc" | "desc")
+
+COUNT_MODES = ("exact", "estimate", "none")
+DEFAULT_ESTIMATE_TTL_SECONDS = 60.0
+_ESTIMATE_CACHE_MAX = 512
+
+
+def order_signature(model, keys: Sequence[OrderKey]) -> str:
+    table = getattr(getattr(model, "__table__", None), "name", model.__name__)
+    return table + "|" + ",".join(f"{name}:{direction}" for name, direction in keys)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy Enum columns bind member names
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(str(value["$dt"]))
+        if "$d" in value:
+            return date.fromisoformat(str(value["$d"]))
+    return value
+
+
+def encode_cursor(values: Sequence[Any], *, signature: str) -> str:
+    payload = {"k": signature, "v": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, *, signature: str, width: int) -> list[Any]:
+    """Return the order values stored in ``token``; raise ``ValueError`` if unusable."""
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(payload, dict) or payload.get("k") != signature:
+        raise ValueError("Cursor does not match this ordering")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != width:
+        raise ValueError("Malformed cursor")
+    return [_decode_value(v) for v in values]
+
+
+def row_cursor(row, keys: Sequence[OrderKey], *, signature: str) -> str:
+    return encode_cursor([getattr(row, name) for name, _ in keys], signature=signature)
+
+
+def _after(column, direction: str, value: Any):
+    # SQLite sorts NULLs first ascending and last descending.
+    if direction == "desc":
+        if value is None:
+            return false()
+        return or_(column < value, column.is_(None))
+    if value is None:
+        return column.is_not(None)
+    return column > value
+
+
+def _equal(column, value: Any):
+    return column.is_(None) if value is None else column == value
+
+
+def keyset_filter(model, keys: Sequence[OrderKey], values: Sequence[Any]):
+    """Predicate selecting rows strictly after ``values`` in ``keys`` order."""
+
+    clauses = []
+    for idx, (name, direction) in enumerate(keys):
+        prefix = [
+            _equal(getattr(model, prev_name), values[pos])
+            for pos, (prev_name, _) in enumerate(keys[:idx])
+        ]
+        clauses.append(and_(*prefix, _after(getattr(model, name), direction, values[idx])))
+    return or_(*clauses)
+
+
+class CountEstimator:
+    """Cache ``COUNT(*)`` per query shape (SQL text + parameters) for a TTL.
+
+    ``estimate`` mode reuses a recent count instead of rescanning the table on
+    every page; the value may lag concurrent writes by up to ``ttl`` seconds.
+    """
+
+    def __init__(self, *, ttl: float = DEFAULT_ESTIMATE_TTL_SECONDS) -> None:
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[Any, ...], tuple[float, int]] = {}
+
+    @staticmethod
+    def _shape(query) -> tuple[Any, ...]:
+        compiled = query.statement.compile()
+        bind = getattr(query.session, "bind", None)
+        url = str(getattr(bind, "url", "")) if bind is not None else ""
+        params = tuple(sorted((k, repr(v)) for k, v in compiled.params.items()))
+        return (url, str(compiled), params)
+
+    def count(self, query, *, mode: str = "exact") -> tuple[int | None, bool]:
+        """Return ``(total, estimated)`` for ``query`` (unordered, unpaged)."""
+
+        if mode == "none":
+            return None, False
+        if mode != "estimate":
+            return query.count(), False
+
+        key = self._shape(query)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+        if hit is not None and now - hit[0] < self.ttl:
+            return hit[1], True
+        total = query.count()
+        with self._lock:
+            if len(self._entries) >= _ESTIMATE_CACHE_MAX:
+                self._entries.clear()
+            self._entries[key] = (now, total)
+        return total, True
+
+
+def iter_keyset(
+    query,
+    model,
+    keys: Sequence[OrderKey],
+    *,
+    batch_size: int = 1000,
+) -> Iterator[Any]:
+    """Walk ``query`` (already ordered by ``keys``) in keyset-bounded batches.
+
+    Each batch streams from a server-side cursor (``yield_per``) and the read
+    transaction is released between batches, so long exports never pin an
+    SQLite snapshot or hold the full result in memory.
+    """
+
+    batch_size = max(1, int(batch_size))
+    last: list[Any] | None = None
+    while True:
+        page = query if last is None else query.filter(keyset_filter(model, keys, last))
+        count = 0
+        row = None
+        for row in page.limit(batch_size).yield_per(batch_size):
+            count += 1
+            yield row
+        if count < batch_size or row is None:
+            return
+        last = [getattr(row, name) for name, _ in keys]
+        session = getattr(query, "session", None)
+        if session is not None:
+            session.expunge_all()
+            session.rollback()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def ndjson_lines(rows: Iterable[Any], serialize: Callable[[Any], dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(serialize(row), default=_json_default) + "\n"
+
+
+def csv_lines(rows: Iterable[Any], serialize: Callable[[Any], dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer: csv.DictWriter | None = None
+    for row in rows:
+        payload = serialize(row)
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(payload), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(
+            {
+                key: value.isoformat() if isinstance(value, (datetime, date)) else value
+                for key, value in payload.items()
+            }
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
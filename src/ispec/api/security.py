@@ -21,16 +21,21 @@ import base64
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 import hashlib
+from itertools import chain
 import os
 import secrets
+import threading
+import time
+from typing import Any
 
 from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from ispec.authz import get_project_for_user
 from ispec.db.connect import get_session_dep
-from ispec.db.models import AuthSession, AuthUser, Project, ProjectAccessMode, UserRole
+from ispec.db.models import AuthSession, AuthUser, AuthUserProject, Project, ProjectAccessMode, UserRole
 
 _API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 _BEARER = HTTPBearer(auto_error=False)
@@ -215,6 +220,170 @@ def _hash_session_token(token: str) -> str:
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
+def _auth_cache_ttl_seconds() -> float:
+    raw = os.getenv("ISPEC_AUTH_CACHE_TTL_SECONDS")
+    if not raw:
+        return 30.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 30.0
+
+
+_AUTH_CACHE_MAX_ENTRIES = 4096
+
+
+@dataclass(frozen=True)
+class _CachedSession:
+    user: AuthUser  # detached snapshot; merged into each request's session
+    user_id: int
+    expires_at: datetime
+    cached_at: float
+
+
+class _AuthCache:
+    """In-process cache of valid session tokens, keyed by ``(db url, token hash)``.
+
+    Entries live for ``ISPEC_AUTH_CACHE_TTL_SECONDS`` (0 disables the cache)
+    and never past the session's own expiry. Logout, password changes and
+    edits to ``AuthUser``/``AuthUserProject`` in this process invalidate them
+    immediately; changes made by other processes (e.g. the CLI) are picked up
+    within the TTL.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], _CachedSession] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple[str, str], *, now: datetime) -> _CachedSession | None:
+        ttl = _auth_cache_ttl_seconds()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                time.monotonic() - entry.cached_at >= ttl or entry.expires_at <= now
+            ):
+                self._entries.pop(key, None)
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, key: tuple[str, str], *, user: AuthUser, expires_at: datetime) -> None:
+        if _auth_cache_ttl_seconds() <= 0:
+            return
+        snapshot = AuthUser(
+            **{attr.key: getattr(user, attr.key) for attr in sa_inspect(AuthUser).column_attrs}
+        )
+        make_transient_to_detached(snapshot)
+        entry = _CachedSession(
+            user=snapshot,
+            user_id=int(user.id),
+            expires_at=expires_at,
+            cached_at=time.monotonic(),
+        )
+        with self._lock:
+            if len(self._entries) >= _AUTH_CACHE_MAX_ENTRIES:
+                self._entries.clear()
+            self._entries[key] = entry
+
+    def invalidate_token_hash(self, token_hash: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == token_hash]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry.user_id == int(user_id)]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "ttl_seconds": _auth_cache_ttl_seconds(),
+            }
+
+
+_AUTH_CACHE = _AuthCache()
+
+
+def auth_cache_stats() -> dict[str, Any]:
+    return _AUTH_CACHE.stats()
+
+
+_STALE_AUTH_KEY = "ispec_auth_cache_stale"
+
+
+def _stale_auth(session: Session) -> dict[str, set]:
+    return session.info.setdefault(_STALE_AUTH_KEY, {"users": set(), "tokens": set()})
+
+
+def invalidate_user_auth_cache(user_id: int, *, db: Session | None = None) -> None:
+    """Drop cached sessions for ``user_id`` (role, password or project access changed).
+
+    With ``db`` the invalidation is deferred until that session commits, so a
+    concurrent request cannot re-cache the pre-change state in between.
+    """
+
+    if db is None:
+        _AUTH_CACHE.invalidate_user(int(user_id))
+    else:
+        _stale_auth(db)["users"].add(int(user_id))
+
+
+def clear_auth_cache() -> None:
+    _AUTH_CACHE.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_auth(session: Session, flush_context) -> None:
+    stale: dict[str, set] | None = None
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, AuthUser) and obj.id is not None:
+            stale = stale or _stale_auth(session)
+            stale["users"].add(int(obj.id))
+        elif isinstance(obj, AuthUserProject) and obj.user_id is not None:
+            stale = stale or _stale_auth(session)
+            stale["users"].add(int(obj.user_id))
+        elif isinstance(obj, AuthSession) and obj.token_hash:
+            stale = stale or _stale_auth(session)
+            stale["tokens"].add(obj.token_hash)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_auth(session: Session) -> None:
+    stale = session.info.pop(_STALE_AUTH_KEY, None)
+    if not stale:
+        return
+    for user_id in stale["users"]:
+        _AUTH_CACHE.invalidate_user(user_id)
+    for token_hash in stale["tokens"]:
+        _AUTH_CACHE.invalidate_token_hash(token_hash)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_auth(session: Session) -> None:
+    session.info.pop(_STALE_AUTH_KEY, None)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+
+
 def create_session(db: Session, *, user: AuthUser) -> str:
     """Create a DB-backed session token and return the **raw** token."""
 
@@ -237,6 +406,7 @@ def delete_session(db: Session, *, token: str) -> None:
     token_hash = _hash_session_token(token)
     db.query(AuthSession).filter(AuthSession.token_hash == token_hash).delete()
     db.commit()
+    _AUTH_CACHE.invalidate_token_hash(token_hash)
 
 
 def set_session_cookie(response: Response, *, token: str) -> None:
@@ -264,6 +434,12 @@ def get_current_user(
 
     token_hash = _hash_session_token(token)
     now = datetime.now(UTC)
+    cache_key = (str(db.get_bind().url), token_hash)
+    cached = _AUTH_CACHE.get(cache_key, now=now)
+    if cached is not None:
+        # Attach the snapshot to this request's session without a query.
+        return db.merge(cached.user, load=False)
+
     row = (
         db.query(AuthSession)
         .join(AuthUser, AuthSession.user_id == AuthUser.id)
@@ -275,6 +451,7 @@ def get_current_user(
         return None
     if not row.user.is_active:
         return None
+    _AUTH_CACHE.put(cache_key, user=row.user, expires_at=_as_utc(row.expires_at))
     return row.user
 
 
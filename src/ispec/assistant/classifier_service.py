@@ -4,8 +4,7 @@ import os
 import time
 from typing import Any, Callable, Literal
 
-import requests
-
+from ispec.assistant import http_client
 from ispec.assistant.service import (
     AssistantReply,
     _normalize_openai_base_url,
@@ -95,9 +94,10 @@ def _generate_classifier_vllm_reply(
     }
     started = time.monotonic()
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=timeout)
+        response = http_client.post(url, json=payload, headers=headers, timeout=timeout)
         response.raise_for_status()
         data = response.json()
+        timing = http_client.call_timing(response, started)
     except Exception as exc:
         error = f"{type(exc).__name__}: {exc}"
         meta = {"url": url, "error": repr(exc)}
@@ -134,7 +134,7 @@ def _generate_classifier_vllm_reply(
         content = ""
     if not content:
         content = str(data)[:4000]
-    meta = {"url": url, "elapsed_ms": elapsed_ms, "usage": usage}
+    meta = {"url": url, "elapsed_ms": elapsed_ms, "usage": usage, "timing": timing}
     record_inference_usage_event(
         provider="classifier_vllm",
         model=model,
@@ -53,6 +53,7 @@ def _get_engine(db_uri: str) -> Engine:
     _ensure_support_session_columns(engine)
     _ensure_support_message_columns(engine)
     _migrate_support_session_reviews_from_state(engine)
+    _ensure_ops_counters(engine)
     return engine
 
 
@@ -166,6 +167,62 @@ def _migrate_support_session_reviews_from_state(engine: Engine) -> None:
         db.close()
 
 
+# counter name -> counted table
+OPS_COUNTER_TABLES = {
+    "sessions_total": "support_session",
+    "messages_total": "support_message",
+    "reviews_total": "support_session_review",
+}
+
+
+def _ensure_ops_counters(engine: Engine) -> None:
+    """Install triggers that keep ``support_ops_counter`` in step with row counts.
+
+    Every insert/delete on a counted table adjusts its counter in the same
+    transaction, whichever process writes, so the ops snapshot reads three
+    rows instead of scanning three tables. Counters are reseeded from
+    ``COUNT(*)`` whenever a trigger had to be (re)created.
+    """
+
+    statements: list[str] = []
+    for name, table in OPS_COUNTER_TABLES.items():
+        for event, delta in (("insert", "+ 1"), ("delete", "- 1")):
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS support_ops_counter_{table}_{event} "
+                f"AFTER {event.upper()} ON {table} BEGIN "
+                f"UPDATE support_ops_counter SET value = value {delta} WHERE name = '{name}'; END"
+            )
+
+    try:
+        with engine.begin() as conn:
+            existing = {
+                row[0]
+                for row in conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'support_ops_counter_%'")
+                )
+            }
+            conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_support_session_updated_at ON support_session (updated_at, id)")
+            )
+            if len(existing) == len(statements):
+                return
+            for statement in statements:
+                conn.execute(text(statement))
+            # Seed after the triggers exist so rows written meanwhile are not lost.
+            for name, table in OPS_COUNTER_TABLES.items():
+                conn.execute(
+                    text(
+                        "INSERT OR REPLACE INTO support_ops_counter (name, value) "
+                        f"SELECT :name, COUNT(*) FROM {table}"
+                    ),
+                    {"name": name},
+                )
+    except Exception:
+        logger.exception("Unable to install assistant ops counter triggers")
+        return
+    logger.info("Installed assistant ops counter triggers")
+
+
 @contextmanager
 def get_assistant_session(file_path: str | Path | None = None) -> Iterator[Session]:
     """Context-managed SQLAlchemy session for the assistant DB."""
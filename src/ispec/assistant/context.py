@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import copy
+import os
 import re
+import threading
+import time
+from itertools import chain
 from typing import Any
 
-from sqlalchemy import func
+from sqlalchemy import event, func
 from sqlalchemy.orm import Session, defer
 
 from ispec.authz import (
@@ -167,6 +172,167 @@ def project_summary(
     return payload
 
 
+_SUMMARY_CACHE_MAX = 1024
+_STALE_PROJECTS_KEY = "ispec_stale_project_summaries"
+
+
+def _summary_cache_ttl_seconds() -> float:
+    raw = (os.getenv("ISPEC_ASSISTANT_CONTEXT_CACHE_SECONDS") or "").strip()
+    if not raw:
+        return 300.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 300.0
+
+
+class ProjectSummaryCache:
+    """Reuse :func:`project_summary` payloads across turns and sessions.
+
+    Entries are keyed by database, project id, summary options and the
+    project's ``prj_ModificationTS``, so an edit to the project row from any
+    process produces a new key. Comment changes made in this process drop
+    the project's entries when their transaction commits (see the session
+    hooks below); writes from other processes are picked up after ``ttl``.
+    """
+
+    def __init__(self, *, max_entries: int = _SUMMARY_CACHE_MAX) -> None:
+        self.max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[Any, ...], tuple[float, dict[str, Any]]] = {}
+        self._generations: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _db_key(db: Session) -> str | None:
+        engine = getattr(db.get_bind(), "engine", None)
+        if engine is None or engine.url.database in (None, "", ":memory:"):
+            return None  # every in-memory engine is a different database
+        return str(engine.url)
+
+    def summary(
+        self,
+        db: Session,
+        project: Project,
+        *,
+        include_comments: bool = True,
+        include_details: bool = False,
+        stats: dict[str, int] | None = None,
+    ) -> dict[str, Any]:
+        ttl = _summary_cache_ttl_seconds()
+        db_key = self._db_key(db)
+        if db_key is None or ttl <= 0:
+            return project_summary(db, project, include_comments=include_comments, include_details=include_details)
+
+        project_id = int(project.id)
+        modified = project.prj_ModificationTS.isoformat() if project.prj_ModificationTS else None
+        key = (db_key, project_id, bool(include_comments), bool(include_details), modified)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+            generation = self._generations.get(project_id, 0)
+            fresh = hit is not None and now - hit[0] < ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if stats is not None:
+            stats["hits" if fresh else "misses"] = stats.get("hits" if fresh else "misses", 0) + 1
+        if fresh:
+            return copy.deepcopy(hit[1])
+
+        payload = project_summary(db, project, include_comments=include_comments, include_details=include_details)
+        with self._lock:
+            # Skip the store if the project was invalidated while we were building.
+            if self._generations.get(project_id, 0) == generation:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                self._entries[key] = (now, copy.deepcopy(payload))
+        return payload
+
+    def invalidate_project(self, project_id: int) -> None:
+        project_id = int(project_id)
+        with self._lock:
+            self._generations[project_id] = self._generations.get(project_id, 0) + 1
+            for key in [k for k in self._entries if k[1] == project_id]:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_SUMMARY_CACHE = ProjectSummaryCache()
+
+
+def cached_project_summary(
+    db: Session,
+    project: Project,
+    *,
+    include_comments: bool = True,
+    include_details: bool = False,
+    stats: dict[str, int] | None = None,
+) -> dict[str, Any]:
+    return _SUMMARY_CACHE.summary(
+        db,
+        project,
+        include_comments=include_comments,
+        include_details=include_details,
+        stats=stats,
+    )
+
+
+def project_summary_cache_stats() -> dict[str, Any]:
+    return _SUMMARY_CACHE.stats()
+
+
+def invalidate_project_summary(project_id: int) -> None:
+    _SUMMARY_CACHE.invalidate_project(project_id)
+
+
+def clear_project_summary_cache() -> None:
+    _SUMMARY_CACHE.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_project_summaries(session: Session, flush_context) -> None:
+    stale: set[int] | None = None
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Project) and obj.id is not None:
+            project_id = obj.id
+        elif isinstance(obj, ProjectComment) and obj.project_id is not None:
+            project_id = obj.project_id
+        else:
+            continue
+        stale = stale if stale is not None else session.info.setdefault(_STALE_PROJECTS_KEY, set())
+        stale.add(int(project_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_project_summaries(session: Session) -> None:
+    for project_id in session.info.pop(_STALE_PROJECTS_KEY, None) or ():
+        _SUMMARY_CACHE.invalidate_project(project_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_project_summaries(session: Session) -> None:
+    session.info.pop(_STALE_PROJECTS_KEY, None)
+
+
 def person_summary(person: Person) -> dict[str, Any]:
     return {
         "id": int(person.id),
@@ -249,8 +415,13 @@ def build_ispec_context(
     state: dict[str, Any] | None = None,
     user: AuthUser | None = None,
     max_items: int = 20,
+    cache_stats: dict[str, int] | None = None,
 ) -> dict[str, Any]:
-    """Return a compact, LLM-friendly context payload from the iSPEC DB."""
+    """Return a compact, LLM-friendly context payload from the iSPEC DB.
+
+    Project summaries come from the shared summary cache; pass
+    ``cache_stats`` to receive this call's ``hits``/``misses``.
+    """
 
     lowered = (message or "").lower()
     context: dict[str, Any] = {}
@@ -292,11 +463,12 @@ def build_ispec_context(
             missing_project_ids.append(project_id)
             continue
         resolved_projects.append(
-            project_summary(
+            cached_project_summary(
                 db,
                 project,
                 include_comments=include_project_comments,
                 include_details=True,
+                stats=cache_stats,
             )
         )
     if resolved_projects:
@@ -315,11 +487,12 @@ def build_ispec_context(
             if project is None:
                 context["missing_current_project"] = focused_project_id
             else:
-                context["current_project"] = project_summary(
+                context["current_project"] = cached_project_summary(
                     db,
                     project,
                     include_comments=include_project_comments,
                     include_details=True,
+                    stats=cache_stats,
                 )
 
     if "current" in lowered and "project" in lowered:
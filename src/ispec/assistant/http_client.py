@@ -0,0 +1,195 @@
+"""Shared keep-alive HTTP clients for inference providers (vLLM, Ollama, classifier).
+
+All provider calls go through one process-wide :class:`requests.Session`
+whose adapter keeps up to ``ISPEC_INFERENCE_HTTP_POOL_SIZE`` idle connections
+per host, so the several LLM calls of a chat turn reuse warm TCP connections
+instead of reconnecting each time. :func:`async_client` returns the asyncio
+flavour (an ``httpx.AsyncClient`` with the same limits, one per event loop);
+``httpx`` is optional and only imported when that client is requested.
+
+Each sync response carries an ``ispec_timing`` dict splitting latency into
+``connect_ms`` (0 when a pooled connection was reused) and ``ttfb_ms`` (time
+from sending the request to its response headers, connect included);
+:func:`call_timing` adds ``total_ms`` once the body has been read, for
+:mod:`ispec.assistant.usage_logging`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_SIZE = 16
+_MAX_POOL_SIZE = 256
+
+_local = threading.local()
+_session_lock = threading.Lock()
+_session: requests.Session | None = None
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = weakref.WeakKeyDictionary()
+
+
+def _pool_size() -> int:
+    raw = (os.getenv("ISPEC_INFERENCE_HTTP_POOL_SIZE") or "").strip()
+    if not raw:
+        return DEFAULT_POOL_SIZE
+    try:
+        return max(1, min(_MAX_POOL_SIZE, int(raw)))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+def _record_connect(seconds: float) -> None:
+    _local.connect_seconds = getattr(_local, "connect_seconds", 0.0) + seconds
+    _local.connections = getattr(_local, "connections", 0) + 1
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _record_connect(time.perf_counter() - started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _record_connect(time.perf_counter() - started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose pools time new connections (TCP + TLS setup)."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _build_session() -> requests.Session:
+    size = _pool_size()
+    session = requests.Session()
+    adapter = _TimedAdapter(pool_connections=size, pool_maxsize=size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+
+    global _session
+    session = _session
+    if session is not None:
+        return session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def reset() -> None:
+    """Close pooled connections and drop the shared session (tests, config reloads).
+
+    Async clients are closed on their own event loop: scheduled there when the
+    loop is running, run to completion when it is idle, and skipped when it
+    is already closed.
+    """
+
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+    clients = list(_async_clients.items())
+    _async_clients.clear()
+    for loop, client in clients:
+        if loop.is_closed() or client.is_closed:
+            continue
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            loop.run_until_complete(client.aclose())
+
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    _local.connect_seconds = 0.0
+    _local.connections = 0
+    response = get_session().request(method, url, **kwargs)
+    elapsed = getattr(response, "elapsed", None)
+    response.ispec_timing = {  # type: ignore[attr-defined]
+        "connect_ms": int(_local.connect_seconds * 1000),
+        "ttfb_ms": int(elapsed.total_seconds() * 1000) if elapsed is not None else None,
+        "new_connections": int(_local.connections),
+    }
+    return response
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def call_timing(response: Any, started: float) -> dict[str, Any]:
+    """Latency split for a finished call; ``started`` is a ``time.monotonic()`` value."""
+
+    timing: dict[str, Any] = dict(getattr(response, "ispec_timing", None) or {})
+    timing["total_ms"] = int((time.monotonic() - started) * 1000)
+    return timing
+
+
+def async_client() -> Any:
+    """Return the pooled ``httpx.AsyncClient`` bound to the running event loop.
+
+    Raises ``RuntimeError`` when called outside a running loop or when
+    ``httpx`` is not installed.
+    """
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None and not client.is_closed:
+        return client
+    try:
+        import httpx
+    except ImportError as exc:
+        raise RuntimeError("The asyncio inference client requires httpx (pip install httpx).") from exc
+    size = _pool_size()
+    client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+    )
+    _async_clients[loop] = client
+    return client
+
+
+async def apost(url: str, **kwargs: Any) -> Any:
+    """Async ``POST`` through :func:`async_client`; the response has ``ispec_timing``."""
+
+    response = await async_client().post(url, **kwargs)
+    response.ispec_timing = {"ttfb_ms": int(response.elapsed.total_seconds() * 1000)}
+    return response
@@ -141,3 +141,15 @@ class SupportSessionReview(AssistantBase):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow, index=True)
 
     session: Mapped[SupportSession] = relationship(back_populates="reviews")
+
+
+class SupportOpsCounter(AssistantBase):
+    """Row counts for the ops dashboard, kept current by SQLite triggers.
+
+    See :func:`ispec.assistant.connect._ensure_ops_counters`.
+    """
+
+    __tablename__ = "support_ops_counter"
+
+    name: Mapped[str] = mapped_column(Text, primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, default=0)
@@ -3,33 +3,38 @@ from __future__ import annotations
 import re
 from typing import Iterable
 
+from ispec.assistant.token_counter import count_tokens, count_tokens_batch
 
 _WHITESPACE_RE = re.compile(r"\s+")
 
 
 def estimate_tokens(text: str) -> int:
-    """Best-effort token estimate without a tokenizer.
+    """Token count for ``text`` (see :mod:`ispec.assistant.token_counter`).
 
-    We keep this intentionally simple and conservative. A common rough estimate
-    for Llama-style tokenizers is ~4 characters per token on English text.
+    Without a configured tokenizer this is the ~4 characters per token
+    heuristic.
     """
 
-    if not text:
-        return 0
-    return max(1, (len(text) + 3) // 4)
+    return count_tokens(text)
+
+
+def _message_overhead(message: dict[str, str]) -> int:
+    # Small per-message overhead (role/formatting).
+    return 4 if (message.get("role") or "").strip() else 2
+
+
+def estimate_tokens_per_message(messages: Iterable[dict[str, str]]) -> list[int]:
+    """Token count of each message in an OpenAI-style chat `messages` list."""
+
+    items = list(messages)
+    counts = count_tokens_batch([item.get("content") or "" for item in items])
+    return [count + _message_overhead(item) for item, count in zip(items, counts)]
 
 
 def estimate_tokens_for_messages(messages: Iterable[dict[str, str]]) -> int:
     """Estimate tokens for an OpenAI-style chat `messages` list."""
 
-    total = 0
-    for message in messages:
-        role = (message.get("role") or "").strip()
-        content = message.get("content") or ""
-        total += estimate_tokens(content)
-        # Small per-message overhead (role/formatting).
-        total += 4 if role else 2
-    return total
+    return sum(estimate_tokens_per_message(messages))
 
 
 def normalize_text(text: str) -> str:
@@ -0,0 +1,397 @@
+"""Incremental FTS5 indexes over assistant transcripts and agent logs.
+
+Each source table gets a standalone FTS5 table (``<table>_fts``) with a single
+``body`` column whose rowid is the source row id. Bodies are flattened text:
+message content as-is, JSON columns reduced to their keys and scalar values
+so snippets read like prose rather than escaped JSON.
+
+Unlike the core-table indexes in :mod:`ispec.db.fts` these are not filled by
+triggers (the bodies need Python-side flattening). Instead
+:func:`refresh_search_index` indexes rows past a per-source watermark stored
+in ``search_index_state``: the last id for append-only tables, or the last
+``(updated_at, id)`` for tables whose rows change after insert. The
+supervisor calls it on a short poll, and readers cover the not-yet-indexed
+tail with a bounded ``ILIKE`` via :func:`unindexed_filter`. Deletes are the
+exception: an ``AFTER DELETE`` trigger on each source table drops the row's
+index entry, so pruned or archived rows take their text with them.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    and_,
+    column,
+    delete,
+    or_,
+    select,
+    table,
+    text,
+    true,
+)
+from sqlalchemy.orm import Session
+
+from ispec.agent.models import AgentCommand, AgentEvent, AgentStep
+from ispec.assistant.models import SupportMemory, SupportMessage
+from ispec.db import fts
+from ispec.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_BATCHES = 4
+SNIPPET_TOKENS = 32
+_MAX_BODY_CHARS = 64_000
+
+_state_metadata = MetaData()
+search_index_state = Table(
+    "search_index_state",
+    _state_metadata,
+    Column("source", Text, primary_key=True),
+    Column("last_id", Integer, nullable=False, default=0),
+    Column("last_updated_at", DateTime, nullable=True),
+)
+
+
+def _flatten_into(value: Any, out: list[str]) -> None:
+    if value is None:
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            out.append(str(key))
+            _flatten_into(item, out)
+        return
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            _flatten_into(item, out)
+        return
+    if isinstance(value, bool):
+        out.append("true" if value else "false")
+        return
+    out.append(str(value))
+
+
+def flatten_json(value: Any) -> str:
+    """Reduce a JSON value (or JSON text) to space-separated keys and scalars."""
+
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped[:1] in ("{", "["):
+            try:
+                value = json.loads(stripped)
+            except ValueError:
+                return stripped
+        else:
+            return stripped
+    parts: list[str] = []
+    _flatten_into(value, parts)
+    return " ".join(parts)
+
+
+def _join(*parts: Any) -> str:
+    body = "\n".join(str(part) for part in parts if part not in (None, ""))
+    return body[:_MAX_BODY_CHARS]
+
+
+@dataclass(frozen=True)
+class _Source:
+    name: str
+    model: Any
+    body: Callable[[Any], str]
+    # Rows that change after insert are tracked by (updated_at, id) instead of id.
+    updated_column: str | None = None
+    where: Callable[[], Any] | None = None
+
+    @property
+    def table_name(self) -> str:
+        return self.model.__table__.name
+
+
+def _message_body(row: SupportMessage) -> str:
+    return _join(row.content)
+
+
+def _digest_body(row: SupportMemory) -> str:
+    return _join(row.key, flatten_json(row.value_json))
+
+
+def _step_body(row: AgentStep) -> str:
+    return _join(
+        row.kind,
+        row.error,
+        *(
+            flatten_json(getattr(row, name))
+            for name in (
+                "prompt_json",
+                "response_json",
+                "tool_results_json",
+                "state_before_json",
+                "state_after_json",
+                "summary_before_json",
+                "summary_after_json",
+            )
+        ),
+    )
+
+
+def _command_body(row: AgentCommand) -> str:
+    return _join(
+        row.command_type,
+        row.status,
+        row.error,
+        flatten_json(row.payload_json),
+        flatten_json(row.result_json),
+    )
+
+
+def _event_body(row: AgentEvent) -> str:
+    return _join(row.agent_id, row.event_type, row.name, row.severity, flatten_json(row.payload_json))
+
+
+SOURCES: dict[str, _Source] = {
+    source.name: source
+    for source in (
+        _Source("messages", SupportMessage, _message_body),
+        _Source(
+            "digests",
+            SupportMemory,
+            _digest_body,
+            updated_column="updated_at",
+            where=lambda: SupportMemory.kind == "digest",
+        ),
+        _Source("steps", AgentStep, _step_body),
+        _Source("commands", AgentCommand, _command_body, updated_column="updated_at"),
+        _Source("events", AgentEvent, _event_body),
+    )
+}
+ASSISTANT_SOURCES = ("messages", "digests")
+AGENT_SOURCES = ("steps", "commands", "events")
+
+
+def _source(name: str) -> _Source:
+    source = SOURCES.get(name)
+    if source is None:
+        raise ValueError(f"Unknown search index source: {name}")
+    return source
+
+
+def ensure_search_index(session: Session, sources: Iterable[str]) -> None:
+    """Create the state table and FTS tables for ``sources`` if missing."""
+
+    bind = session.get_bind()
+    if bind.dialect.name != "sqlite":
+        raise ValueError("Full-text search indexes require SQLite.")
+    search_index_state.create(session.connection(), checkfirst=True)
+    for name in sources:
+        source_table = _source(name).table_name
+        table_name = fts.fts_table_name(source_table)
+        session.execute(
+            text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts._quote(table_name)} USING fts5("
+                "body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        )
+        session.execute(
+            text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts._quote(table_name + '_ad')} "
+                f"AFTER DELETE ON {fts._quote(source_table)} BEGIN "
+                f"DELETE FROM {fts._quote(table_name)} WHERE rowid = old.id; END"
+            )
+        )
+    session.commit()
+
+
+def _load_state(session: Session, name: str) -> tuple[int, datetime | None]:
+    row = session.execute(
+        select(search_index_state.c.last_id, search_index_state.c.last_updated_at).where(
+            search_index_state.c.source == name
+        )
+    ).first()
+    if row is None:
+        return 0, None
+    return int(row.last_id or 0), row.last_updated_at
+
+
+def _save_state(session: Session, name: str, last_id: int, last_updated_at: datetime | None) -> None:
+    values = {"last_id": int(last_id), "last_updated_at": last_updated_at}
+    updated = session.execute(
+        search_index_state.update().where(search_index_state.c.source == name).values(**values)
+    )
+    if not updated.rowcount:
+        session.execute(search_index_state.insert().values(source=name, **values))
+
+
+def _after_watermark(source: _Source, last_id: int, last_updated_at: datetime | None):
+    model = source.model
+    if source.updated_column is None:
+        return model.id > int(last_id)
+    if last_updated_at is None:
+        return true()
+    updated = getattr(model, source.updated_column)
+    return or_(updated > last_updated_at, and_(updated == last_updated_at, model.id > int(last_id)))
+
+
+def _fts_table(source: _Source):
+    return table(fts.fts_table_name(source.table_name), column("rowid"), column("body"))
+
+
+def _index_batch(session: Session, source: _Source, *, batch_size: int) -> int:
+    model = source.model
+    last_id, last_updated_at = _load_state(session, source.name)
+    # Plain column rows (not ORM instances) keep the caller's identity map untouched.
+    stmt = select(model.__table__).where(_after_watermark(source, last_id, last_updated_at))
+    if source.where is not None:
+        stmt = stmt.where(source.where())
+    if source.updated_column is None:
+        stmt = stmt.order_by(model.id.asc())
+    else:
+        stmt = stmt.order_by(getattr(model, source.updated_column).asc(), model.id.asc())
+    rows = session.execute(stmt.limit(batch_size)).all()
+    if not rows:
+        return 0
+
+    fts_table = _fts_table(source)
+    ids = [int(row.id) for row in rows]
+    if source.updated_column is not None:
+        session.execute(delete(fts_table).where(fts_table.c.rowid.in_(ids)))
+    session.execute(
+        fts_table.insert(),
+        [{"rowid": int(row.id), "body": source.body(row)} for row in rows],
+    )
+
+    tail = rows[-1]
+    if source.updated_column is None:
+        _save_state(session, source.name, int(tail.id), None)
+    else:
+        _save_state(session, source.name, int(tail.id), getattr(tail, source.updated_column))
+    session.commit()
+    return len(rows)
+
+
+def refresh_search_index(
+    session: Session,
+    sources: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_batches: int | None = DEFAULT_MAX_BATCHES,
+) -> dict[str, int]:
+    """Index rows past each source's watermark; return rows scanned per source.
+
+    Each batch is committed with its watermark. Work per call is bounded by
+    ``batch_size * max_batches`` rows per source (``max_batches=None`` drains
+    everything), so a supervisor tick stays short even after a large
+    backlog; the next tick resumes from the watermark.
+    """
+
+    names = list(sources)
+    ensure_search_index(session, names)
+    batch_size = max(1, int(batch_size))
+    summary: dict[str, int] = {}
+    for name in names:
+        source = _source(name)
+        scanned = 0
+        batches = 0
+        while max_batches is None or batches < int(max_batches):
+            count = _index_batch(session, source, batch_size=batch_size)
+            scanned += count
+            batches += 1
+            if count < batch_size:
+                break
+        summary[name] = scanned
+    return summary
+
+
+def rebuild_search_index(session: Session, sources: Iterable[str]) -> dict[str, int]:
+    """Drop and fully repopulate the indexes for ``sources``."""
+
+    names = list(sources)
+    ensure_search_index(session, names)
+    for name in names:
+        source = _source(name)
+        session.execute(text(f"DELETE FROM {fts._quote(fts.fts_table_name(source.table_name))}"))
+        session.execute(delete(search_index_state).where(search_index_state.c.source == name))
+    session.commit()
+    summary = refresh_search_index(session, names, max_batches=None)
+    logger.info("Rebuilt assistant/agent search indexes: %s", summary)
+    return summary
+
+
+def has_search_index(session: Session, name: str) -> bool:
+    return fts.has_search_index(session, _source(name).model)
+
+
+def ranked_matches(name: str, q: str):
+    """Subquery of ``(rowid, rank, snippet)`` FTS matches, or ``None`` for empty ``q``."""
+
+    return fts.ranked_matches(_source(name).model, q, snippet_tokens=SNIPPET_TOKENS)
+
+
+def unindexed_filter(session: Session, name: str):
+    """Predicate selecting rows the index has not caught up with yet."""
+
+    source = _source(name)
+    last_id, last_updated_at = _load_state(session, name)
+    return _after_watermark(source, last_id, last_updated_at)
+
+
+def ranked_search(
+    session: Session,
+    query,
+    name: str,
+    q: str,
+    *,
+    limit: int,
+    tail_predicate,
+) -> list[tuple[Any, str | None]]:
+    """Run ``query`` (whose first entity is the source model) against the index.
+
+    Returns up to ``limit`` ``(row, snippet)`` pairs: rows the index has not
+    reached yet that satisfy ``tail_predicate`` come first, newest first and
+    without a snippet; then indexed matches by bm25 rank with FTS5's snippet.
+    """
+
+    model = _source(name).model
+    tail = (
+        query.filter(unindexed_filter(session, name), tail_predicate)
+        .order_by(model.id.desc())
+        .limit(limit)
+        .all()
+    )
+    hits: list[tuple[Any, str | None]] = [(row, None) for row in tail]
+    seen = {int(_entity(row, model).id) for row in tail}
+    matches = ranked_matches(name, q)
+    if matches is None or len(hits) >= limit:
+        return hits[:limit]
+
+    ranked = (
+        query.join(matches, matches.c.rowid == model.id)
+        .add_columns(matches.c.snippet)
+        .order_by(matches.c.rank.asc(), model.id.desc())
+        .limit(limit + len(seen))
+        .all()
+    )
+    for result in ranked:
+        values = tuple(result)
+        row = values[0] if len(values) == 2 else values[:-1]
+        row_id = int(_entity(row, model).id)
+        if row_id in seen:
+            continue  # changed since it was indexed; the tail copy is current
+        seen.add(row_id)
+        hits.append((row, values[-1]))
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def _entity(row: Any, model) -> Any:
+    return row if isinstance(row, model) else row[0]
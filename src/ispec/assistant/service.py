@@ -6,10 +6,11 @@ import os
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Callable, Literal
 
 import requests
 
+from ispec.assistant import http_client
 from ispec.assistant.tools import TOOL_CALL_PREFIX, TOOL_RESULT_PREFIX, tool_prompt
 from ispec.assistant.usage_logging import record_inference_usage_event
 from ispec.logging import get_logger
@@ -19,6 +20,8 @@ from ispec.prompt import PromptSource, PromptVersionInfo, RenderedPrompt, load_b
 logger = get_logger(__name__)
 
 ResponseFormat = Literal["single", "compare"]
+# Receives each content fragment as the provider streams it.
+DeltaCallback = Callable[[str], None]
 
 @dataclass(frozen=True)
 class AssistantReply:
@@ -434,13 +437,36 @@ def _vllm_headers() -> dict[str, str]:
     return {"Authorization": f"Bearer {api_key}"}
 
 
+def _vllm_model_cache_seconds() -> float:
+    raw = (os.getenv("ISPEC_VLLM_MODEL_CACHE_SECONDS") or "").strip()
+    if not raw:
+        return 300.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 300.0
+
+
+# base_url -> (resolved_at monotonic, model id) for servers without ISPEC_VLLM_MODEL.
+_resolved_vllm_models: dict[str, tuple[float, str]] = {}
+
+
+def clear_vllm_model_cache() -> None:
+    _resolved_vllm_models.clear()
+
+
 def _resolve_vllm_model(*, base_url: str, headers: dict[str, str], timeout: float) -> str | None:
     model = _vllm_model()
     if model:
         return model
 
+    ttl = _vllm_model_cache_seconds()
+    cached = _resolved_vllm_models.get(base_url)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
     url = f"{base_url}/v1/models"
-    response = requests.get(url, headers=headers, timeout=timeout)
+    response = http_client.get(url, headers=headers, timeout=timeout)
     response.raise_for_status()
     payload = response.json()
 
@@ -453,6 +479,8 @@ def _resolve_vllm_model(*, base_url: str, headers: dict[str, str], timeout: floa
     if not isinstance(first, dict):
         return None
     value = (first.get("id") or "").strip()
+    if value and ttl > 0:
+        _resolved_vllm_models[base_url] = (time.monotonic(), value)
     return value or None
 
 
@@ -492,7 +520,15 @@ def generate_reply(
     stage: Literal["planner", "answer", "review"] = "answer",
     vllm_extra_body: dict[str, Any] | None = None,
     observability_context: dict[str, Any] | None = None,
+    on_delta: DeltaCallback | None = None,
 ) -> AssistantReply:
+    """Run one chat completion against the configured provider.
+
+    With ``on_delta`` the request is streamed and each content fragment is
+    passed to the callback as it arrives; the returned reply is the same
+    assembled reply a non-streaming call would produce.
+    """
+
     provider = (os.getenv("ISPEC_ASSISTANT_PROVIDER") or "stub").strip().lower()
     if messages is None:
         if message is None:
@@ -507,7 +543,12 @@ def generate_reply(
         )
         observability_context = prompt_observability_context(stage_prompt, extra=observability_context)
     if provider == "ollama":
-        return _generate_ollama_reply(messages=messages, tools=tools, observability_context=observability_context)
+        return _generate_ollama_reply(
+            messages=messages,
+            tools=tools,
+            observability_context=observability_context,
+            on_delta=on_delta,
+        )
     if provider == "vllm":
         return _generate_vllm_reply(
             messages=messages,
@@ -515,13 +556,17 @@ def generate_reply(
             tool_choice=tool_choice,
             extra_body=vllm_extra_body,
             observability_context=observability_context,
+            on_delta=on_delta,
         )
+    content = (
+        "Support assistant is running in stub mode. "
+        "Set `ISPEC_ASSISTANT_PROVIDER=ollama` or `ISPEC_ASSISTANT_PROVIDER=vllm` "
+        "to enable a local model."
+    )
+    if on_delta is not None:
+        on_delta(content)
     return AssistantReply(
-        content=(
-            "Support assistant is running in stub mode. "
-            "Set `ISPEC_ASSISTANT_PROVIDER=ollama` or `ISPEC_ASSISTANT_PROVIDER=vllm` "
-            "to enable a local model."
-        ),
+        content=content,
         provider="stub",
         model=None,
         meta=None,
@@ -593,7 +638,34 @@ def _build_messages(
     return messages
 
 
-def _generate_ollama_reply(*, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None, observability_context: dict[str, Any] | None = None) -> AssistantReply:
+def _read_ollama_stream(response: requests.Response, on_delta: DeltaCallback) -> dict[str, Any]:
+    """Consume Ollama's NDJSON chat stream into a non-streaming response shape."""
+
+    parts: list[str] = []
+    final: dict[str, Any] = {}
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            continue
+        chunk = json.loads(line)
+        if not isinstance(chunk, dict):
+            continue
+        message_obj = chunk.get("message")
+        piece = str(message_obj.get("content") or "") if isinstance(message_obj, dict) else ""
+        if piece:
+            parts.append(piece)
+            on_delta(piece)
+        if chunk.get("done"):
+            final = chunk  # keep reading to the end so the connection can return to the pool
+    return {**final, "message": {"role": "assistant", "content": "".join(parts)}}
+
+
+def _generate_ollama_reply(
+    *,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    observability_context: dict[str, Any] | None = None,
+    on_delta: DeltaCallback | None = None,
+) -> AssistantReply:
     url = f"{_ollama_url()}/api/chat"
     model = _ollama_model()
     timeout = _ollama_timeout_seconds()
@@ -608,15 +680,21 @@ def _generate_ollama_reply(*, messages: list[dict[str, Any]], tools: list[dict[s
             role = "system"
         normalized_messages.append({"role": role, "content": str(item.get("content", "") or "")})
 
-    payload = {"model": model, "messages": normalized_messages, "stream": False}
+    payload = {"model": model, "messages": normalized_messages, "stream": on_delta is not None}
     temperature = _assistant_temperature()
     if temperature is not None:
         payload["options"] = {"temperature": temperature}
     started = time.monotonic()
     try:
-        response = requests.post(url, json=payload, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
+        if on_delta is None:
+            response = http_client.post(url, json=payload, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+        else:
+            with http_client.post(url, json=payload, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                data = _read_ollama_stream(response, on_delta)
+        timing = http_client.call_timing(response, started)
     except Exception as exc:
         error = f"{type(exc).__name__}: {exc}"
         logger.warning("Ollama request failed (%s): %s", url, error)
@@ -648,7 +726,9 @@ def _generate_ollama_reply(*, messages: list[dict[str, Any]], tools: list[dict[s
     if not content and not tool_calls:
         content = json.dumps(data)[:4000]
 
-    meta = {"url": url, "elapsed_ms": elapsed_ms}
+    meta = {"url": url, "elapsed_ms": elapsed_ms, "timing": timing}
+    if on_delta is not None:
+        meta["streamed"] = True
     record_inference_usage_event(
         provider="ollama",
         model=model,
@@ -810,6 +890,68 @@ def _salvage_vllm_tool_calls_from_content(content: str | None) -> tuple[list[dic
     return [normalized], shape
 
 
+def _merge_tool_call_deltas(merged: dict[int, dict[str, Any]], deltas: list[Any]) -> None:
+    for delta in deltas:
+        if not isinstance(delta, dict):
+            continue
+        index = int(delta.get("index") or 0)
+        entry = merged.setdefault(index, {"type": "function", "function": {"name": "", "arguments": ""}})
+        if delta.get("id"):
+            entry["id"] = delta["id"]
+        if delta.get("type"):
+            entry["type"] = delta["type"]
+        func_obj = delta.get("function")
+        if isinstance(func_obj, dict):
+            entry["function"]["name"] += str(func_obj.get("name") or "")
+            entry["function"]["arguments"] += str(func_obj.get("arguments") or "")
+
+
+def _read_vllm_stream(response: requests.Response, on_delta: DeltaCallback) -> dict[str, Any]:
+    """Consume an OpenAI-style SSE stream into a non-streaming completion shape.
+
+    Content fragments go to ``on_delta`` as they arrive; tool-call fragments
+    are merged by index, so the result parses exactly like ``stream: false``.
+    """
+
+    parts: list[str] = []
+    tool_calls: dict[int, dict[str, Any]] = {}
+    usage: dict[str, Any] | None = None
+    finish_reason: str | None = None
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            continue  # read to the end so the connection can return to the pool
+        chunk = json.loads(data)
+        if not isinstance(chunk, dict):
+            continue
+        if isinstance(chunk.get("usage"), dict):
+            usage = chunk["usage"]
+        choices = chunk.get("choices")
+        if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+            continue
+        choice0 = choices[0]
+        finish_reason = choice0.get("finish_reason") or finish_reason
+        delta = choice0.get("delta")
+        if not isinstance(delta, dict):
+            continue
+        piece = delta.get("content")
+        if piece:
+            parts.append(str(piece))
+            on_delta(str(piece))
+        if isinstance(delta.get("tool_calls"), list):
+            _merge_tool_call_deltas(tool_calls, delta["tool_calls"])
+
+    message: dict[str, Any] = {"role": "assistant", "content": "".join(parts)}
+    if tool_calls:
+        message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+    completion: dict[str, Any] = {"choices": [{"message": message, "finish_reason": finish_reason}]}
+    if usage is not None:
+        completion["usage"] = usage
+    return completion
+
+
 def _generate_vllm_reply(
     *,
     messages: list[dict[str, Any]],
@@ -817,6 +959,7 @@ def _generate_vllm_reply(
     tool_choice: str | dict[str, Any] | None = None,
     extra_body: dict[str, Any] | None = None,
     observability_context: dict[str, Any] | None = None,
+    on_delta: DeltaCallback | None = None,
 ) -> AssistantReply:
     base_url = _vllm_url()
     url = f"{base_url}/v1/chat/completions"
@@ -849,7 +992,9 @@ def _generate_vllm_reply(
         )
     model = model or "unknown"
 
-    payload_base: dict[str, Any] = {"model": model, "messages": messages, "stream": False}
+    payload_base: dict[str, Any] = {"model": model, "messages": messages, "stream": on_delta is not None}
+    if on_delta is not None:
+        payload_base["stream_options"] = {"include_usage": True}
     temperature = _assistant_temperature()
     if temperature is not None:
         payload_base["temperature"] = temperature
@@ -861,6 +1006,7 @@ def _generate_vllm_reply(
     if extra_body:
         cleaned_extra_body = _sanitize_vllm_extra_body(extra_body)
         payload.update(cleaned_extra_body)
+    stream_kwargs: dict[str, Any] = {"stream": True} if on_delta is not None else {}
     started = time.monotonic()
     fallback: dict[str, Any] = {}
     rejections: list[dict[str, Any]] = []
@@ -883,11 +1029,32 @@ def _generate_vllm_reply(
             )
 
         last_exc: Exception | None = None
+        delta_count = 0
+
+        def counted_delta(piece: str) -> None:
+            nonlocal delta_count
+            delta_count += 1
+            on_delta(piece)
+
         for label, candidate, candidate_fallback in candidates:
+            if delta_count:
+                # The client already holds text from a failed attempt; retrying would splice two replies.
+                break
             try:
-                response = requests.post(url, json=candidate, headers=headers, timeout=timeout)
-                response.raise_for_status()
-                data = response.json()
+                attempt_started = time.monotonic()
+                response = http_client.post(url, json=candidate, headers=headers, timeout=timeout, **stream_kwargs)
+                if on_delta is None:
+                    response.raise_for_status()
+                    data = response.json()
+                else:
+                    try:
+                        if not response.ok:
+                            response.content  # keep the error body readable after close()
+                        response.raise_for_status()
+                        data = _read_vllm_stream(response, counted_delta)
+                    finally:
+                        response.close()
+                timing = http_client.call_timing(response, attempt_started)
                 fallback = candidate_fallback
                 last_exc = None
                 break
@@ -1012,7 +1179,9 @@ def _generate_vllm_reply(
     if not content and not tool_calls:
         content = json.dumps(data)[:4000]
 
-    meta: dict[str, Any] = {"url": url, "elapsed_ms": elapsed_ms}
+    meta: dict[str, Any] = {"url": url, "elapsed_ms": elapsed_ms, "timing": timing}
+    if on_delta is not None:
+        meta["streamed"] = True
     if usage is not None:
         meta["usage"] = usage
     if tools is not None:
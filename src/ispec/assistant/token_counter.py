@@ -0,0 +1,168 @@
+"""Token counting for prompt budgets.
+
+By default counts use the ~4 characters per token heuristic. When
+``ISPEC_ASSISTANT_TOKENIZER_PATH`` points at a local ``tokenizer.json`` (the
+file shipped with the served model) and the optional ``tokenizers`` package
+is installed, counts come from the real tokenizer instead, so history
+truncation and digest fitting match what vLLM will actually see.
+
+Tokenizer counts are memoized by content hash. System prompts, tool specs and
+other stable fragments are re-counted on every turn, so after the first turn
+they cost one hash instead of one encode. :func:`count_tokens_batch` encodes
+all cache misses in a single ``encode_batch`` call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable
+
+from ispec.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def heuristic_tokens(text: str) -> int:
+    """Best-effort token estimate without a tokenizer.
+
+    We keep this intentionally simple and conservative. A common rough estimate
+    for Llama-style tokenizers is ~4 characters per token on English text.
+    """
+
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
+
+
+class TokenCounter:
+    """Counts tokens with the heuristic; subclasses plug in a real tokenizer."""
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        return heuristic_tokens(text)
+
+    def count_batch(self, texts: Iterable[str]) -> list[int]:
+        return [self.count(text) for text in texts]
+
+    def stats(self) -> dict[str, Any]:
+        return {"counter": self.name}
+
+
+class TokenizerCounter(TokenCounter):
+    """Counts with a Hugging Face ``tokenizers`` tokenizer, memoized by content hash."""
+
+    def __init__(self, tokenizer: Any, *, name: str, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self._tokenizer = tokenizer
+        self.name = name
+        self.cache_size = max(1, int(cache_size))
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[bytes, int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, path: str | Path, **kwargs: Any) -> "TokenizerCounter":
+        from tokenizers import Tokenizer
+
+        return cls(Tokenizer.from_file(str(path)), name=f"tokenizer:{Path(path).name}", **kwargs)
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def count(self, text: str) -> int:
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: Iterable[str]) -> list[int]:
+        values = [text if isinstance(text, str) else str(text or "") for text in texts]
+        counts: list[int | None] = [0 if not text else None for text in values]
+        keys: dict[int, bytes] = {}
+        with self._lock:
+            for idx, text in enumerate(values):
+                if not text:
+                    continue
+                key = self._key(text)
+                cached = self._cache.get(key)
+                if cached is None:
+                    keys[idx] = key
+                    continue
+                self._cache.move_to_end(key)
+                counts[idx] = cached
+                self.hits += 1
+            self.misses += len(keys)
+        if keys:
+            missing = list(keys)
+            encodings = self._tokenizer.encode_batch([values[idx] for idx in missing], add_special_tokens=False)
+            with self._lock:
+                for idx, encoding in zip(missing, encodings):
+                    counts[idx] = len(encoding.ids)
+                    self._cache[keys[idx]] = counts[idx]
+                    self._cache.move_to_end(keys[idx])
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [int(count or 0) for count in counts]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "counter": self.name,
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_counter_lock = threading.Lock()
+_counter: TokenCounter | None = None
+
+
+def _load_counter() -> TokenCounter:
+    path = (os.getenv("ISPEC_ASSISTANT_TOKENIZER_PATH") or "").strip()
+    if not path:
+        return TokenCounter()
+    try:
+        counter = TokenizerCounter.from_file(Path(path).expanduser())
+    except ImportError:
+        logger.warning("ISPEC_ASSISTANT_TOKENIZER_PATH is set but tokenizers is not installed; using estimates.")
+        return TokenCounter()
+    except Exception as exc:
+        logger.warning("Could not load tokenizer %s (%s); using estimates.", path, exc)
+        return TokenCounter()
+    logger.info("Prompt budgets use %s", counter.name)
+    return counter
+
+
+def get_token_counter() -> TokenCounter:
+    """Return the process-wide counter, loading the configured tokenizer on first use."""
+
+    global _counter
+    counter = _counter
+    if counter is not None:
+        return counter
+    with _counter_lock:
+        if _counter is None:
+            _counter = _load_counter()
+        return _counter
+
+
+def set_token_counter(counter: TokenCounter | None) -> None:
+    """Install ``counter`` (``None`` re-reads the environment on next use)."""
+
+    global _counter
+    with _counter_lock:
+        _counter = counter
+
+
+def count_tokens(text: str) -> int:
+    return get_token_counter().count(text)
+
+
+def count_tokens_batch(texts: Iterable[str]) -> list[int]:
+    return get_token_counter().count_batch(texts)
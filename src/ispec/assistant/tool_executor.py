@@ -0,0 +1,247 @@
+"""Concurrent execution of the tool calls returned in one assistant round.
+
+When the model asks for several tools at once, read-only calls are
+independent: each only runs its own queries. :func:`execute_tool_calls` keeps
+the model's order but runs each stretch of consecutive reads on a small shared
+thread pool. Every pooled call gets its own sessions, bound to the same
+engines as the request's sessions, because a SQLAlchemy ``Session`` must never
+be shared across threads. Write tools (:func:`tool_writes_data`) are barriers.
+Each one runs alone in the calling thread with the request's own sessions,
+after the reads before it and before the reads after it. A write may leave
+its changes uncommitted in the request's sessions, and pooled sessions would
+not see them. So once a write has run, the remaining reads also run inline,
+which keeps the turn's write guardrails unchanged.
+
+A turn-wide deadline bounds how long the caller waits. A call still running
+when the deadline passes is reported as timed out. Its worker finishes in the
+background and closes its own sessions. Until then it occupies one of the
+``ISPEC_ASSISTANT_TOOL_WORKERS`` pool threads. Later turns queue behind it, and
+their own deadlines still bound how long they wait, so size the pool for the
+number of slow tools you expect to overrun at once. Every outcome records the
+tool's wall time.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from ispec.assistant.tools import tool_writes_data
+from ispec.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TOOL_WORKERS = 4
+DEFAULT_TOOL_DEADLINE_SECONDS = 120.0
+_MAX_TOOL_WORKERS = 16
+
+# Keyword names ``run_tool`` takes its sessions under.
+SESSION_ARGS = ("core_db", "assistant_db", "agent_db", "schedule_db", "omics_db")
+
+_pool_lock = threading.Lock()
+_pool: ThreadPoolExecutor | None = None
+
+
+def tool_workers() -> int:
+    raw = (os.getenv("ISPEC_ASSISTANT_TOOL_WORKERS") or "").strip()
+    if not raw:
+        return DEFAULT_TOOL_WORKERS
+    try:
+        return max(1, min(_MAX_TOOL_WORKERS, int(raw)))
+    except ValueError:
+        return DEFAULT_TOOL_WORKERS
+
+
+def tool_deadline_seconds() -> float:
+    raw = (os.getenv("ISPEC_ASSISTANT_TOOL_DEADLINE_SECONDS") or "").strip()
+    if not raw:
+        return DEFAULT_TOOL_DEADLINE_SECONDS
+    try:
+        return max(1.0, float(raw))
+    except ValueError:
+        return DEFAULT_TOOL_DEADLINE_SECONDS
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=tool_workers(), thread_name_prefix="assistant-tool")
+        return _pool
+
+
+@dataclass(frozen=True)
+class ToolInvocation:
+    name: str
+    args: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class ToolOutcome:
+    payload: dict[str, Any]
+    elapsed_ms: int
+    concurrent: bool = False
+    timed_out: bool = False
+
+
+def _timeout_payload(name: str) -> dict[str, Any]:
+    return {
+        "ok": False,
+        "tool": name or None,
+        "error": "Tool call timed out (turn tool deadline exceeded); its result was discarded.",
+    }
+
+
+def _error_payload(name: str, exc: Exception) -> dict[str, Any]:
+    return {"ok": False, "tool": name or None, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _isolated_bind(db: Any) -> Any:
+    """Engine a worker may open its own session on, or ``None`` if unsafe."""
+
+    if not isinstance(db, Session):
+        return None
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    if engine.dialect.name == "sqlite" and engine.url.database in (None, "", ":memory:"):
+        return None  # each connection to an in-memory database is a different database
+    return engine
+
+
+def _run_isolated(
+    run: Callable[..., dict[str, Any]],
+    invocation: ToolInvocation,
+    binds: dict[str, Any],
+    run_kwargs: dict[str, Any],
+) -> tuple[dict[str, Any], int]:
+    started = time.monotonic()
+    sessions = {key: Session(bind=bind) for key, bind in binds.items()}
+    try:
+        payload = run(name=invocation.name, args=invocation.args, **sessions, **run_kwargs)
+        for db in sessions.values():
+            db.commit()
+    except Exception as exc:
+        logger.exception("Tool %s failed on a worker thread", invocation.name)
+        payload = _error_payload(invocation.name, exc)
+    finally:
+        for db in sessions.values():
+            db.close()
+    return payload, int((time.monotonic() - started) * 1000)
+
+
+def _run_inline(
+    run: Callable[..., dict[str, Any]],
+    invocation: ToolInvocation,
+    sessions: dict[str, Session | None],
+    run_kwargs: dict[str, Any],
+) -> ToolOutcome:
+    started = time.monotonic()
+    payload = run(name=invocation.name, args=invocation.args, **sessions, **run_kwargs)
+    return ToolOutcome(payload=payload, elapsed_ms=int((time.monotonic() - started) * 1000))
+
+
+def execute_tool_calls(
+    invocations: list[ToolInvocation],
+    *,
+    run: Callable[..., dict[str, Any]],
+    sessions: dict[str, Session | None],
+    run_kwargs: dict[str, Any] | None = None,
+    deadline: float | None = None,
+    before_write: Callable[[ToolInvocation], dict[str, Any] | None] | None = None,
+    after_write: Callable[[ToolInvocation, dict[str, Any]], None] | None = None,
+) -> list[ToolOutcome]:
+    """Run ``invocations`` and return their outcomes in the same order.
+
+    ``sessions`` maps :data:`SESSION_ARGS` names to the request's sessions.
+    Calls run in the given order, with writes as barriers. Consecutive read
+    calls run concurrently when all of these hold: there are at least two,
+    no write has run yet, the pool has more than one worker, and every
+    session can be reopened on another thread. Otherwise they run inline. ``deadline`` is a ``time.monotonic()``
+    value. ``before_write`` may return a payload that replaces a write call
+    without running it, for example when an earlier write blocked further
+    writes. ``after_write`` sees each payload before the next write runs.
+    """
+
+    kwargs = dict(run_kwargs or {})
+    outcomes: list[ToolOutcome | None] = [None] * len(invocations)
+    reads: list[int] = []
+    wrote = False
+    for idx, invocation in enumerate(invocations):
+        if not tool_writes_data(invocation.name):
+            reads.append(idx)
+            continue
+        _run_reads(
+            invocations, reads, outcomes, run=run, sessions=sessions, kwargs=kwargs, deadline=deadline, inline=wrote
+        )
+        reads = []
+        wrote = True
+        if deadline is not None and time.monotonic() >= deadline:
+            outcomes[idx] = ToolOutcome(payload=_timeout_payload(invocation.name), elapsed_ms=0, timed_out=True)
+            continue
+        replacement = before_write(invocation) if before_write is not None else None
+        if replacement is not None:
+            outcomes[idx] = ToolOutcome(payload=replacement, elapsed_ms=0)
+            continue
+        outcome = _run_inline(run, invocation, sessions, kwargs)
+        outcomes[idx] = outcome
+        if after_write is not None:
+            after_write(invocation, outcome.payload)
+    _run_reads(invocations, reads, outcomes, run=run, sessions=sessions, kwargs=kwargs, deadline=deadline, inline=wrote)
+
+    return [outcome for outcome in outcomes if outcome is not None]
+
+
+def _run_reads(
+    invocations: list[ToolInvocation],
+    reads: list[int],
+    outcomes: list[ToolOutcome | None],
+    *,
+    run: Callable[..., dict[str, Any]],
+    sessions: dict[str, Session | None],
+    kwargs: dict[str, Any],
+    deadline: float | None,
+    inline: bool = False,
+) -> None:
+    """Fill ``outcomes`` for one stretch of consecutive read calls."""
+
+    concurrent = not inline and len(reads) > 1 and tool_workers() > 1
+    binds: dict[str, Any] = {}
+    if concurrent:
+        binds = {key: _isolated_bind(db) for key, db in sessions.items() if db is not None}
+        concurrent = all(bind is not None for bind in binds.values())
+    if not concurrent:
+        for idx in reads:
+            if deadline is not None and time.monotonic() >= deadline:
+                outcomes[idx] = ToolOutcome(
+                    payload=_timeout_payload(invocations[idx].name), elapsed_ms=0, timed_out=True
+                )
+                continue
+            outcomes[idx] = _run_inline(run, invocations[idx], sessions, kwargs)
+        return
+
+    pool = _get_pool()
+    futures: dict[int, tuple[Future, float]] = {
+        idx: (pool.submit(_run_isolated, run, invocations[idx], binds, kwargs), time.monotonic())
+        for idx in reads
+    }
+    for idx, (future, submitted) in futures.items():
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            payload, elapsed_ms = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            outcomes[idx] = ToolOutcome(
+                payload=_timeout_payload(invocations[idx].name),
+                elapsed_ms=int((time.monotonic() - submitted) * 1000),
+                concurrent=True,
+                timed_out=True,
+            )
+            continue
+        outcomes[idx] = ToolOutcome(payload=payload, elapsed_ms=elapsed_ms, concurrent=True)
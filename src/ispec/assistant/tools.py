@@ -3,24 +3,28 @@ from __future__ import annotations
 from contextlib import nullcontext
 from datetime import date, datetime, time, timedelta
 import enum
+import functools
 import json
 import os
 from pathlib import Path
 import re
 import shutil
 import subprocess
+import threading
 import time as time_module
-from typing import Any
+from time import perf_counter
+from dataclasses import dataclass
+from typing import Any, Callable
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import Text, cast, func, or_
+from sqlalchemy import Text, and_, cast, func, or_
 from sqlalchemy.orm import Session, defer
 
 from ispec.agent.archive import get_agent_archive_session_if_available
 from ispec.agent.connect import get_agent_session
 from ispec.authz import get_project_for_user, scope_project_query, uses_explicit_project_access
 from ispec.backup import load_backup_status
-from ispec.assistant.context import person_summary, project_summary
+from ispec.assistant.context import cached_project_summary, person_summary
 from ispec.assistant.models import (
     SupportMemory,
     SupportMemoryEvidence,
@@ -38,6 +42,7 @@ from ispec.assistant.schedules import (
     parse_weekday,
     write_assistant_schedule_rows,
 )
+from ispec.assistant import search_index
 from ispec.assistant.slack_tmux_bridge import (
     BRIDGE_AGENT_ID,
     EVENT_SLACK_ARTIFACT_REPLY,
@@ -48,6 +53,7 @@ from ispec.assistant.slack_tmux_bridge import (
     relayed_reply_event_ids,
     stable_json,
 )
+from ispec.assistant.usage_report import load_usage_summary, usage_summary_digest
 from ispec.assistant.work_bag import recent_work_bag_payload
 from ispec.agent.commands import (
     COMMAND_DEV_RESTART_SERVICES,
@@ -56,6 +62,7 @@ from ispec.agent.commands import (
     COMMAND_SLACK_POST_MESSAGE,
 )
 from ispec.agent.models import AgentCommand, AgentEvent, AgentRun, AgentStep
+from ispec.db.crud import e2g_gene_group_keys
 from ispec.db.models import (
     AuthUser,
     E2G,
@@ -1810,7 +1817,7 @@ def tool_prompt(*, tool_names: set[str] | None = None) -> str:
     add("latest_activity", "- latest_activity(limit: int = 20, kinds: list[str] | None = None, current_only: bool = false)")
     add("billing_category_counts", "- billing_category_counts(current_only: bool = false, limit: int = 20)")
     add("db_file_stats", "- db_file_stats()  # show sqlite DB file sizes")
-    add("assistant_stats", "- assistant_stats()  # assistant DB stats, review backlog, and supervisor loop health")
+    add("assistant_stats", "- assistant_stats()  # assistant DB stats, review backlog, supervisor loop health, and inference latency")
     add(
         "assistant_list_tools",
         "- assistant_list_tools(query: str | None = None, include_unavailable: bool = false, limit: int = 30)  # tool catalog (meta)",
@@ -2361,6 +2368,29 @@ def _snippet_for_query(text: str | None, query: str, *, window: int = 80, max_le
     return snippet
 
 
+def _search_index_rows(
+    db: Session,
+    query,
+    source: str,
+    query_text: str,
+    *,
+    limit: int,
+    predicate,
+    order_by: tuple[Any, ...] | None = None,
+) -> list[tuple[Any, str | None]]:
+    """Return ``(row, snippet)`` matches, ranked via FTS when the index exists.
+
+    Without an index this is the plain ``ILIKE`` scan, newest first, and the
+    snippet is left to :func:`_snippet_for_query`.
+    """
+
+    if search_index.has_search_index(db, source):
+        return search_index.ranked_search(db, query, source, query_text, limit=limit, tail_predicate=predicate)
+    model = search_index.SOURCES[source].model
+    rows = query.filter(predicate).order_by(*(order_by or (model.id.desc(),))).limit(limit).all()
+    return [(row, None) for row in rows]
+
+
 def _safe_date(value: Any) -> date | None:
     if value is None:
         return None
@@ -2628,30 +2658,28 @@ def _search_internal_logs_from_db(
     source: str,
 ) -> dict[str, list[dict[str, Any]]]:
     pattern = f"%{query_text}%"
-    step_rows = (
-        db.query(AgentStep, AgentRun.run_id, AgentRun.agent_id)
-        .join(AgentRun, AgentStep.run_pk == AgentRun.id)
-        .filter(
-            or_(
-                AgentStep.kind.ilike(pattern),
-                AgentStep.error.ilike(pattern),
-                cast(AgentStep.prompt_json, Text).ilike(pattern),
-                cast(AgentStep.response_json, Text).ilike(pattern),
-                cast(AgentStep.tool_results_json, Text).ilike(pattern),
-                cast(AgentStep.state_before_json, Text).ilike(pattern),
-                cast(AgentStep.state_after_json, Text).ilike(pattern),
-                cast(AgentStep.summary_before_json, Text).ilike(pattern),
-                cast(AgentStep.summary_after_json, Text).ilike(pattern),
-            )
-        )
-        .order_by(AgentStep.id.desc())
-        .limit(limit)
-        .all()
+    step_hits = _search_index_rows(
+        db,
+        db.query(AgentStep, AgentRun.run_id, AgentRun.agent_id).join(AgentRun, AgentStep.run_pk == AgentRun.id),
+        "steps",
+        query_text,
+        limit=limit,
+        predicate=or_(
+            AgentStep.kind.ilike(pattern),
+            AgentStep.error.ilike(pattern),
+            cast(AgentStep.prompt_json, Text).ilike(pattern),
+            cast(AgentStep.response_json, Text).ilike(pattern),
+            cast(AgentStep.tool_results_json, Text).ilike(pattern),
+            cast(AgentStep.state_before_json, Text).ilike(pattern),
+            cast(AgentStep.state_after_json, Text).ilike(pattern),
+            cast(AgentStep.summary_before_json, Text).ilike(pattern),
+            cast(AgentStep.summary_after_json, Text).ilike(pattern),
+        ),
     )
     steps: list[dict[str, Any]] = []
-    for step, run_id, agent_id in step_rows:
-        response_preview = ""
-        if isinstance(step.response_json, dict):
+    for (step, run_id, agent_id), snippet in step_hits:
+        response_preview = snippet or ""
+        if snippet is None and isinstance(step.response_json, dict):
             response_preview = _snippet_for_query(json.dumps(step.response_json, ensure_ascii=False), query_text)
         steps.append(
             {
@@ -2670,29 +2698,29 @@ def _search_internal_logs_from_db(
             }
         )
 
-    command_rows = (
-        db.query(AgentCommand)
-        .filter(
-            or_(
-                AgentCommand.command_type.ilike(pattern),
-                AgentCommand.status.ilike(pattern),
-                AgentCommand.error.ilike(pattern),
-                cast(AgentCommand.payload_json, Text).ilike(pattern),
-                cast(AgentCommand.result_json, Text).ilike(pattern),
-            )
-        )
-        .order_by(AgentCommand.id.desc())
-        .limit(limit)
-        .all()
+    command_hits = _search_index_rows(
+        db,
+        db.query(AgentCommand),
+        "commands",
+        query_text,
+        limit=limit,
+        predicate=or_(
+            AgentCommand.command_type.ilike(pattern),
+            AgentCommand.status.ilike(pattern),
+            AgentCommand.error.ilike(pattern),
+            cast(AgentCommand.payload_json, Text).ilike(pattern),
+            cast(AgentCommand.result_json, Text).ilike(pattern),
+        ),
     )
     commands: list[dict[str, Any]] = []
-    for cmd in command_rows:
+    for cmd, snippet in command_hits:
         payload_preview = ""
-        if isinstance(cmd.payload_json, dict):
-            payload_preview = _snippet_for_query(json.dumps(cmd.payload_json, ensure_ascii=False), query_text)
         result_preview = ""
-        if isinstance(cmd.result_json, dict):
-            result_preview = _snippet_for_query(json.dumps(cmd.result_json, ensure_ascii=False), query_text)
+        if snippet is None:
+            if isinstance(cmd.payload_json, dict):
+                payload_preview = _snippet_for_query(json.dumps(cmd.payload_json, ensure_ascii=False), query_text)
+            if isinstance(cmd.result_json, dict):
+                result_preview = _snippet_for_query(json.dumps(cmd.result_json, ensure_ascii=False), query_text)
         commands.append(
             {
                 "command_id": int(cmd.id),
@@ -2703,29 +2731,29 @@ def _search_internal_logs_from_db(
                 "available_at": cmd.available_at.isoformat() if getattr(cmd, "available_at", None) else None,
                 "claimed_by_run_id": cmd.claimed_by_run_id,
                 "error": cmd.error,
+                "snippet": snippet,
                 "payload_preview": payload_preview,
                 "result_preview": result_preview,
             }
         )
 
-    event_rows = (
-        db.query(AgentEvent)
-        .filter(
-            or_(
-                AgentEvent.agent_id.ilike(pattern),
-                AgentEvent.event_type.ilike(pattern),
-                AgentEvent.name.ilike(pattern),
-                AgentEvent.severity.ilike(pattern),
-                AgentEvent.payload_json.ilike(pattern),
-            )
-        )
-        .order_by(AgentEvent.id.desc())
-        .limit(limit)
-        .all()
+    event_hits = _search_index_rows(
+        db,
+        db.query(AgentEvent),
+        "events",
+        query_text,
+        limit=limit,
+        predicate=or_(
+            AgentEvent.agent_id.ilike(pattern),
+            AgentEvent.event_type.ilike(pattern),
+            AgentEvent.name.ilike(pattern),
+            AgentEvent.severity.ilike(pattern),
+            AgentEvent.payload_json.ilike(pattern),
+        ),
     )
     events: list[dict[str, Any]] = []
-    for event in event_rows:
-        payload_preview = _snippet_for_query(event.payload_json, query_text)
+    for event, snippet in event_hits:
+        payload_preview = snippet or _snippet_for_query(event.payload_json, query_text)
         events.append(
             {
                 "event_id": int(event.id),
@@ -2981,1695 +3009,1153 @@ def format_tool_result_message(tool_name: str, payload: dict[str, Any]) -> str:
         payload, ensure_ascii=False, separators=(",", ":")
     )
 
+ToolHandler = Callable[..., dict[str, Any]]
 
-def run_tool(
-    *,
-    name: str,
-    args: dict[str, Any],
-    core_db: Session,
-    assistant_db: Session | None = None,
-    agent_db: Session | None = None,
-    schedule_db: Session | None = None,
-    omics_db: Session | None = None,
-    user: AuthUser | None = None,
-    api_schema: dict[str, Any] | None = None,
-    user_message: str | None = None,
-    project_comment_save_authorized: bool = False,
-    support_session_id: str | None = None,
-) -> dict[str, Any]:
-    # the large try block is not great - but these if statements for
-    # resolving tool call results is probably fine
-    # also not great to define closure inside as that makes it more difficult to test
-    try:
-        if name == "projects":
-            project_id = _safe_int(args.get("id"))
-            if project_id is None:
-                project_id = _safe_int(args.get("project_id"))
-            if project_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: id (or project_id)"}
-            name = "get_project"
-            args = {"id": project_id}
+_TOOL_HANDLERS: dict[str, ToolHandler] = {}
 
-        scope = _TOOL_SCOPES.get(name, ToolScope.staff)
-        scope_error = _scope_error(scope, user)
-        if scope_error:
-            return {"ok": False, "tool": name, "error": scope_error}
-        if _tool_requires_code_access(name):
-            code_tools_enabled, code_tools_reason = _code_tool_access_status(user)
-            if not code_tools_enabled:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": code_tools_reason or "Code tools are unavailable.",
-                }
 
-        if name in {"repo_list_files", "repo_search", "repo_read_file"}:
-            if not _repo_tools_enabled():
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": f"Repo tools are disabled. Set {_REPO_TOOLS_ENV}=1 to enable them.",
-                }
-            repo_root = _assistant_repo_root()
-            if repo_root is None:
-                return {"ok": False, "tool": name, "error": "Repo root not found."}
-
-            if name == "repo_list_files":
-                query = _safe_str(args.get("query"), max_len=256)
-                path = _safe_str(args.get("path"), max_len=256)
-                limit = _safe_int(args.get("limit")) or 200
-                return _repo_list_files(repo_root=repo_root, query=query, path=path, limit=limit)
-
-            if name == "repo_search":
-                query_raw = _safe_str(args.get("query"), max_len=2048) or ""
-                path = _safe_str(args.get("path"), max_len=256)
-                limit = _safe_int(args.get("limit")) or 50
-                regex = bool(args.get("regex"))
-                ignore_case = True if args.get("ignore_case") is None else bool(args.get("ignore_case"))
-                return _repo_search(
-                    repo_root=repo_root,
-                    query=query_raw,
-                    path=path,
-                    limit=limit,
-                    regex=regex,
-                    ignore_case=ignore_case,
-                )
+def _tool_handler(*names: str) -> Callable[[ToolHandler], ToolHandler]:
+    """Register the decorated function as the handler for ``names``.
 
-            file_path = _safe_str(args.get("path"), max_len=512) or ""
-            start_line = _safe_int(args.get("start_line")) or 1
-            max_lines = _safe_int(args.get("max_lines")) or 200
-            return _repo_read_file(
-                repo_root=repo_root,
-                path=file_path,
-                start_line=start_line,
-                max_lines=max_lines,
-            )
+    Handlers take ``run_tool``'s keyword arguments; each declares the ones it
+    uses and absorbs the rest with ``**_``.
+    """
 
-        if name in {
-            "assistant_list_scheduled_jobs",
-            "assistant_upsert_scheduled_job",
-            "assistant_delete_scheduled_job",
-        }:
-            if name == "assistant_list_scheduled_jobs":
-                enabled, reason = _assistant_schedule_tools_status()
-            else:
-                enabled, reason = _assistant_schedule_write_tools_status()
-            if not enabled:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": reason or "Assistant schedule-management tools are unavailable.",
-                    "hint": reason or None,
-                }
+    def register(func: ToolHandler) -> ToolHandler:
+        for tool_name in names:
+            if tool_name in _TOOL_HANDLERS:
+                raise ValueError(f"Duplicate tool handler: {tool_name}")
+            _TOOL_HANDLERS[tool_name] = func
+        return func
 
-        if name in {
-            "assistant_list_tmux_panes",
-            "assistant_capture_tmux_pane",
-            "assistant_compare_tmux_pane",
-            "assistant_relay_slack_reply_to_tmux",
-        }:
-            enabled, reason = _tmux_tools_status()
-            if not enabled:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": reason or "tmux monitoring tools are unavailable.",
-                    "hint": reason or None,
-                }
+    return register
 
-        if name == "assistant_list_tools":
-            query = _safe_str(args.get("query"), max_len=256)
-            include_unavailable = bool(args.get("include_unavailable") or False)
-            limit = _clamp_int(
-                _safe_int(args.get("limit")),
-                default=30,
-                min_value=1,
-                max_value=200,
-            )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": _assistant_list_tools_payload(
-                    query=query,
-                    limit=int(limit),
-                    include_unavailable=bool(include_unavailable),
-                    user=user,
-                ),
-            }
 
-        if name == "assistant_list_scheduled_jobs":
-            query = _safe_str(args.get("query"), max_len=256)
-            include_disabled = True if args.get("include_disabled") is None else bool(args.get("include_disabled"))
-            limit = _clamp_int(
-                _safe_int(args.get("limit")),
-                default=50,
-                min_value=1,
-                max_value=200,
-            )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": _assistant_scheduled_jobs_payload(
-                    query=query,
-                    include_disabled=bool(include_disabled),
-                    limit=int(limit),
-                ),
-            }
+@dataclass
+class _ToolStats:
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
 
-        if name == "assistant_upsert_scheduled_job":
-            if args.get("confirm") is not True:
-                return {"ok": False, "tool": name, "error": "confirm=true is required to write schedule configuration."}
-
-            schedule_name = _safe_str(args.get("name"), max_len=200)
-            prompt_text = _safe_str(args.get("prompt"), max_len=16_000)
-            timezone_name = _safe_str(args.get("timezone"), max_len=128)
-            required_tool = _safe_str(args.get("required_tool"), max_len=128)
-            allowed_tools_raw = args.get("allowed_tools")
-            if allowed_tools_raw is None:
-                allowed_tools_raw = args.get("tools")
-
-            candidate_row: dict[str, Any] = {
-                "name": schedule_name,
-                "weekday": args.get("weekday"),
-                "time": args.get("time"),
-                "timezone": timezone_name,
-                "prompt": prompt_text,
-                "allowed_tools": allowed_tools_raw,
-                "required_tool": required_tool,
-                "max_tool_calls": args.get("max_tool_calls"),
-                "priority": args.get("priority"),
-                "grace_seconds": args.get("grace_seconds"),
-                "max_attempts": args.get("max_attempts"),
-                "enabled": True if args.get("enabled") is None else bool(args.get("enabled")),
-            }
-            canonical, validation_errors = canonicalize_schedule_row(
-                candidate_row,
-                known_tool_names=_assistant_schedule_known_tool_names(),
-            )
-            if canonical is None:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "; ".join(validation_errors) or "Invalid scheduled job payload.",
-                }
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+        }
 
-            rows, row_errors, path = load_assistant_schedule_rows_for_write(
-                known_tool_names=_assistant_schedule_known_tool_names(),
-            )
-            if row_errors:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "; ".join(row_errors[:3]),
-                    "details": row_errors,
-                }
-            if path is None:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": f"Set {ASSISTANT_SCHEDULE_PATH_ENV}=<path> to enable schedule editing.",
-                }
 
-            action = "created"
-            updated_rows: list[dict[str, Any]] = []
-            replaced = False
-            for row in rows:
-                if str(row.get("name") or "").strip() == str(canonical.get("name") or "").strip():
-                    updated_rows.append(canonical)
-                    replaced = True
-                else:
-                    updated_rows.append(row)
-            if not replaced:
-                updated_rows.append(canonical)
-            else:
-                action = "updated"
-            updated_rows.sort(
-                key=lambda item: (
-                    parse_weekday(item.get("weekday")) or 99,
-                    str(item.get("time") or ""),
-                    str(item.get("name") or ""),
-                )
-            )
+_tool_stats_lock = threading.Lock()
+_tool_stats: dict[str, _ToolStats] = {}
 
-            write_assistant_schedule_rows(updated_rows, path=path)
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "action": action,
-                    "path": str(path),
-                    "job": canonical,
-                    "total_jobs": len(updated_rows),
-                },
-            }
 
-        if name == "assistant_delete_scheduled_job":
-            if args.get("confirm") is not True:
-                return {"ok": False, "tool": name, "error": "confirm=true is required to delete a scheduled job."}
+def _record_tool_call(name: str, elapsed_ms: float, *, ok: bool) -> None:
+    with _tool_stats_lock:
+        stats = _tool_stats.get(name)
+        if stats is None:
+            stats = _tool_stats[name] = _ToolStats()
+        stats.calls += 1
+        if not ok:
+            stats.errors += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
 
-            schedule_name = _safe_str(args.get("name"), max_len=200)
-            if schedule_name is None:
-                return {"ok": False, "tool": name, "error": "name is required."}
 
-            rows, row_errors, path = load_assistant_schedule_rows_for_write(
-                known_tool_names=_assistant_schedule_known_tool_names(),
-            )
-            if row_errors:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "; ".join(row_errors[:3]),
-                    "details": row_errors,
-                }
-            if path is None:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": f"Set {ASSISTANT_SCHEDULE_PATH_ENV}=<path> to enable schedule editing.",
-                }
+def tool_stats() -> dict[str, dict[str, Any]]:
+    """Per-tool invocation counts and wall time (ms) since start or last reset."""
 
-            remaining_rows = [row for row in rows if str(row.get("name") or "").strip() != schedule_name]
-            if len(remaining_rows) == len(rows):
-                return {"ok": False, "tool": name, "error": f"Scheduled job {schedule_name!r} was not found."}
+    with _tool_stats_lock:
+        return {name: stats.as_dict() for name, stats in sorted(_tool_stats.items())}
 
-            write_assistant_schedule_rows(remaining_rows, path=path)
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "deleted": True,
-                    "name": schedule_name,
-                    "path": str(path),
-                    "remaining_jobs": len(remaining_rows),
-                },
-            }
 
-        if name == "assistant_list_tmux_panes":
-            query = _safe_str(args.get("query"), max_len=256)
-            session_name = _safe_str(args.get("session_name"), max_len=128)
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
-            query_tokens = _tokenize(query or "")
-            session_filter = str(session_name or "").strip().lower()
-            panes = _tmux_list_allowed_panes()
-            items: list[dict[str, Any]] = []
-            for pane in panes:
-                pane_session_names = {
-                    value.lower()
-                    for value in _tmux_unique_strings([pane.get("session_names"), pane.get("session"), pane.get("session_group")])
-                    if value
-                }
-                if session_filter and session_filter not in pane_session_names:
-                    continue
-                haystack = " ".join(
-                    [
-                        str(pane.get("target") or ""),
-                        str(pane.get("preferred_alias") or ""),
-                        str(pane.get("capture_target") or ""),
-                        str(pane.get("group_target") or ""),
-                        str(pane.get("session") or ""),
-                        str(pane.get("session_group") or ""),
-                        " ".join(_tmux_unique_strings([pane.get("session_names")])),
-                        " ".join(_tmux_unique_strings([pane.get("target_aliases")])),
-                        " ".join(_tmux_unique_strings([pane.get("window_aliases")])),
-                        str(pane.get("window_name") or ""),
-                        str(pane.get("pane_id") or ""),
-                        str(pane.get("pane_title") or ""),
-                        str(pane.get("current_command") or ""),
-                    ]
-                ).lower()
-                if query_tokens and not all(token in haystack for token in query_tokens):
-                    continue
-                items.append(
-                    {
-                        "target": pane.get("target") or _tmux_preferred_alias(pane),
-                        "preferred_alias": pane.get("preferred_alias") or _tmux_preferred_alias(pane),
-                        "capture_target": pane.get("capture_target") or _tmux_capture_target(pane),
-                        "target_aliases": _tmux_unique_strings([pane.get("target_aliases")]),
-                        "window_aliases": _tmux_unique_strings([pane.get("window_aliases")]),
-                        "group_target": pane.get("group_target"),
-                        "window_target": pane.get("window_target"),
-                        "group_window_target": pane.get("group_window_target"),
-                        "pane_id": pane.get("pane_id"),
-                        "pane_number": _tmux_pane_number(pane.get("pane_id")),
-                        "session": pane.get("session"),
-                        "session_names": _tmux_unique_strings([pane.get("session_names"), pane.get("session")]),
-                        "session_group": pane.get("session_group"),
-                        "window_name": pane.get("window_name"),
-                        "window_index": pane.get("window_index"),
-                        "pane_index": pane.get("pane_index"),
-                        "pane_title": pane.get("pane_title"),
-                        "current_command": pane.get("current_command"),
-                        "pane_dead": bool(pane.get("pane_dead")),
-                        "pane_active": bool(pane.get("pane_active")),
-                        "allowlist_match": _tmux_allowlist_match(pane),
-                        "summary": pane.get("summary") or _tmux_pane_summary(pane),
-                    }
-                )
-                if len(items) >= int(limit):
-                    break
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "count": len(items),
-                    "query": query,
-                    "session_name": session_name,
-                    "allowlist": _tmux_allowlist_entries() or [f"session:{_tmux_default_session_name()}"],
-                    "items": items,
-                },
-            }
+def reset_tool_stats() -> None:
+    with _tool_stats_lock:
+        _tool_stats.clear()
 
-        if name == "assistant_capture_tmux_pane":
-            target = _safe_str(args.get("target"), max_len=128)
-            if target is None:
-                target = _safe_str(args.get("pane"), max_len=128)
-            pane = _tmux_find_allowed_pane(target)
-            if pane is None:
-                return {"ok": False, "tool": name, "error": "Readable tmux pane not found for target."}
-
-            lines = _clamp_int(_safe_int(args.get("lines")), default=120, min_value=1, max_value=400)
-            include_history = bool(args.get("include_history"))
-            history_lines = _safe_int(args.get("history_lines"))
-            snapshot = _tmux_capture_snapshot(
-                pane=pane,
-                lines=int(lines),
-                include_history=bool(include_history),
-                history_lines=int(history_lines) if history_lines is not None else None,
-            )
-            return {"ok": True, "tool": name, "result": snapshot}
-
-        if name == "assistant_compare_tmux_pane":
-            target = _safe_str(args.get("target"), max_len=128)
-            if target is None:
-                target = _safe_str(args.get("pane"), max_len=128)
-            pane = _tmux_find_allowed_pane(target)
-            if pane is None:
-                return {"ok": False, "tool": name, "error": "Readable tmux pane not found for target."}
-
-            lines = _clamp_int(_safe_int(args.get("lines")), default=80, min_value=1, max_value=400)
-            include_history = bool(args.get("include_history"))
-            history_lines = _safe_int(args.get("history_lines"))
-            interval_seconds = _clamp_int(_safe_int(args.get("interval_seconds")), default=3, min_value=1, max_value=30)
-
-            before = _tmux_capture_snapshot(
-                pane=pane,
-                lines=int(lines),
-                include_history=bool(include_history),
-                history_lines=int(history_lines) if history_lines is not None else None,
-            )
-            time_module.sleep(float(interval_seconds))
-            after = _tmux_capture_snapshot(
-                pane=pane,
-                lines=int(lines),
-                include_history=bool(include_history),
-                history_lines=int(history_lines) if history_lines is not None else None,
-            )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "target": pane.get("target"),
-                    "pane_id": pane.get("pane_id"),
-                    "interval_seconds": int(interval_seconds),
-                    "changed": before.get("content") != after.get("content"),
-                    "before": before,
-                    "after": after,
-                },
-            }
 
-        if name == "assistant_list_slack_artifact_replies":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
-            include_relayed = bool(args.get("include_relayed") or False)
-            replies = recent_artifact_replies(
-                agent_db,
-                limit=int(limit),
-                include_relayed=bool(include_relayed),
-            )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "count": len(replies),
-                    "include_relayed": bool(include_relayed),
-                    "replies": replies,
-                },
-            }
+@_tool_handler("repo_list_files", "repo_search", "repo_read_file")
+def _tool_repo(*, name: str, args: dict[str, Any], **_: Any) -> dict[str, Any]:
+    if not _repo_tools_enabled():
+        return {
+            "ok": False,
+            "tool": name,
+            "error": f"Repo tools are disabled. Set {_REPO_TOOLS_ENV}=1 to enable them.",
+        }
+    repo_root = _assistant_repo_root()
+    if repo_root is None:
+        return {"ok": False, "tool": name, "error": "Repo root not found."}
+
+    if name == "repo_list_files":
+        query = _safe_str(args.get("query"), max_len=256)
+        path = _safe_str(args.get("path"), max_len=256)
+        limit = _safe_int(args.get("limit")) or 200
+        return _repo_list_files(repo_root=repo_root, query=query, path=path, limit=limit)
+
+    if name == "repo_search":
+        query_raw = _safe_str(args.get("query"), max_len=2048) or ""
+        path = _safe_str(args.get("path"), max_len=256)
+        limit = _safe_int(args.get("limit")) or 50
+        regex = bool(args.get("regex"))
+        ignore_case = True if args.get("ignore_case") is None else bool(args.get("ignore_case"))
+        return _repo_search(
+            repo_root=repo_root,
+            query=query_raw,
+            path=path,
+            limit=limit,
+            regex=regex,
+            ignore_case=ignore_case,
+        )
 
-        if name == "assistant_relay_slack_reply_to_tmux":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-            if args.get("confirm") is not True:
-                return {"ok": False, "tool": name, "error": "confirm=true is required to send text into tmux."}
+    file_path = _safe_str(args.get("path"), max_len=512) or ""
+    start_line = _safe_int(args.get("start_line")) or 1
+    max_lines = _safe_int(args.get("max_lines")) or 200
+    return _repo_read_file(
+        repo_root=repo_root,
+        path=file_path,
+        start_line=start_line,
+        max_lines=max_lines,
+    )
 
-            reply_event_id = _safe_int(args.get("reply_event_id"))
-            if reply_event_id is None or int(reply_event_id) <= 0:
-                return {"ok": False, "tool": name, "error": "reply_event_id is required."}
 
-            row = (
-                agent_db.query(AgentEvent)
-                .filter(AgentEvent.id == int(reply_event_id))
-                .one_or_none()
-            )
-            if row is None:
-                return {"ok": False, "tool": name, "error": f"Slack artifact reply event {reply_event_id} was not found."}
-            payload = parse_event_payload(row)
-            if str(payload.get("type") or getattr(row, "event_type", "")) != EVENT_SLACK_ARTIFACT_REPLY and row.event_type != EVENT_SLACK_ARTIFACT_REPLY:
-                return {"ok": False, "tool": name, "error": "reply_event_id does not refer to a Slack artifact reply event."}
-
-            origin_tmux = payload.get("origin_tmux") if isinstance(payload.get("origin_tmux"), dict) else {}
-            routing = payload.get("routing") if isinstance(payload.get("routing"), dict) else {}
-            target = _safe_str(args.get("target"), max_len=128)
-            if not target:
-                target = (
-                    _safe_str(origin_tmux.get("pane_id"), max_len=128)
-                    or _safe_str(origin_tmux.get("capture_target"), max_len=128)
-                    or _safe_str(origin_tmux.get("preferred_alias"), max_len=128)
-                    or _safe_str(origin_tmux.get("target"), max_len=128)
-                )
-            if not target:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "No tmux target was provided and the reply receipt has no origin target.",
-                }
+@_tool_handler("assistant_list_tools")
+def _tool_assistant_list_tools(
+    *,
+    name: str,
+    args: dict[str, Any],
+    user: AuthUser | None,
+    **_: Any,
+) -> dict[str, Any]:
+    query = _safe_str(args.get("query"), max_len=256)
+    include_unavailable = bool(args.get("include_unavailable") or False)
+    limit = _clamp_int(
+        _safe_int(args.get("limit")),
+        default=30,
+        min_value=1,
+        max_value=200,
+    )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": _assistant_list_tools_payload(
+            query=query,
+            limit=int(limit),
+            include_unavailable=bool(include_unavailable),
+            user=user,
+        ),
+    }
 
-            if int(reply_event_id) in relayed_reply_event_ids(agent_db):
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": f"Slack artifact reply event {reply_event_id} has already been relayed.",
-                }
 
-            press_enter = True if args.get("press_enter") is None else bool(args.get("press_enter"))
-            if press_enter and routing.get("submit_allowed") is not True:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "This artifact receipt does not allow submit/Enter for tmux relay.",
-                }
+@_tool_handler("assistant_list_scheduled_jobs")
+def _tool_assistant_list_scheduled_jobs(*, name: str, args: dict[str, Any], **_: Any) -> dict[str, Any]:
+    query = _safe_str(args.get("query"), max_len=256)
+    include_disabled = True if args.get("include_disabled") is None else bool(args.get("include_disabled"))
+    limit = _clamp_int(
+        _safe_int(args.get("limit")),
+        default=50,
+        min_value=1,
+        max_value=200,
+    )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": _assistant_scheduled_jobs_payload(
+            query=query,
+            include_disabled=bool(include_disabled),
+            limit=int(limit),
+        ),
+    }
 
-            message = format_tmux_relay_message(reply_payload=payload)
-            send_result = _tmux_send_text(target=target, text=message, press_enter=bool(press_enter))
-            relay_payload = {
-                "type": EVENT_SLACK_TMUX_RELAY_SENT,
-                "reply_event_id": int(reply_event_id),
-                "artifact_id": payload.get("artifact_id"),
-                "sent_at": datetime.now(UTC_TZ).isoformat(),
-                "tmux": send_result,
-                "press_enter": bool(press_enter),
-                "message": {"preview": message[:500], "length": len(message)},
-            }
-            event = AgentEvent(
-                agent_id=BRIDGE_AGENT_ID,
-                event_type=EVENT_SLACK_TMUX_RELAY_SENT,
-                ts=datetime.now(UTC_TZ),
-                name="slack_tmux_relay",
-                severity="info",
-                correlation_id=str(payload.get("artifact_id") or ""),
-                payload_json=stable_json(relay_payload),
-            )
-            agent_db.add(event)
-            agent_db.commit()
-            agent_db.refresh(event)
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "relayed": True,
-                    "relay_event_id": int(event.id),
-                    "reply_event_id": int(reply_event_id),
-                    "tmux": send_result,
-                    "message_preview": message[:500],
-                },
-            }
 
-        if name == "project_counts_snapshot":
-            max_categories = _clamp_int(
-                _safe_int(args.get("max_categories")),
-                default=20,
-                min_value=1,
-                max_value=100,
-            )
-            total_count = int(core_db.query(func.count(Project.id)).scalar() or 0)
-            current_count = int(
-                core_db.query(func.count(Project.id))
-                .filter(Project.prj_Current_FLAG.is_(True))
-                .scalar()
-                or 0
-            )
+@_tool_handler("assistant_upsert_scheduled_job")
+def _tool_assistant_upsert_scheduled_job(*, name: str, args: dict[str, Any], **_: Any) -> dict[str, Any]:
+    if args.get("confirm") is not True:
+        return {"ok": False, "tool": name, "error": "confirm=true is required to write schedule configuration."}
+
+    schedule_name = _safe_str(args.get("name"), max_len=200)
+    prompt_text = _safe_str(args.get("prompt"), max_len=16_000)
+    timezone_name = _safe_str(args.get("timezone"), max_len=128)
+    required_tool = _safe_str(args.get("required_tool"), max_len=128)
+    allowed_tools_raw = args.get("allowed_tools")
+    if allowed_tools_raw is None:
+        allowed_tools_raw = args.get("tools")
+
+    candidate_row: dict[str, Any] = {
+        "name": schedule_name,
+        "weekday": args.get("weekday"),
+        "time": args.get("time"),
+        "timezone": timezone_name,
+        "prompt": prompt_text,
+        "allowed_tools": allowed_tools_raw,
+        "required_tool": required_tool,
+        "max_tool_calls": args.get("max_tool_calls"),
+        "priority": args.get("priority"),
+        "grace_seconds": args.get("grace_seconds"),
+        "max_attempts": args.get("max_attempts"),
+        "enabled": True if args.get("enabled") is None else bool(args.get("enabled")),
+    }
+    canonical, validation_errors = canonicalize_schedule_row(
+        candidate_row,
+        known_tool_names=_assistant_schedule_known_tool_names(),
+    )
+    if canonical is None:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "; ".join(validation_errors) or "Invalid scheduled job payload.",
+        }
 
-            status_rows = (
-                core_db.query(Project.prj_Status, func.count(Project.id))
-                .group_by(Project.prj_Status)
-                .all()
-            )
-            status_total = [
-                {"status": (status if status is not None else None), "count": int(count or 0)}
-                for status, count in status_rows
-            ]
-            status_total.sort(
-                key=lambda item: (
-                    -int(item["count"]),
-                    "" if item["status"] is None else str(item["status"]),
-                )
-            )
+    rows, row_errors, path = load_assistant_schedule_rows_for_write(
+        known_tool_names=_assistant_schedule_known_tool_names(),
+    )
+    if row_errors:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "; ".join(row_errors[:3]),
+            "details": row_errors,
+        }
+    if path is None:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": f"Set {ASSISTANT_SCHEDULE_PATH_ENV}=<path> to enable schedule editing.",
+        }
 
-            status_rows_current = (
-                core_db.query(Project.prj_Status, func.count(Project.id))
-                .filter(Project.prj_Current_FLAG.is_(True))
-                .group_by(Project.prj_Status)
-                .all()
-            )
-            status_current = [
-                {"status": (status if status is not None else None), "count": int(count or 0)}
-                for status, count in status_rows_current
-            ]
-            status_current.sort(
-                key=lambda item: (
-                    -int(item["count"]),
-                    "" if item["status"] is None else str(item["status"]),
-                )
-            )
+    action = "created"
+    updated_rows: list[dict[str, Any]] = []
+    replaced = False
+    for row in rows:
+        if str(row.get("name") or "").strip() == str(canonical.get("name") or "").strip():
+            updated_rows.append(canonical)
+            replaced = True
+        else:
+            updated_rows.append(row)
+    if not replaced:
+        updated_rows.append(canonical)
+    else:
+        action = "updated"
+    updated_rows.sort(
+        key=lambda item: (
+            parse_weekday(item.get("weekday")) or 99,
+            str(item.get("time") or ""),
+            str(item.get("name") or ""),
+        )
+    )
 
-            price_level_rows = (
-                core_db.query(Project.prj_ProjectPriceLevel, func.count(Project.id))
-                .group_by(Project.prj_ProjectPriceLevel)
-                .all()
-            )
-            price_levels = [
-                {
-                    "category": (category.strip() if isinstance(category, str) and category.strip() else None),
-                    "count": int(count or 0),
-                }
-                for category, count in price_level_rows
-            ]
-            price_levels.sort(
-                key=lambda item: (
-                    -int(item["count"]),
-                    "" if item["category"] is None else str(item["category"]),
-                )
-            )
-            if len(price_levels) > max_categories:
-                price_levels = price_levels[:max_categories]
-
-            ready_to_bill_total = int(
-                core_db.query(func.count(Project.id))
-                .filter(Project.prj_Billing_ReadyToBill.is_(True))
-                .scalar()
-                or 0
-            )
-            ready_to_bill_current = int(
-                core_db.query(func.count(Project.id))
-                .filter(Project.prj_Current_FLAG.is_(True))
-                .filter(Project.prj_Billing_ReadyToBill.is_(True))
-                .scalar()
-                or 0
-            )
-
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "generated_at": datetime.now(tz=UTC_TZ).isoformat(),
-                    "projects": {
-                        "total": total_count,
-                        "current": current_count,
-                        "status_counts_total": status_total,
-                        "status_counts_current": status_current,
-                        "billing_ready_to_bill": {
-                            "total": ready_to_bill_total,
-                            "current": ready_to_bill_current,
-                        },
-                        "billing_categories": {
-                            "field": "prj_ProjectPriceLevel",
-                            "max_categories": max_categories,
-                            "items": price_levels,
-                        },
-                    },
-                },
-            }
+    write_assistant_schedule_rows(updated_rows, path=path)
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "action": action,
+            "path": str(path),
+            "job": canonical,
+            "total_jobs": len(updated_rows),
+        },
+    }
 
-        if name == "create_project_comment":
-            if user is None:
-                return {"ok": False, "tool": name, "error": "Not authenticated."}
 
-            is_scoped_user = uses_explicit_project_access(user)
+@_tool_handler("assistant_delete_scheduled_job")
+def _tool_assistant_delete_scheduled_job(*, name: str, args: dict[str, Any], **_: Any) -> dict[str, Any]:
+    if args.get("confirm") is not True:
+        return {"ok": False, "tool": name, "error": "confirm=true is required to delete a scheduled job."}
 
-            confirm = args.get("confirm")
-            if confirm is not True:
-                return {"ok": False, "tool": name, "error": "confirm=true is required to write project history."}
+    schedule_name = _safe_str(args.get("name"), max_len=200)
+    if schedule_name is None:
+        return {"ok": False, "tool": name, "error": "name is required."}
 
-            user_msg = (user_message or "").strip().lower()
-            if user_msg and (
-                re.search(r"\b(do not|don't|dont)\s+(save|log|record|add|commit)\b", user_msg)
-                or re.search(r"\bnot\s+(?:save|commit)\b", user_msg)
-            ):
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "User requested not to save yet.",
-                }
-            if not project_comment_save_authorized and not _project_comment_save_requested(user_msg):
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "User did not explicitly request saving to project history.",
-                }
+    rows, row_errors, path = load_assistant_schedule_rows_for_write(
+        known_tool_names=_assistant_schedule_known_tool_names(),
+    )
+    if row_errors:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "; ".join(row_errors[:3]),
+            "details": row_errors,
+        }
+    if path is None:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": f"Set {ASSISTANT_SCHEDULE_PATH_ENV}=<path> to enable schedule editing.",
+        }
 
-            project_id = _safe_int(args.get("project_id"))
-            if project_id is None or project_id <= 0:
-                return {"ok": False, "tool": name, "error": "project_id is required."}
-
-            comment_text = _safe_str(args.get("comment"), max_len=20_000)
-            if comment_text is None or not comment_text.strip():
-                return {"ok": False, "tool": name, "error": "comment text is required."}
-
-            comment_type = _safe_str(args.get("comment_type"), max_len=64) or "assistant_note"
-            if is_scoped_user:
-                comment_type = "client_note"
-
-            project = get_project_for_user(core_db, user=user, project_id=int(project_id))
-            if project is None:
-                if is_scoped_user:
-                    return {
-                        "ok": False,
-                        "tool": name,
-                        "error": f"Project {project_id} not found or not accessible.",
-                    }
-                return {"ok": False, "tool": name, "error": f"Project {project_id} not found."}
+    remaining_rows = [row for row in rows if str(row.get("name") or "").strip() != schedule_name]
+    if len(remaining_rows) == len(rows):
+        return {"ok": False, "tool": name, "error": f"Scheduled job {schedule_name!r} was not found."}
 
-            person_id = _safe_int(args.get("person_id")) if not is_scoped_user else None
-            if person_id is not None and person_id > 0:
-                person = core_db.get(Person, int(person_id))
-                if person is None:
-                    return {"ok": False, "tool": name, "error": f"Person {person_id} not found."}
-            else:
-                assistant_person = (
-                    core_db.query(Person)
-                    .filter(Person.ppl_Name_First == "iSPEC")
-                    .filter(Person.ppl_Name_Last == "Assistant")
-                    .first()
-                )
-                if assistant_person is None:
-                    assistant_person = Person(
-                        ppl_AddedBy=user.username,
-                        ppl_Name_First="iSPEC",
-                        ppl_Name_Last="Assistant",
-                    )
-                    core_db.add(assistant_person)
-                    core_db.flush()
-                person_id = int(assistant_person.id)
-
-            comment = ProjectComment(
-                project_id=int(project_id),
-                person_id=int(person_id),
-                com_Comment=comment_text,
-                com_CommentType=comment_type,
-                com_AddedBy=user.username,
-            )
-            core_db.add(comment)
-            core_db.flush()
-            core_db.commit()
-            legacy_push_enqueue = _enqueue_legacy_project_comment_push(
-                project_id=int(project_id),
-                added_by=getattr(user, "username", None),
-                comment_id=int(comment.id),
-            )
+    write_assistant_schedule_rows(remaining_rows, path=path)
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "deleted": True,
+            "name": schedule_name,
+            "path": str(path),
+            "remaining_jobs": len(remaining_rows),
+        },
+    }
 
-            snippet = comment_text.strip().replace("\n", " ")
-            if len(snippet) > 240:
-                snippet = snippet[:239] + "…"
 
-            result = {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "project_id": int(project_id),
-                    "comment_id": int(comment.id),
-                    "person_id": int(person_id),
-                    "comment_type": comment_type,
-                    "added_by": user.username,
-                    "snippet": snippet,
-                    "links": {"project_ui": f"/project/{project_id}"},
-                },
-            }
-            if legacy_push_enqueue is not None:
-                result["result"]["legacy_push_enqueue"] = legacy_push_enqueue
-            return result
-
-        if name == "latest_activity":
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
-            current_only = bool(args.get("current_only"))
-            kinds = _coerce_str_list(args.get("kinds"), max_items=8)
-            allowed_kinds = {
-                "project",
-                "project_comment",
-                "experiment",
-                "experiment_run",
+@_tool_handler("assistant_list_tmux_panes")
+def _tool_assistant_list_tmux_panes(*, name: str, args: dict[str, Any], **_: Any) -> dict[str, Any]:
+    query = _safe_str(args.get("query"), max_len=256)
+    session_name = _safe_str(args.get("session_name"), max_len=128)
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+    query_tokens = _tokenize(query or "")
+    session_filter = str(session_name or "").strip().lower()
+    panes = _tmux_list_allowed_panes()
+    items: list[dict[str, Any]] = []
+    for pane in panes:
+        pane_session_names = {
+            value.lower()
+            for value in _tmux_unique_strings([pane.get("session_names"), pane.get("session"), pane.get("session_group")])
+            if value
+        }
+        if session_filter and session_filter not in pane_session_names:
+            continue
+        haystack = " ".join(
+            [
+                str(pane.get("target") or ""),
+                str(pane.get("preferred_alias") or ""),
+                str(pane.get("capture_target") or ""),
+                str(pane.get("group_target") or ""),
+                str(pane.get("session") or ""),
+                str(pane.get("session_group") or ""),
+                " ".join(_tmux_unique_strings([pane.get("session_names")])),
+                " ".join(_tmux_unique_strings([pane.get("target_aliases")])),
+                " ".join(_tmux_unique_strings([pane.get("window_aliases")])),
+                str(pane.get("window_name") or ""),
+                str(pane.get("pane_id") or ""),
+                str(pane.get("pane_title") or ""),
+                str(pane.get("current_command") or ""),
+            ]
+        ).lower()
+        if query_tokens and not all(token in haystack for token in query_tokens):
+            continue
+        items.append(
+            {
+                "target": pane.get("target") or _tmux_preferred_alias(pane),
+                "preferred_alias": pane.get("preferred_alias") or _tmux_preferred_alias(pane),
+                "capture_target": pane.get("capture_target") or _tmux_capture_target(pane),
+                "target_aliases": _tmux_unique_strings([pane.get("target_aliases")]),
+                "window_aliases": _tmux_unique_strings([pane.get("window_aliases")]),
+                "group_target": pane.get("group_target"),
+                "window_target": pane.get("window_target"),
+                "group_window_target": pane.get("group_window_target"),
+                "pane_id": pane.get("pane_id"),
+                "pane_number": _tmux_pane_number(pane.get("pane_id")),
+                "session": pane.get("session"),
+                "session_names": _tmux_unique_strings([pane.get("session_names"), pane.get("session")]),
+                "session_group": pane.get("session_group"),
+                "window_name": pane.get("window_name"),
+                "window_index": pane.get("window_index"),
+                "pane_index": pane.get("pane_index"),
+                "pane_title": pane.get("pane_title"),
+                "current_command": pane.get("current_command"),
+                "pane_dead": bool(pane.get("pane_dead")),
+                "pane_active": bool(pane.get("pane_active")),
+                "allowlist_match": _tmux_allowlist_match(pane),
+                "summary": pane.get("summary") or _tmux_pane_summary(pane),
             }
-            if kinds is None:
-                selected_kinds = allowed_kinds
-            else:
-                selected_kinds = {kind.strip().lower() for kind in kinds if kind.strip()}
-                unknown = sorted(selected_kinds - allowed_kinds)
-                if unknown:
-                    return {
-                        "ok": False,
-                        "tool": name,
-                        "error": f"Unknown kinds: {unknown}. Allowed: {sorted(allowed_kinds)}",
-                    }
+        )
+        if len(items) >= int(limit):
+            break
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "count": len(items),
+            "query": query,
+            "session_name": session_name,
+            "allowlist": _tmux_allowlist_entries() or [f"session:{_tmux_default_session_name()}"],
+            "items": items,
+        },
+    }
 
-            events: list[dict[str, Any]] = []
 
-            if "project" in selected_kinds:
-                query = core_db.query(Project)
-                if current_only:
-                    query = query.filter(Project.prj_Current_FLAG.is_(True))
-                rows = (
-                    query.order_by(Project.prj_ModificationTS.desc(), Project.id.desc())
-                    .limit(limit)
-                    .all()
-                )
-                for project in rows:
-                    modified = getattr(project, "prj_ModificationTS", None)
-                    created = getattr(project, "prj_CreationTS", None)
-                    ts = modified or created
-                    events.append(
-                        {
-                            "kind": "project",
-                            "timestamp": ts.isoformat() if ts else None,
-                            "id": int(project.id),
-                            "title": project.prj_ProjectTitle,
-                            "status": project.prj_Status,
-                            "current": bool(project.prj_Current_FLAG),
-                            "links": {"ui": f"/project/{project.id}", "api": f"/api/projects/{project.id}"},
-                        }
-                    )
-
-            if "project_comment" in selected_kinds:
-                query = (
-                    core_db.query(ProjectComment, Project)
-                    .join(Project, ProjectComment.project_id == Project.id)
-                    .order_by(ProjectComment.com_CreationTS.desc(), ProjectComment.id.desc())
-                )
-                if current_only:
-                    query = query.filter(Project.prj_Current_FLAG.is_(True))
-                rows = query.limit(limit).all()
-                for comment, project in rows:
-                    created = getattr(comment, "com_CreationTS", None)
-                    text = (comment.com_Comment or "").strip()
-                    if len(text) > 240:
-                        text = text[:239] + "…"
-                    events.append(
-                        {
-                            "kind": "project_comment",
-                            "timestamp": created.isoformat() if created else None,
-                            "id": int(comment.id),
-                            "project_id": int(project.id),
-                            "project_title": project.prj_ProjectTitle,
-                            "type": comment.com_CommentType,
-                            "added_by": comment.com_AddedBy,
-                            "comment": text or None,
-                            "links": {"ui": f"/project/{project.id}", "api": f"/api/projects/{project.id}"},
-                        }
-                    )
-
-            if "experiment" in selected_kinds:
-                query = core_db.query(Experiment)
-                if current_only:
-                    query = query.join(Project, Experiment.project_id == Project.id).filter(
-                        Project.prj_Current_FLAG.is_(True)
-                    )
-                rows = (
-                    query.order_by(Experiment.Experiment_ModificationTS.desc(), Experiment.id.desc())
-                    .limit(limit)
-                    .all()
-                )
-                for experiment in rows:
-                    modified = getattr(experiment, "Experiment_ModificationTS", None)
-                    created = getattr(experiment, "Experiment_CreationTS", None)
-                    ts = modified or created
-                    events.append(
-                        {
-                            "kind": "experiment",
-                            "timestamp": ts.isoformat() if ts else None,
-                            "id": int(experiment.id),
-                            "record_no": experiment.record_no,
-                            "name": experiment.exp_Name,
-                            "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
-                            "project_id": int(experiment.project_id)
-                            if experiment.project_id is not None
-                            else None,
-                            "links": {"ui": f"/experiment/{experiment.id}", "api": f"/api/experiments/{experiment.id}"},
-                        }
-                    )
-
-            if "experiment_run" in selected_kinds:
-                query = core_db.query(ExperimentRun)
-                if current_only:
-                    query = (
-                        query.join(Experiment, ExperimentRun.experiment_id == Experiment.id)
-                        .join(Project, Experiment.project_id == Project.id)
-                        .filter(Project.prj_Current_FLAG.is_(True))
-                    )
-                rows = (
-                    query.order_by(
-                        ExperimentRun.ExperimentRun_ModificationTS.desc(),
-                        ExperimentRun.id.desc(),
-                    )
-                    .limit(limit)
-                    .all()
-                )
-                for run in rows:
-                    modified = getattr(run, "ExperimentRun_ModificationTS", None)
-                    created = getattr(run, "ExperimentRun_CreationTS", None)
-                    ts = modified or created
-                    events.append(
-                        {
-                            "kind": "experiment_run",
-                            "timestamp": ts.isoformat() if ts else None,
-                            "id": int(run.id),
-                            "experiment_id": int(run.experiment_id),
-                            "run_no": int(run.run_no),
-                            "search_no": int(run.search_no),
-                            "search_engine": getattr(run, "search_engine", None),
-                            "search_state": getattr(run, "search_state", None),
-                            "links": {
-                                "ui": f"/experiment-run/{run.id}",
-                                "api": f"/api/experiment-runs/{run.id}",
-                            },
-                        }
-                    )
-
-            def sort_key(item: dict[str, Any]) -> tuple[int, str, int]:
-                ts = item.get("timestamp")
-                if isinstance(ts, str) and ts:
-                    return (1, ts, int(item.get("id") or 0))
-                return (0, "", int(item.get("id") or 0))
-
-            events.sort(key=sort_key, reverse=True)
-            events = events[:limit]
+@_tool_handler("assistant_capture_tmux_pane")
+def _tool_assistant_capture_tmux_pane(*, name: str, args: dict[str, Any], **_: Any) -> dict[str, Any]:
+    target = _safe_str(args.get("target"), max_len=128)
+    if target is None:
+        target = _safe_str(args.get("pane"), max_len=128)
+    pane = _tmux_find_allowed_pane(target)
+    if pane is None:
+        return {"ok": False, "tool": name, "error": "Readable tmux pane not found for target."}
+
+    lines = _clamp_int(_safe_int(args.get("lines")), default=120, min_value=1, max_value=400)
+    include_history = bool(args.get("include_history"))
+    history_lines = _safe_int(args.get("history_lines"))
+    snapshot = _tmux_capture_snapshot(
+        pane=pane,
+        lines=int(lines),
+        include_history=bool(include_history),
+        history_lines=int(history_lines) if history_lines is not None else None,
+    )
+    return {"ok": True, "tool": name, "result": snapshot}
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "limit": limit,
-                    "current_only": current_only,
-                    "kinds": sorted(selected_kinds),
-                    "count": len(events),
-                    "events": events,
-                },
-            }
 
-        if name == "billing_category_counts":
-            current_only = bool(args.get("current_only"))
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+@_tool_handler("assistant_compare_tmux_pane")
+def _tool_assistant_compare_tmux_pane(*, name: str, args: dict[str, Any], **_: Any) -> dict[str, Any]:
+    target = _safe_str(args.get("target"), max_len=128)
+    if target is None:
+        target = _safe_str(args.get("pane"), max_len=128)
+    pane = _tmux_find_allowed_pane(target)
+    if pane is None:
+        return {"ok": False, "tool": name, "error": "Readable tmux pane not found for target."}
+
+    lines = _clamp_int(_safe_int(args.get("lines")), default=80, min_value=1, max_value=400)
+    include_history = bool(args.get("include_history"))
+    history_lines = _safe_int(args.get("history_lines"))
+    interval_seconds = _clamp_int(_safe_int(args.get("interval_seconds")), default=3, min_value=1, max_value=30)
+
+    before = _tmux_capture_snapshot(
+        pane=pane,
+        lines=int(lines),
+        include_history=bool(include_history),
+        history_lines=int(history_lines) if history_lines is not None else None,
+    )
+    time_module.sleep(float(interval_seconds))
+    after = _tmux_capture_snapshot(
+        pane=pane,
+        lines=int(lines),
+        include_history=bool(include_history),
+        history_lines=int(history_lines) if history_lines is not None else None,
+    )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "target": pane.get("target"),
+            "pane_id": pane.get("pane_id"),
+            "interval_seconds": int(interval_seconds),
+            "changed": before.get("content") != after.get("content"),
+            "before": before,
+            "after": after,
+        },
+    }
 
-            query = core_db.query(Project.prj_ProjectPriceLevel, func.count(Project.id))
-            if current_only:
-                query = query.filter(Project.prj_Current_FLAG.is_(True))
-            rows = query.group_by(Project.prj_ProjectPriceLevel).all()
-            items = [
-                {
-                    "category": (category.strip() if isinstance(category, str) and category.strip() else None),
-                    "count": int(count or 0),
-                }
-                for category, count in rows
-            ]
-            items.sort(
-                key=lambda item: (
-                    -int(item["count"]),
-                    "" if item["category"] is None else str(item["category"]),
-                )
-            )
-            if len(items) > limit:
-                items = items[:limit]
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "current_only": current_only,
-                    "field": "prj_ProjectPriceLevel",
-                    "count": len(items),
-                    "items": items,
-                },
-            }
 
-        if name == "assistant_prompt_header":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
+@_tool_handler("assistant_list_slack_artifact_replies")
+def _tool_assistant_list_slack_artifact_replies(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+    include_relayed = bool(args.get("include_relayed") or False)
+    replies = recent_artifact_replies(
+        agent_db,
+        limit=int(limit),
+        include_relayed=bool(include_relayed),
+    )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "count": len(replies),
+            "include_relayed": bool(include_relayed),
+            "replies": replies,
+        },
+    }
 
-            session_id = _safe_str(args.get("session_id"), max_len=256) or _safe_str(args.get("sessionId"), max_len=256)
-            if not session_id:
-                return {"ok": False, "tool": name, "error": "Missing argument: session_id"}
 
-            include_legend = bool(args.get("include_legend"))
-            user_message_id = _safe_int(args.get("user_message_id"))
-            if user_message_id is None:
-                user_message_id = _safe_int(args.get("message_id"))
-            if user_message_id is None:
-                user_message_id = _safe_int(args.get("userMessageId"))
+@_tool_handler("assistant_relay_slack_reply_to_tmux")
+def _tool_assistant_relay_slack_reply_to_tmux(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+    if args.get("confirm") is not True:
+        return {"ok": False, "tool": name, "error": "confirm=true is required to send text into tmux."}
 
-            session = assistant_db.query(SupportSession).filter(SupportSession.session_id == session_id).first()
-            if session is None:
-                return {"ok": False, "tool": name, "error": "Session not found.", "session_id": session_id}
+    reply_event_id = _safe_int(args.get("reply_event_id"))
+    if reply_event_id is None or int(reply_event_id) <= 0:
+        return {"ok": False, "tool": name, "error": "reply_event_id is required."}
 
-            state: dict[str, Any] = {}
-            raw_state = getattr(session, "state_json", None)
-            if raw_state:
-                try:
-                    parsed_state = json.loads(raw_state)
-                    if isinstance(parsed_state, dict):
-                        state = parsed_state
-                except Exception:
-                    state = {}
+    row = (
+        agent_db.query(AgentEvent)
+        .filter(AgentEvent.id == int(reply_event_id))
+        .one_or_none()
+    )
+    if row is None:
+        return {"ok": False, "tool": name, "error": f"Slack artifact reply event {reply_event_id} was not found."}
+    payload = parse_event_payload(row)
+    if str(payload.get("type") or getattr(row, "event_type", "")) != EVENT_SLACK_ARTIFACT_REPLY and row.event_type != EVENT_SLACK_ARTIFACT_REPLY:
+        return {"ok": False, "tool": name, "error": "reply_event_id does not refer to a Slack artifact reply event."}
+
+    origin_tmux = payload.get("origin_tmux") if isinstance(payload.get("origin_tmux"), dict) else {}
+    routing = payload.get("routing") if isinstance(payload.get("routing"), dict) else {}
+    target = _safe_str(args.get("target"), max_len=128)
+    if not target:
+        target = (
+            _safe_str(origin_tmux.get("pane_id"), max_len=128)
+            or _safe_str(origin_tmux.get("capture_target"), max_len=128)
+            or _safe_str(origin_tmux.get("preferred_alias"), max_len=128)
+            or _safe_str(origin_tmux.get("target"), max_len=128)
+        )
+    if not target:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "No tmux target was provided and the reply receipt has no origin target.",
+        }
 
-            if user_message_id is None:
-                last_user_message = (
-                    assistant_db.query(AssistantSupportMessage)
-                    .filter(AssistantSupportMessage.session_pk == int(session.id))
-                    .filter(AssistantSupportMessage.role == "user")
-                    .order_by(AssistantSupportMessage.id.desc())
-                    .first()
-                )
-                if last_user_message is not None:
-                    user_message_id = int(last_user_message.id)
-
-            tool_protocol = (os.getenv("ISPEC_ASSISTANT_TOOL_PROTOCOL") or "line").strip()
-            header = build_prompt_header(
-                session_id=session.session_id,
-                user_role=user.role if user is not None else None,
-                user_id=int(user.id) if user is not None else None,
-                session_state=state,
-                user_message_id=user_message_id,
-                tools_available=True,
-                tool_protocol=tool_protocol,
-                compare_mode=False,
-                forced_tool_choice=False,
-                repo_tools_enabled=_repo_tools_enabled(),
-            )
+    if int(reply_event_id) in relayed_reply_event_ids(agent_db):
+        return {
+            "ok": False,
+            "tool": name,
+            "error": f"Slack artifact reply event {reply_event_id} has already been relayed.",
+        }
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "session_id": session.session_id,
-                    "header_line": header.line,
-                    "header_fields": header.fields,
-                    "legend": header_legend() if include_legend else None,
-                },
-            }
+    press_enter = True if args.get("press_enter") is None else bool(args.get("press_enter"))
+    if press_enter and routing.get("submit_allowed") is not True:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "This artifact receipt does not allow submit/Enter for tmux relay.",
+        }
 
-        if name == "assistant_stats":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    message = format_tmux_relay_message(reply_payload=payload)
+    send_result = _tmux_send_text(target=target, text=message, press_enter=bool(press_enter))
+    relay_payload = {
+        "type": EVENT_SLACK_TMUX_RELAY_SENT,
+        "reply_event_id": int(reply_event_id),
+        "artifact_id": payload.get("artifact_id"),
+        "sent_at": datetime.now(UTC_TZ).isoformat(),
+        "tmux": send_result,
+        "press_enter": bool(press_enter),
+        "message": {"preview": message[:500], "length": len(message)},
+    }
+    event = AgentEvent(
+        agent_id=BRIDGE_AGENT_ID,
+        event_type=EVENT_SLACK_TMUX_RELAY_SENT,
+        ts=datetime.now(UTC_TZ),
+        name="slack_tmux_relay",
+        severity="info",
+        correlation_id=str(payload.get("artifact_id") or ""),
+        payload_json=stable_json(relay_payload),
+    )
+    agent_db.add(event)
+    agent_db.commit()
+    agent_db.refresh(event)
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "relayed": True,
+            "relay_event_id": int(event.id),
+            "reply_event_id": int(reply_event_id),
+            "tmux": send_result,
+            "message_preview": message[:500],
+        },
+    }
 
-            sessions_total = int(assistant_db.query(func.count(SupportSession.id)).scalar() or 0)
-            messages_total = int(assistant_db.query(func.count(AssistantSupportMessage.id)).scalar() or 0)
-            memories_total = int(assistant_db.query(func.count(SupportMemory.id)).scalar() or 0)
 
-            session_rows = (
-                assistant_db.query(SupportSession)
-                .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
-                .limit(250)
-                .all()
-            )
-            last_message_rows = (
-                assistant_db.query(AssistantSupportMessage.session_pk, func.max(AssistantSupportMessage.id))
-                .group_by(AssistantSupportMessage.session_pk)
-                .all()
-            )
-            last_message_by_session = {int(session_pk): int(last_id or 0) for session_pk, last_id in last_message_rows}
-            last_message_ids = [int(last_id or 0) for _, last_id in last_message_rows if last_id]
-            last_role_by_id = {}
-            if last_message_ids:
-                role_rows = (
-                    assistant_db.query(AssistantSupportMessage.id, AssistantSupportMessage.role)
-                    .filter(AssistantSupportMessage.id.in_(last_message_ids))
-                    .all()
-                )
-                last_role_by_id = {int(message_id): role for message_id, role in role_rows}
-            last_role_by_session = {
-                int(session_pk): last_role_by_id.get(int(last_id or 0))
-                for session_pk, last_id in last_message_rows
-            }
-            last_assistant_rows = (
-                assistant_db.query(AssistantSupportMessage.session_pk, func.max(AssistantSupportMessage.id))
-                .filter(AssistantSupportMessage.role == "assistant")
-                .group_by(AssistantSupportMessage.session_pk)
-                .all()
-            )
-            last_assistant_by_session = {int(session_pk): int(last_id or 0) for session_pk, last_id in last_assistant_rows}
-
-            session_pks = [int(session.id) for session in session_rows]
-            reviewed_up_to_by_session: dict[int, int] = {}
-            if session_pks:
-                review_rows = (
-                    assistant_db.query(SupportSessionReview.session_pk, func.max(SupportSessionReview.target_message_id))
-                    .filter(SupportSessionReview.session_pk.in_(session_pks))
-                    .group_by(SupportSessionReview.session_pk)
-                    .all()
-                )
-                reviewed_up_to_by_session = {int(session_pk): int(max_id or 0) for session_pk, max_id in review_rows}
-
-            needs_review = 0
-            reviewed = 0
-            pending_user_turn = 0
-            no_assistant_messages = 0
-            for session in session_rows:
-                session_pk = int(session.id)
-                last_id = int(last_message_by_session.get(session_pk, 0))
-                last_role = last_role_by_session.get(session_pk)
-                last_assistant_id = int(last_assistant_by_session.get(session_pk, 0))
-                if last_assistant_id <= 0:
-                    no_assistant_messages += 1
-                    continue
-                if last_role != "assistant":
-                    pending_user_turn += 1
-                    continue
-                reviewed_up_to = reviewed_up_to_by_session.get(session_pk)
-                if reviewed_up_to is None:
-                    state: dict[str, Any] = {}
-                    raw_state = getattr(session, "state_json", None)
-                    if raw_state:
-                        try:
-                            parsed_state = json.loads(raw_state)
-                            if isinstance(parsed_state, dict):
-                                state = parsed_state
-                        except Exception:
-                            state = {}
-                    reviewed_up_to = _safe_int(state.get("conversation_review_up_to_id")) or 0
-                if last_id > 0 and reviewed_up_to >= last_assistant_id:
-                    reviewed += 1
-                elif last_assistant_id > reviewed_up_to:
-                    needs_review += 1
-
-            queued_commands: int | None = None
-            running_commands: int | None = None
-            last_run: AgentRun | None = None
-            orchestrator_state = None
-            if agent_db is not None:
-                queued_commands = int(
-                    agent_db.query(func.count(AgentCommand.id))
-                    .filter(AgentCommand.status == "queued")
-                    .scalar()
-                    or 0
-                )
-                running_commands = int(
-                    agent_db.query(func.count(AgentCommand.id))
-                    .filter(AgentCommand.status == "running")
-                    .scalar()
-                    or 0
-                )
-                last_run = (
-                    agent_db.query(AgentRun)
-                    .filter(AgentRun.kind == "supervisor")
-                    .order_by(AgentRun.id.desc())
-                    .first()
-                )
-                if last_run is not None and isinstance(last_run.summary_json, dict):
-                    orchestrator_state = last_run.summary_json.get("orchestrator")
-
-            supervisor_health = None
-            if agent_db is not None:
-                supervisor_health = _assistant_supervisor_health_snapshot(
-                    agent_db=agent_db,
-                    last_run=last_run,
-                    orchestrator_state=orchestrator_state if isinstance(orchestrator_state, dict) else None,
-                )
+@_tool_handler("project_counts_snapshot")
+def _tool_project_counts_snapshot(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    max_categories = _clamp_int(
+        _safe_int(args.get("max_categories")),
+        default=20,
+        min_value=1,
+        max_value=100,
+    )
+    total_count = int(core_db.query(func.count(Project.id)).scalar() or 0)
+    current_count = int(
+        core_db.query(func.count(Project.id))
+        .filter(Project.prj_Current_FLAG.is_(True))
+        .scalar()
+        or 0
+    )
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "sessions_total": sessions_total,
-                    "messages_total": messages_total,
-                    "memories_total": memories_total,
-                    "sessions_needing_review": needs_review,
-                    "sessions_reviewed": reviewed,
-                    "sessions_pending_user_turn": pending_user_turn,
-                    "sessions_without_assistant_messages": no_assistant_messages,
-                    "agent_commands": (
-                        {"queued": queued_commands, "running": running_commands}
-                        if queued_commands is not None and running_commands is not None
-                        else None
-                    ),
-                    "latest_supervisor_run": {
-                        "run_id": getattr(last_run, "run_id", None),
-                        "agent_id": getattr(last_run, "agent_id", None),
-                        "status": getattr(last_run, "status", None),
-                        "updated_at": getattr(last_run, "updated_at", None).isoformat() if getattr(last_run, "updated_at", None) else None,
-                        "orchestrator": orchestrator_state,
-                    }
-                    if last_run is not None
-                    else None,
-                    "supervisor_health": supervisor_health,
-                },
-            }
+    status_rows = (
+        core_db.query(Project.prj_Status, func.count(Project.id))
+        .group_by(Project.prj_Status)
+        .all()
+    )
+    status_total = [
+        {"status": (status if status is not None else None), "count": int(count or 0)}
+        for status, count in status_rows
+    ]
+    status_total.sort(
+        key=lambda item: (
+            -int(item["count"]),
+            "" if item["status"] is None else str(item["status"]),
+        )
+    )
+
+    status_rows_current = (
+        core_db.query(Project.prj_Status, func.count(Project.id))
+        .filter(Project.prj_Current_FLAG.is_(True))
+        .group_by(Project.prj_Status)
+        .all()
+    )
+    status_current = [
+        {"status": (status if status is not None else None), "count": int(count or 0)}
+        for status, count in status_rows_current
+    ]
+    status_current.sort(
+        key=lambda item: (
+            -int(item["count"]),
+            "" if item["status"] is None else str(item["status"]),
+        )
+    )
 
-        if name == "assistant_enqueue_dev_restart_services":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
+    price_level_rows = (
+        core_db.query(Project.prj_ProjectPriceLevel, func.count(Project.id))
+        .group_by(Project.prj_ProjectPriceLevel)
+        .all()
+    )
+    price_levels = [
+        {
+            "category": (category.strip() if isinstance(category, str) and category.strip() else None),
+            "count": int(count or 0),
+        }
+        for category, count in price_level_rows
+    ]
+    price_levels.sort(
+        key=lambda item: (
+            -int(item["count"]),
+            "" if item["category"] is None else str(item["category"]),
+        )
+    )
+    if len(price_levels) > max_categories:
+        price_levels = price_levels[:max_categories]
+
+    ready_to_bill_total = int(
+        core_db.query(func.count(Project.id))
+        .filter(Project.prj_Billing_ReadyToBill.is_(True))
+        .scalar()
+        or 0
+    )
+    ready_to_bill_current = int(
+        core_db.query(func.count(Project.id))
+        .filter(Project.prj_Current_FLAG.is_(True))
+        .filter(Project.prj_Billing_ReadyToBill.is_(True))
+        .scalar()
+        or 0
+    )
 
-            if args.get("confirm") is not True:
-                return {"ok": False, "tool": name, "error": "confirm=true is required to enqueue a restart."}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "generated_at": datetime.now(tz=UTC_TZ).isoformat(),
+            "projects": {
+                "total": total_count,
+                "current": current_count,
+                "status_counts_total": status_total,
+                "status_counts_current": status_current,
+                "billing_ready_to_bill": {
+                    "total": ready_to_bill_total,
+                    "current": ready_to_bill_current,
+                },
+                "billing_categories": {
+                    "field": "prj_ProjectPriceLevel",
+                    "max_categories": max_categories,
+                    "items": price_levels,
+                },
+            },
+        },
+    }
 
-            tmux_session = _safe_str(args.get("tmux_session"), max_len=64)
-            make_root = _safe_str(args.get("make_root"), max_len=512)
-            dev_restart_enabled, dev_restart_reason = _dev_restart_enabled_status(
-                tmux_session=tmux_session,
-                make_root=make_root,
-            )
-            if not dev_restart_enabled:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "Dev restart tools are unavailable.",
-                    "hint": dev_restart_reason or None,
-                }
 
-            services_raw = args.get("services")
-            services: list[str] = []
-            if isinstance(services_raw, str):
-                tokens = [tok.strip() for tok in re.split(r"[\\s,]+", services_raw.strip()) if tok.strip()]
-                services = [tok.lower() for tok in tokens if tok]
-            elif isinstance(services_raw, list):
-                services = [str(item).strip().lower() for item in services_raw if str(item).strip()]
-
-            # Default behavior mirrors make dev-restart (backend + supervisor).
-            if not services:
-                services = ["backend", "supervisor"]
-
-            normalized: list[str] = []
-            seen: set[str] = set()
-            for svc in services:
-                if svc in {"api"}:
-                    svc = "backend"
-                if svc not in seen:
-                    normalized.append(svc)
-                    seen.add(svc)
-
-            allowed_services = {"backend", "supervisor", "frontend", "vllm", "slack"}
-            unknown = sorted({svc for svc in normalized if svc not in allowed_services})
-            if unknown:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": f"Unknown services: {unknown}. Allowed: {sorted(allowed_services)}",
-                }
+@_tool_handler("create_project_comment")
+def _tool_create_project_comment(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    user: AuthUser | None,
+    user_message: str | None,
+    project_comment_save_authorized: bool,
+    **_: Any,
+) -> dict[str, Any]:
+    if user is None:
+        return {"ok": False, "tool": name, "error": "Not authenticated."}
 
-            reason = _safe_str(args.get("reason"), max_len=240)
+    is_scoped_user = uses_explicit_project_access(user)
 
-            delay_seconds = _safe_int(args.get("delay_seconds")) or 0
-            delay_seconds = max(0, min(3600, int(delay_seconds)))
+    confirm = args.get("confirm")
+    if confirm is not True:
+        return {"ok": False, "tool": name, "error": "confirm=true is required to write project history."}
 
-            priority = _safe_int(args.get("priority"))
-            priority_int = int(priority) if priority is not None else 50
-            priority_int = max(0, min(1000, int(priority_int)))
+    user_msg = (user_message or "").strip().lower()
+    if user_msg and (
+        re.search(r"\b(do not|don't|dont)\s+(save|log|record|add|commit)\b", user_msg)
+        or re.search(r"\bnot\s+(?:save|commit)\b", user_msg)
+    ):
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "User requested not to save yet.",
+        }
+    if not project_comment_save_authorized and not _project_comment_save_requested(user_msg):
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "User did not explicitly request saving to project history.",
+        }
 
-            now = datetime.now(UTC_TZ)
-            available_at = now + timedelta(seconds=delay_seconds) if delay_seconds > 0 else now
+    project_id = _safe_int(args.get("project_id"))
+    if project_id is None or project_id <= 0:
+        return {"ok": False, "tool": name, "error": "project_id is required."}
 
-            command_payload: dict[str, Any] = {
-                "confirm": True,
-                "services": normalized,
-            }
-            if tmux_session:
-                command_payload["tmux_session"] = tmux_session
-            if make_root:
-                command_payload["make_root"] = make_root
-            if reason:
-                command_payload["reason"] = reason
-
-            if user is not None:
-                command_payload["requested_by"] = {
-                    "user_id": int(getattr(user, "id", 0) or 0),
-                    "username": getattr(user, "username", None),
-                    "role": str(getattr(user, "role", "")),
-                }
-            if isinstance(user_message, str) and user_message.strip():
-                command_payload["requested_via_message"] = user_message.strip()[:240]
+    comment_text = _safe_str(args.get("comment"), max_len=20_000)
+    if comment_text is None or not comment_text.strip():
+        return {"ok": False, "tool": name, "error": "comment text is required."}
 
-            cmd = AgentCommand(
-                command_type=COMMAND_DEV_RESTART_SERVICES,
-                status="queued",
-                priority=int(priority_int),
-                available_at=available_at,
-                attempts=0,
-                max_attempts=1,
-                payload_json=command_payload,
-                result_json={},
-            )
-            agent_db.add(cmd)
-            agent_db.commit()
-            agent_db.refresh(cmd)
+    comment_type = _safe_str(args.get("comment_type"), max_len=64) or "assistant_note"
+    if is_scoped_user:
+        comment_type = "client_note"
 
+    project = get_project_for_user(core_db, user=user, project_id=int(project_id))
+    if project is None:
+        if is_scoped_user:
             return {
-                "ok": True,
+                "ok": False,
                 "tool": name,
-                "result": {
-                    "queued": True,
-                    "command_id": int(cmd.id),
-                    "command_type": COMMAND_DEV_RESTART_SERVICES,
-                    "services": normalized,
-                    "available_at": available_at.isoformat(),
-                    "priority": int(priority_int),
-                },
+                "error": f"Project {project_id} not found or not accessible.",
             }
+        return {"ok": False, "tool": name, "error": f"Project {project_id} not found."}
 
-        if name in {"assistant_enqueue_slack_message", "assistant_enqueue_staff_slack_message"}:
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-
-            if args.get("confirm") is not True:
-                return {"ok": False, "tool": name, "error": "confirm=true is required to enqueue a Slack post."}
-
-            slack_enabled, slack_reason = (
-                _staff_slack_tool_status()
-                if name == "assistant_enqueue_staff_slack_message"
-                else _assistant_slack_tool_status()
+    person_id = _safe_int(args.get("person_id")) if not is_scoped_user else None
+    if person_id is not None and person_id > 0:
+        person = core_db.get(Person, int(person_id))
+        if person is None:
+            return {"ok": False, "tool": name, "error": f"Person {person_id} not found."}
+    else:
+        assistant_person = (
+            core_db.query(Person)
+            .filter(Person.ppl_Name_First == "iSPEC")
+            .filter(Person.ppl_Name_Last == "Assistant")
+            .first()
+        )
+        if assistant_person is None:
+            assistant_person = Person(
+                ppl_AddedBy=user.username,
+                ppl_Name_First="iSPEC",
+                ppl_Name_Last="Assistant",
             )
-            if not slack_enabled:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "Assistant Slack messaging is unavailable.",
-                    "hint": slack_reason or None,
-                }
+            core_db.add(assistant_person)
+            core_db.flush()
+        person_id = int(assistant_person.id)
+
+    comment = ProjectComment(
+        project_id=int(project_id),
+        person_id=int(person_id),
+        com_Comment=comment_text,
+        com_CommentType=comment_type,
+        com_AddedBy=user.username,
+    )
+    core_db.add(comment)
+    core_db.flush()
+    core_db.commit()
+    legacy_push_enqueue = _enqueue_legacy_project_comment_push(
+        project_id=int(project_id),
+        added_by=getattr(user, "username", None),
+        comment_id=int(comment.id),
+    )
 
-            destination_alias = _safe_str(args.get("to"), max_len=80)
-            if name == "assistant_enqueue_staff_slack_message" and not destination_alias:
-                destination_alias = "staff"
-            message_type = _safe_str(args.get("message_type"), max_len=80)
-            destination, destination_error = _resolve_assistant_slack_destination(
-                alias=destination_alias,
-                message_type=message_type,
-            )
-            if destination_error:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": destination_error,
-                }
+    snippet = comment_text.strip().replace("\n", " ")
+    if len(snippet) > 240:
+        snippet = snippet[:239] + "…"
 
-            message_text = _safe_str(args.get("message"), max_len=4000)
-            if message_text is None:
-                message_text = _safe_str(args.get("text"), max_len=4000)
-            if message_text is None:
-                return {"ok": False, "tool": name, "error": "Missing argument: message (or text)"}
-
-            thread_ts = _safe_str(args.get("thread_ts"), max_len=64)
-            reason = _safe_str(args.get("reason"), max_len=240)
-
-            delay_seconds = _safe_int(args.get("delay_seconds")) or 0
-            delay_seconds = max(0, min(3600, int(delay_seconds)))
-
-            priority = _safe_int(args.get("priority"))
-            priority_int = int(priority) if priority is not None else 50
-            priority_int = max(0, min(1000, int(priority_int)))
-
-            now = datetime.now(UTC_TZ)
-            available_at = now + timedelta(seconds=delay_seconds) if delay_seconds > 0 else now
-
-            command_payload: dict[str, Any] = {
-                "text": message_text,
-                "destination": destination,
-                "meta": {
-                    "source": name,
-                    "destination_alias": destination.get("alias") if isinstance(destination, dict) else None,
-                },
-            }
-            if isinstance(destination, dict):
-                if destination.get("channel"):
-                    command_payload["channel"] = str(destination["channel"])
-                if destination.get("user_id"):
-                    command_payload["user_id"] = str(destination["user_id"])
-                if destination.get("email"):
-                    command_payload["email"] = str(destination["email"])
-            if thread_ts:
-                command_payload["thread_ts"] = thread_ts
-            if reason:
-                command_payload["reason"] = reason
-
-            if user is not None:
-                command_payload["requested_by"] = {
-                    "user_id": int(getattr(user, "id", 0) or 0),
-                    "username": getattr(user, "username", None),
-                    "role": str(getattr(user, "role", "")),
-                }
-            if isinstance(user_message, str) and user_message.strip():
-                command_payload["requested_via_message"] = user_message.strip()[:240]
+    result = {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "project_id": int(project_id),
+            "comment_id": int(comment.id),
+            "person_id": int(person_id),
+            "comment_type": comment_type,
+            "added_by": user.username,
+            "snippet": snippet,
+            "links": {"project_ui": f"/project/{project_id}"},
+        },
+    }
+    if legacy_push_enqueue is not None:
+        result["result"]["legacy_push_enqueue"] = legacy_push_enqueue
+    return result
 
-            cmd = AgentCommand(
-                command_type=COMMAND_SLACK_POST_MESSAGE,
-                status="queued",
-                priority=int(priority_int),
-                available_at=available_at,
-                attempts=0,
-                max_attempts=3,
-                payload_json=command_payload,
-                result_json={},
-            )
-            agent_db.add(cmd)
-            agent_db.commit()
-            agent_db.refresh(cmd)
 
+@_tool_handler("latest_activity")
+def _tool_latest_activity(*, name: str, args: dict[str, Any], core_db: Session, **_: Any) -> dict[str, Any]:
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
+    current_only = bool(args.get("current_only"))
+    kinds = _coerce_str_list(args.get("kinds"), max_items=8)
+    allowed_kinds = {
+        "project",
+        "project_comment",
+        "experiment",
+        "experiment_run",
+    }
+    if kinds is None:
+        selected_kinds = allowed_kinds
+    else:
+        selected_kinds = {kind.strip().lower() for kind in kinds if kind.strip()}
+        unknown = sorted(selected_kinds - allowed_kinds)
+        if unknown:
             return {
-                "ok": True,
+                "ok": False,
                 "tool": name,
-                "result": {
-                    "queued": True,
-                    "command_id": int(cmd.id),
-                    "command_type": COMMAND_SLACK_POST_MESSAGE,
-                    "to": destination.get("alias") if isinstance(destination, dict) else None,
-                    "destination": destination,
-                    "channel": command_payload.get("channel"),
-                    "user_id": command_payload.get("user_id"),
-                    "thread_ts": thread_ts,
-                    "available_at": available_at.isoformat(),
-                    "priority": int(priority_int),
-                },
+                "error": f"Unknown kinds: {unknown}. Allowed: {sorted(allowed_kinds)}",
             }
 
-        if name == "assistant_recent_agent_commands":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
-            statuses = _coerce_str_list(args.get("statuses"), max_items=10) or _coerce_str_list(args.get("status"), max_items=10)
-            command_types = _coerce_str_list(args.get("command_types"), max_items=20) or _coerce_str_list(args.get("command_type"), max_items=20)
-            after_id = _safe_int(args.get("after_id"))
-            order = (_safe_str(args.get("order"), max_len=8) or "desc").lower()
-            if order not in {"asc", "desc"}:
-                return {"ok": False, "tool": name, "error": "order must be 'asc' or 'desc'."}
-            include_payload = bool(args.get("include_payload"))
-            include_result = bool(args.get("include_result"))
-            include_archive = bool(args.get("include_archive"))
-
-            items = _recent_agent_commands_from_db(
-                agent_db,
-                limit=limit,
-                statuses=statuses,
-                command_types=command_types,
-                after_id=after_id,
-                order=order,
-                include_payload=include_payload,
-                include_result=include_result,
-                source="live",
-            )
-            archive_cm = get_agent_archive_session_if_available() if include_archive else nullcontext(None)
-            with archive_cm as archive_db:
-                archive_available = archive_db is not None
-                if archive_db is not None:
-                    items.extend(
-                        _recent_agent_commands_from_db(
-                            archive_db,
-                            limit=limit,
-                            statuses=statuses,
-                            command_types=command_types,
-                            after_id=after_id,
-                            order=order,
-                            include_payload=include_payload,
-                            include_result=include_result,
-                            source="archive",
-                        )
-                    )
-            items = _sorted_unique_agent_items(items, id_key="id", order=order, limit=limit)
+    events: list[dict[str, Any]] = []
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "limit": limit,
-                    "order": order,
-                    "after_id": after_id,
-                    "include_archive": bool(include_archive),
-                    "archive_available": bool(archive_available if include_archive else False),
-                    "filters": {"statuses": statuses, "command_types": command_types},
-                    "count": len(items),
-                    "commands": items,
-                },
-            }
+    if "project" in selected_kinds:
+        query = core_db.query(Project)
+        if current_only:
+            query = query.filter(Project.prj_Current_FLAG.is_(True))
+        rows = (
+            query.order_by(Project.prj_ModificationTS.desc(), Project.id.desc())
+            .limit(limit)
+            .all()
+        )
+        for project in rows:
+            modified = getattr(project, "prj_ModificationTS", None)
+            created = getattr(project, "prj_CreationTS", None)
+            ts = modified or created
+            events.append(
+                {
+                    "kind": "project",
+                    "timestamp": ts.isoformat() if ts else None,
+                    "id": int(project.id),
+                    "title": project.prj_ProjectTitle,
+                    "status": project.prj_Status,
+                    "current": bool(project.prj_Current_FLAG),
+                    "links": {"ui": f"/project/{project.id}", "api": f"/api/projects/{project.id}"},
+                }
+            )
 
-        if name == "assistant_recent_agent_steps":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
-            kinds = _coerce_str_list(args.get("kinds"), max_items=20) or _coerce_str_list(args.get("kind"), max_items=20)
-            run_id = _safe_str(args.get("run_id"), max_len=128)
-            ok_filter = args.get("ok")
-            if ok_filter is not None and not isinstance(ok_filter, bool):
-                ok_filter = bool(ok_filter)
-            after_id = _safe_int(args.get("after_id"))
-            order = (_safe_str(args.get("order"), max_len=8) or "desc").lower()
-            if order not in {"asc", "desc"}:
-                return {"ok": False, "tool": name, "error": "order must be 'asc' or 'desc'."}
-            include_prompt = bool(args.get("include_prompt"))
-            include_response = bool(args.get("include_response"))
-            include_state = bool(args.get("include_state"))
-            include_archive = bool(args.get("include_archive"))
-
-            items = _recent_agent_steps_from_db(
-                agent_db,
-                limit=limit,
-                kinds=kinds,
-                run_id=run_id,
-                ok_filter=ok_filter,
-                after_id=after_id,
-                order=order,
-                include_prompt=include_prompt,
-                include_response=include_response,
-                include_state=include_state,
-                source="live",
+    if "project_comment" in selected_kinds:
+        query = (
+            core_db.query(ProjectComment, Project)
+            .join(Project, ProjectComment.project_id == Project.id)
+            .order_by(ProjectComment.com_CreationTS.desc(), ProjectComment.id.desc())
+        )
+        if current_only:
+            query = query.filter(Project.prj_Current_FLAG.is_(True))
+        rows = query.limit(limit).all()
+        for comment, project in rows:
+            created = getattr(comment, "com_CreationTS", None)
+            text = (comment.com_Comment or "").strip()
+            if len(text) > 240:
+                text = text[:239] + "…"
+            events.append(
+                {
+                    "kind": "project_comment",
+                    "timestamp": created.isoformat() if created else None,
+                    "id": int(comment.id),
+                    "project_id": int(project.id),
+                    "project_title": project.prj_ProjectTitle,
+                    "type": comment.com_CommentType,
+                    "added_by": comment.com_AddedBy,
+                    "comment": text or None,
+                    "links": {"ui": f"/project/{project.id}", "api": f"/api/projects/{project.id}"},
+                }
             )
-            archive_cm = get_agent_archive_session_if_available() if include_archive else nullcontext(None)
-            with archive_cm as archive_db:
-                archive_available = archive_db is not None
-                if archive_db is not None:
-                    items.extend(
-                        _recent_agent_steps_from_db(
-                            archive_db,
-                            limit=limit,
-                            kinds=kinds,
-                            run_id=run_id,
-                            ok_filter=ok_filter,
-                            after_id=after_id,
-                            order=order,
-                            include_prompt=include_prompt,
-                            include_response=include_response,
-                            include_state=include_state,
-                            source="archive",
-                        )
-                    )
-            items = _sorted_unique_agent_items(items, id_key="id", order=order, limit=limit)
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "limit": limit,
-                    "order": order,
-                    "after_id": after_id,
-                    "include_archive": bool(include_archive),
-                    "archive_available": bool(archive_available if include_archive else False),
-                    "filters": {"kinds": kinds, "run_id": run_id, "ok": ok_filter},
-                    "count": len(items),
-                    "steps": items,
-                },
-            }
+    if "experiment" in selected_kinds:
+        query = core_db.query(Experiment)
+        if current_only:
+            query = query.join(Project, Experiment.project_id == Project.id).filter(
+                Project.prj_Current_FLAG.is_(True)
+            )
+        rows = (
+            query.order_by(Experiment.Experiment_ModificationTS.desc(), Experiment.id.desc())
+            .limit(limit)
+            .all()
+        )
+        for experiment in rows:
+            modified = getattr(experiment, "Experiment_ModificationTS", None)
+            created = getattr(experiment, "Experiment_CreationTS", None)
+            ts = modified or created
+            events.append(
+                {
+                    "kind": "experiment",
+                    "timestamp": ts.isoformat() if ts else None,
+                    "id": int(experiment.id),
+                    "record_no": experiment.record_no,
+                    "name": experiment.exp_Name,
+                    "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
+                    "project_id": int(experiment.project_id)
+                    if experiment.project_id is not None
+                    else None,
+                    "links": {"ui": f"/experiment/{experiment.id}", "api": f"/api/experiments/{experiment.id}"},
+                }
+            )
 
-        if name == "assistant_recent_session_reviews":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
-
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
-            session_id = _safe_str(args.get("session_id"), max_len=256)
-            user_id = _safe_int(args.get("user_id"))
-            after_id = _safe_int(args.get("after_id"))
-            order = (_safe_str(args.get("order"), max_len=8) or "desc").lower()
-            if order not in {"asc", "desc"}:
-                return {"ok": False, "tool": name, "error": "order must be 'asc' or 'desc'."}
-            include_review_json = bool(args.get("include_review_json"))
-
-            query = assistant_db.query(SupportSessionReview, SupportSession.session_id, SupportSession.user_id).join(
-                SupportSession, SupportSession.id == SupportSessionReview.session_pk
+    if "experiment_run" in selected_kinds:
+        query = core_db.query(ExperimentRun)
+        if current_only:
+            query = (
+                query.join(Experiment, ExperimentRun.experiment_id == Experiment.id)
+                .join(Project, Experiment.project_id == Project.id)
+                .filter(Project.prj_Current_FLAG.is_(True))
             )
-            if session_id:
-                query = query.filter(SupportSession.session_id == session_id)
-            if user_id is not None:
-                query = query.filter(SupportSession.user_id == int(user_id))
-            if after_id is not None and after_id > 0:
-                query = query.filter(SupportSessionReview.id > int(after_id))
-
-            if order == "asc":
-                query = query.order_by(SupportSessionReview.id.asc())
-            else:
-                query = query.order_by(SupportSessionReview.id.desc())
-
-            rows = query.limit(limit).all()
-            items: list[dict[str, Any]] = []
-            for review, review_session_id, review_user_id in rows:
-                review_json = review.review_json if isinstance(review.review_json, dict) else {}
-                summary = review_json.get("summary")
-                if not isinstance(summary, str):
-                    summary = ""
-                issues = review_json.get("issues")
-                issue_count = len(issues) if isinstance(issues, list) else 0
-                followups = review_json.get("followups")
-                followup_count = len(followups) if isinstance(followups, list) else 0
-                repo_queries = review_json.get("repo_search_queries")
-                repo_query_count = len(repo_queries) if isinstance(repo_queries, list) else 0
-
-                item: dict[str, Any] = {
-                    "id": int(review.id),
-                    "session_id": review_session_id,
-                    "session_pk": int(review.session_pk),
-                    "user_id": int(review_user_id) if review_user_id is not None else None,
-                    "target_message_id": int(review.target_message_id),
-                    "updated_at": review.updated_at.isoformat() if review.updated_at else None,
-                    "issues_count": issue_count,
-                    "followups_count": followup_count,
-                    "repo_search_queries_count": repo_query_count,
-                    "summary": summary[:400] + ("…" if isinstance(summary, str) and len(summary) > 400 else ""),
+        rows = (
+            query.order_by(
+                ExperimentRun.ExperimentRun_ModificationTS.desc(),
+                ExperimentRun.id.desc(),
+            )
+            .limit(limit)
+            .all()
+        )
+        for run in rows:
+            modified = getattr(run, "ExperimentRun_ModificationTS", None)
+            created = getattr(run, "ExperimentRun_CreationTS", None)
+            ts = modified or created
+            events.append(
+                {
+                    "kind": "experiment_run",
+                    "timestamp": ts.isoformat() if ts else None,
+                    "id": int(run.id),
+                    "experiment_id": int(run.experiment_id),
+                    "run_no": int(run.run_no),
+                    "search_no": int(run.search_no),
+                    "search_engine": getattr(run, "search_engine", None),
+                    "search_state": getattr(run, "search_state", None),
+                    "links": {
+                        "ui": f"/experiment-run/{run.id}",
+                        "api": f"/api/experiment-runs/{run.id}",
+                    },
                 }
-                if include_review_json:
-                    item["review_json"] = review_json
-                items.append(item)
+            )
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "limit": limit,
-                    "order": order,
-                    "after_id": after_id,
-                    "filters": {"session_id": session_id, "user_id": user_id},
-                    "count": len(items),
-                    "reviews": items,
-                },
-            }
+    def sort_key(item: dict[str, Any]) -> tuple[int, str, int]:
+        ts = item.get("timestamp")
+        if isinstance(ts, str) and ts:
+            return (1, ts, int(item.get("id") or 0))
+        return (0, "", int(item.get("id") or 0))
 
-        if name == "assistant_recent_sessions":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    events.sort(key=sort_key, reverse=True)
+    events = events[:limit]
 
-            limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
-            sessions = (
-                assistant_db.query(SupportSession)
-                .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
-                .limit(limit)
-                .all()
-            )
-            session_pks = [int(session.id) for session in sessions]
-            review_by_session_pk: dict[int, dict[str, Any]] = {}
-            if session_pks:
-                review_rows = (
-                    assistant_db.query(
-                        SupportSessionReview.session_pk,
-                        SupportSessionReview.target_message_id,
-                        SupportSessionReview.updated_at,
-                    )
-                    .filter(SupportSessionReview.session_pk.in_(session_pks))
-                    .order_by(
-                        SupportSessionReview.session_pk.asc(),
-                        SupportSessionReview.target_message_id.desc(),
-                        SupportSessionReview.updated_at.desc(),
-                        SupportSessionReview.id.desc(),
-                    )
-                    .all()
-                )
-                for session_pk, target_id, updated_at in review_rows:
-                    key = int(session_pk)
-                    if key in review_by_session_pk:
-                        continue
-                    review_by_session_pk[key] = {
-                        "reviewed_up_to_id": int(target_id or 0),
-                        "review_updated_at": updated_at.isoformat() if updated_at else None,
-                    }
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "limit": limit,
+            "current_only": current_only,
+            "kinds": sorted(selected_kinds),
+            "count": len(events),
+            "events": events,
+        },
+    }
 
-            items: list[dict[str, Any]] = []
-            for session in sessions:
-                msg_count = int(
-                    assistant_db.query(func.count(AssistantSupportMessage.id))
-                    .filter(AssistantSupportMessage.session_pk == session.id)
-                    .scalar()
-                    or 0
-                )
-                last_message = (
-                    assistant_db.query(AssistantSupportMessage)
-                    .filter(AssistantSupportMessage.session_pk == session.id)
-                    .order_by(AssistantSupportMessage.id.desc())
-                    .first()
-                )
-                last_user = (
-                    assistant_db.query(AssistantSupportMessage)
-                    .filter(AssistantSupportMessage.session_pk == session.id)
-                    .filter(AssistantSupportMessage.role == "user")
-                    .order_by(AssistantSupportMessage.id.desc())
-                    .first()
-                )
-                last_assistant = (
-                    assistant_db.query(AssistantSupportMessage)
-                    .filter(AssistantSupportMessage.session_pk == session.id)
-                    .filter(AssistantSupportMessage.role == "assistant")
-                    .order_by(AssistantSupportMessage.id.desc())
-                    .first()
-                )
-                state: dict[str, Any] = {}
-                raw_state = getattr(session, "state_json", None)
-                if raw_state:
-                    try:
-                        parsed_state = json.loads(raw_state)
-                        if isinstance(parsed_state, dict):
-                            state = parsed_state
-                    except Exception:
-                        state = {}
-                review_info = review_by_session_pk.get(int(session.id))
-                if isinstance(review_info, dict):
-                    reviewed_up_to_id = _safe_int(review_info.get("reviewed_up_to_id")) or 0
-                    review_updated_at = review_info.get("review_updated_at")
-                else:
-                    reviewed_up_to_id = _safe_int(state.get("conversation_review_up_to_id")) or 0
-                    review_updated_at = state.get("conversation_review_updated_at")
-                items.append(
-                    {
-                        "session_id": session.session_id,
-                        "user_id": int(session.user_id) if session.user_id is not None else None,
-                        "updated_at": session.updated_at.isoformat() if session.updated_at else None,
-                        "message_count": msg_count,
-                        "last_message_id": int(last_message.id) if last_message is not None else 0,
-                        "last_message_role": getattr(last_message, "role", None),
-                        "last_assistant_message_id": int(last_assistant.id) if last_assistant is not None else 0,
-                        "last_user_message": _safe_str(getattr(last_user, "content", None), max_len=240),
-                        "reviewed_up_to_id": reviewed_up_to_id,
-                        "review_updated_at": review_updated_at,
-                        "memory_up_to_id": _safe_int(state.get("conversation_memory_up_to_id")) or 0,
-                    }
-                )
 
-            return {"ok": True, "tool": name, "result": {"limit": limit, "sessions": items}}
+@_tool_handler("billing_category_counts")
+def _tool_billing_category_counts(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    current_only = bool(args.get("current_only"))
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+
+    query = core_db.query(Project.prj_ProjectPriceLevel, func.count(Project.id))
+    if current_only:
+        query = query.filter(Project.prj_Current_FLAG.is_(True))
+    rows = query.group_by(Project.prj_ProjectPriceLevel).all()
+    items = [
+        {
+            "category": (category.strip() if isinstance(category, str) and category.strip() else None),
+            "count": int(count or 0),
+        }
+        for category, count in rows
+    ]
+    items.sort(
+        key=lambda item: (
+            -int(item["count"]),
+            "" if item["category"] is None else str(item["category"]),
+        )
+    )
+    if len(items) > limit:
+        items = items[:limit]
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "current_only": current_only,
+            "field": "prj_ProjectPriceLevel",
+            "count": len(items),
+            "items": items,
+        },
+    }
+
 
-        if name == "assistant_recent_session_work_bag":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
+@_tool_handler("assistant_prompt_header")
+def _tool_assistant_prompt_header(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    user: AuthUser | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+
+    session_id = _safe_str(args.get("session_id"), max_len=256) or _safe_str(args.get("sessionId"), max_len=256)
+    if not session_id:
+        return {"ok": False, "tool": name, "error": "Missing argument: session_id"}
+
+    include_legend = bool(args.get("include_legend"))
+    user_message_id = _safe_int(args.get("user_message_id"))
+    if user_message_id is None:
+        user_message_id = _safe_int(args.get("message_id"))
+    if user_message_id is None:
+        user_message_id = _safe_int(args.get("userMessageId"))
+
+    session = assistant_db.query(SupportSession).filter(SupportSession.session_id == session_id).first()
+    if session is None:
+        return {"ok": False, "tool": name, "error": "Session not found.", "session_id": session_id}
+
+    state: dict[str, Any] = {}
+    raw_state = getattr(session, "state_json", None)
+    if raw_state:
+        try:
+            parsed_state = json.loads(raw_state)
+            if isinstance(parsed_state, dict):
+                state = parsed_state
+        except Exception:
+            state = {}
+
+    if user_message_id is None:
+        last_user_message = (
+            assistant_db.query(AssistantSupportMessage)
+            .filter(AssistantSupportMessage.session_pk == int(session.id))
+            .filter(AssistantSupportMessage.role == "user")
+            .order_by(AssistantSupportMessage.id.desc())
+            .first()
+        )
+        if last_user_message is not None:
+            user_message_id = int(last_user_message.id)
+
+    tool_protocol = (os.getenv("ISPEC_ASSISTANT_TOOL_PROTOCOL") or "line").strip()
+    header = build_prompt_header(
+        session_id=session.session_id,
+        user_role=user.role if user is not None else None,
+        user_id=int(user.id) if user is not None else None,
+        session_state=state,
+        user_message_id=user_message_id,
+        tools_available=True,
+        tool_protocol=tool_protocol,
+        compare_mode=False,
+        forced_tool_choice=False,
+        repo_tools_enabled=_repo_tools_enabled(),
+    )
 
-            session_id = (
-                _safe_str(args.get("session_id"), max_len=256)
-                or _safe_str(args.get("id"), max_len=256)
-                or _safe_str(support_session_id, max_len=256)
-            )
-            if not session_id:
-                return {"ok": False, "tool": name, "error": "Missing argument: session_id"}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "session_id": session.session_id,
+            "header_line": header.line,
+            "header_fields": header.fields,
+            "legend": header_legend() if include_legend else None,
+        },
+    }
+
+
+@_tool_handler("assistant_stats")
+def _tool_assistant_stats(
+    *,
+    name: str,
+    assistant_db: Session | None,
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
 
-            limit = _clamp_int(_safe_int(args.get("limit")), default=12, min_value=1, max_value=50)
-            session = assistant_db.query(SupportSession).filter(SupportSession.session_id == session_id).first()
-            if session is None:
-                return {"ok": False, "tool": name, "error": "Session not found.", "session_id": session_id}
+    sessions_total = int(assistant_db.query(func.count(SupportSession.id)).scalar() or 0)
+    messages_total = int(assistant_db.query(func.count(AssistantSupportMessage.id)).scalar() or 0)
+    memories_total = int(assistant_db.query(func.count(SupportMemory.id)).scalar() or 0)
 
+    session_rows = (
+        assistant_db.query(SupportSession)
+        .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
+        .limit(250)
+        .all()
+    )
+    last_message_rows = (
+        assistant_db.query(AssistantSupportMessage.session_pk, func.max(AssistantSupportMessage.id))
+        .group_by(AssistantSupportMessage.session_pk)
+        .all()
+    )
+    last_message_by_session = {int(session_pk): int(last_id or 0) for session_pk, last_id in last_message_rows}
+    last_message_ids = [int(last_id or 0) for _, last_id in last_message_rows if last_id]
+    last_role_by_id = {}
+    if last_message_ids:
+        role_rows = (
+            assistant_db.query(AssistantSupportMessage.id, AssistantSupportMessage.role)
+            .filter(AssistantSupportMessage.id.in_(last_message_ids))
+            .all()
+        )
+        last_role_by_id = {int(message_id): role for message_id, role in role_rows}
+    last_role_by_session = {
+        int(session_pk): last_role_by_id.get(int(last_id or 0))
+        for session_pk, last_id in last_message_rows
+    }
+    last_assistant_rows = (
+        assistant_db.query(AssistantSupportMessage.session_pk, func.max(AssistantSupportMessage.id))
+        .filter(AssistantSupportMessage.role == "assistant")
+        .group_by(AssistantSupportMessage.session_pk)
+        .all()
+    )
+    last_assistant_by_session = {int(session_pk): int(last_id or 0) for session_pk, last_id in last_assistant_rows}
+
+    session_pks = [int(session.id) for session in session_rows]
+    reviewed_up_to_by_session: dict[int, int] = {}
+    if session_pks:
+        review_rows = (
+            assistant_db.query(SupportSessionReview.session_pk, func.max(SupportSessionReview.target_message_id))
+            .filter(SupportSessionReview.session_pk.in_(session_pks))
+            .group_by(SupportSessionReview.session_pk)
+            .all()
+        )
+        reviewed_up_to_by_session = {int(session_pk): int(max_id or 0) for session_pk, max_id in review_rows}
+
+    needs_review = 0
+    reviewed = 0
+    pending_user_turn = 0
+    no_assistant_messages = 0
+    for session in session_rows:
+        session_pk = int(session.id)
+        last_id = int(last_message_by_session.get(session_pk, 0))
+        last_role = last_role_by_session.get(session_pk)
+        last_assistant_id = int(last_assistant_by_session.get(session_pk, 0))
+        if last_assistant_id <= 0:
+            no_assistant_messages += 1
+            continue
+        if last_role != "assistant":
+            pending_user_turn += 1
+            continue
+        reviewed_up_to = reviewed_up_to_by_session.get(session_pk)
+        if reviewed_up_to is None:
             state: dict[str, Any] = {}
             raw_state = getattr(session, "state_json", None)
             if raw_state:
@@ -4679,1693 +4165,2704 @@ def run_tool(
                         state = parsed_state
                 except Exception:
                     state = {}
+            reviewed_up_to = _safe_int(state.get("conversation_review_up_to_id")) or 0
+        if last_id > 0 and reviewed_up_to >= last_assistant_id:
+            reviewed += 1
+        elif last_assistant_id > reviewed_up_to:
+            needs_review += 1
+
+    queued_commands: int | None = None
+    running_commands: int | None = None
+    last_run: AgentRun | None = None
+    orchestrator_state = None
+    if agent_db is not None:
+        queued_commands = int(
+            agent_db.query(func.count(AgentCommand.id))
+            .filter(AgentCommand.status == "queued")
+            .scalar()
+            or 0
+        )
+        running_commands = int(
+            agent_db.query(func.count(AgentCommand.id))
+            .filter(AgentCommand.status == "running")
+            .scalar()
+            or 0
+        )
+        last_run = (
+            agent_db.query(AgentRun)
+            .filter(AgentRun.kind == "supervisor")
+            .order_by(AgentRun.id.desc())
+            .first()
+        )
+        if last_run is not None and isinstance(last_run.summary_json, dict):
+            orchestrator_state = last_run.summary_json.get("orchestrator")
+
+    supervisor_health = None
+    if agent_db is not None:
+        supervisor_health = _assistant_supervisor_health_snapshot(
+            agent_db=agent_db,
+            last_run=last_run,
+            orchestrator_state=orchestrator_state if isinstance(orchestrator_state, dict) else None,
+        )
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": recent_work_bag_payload(
-                    state,
-                    session_id=session.session_id,
-                    limit=limit,
-                ),
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "sessions_total": sessions_total,
+            "messages_total": messages_total,
+            "memories_total": memories_total,
+            "sessions_needing_review": needs_review,
+            "sessions_reviewed": reviewed,
+            "sessions_pending_user_turn": pending_user_turn,
+            "sessions_without_assistant_messages": no_assistant_messages,
+            "agent_commands": (
+                {"queued": queued_commands, "running": running_commands}
+                if queued_commands is not None and running_commands is not None
+                else None
+            ),
+            "latest_supervisor_run": {
+                "run_id": getattr(last_run, "run_id", None),
+                "agent_id": getattr(last_run, "agent_id", None),
+                "status": getattr(last_run, "status", None),
+                "updated_at": getattr(last_run, "updated_at", None).isoformat() if getattr(last_run, "updated_at", None) else None,
+                "orchestrator": orchestrator_state,
             }
+            if last_run is not None
+            else None,
+            "supervisor_health": supervisor_health,
+            "inference_usage": usage_summary_digest(load_usage_summary()),
+        },
+    }
 
-        if name == "assistant_get_session_review":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
-            session_id = _safe_str(args.get("session_id"), max_len=256) or _safe_str(args.get("id"), max_len=256)
-            if not session_id:
-                return {"ok": False, "tool": name, "error": "Missing argument: session_id"}
-            session = assistant_db.query(SupportSession).filter(SupportSession.session_id == session_id).first()
-            if session is None:
-                return {"ok": False, "tool": name, "error": "Session not found.", "session_id": session_id}
-            review_row = (
-                assistant_db.query(SupportSessionReview)
-                .filter(SupportSessionReview.session_pk == int(session.id))
-                .order_by(
-                    SupportSessionReview.target_message_id.desc(),
-                    SupportSessionReview.updated_at.desc(),
-                    SupportSessionReview.id.desc(),
-                )
-                .first()
-            )
-            if review_row is not None:
-                review = review_row.review_json if isinstance(review_row.review_json, dict) else None
-                reviewed_up_to_id = int(review_row.target_message_id or 0)
-                review_updated_at = review_row.updated_at.isoformat() if review_row.updated_at else None
-            else:
-                state: dict[str, Any] = {}
-                raw_state = getattr(session, "state_json", None)
-                if raw_state:
-                    try:
-                        parsed_state = json.loads(raw_state)
-                        if isinstance(parsed_state, dict):
-                            state = parsed_state
-                    except Exception:
-                        state = {}
-                review = state.get("conversation_review") if isinstance(state.get("conversation_review"), dict) else None
-                reviewed_up_to_id = _safe_int(state.get("conversation_review_up_to_id")) or 0
-                review_updated_at = state.get("conversation_review_updated_at")
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "session_id": session.session_id,
-                    "reviewed_up_to_id": reviewed_up_to_id,
-                    "review_updated_at": review_updated_at,
-                    "review": review,
-                },
-            }
 
-        if name == "assistant_search_messages":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
-            query_text = _safe_str(args.get("query"), max_len=512) or _safe_str(args.get("q"), max_len=512)
-            if not query_text:
-                return {"ok": False, "tool": name, "error": "Missing argument: query"}
+@_tool_handler("assistant_enqueue_dev_restart_services")
+def _tool_assistant_enqueue_dev_restart_services(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    user: AuthUser | None,
+    user_message: str | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
 
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
-            role = _safe_str(args.get("role"), max_len=16)
-            session_id = _safe_str(args.get("session_id"), max_len=256)
-            user_id = _safe_int(args.get("user_id"))
+    if args.get("confirm") is not True:
+        return {"ok": False, "tool": name, "error": "confirm=true is required to enqueue a restart."}
 
-            pattern = f"%{query_text}%"
-            query = (
-                assistant_db.query(
-                    AssistantSupportMessage,
-                    SupportSession.session_id,
-                    SupportSession.user_id,
-                )
-                .join(SupportSession, AssistantSupportMessage.session_pk == SupportSession.id)
-                .filter(AssistantSupportMessage.content.ilike(pattern))
-            )
-            if role:
-                query = query.filter(AssistantSupportMessage.role == role)
-            if session_id:
-                query = query.filter(SupportSession.session_id == session_id)
-            if user_id is not None:
-                query = query.filter(SupportSession.user_id == int(user_id))
-
-            rows = (
-                query.order_by(AssistantSupportMessage.id.desc())
-                .limit(limit)
-                .all()
-            )
-            matches: list[dict[str, Any]] = []
-            for message, sess_id, sess_user_id in rows:
-                content = getattr(message, "content", "") or ""
-                matches.append(
-                    {
-                        "message_id": int(message.id),
-                        "session_id": sess_id,
-                        "user_id": int(sess_user_id) if sess_user_id is not None else None,
-                        "role": getattr(message, "role", None),
-                        "created_at": message.created_at.isoformat() if getattr(message, "created_at", None) else None,
-                        "snippet": _snippet_for_query(content, query_text, window=80, max_len=320),
-                    }
-                )
+    tmux_session = _safe_str(args.get("tmux_session"), max_len=64)
+    make_root = _safe_str(args.get("make_root"), max_len=512)
+    dev_restart_enabled, dev_restart_reason = _dev_restart_enabled_status(
+        tmux_session=tmux_session,
+        make_root=make_root,
+    )
+    if not dev_restart_enabled:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "Dev restart tools are unavailable.",
+            "hint": dev_restart_reason or None,
+        }
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "query": query_text,
-                    "limit": limit,
-                    "role": role,
-                    "session_id": session_id,
-                    "user_id": int(user_id) if user_id is not None else None,
-                    "count": len(matches),
-                    "matches": matches,
-                },
-            }
+    services_raw = args.get("services")
+    services: list[str] = []
+    if isinstance(services_raw, str):
+        tokens = [tok.strip() for tok in re.split(r"[\\s,]+", services_raw.strip()) if tok.strip()]
+        services = [tok.lower() for tok in tokens if tok]
+    elif isinstance(services_raw, list):
+        services = [str(item).strip().lower() for item in services_raw if str(item).strip()]
 
-        if name == "assistant_get_message_context":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
-            message_id = _safe_int(args.get("message_id"))
-            if message_id is None:
-                message_id = _safe_int(args.get("id"))
-            if message_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: message_id (or id)"}
-
-            before = _clamp_int(_safe_int(args.get("before")), default=3, min_value=0, max_value=20)
-            after = _clamp_int(_safe_int(args.get("after")), default=3, min_value=0, max_value=20)
-            max_chars = _clamp_int(_safe_int(args.get("max_chars")), default=800, min_value=50, max_value=5000)
-
-            anchor = assistant_db.query(AssistantSupportMessage).filter(AssistantSupportMessage.id == int(message_id)).first()
-            if anchor is None:
-                return {"ok": False, "tool": name, "error": "Message not found.", "message_id": int(message_id)}
-
-            session = assistant_db.query(SupportSession).filter(SupportSession.id == int(anchor.session_pk)).first()
-            session_id = session.session_id if session is not None else None
-            session_user_id = int(session.user_id) if session is not None and session.user_id is not None else None
-
-            previous_rows = (
-                assistant_db.query(AssistantSupportMessage)
-                .filter(AssistantSupportMessage.session_pk == int(anchor.session_pk))
-                .filter(AssistantSupportMessage.id < int(anchor.id))
-                .order_by(AssistantSupportMessage.id.desc())
-                .limit(before)
-                .all()
-            )
-            previous_rows.reverse()
-            next_rows = (
-                assistant_db.query(AssistantSupportMessage)
-                .filter(AssistantSupportMessage.session_pk == int(anchor.session_pk))
-                .filter(AssistantSupportMessage.id > int(anchor.id))
-                .order_by(AssistantSupportMessage.id.asc())
-                .limit(after)
-                .all()
-            )
+    # Default behavior mirrors make dev-restart (backend + supervisor).
+    if not services:
+        services = ["backend", "supervisor"]
 
-            rows = [*previous_rows, anchor, *next_rows]
-            messages = [
-                {
-                    "id": int(row.id),
-                    "role": row.role,
-                    "created_at": row.created_at.isoformat() if getattr(row, "created_at", None) else None,
-                    "content": _safe_str(getattr(row, "content", None), max_len=max_chars) or "",
-                }
-                for row in rows
-            ]
+    normalized: list[str] = []
+    seen: set[str] = set()
+    for svc in services:
+        if svc in {"api"}:
+            svc = "backend"
+        if svc not in seen:
+            normalized.append(svc)
+            seen.add(svc)
+
+    allowed_services = {"backend", "supervisor", "frontend", "vllm", "slack"}
+    unknown = sorted({svc for svc in normalized if svc not in allowed_services})
+    if unknown:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": f"Unknown services: {unknown}. Allowed: {sorted(allowed_services)}",
+        }
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "message_id": int(anchor.id),
-                    "session_id": session_id,
-                    "user_id": session_user_id,
-                    "before": before,
-                    "after": after,
-                    "count": len(messages),
-                    "messages": messages,
-                },
-            }
+    reason = _safe_str(args.get("reason"), max_len=240)
 
-        if name == "assistant_list_digests":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    delay_seconds = _safe_int(args.get("delay_seconds")) or 0
+    delay_seconds = max(0, min(3600, int(delay_seconds)))
 
-            limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=100)
-            key = _safe_str(args.get("key"), max_len=128) if args.get("key") is not None else "global"
-            user_id = _safe_int(args.get("user_id"))
+    priority = _safe_int(args.get("priority"))
+    priority_int = int(priority) if priority is not None else 50
+    priority_int = max(0, min(1000, int(priority_int)))
 
-            query = (
-                assistant_db.query(SupportMemory, SupportSession.session_id)
-                .outerjoin(SupportSession, SupportMemory.session_pk == SupportSession.id)
-                .filter(SupportMemory.kind == "digest")
-            )
-            if key:
-                query = query.filter(SupportMemory.key == key)
-            if user_id is not None:
-                query = query.filter(SupportMemory.user_id == int(user_id))
-
-            rows = (
-                query.order_by(SupportMemory.created_at.desc(), SupportMemory.id.desc())
-                .limit(limit)
-                .all()
-            )
-            items: list[dict[str, Any]] = []
-            for digest, session_id in rows:
-                digest_json: dict[str, Any] | None = None
-                raw_value = getattr(digest, "value_json", None)
-                if isinstance(raw_value, str) and raw_value.strip():
-                    try:
-                        parsed_value = json.loads(raw_value)
-                        if isinstance(parsed_value, dict):
-                            digest_json = parsed_value
-                    except Exception:
-                        digest_json = None
-                summary_preview = ""
-                if isinstance(digest_json, dict):
-                    summary_preview = _safe_str(digest_json.get("summary"), max_len=240) or ""
-                if not summary_preview and isinstance(raw_value, str):
-                    summary_preview = _safe_str(raw_value, max_len=240) or ""
-                items.append(
-                    {
-                        "digest_id": int(digest.id),
-                        "kind": digest.kind,
-                        "key": digest.key,
-                        "user_id": int(digest.user_id) if getattr(digest, "user_id", None) is not None else 0,
-                        "session_id": session_id,
-                        "created_at": digest.created_at.isoformat() if getattr(digest, "created_at", None) else None,
-                        "updated_at": digest.updated_at.isoformat() if getattr(digest, "updated_at", None) else None,
-                        "summary": summary_preview,
-                    }
-                )
+    now = datetime.now(UTC_TZ)
+    available_at = now + timedelta(seconds=delay_seconds) if delay_seconds > 0 else now
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "limit": limit,
-                    "key": key,
-                    "user_id": int(user_id) if user_id is not None else None,
-                    "count": len(items),
-                    "digests": items,
-                },
-            }
+    command_payload: dict[str, Any] = {
+        "confirm": True,
+        "services": normalized,
+    }
+    if tmux_session:
+        command_payload["tmux_session"] = tmux_session
+    if make_root:
+        command_payload["make_root"] = make_root
+    if reason:
+        command_payload["reason"] = reason
+
+    if user is not None:
+        command_payload["requested_by"] = {
+            "user_id": int(getattr(user, "id", 0) or 0),
+            "username": getattr(user, "username", None),
+            "role": str(getattr(user, "role", "")),
+        }
+    if isinstance(user_message, str) and user_message.strip():
+        command_payload["requested_via_message"] = user_message.strip()[:240]
+
+    cmd = AgentCommand(
+        command_type=COMMAND_DEV_RESTART_SERVICES,
+        status="queued",
+        priority=int(priority_int),
+        available_at=available_at,
+        attempts=0,
+        max_attempts=1,
+        payload_json=command_payload,
+        result_json={},
+    )
+    agent_db.add(cmd)
+    agent_db.commit()
+    agent_db.refresh(cmd)
 
-        if name == "assistant_get_digest":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "queued": True,
+            "command_id": int(cmd.id),
+            "command_type": COMMAND_DEV_RESTART_SERVICES,
+            "services": normalized,
+            "available_at": available_at.isoformat(),
+            "priority": int(priority_int),
+        },
+    }
 
-            digest_id = _safe_int(args.get("digest_id"))
-            if digest_id is None:
-                digest_id = _safe_int(args.get("id"))
-            if digest_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: digest_id (or id)"}
 
-            digest = (
-                assistant_db.query(SupportMemory)
-                .filter(SupportMemory.id == int(digest_id))
-                .filter(SupportMemory.kind == "digest")
-                .first()
-            )
-            if digest is None:
-                return {"ok": False, "tool": name, "error": "Digest not found.", "digest_id": int(digest_id)}
+@_tool_handler("assistant_enqueue_slack_message", "assistant_enqueue_staff_slack_message")
+def _tool_assistant_enqueue_slack_message(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    user: AuthUser | None,
+    user_message: str | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
 
-            session_id = None
-            if getattr(digest, "session_pk", None) is not None:
-                session = assistant_db.query(SupportSession).filter(SupportSession.id == int(digest.session_pk)).first()
-                session_id = session.session_id if session is not None else None
+    if args.get("confirm") is not True:
+        return {"ok": False, "tool": name, "error": "confirm=true is required to enqueue a Slack post."}
 
-            parsed_value: dict[str, Any] | None = None
-            raw_value = getattr(digest, "value_json", None)
-            if isinstance(raw_value, str) and raw_value.strip():
-                try:
-                    payload_value = json.loads(raw_value)
-                    if isinstance(payload_value, dict):
-                        parsed_value = payload_value
-                except Exception:
-                    parsed_value = None
+    slack_enabled, slack_reason = (
+        _staff_slack_tool_status()
+        if name == "assistant_enqueue_staff_slack_message"
+        else _assistant_slack_tool_status()
+    )
+    if not slack_enabled:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "Assistant Slack messaging is unavailable.",
+            "hint": slack_reason or None,
+        }
 
-            evidence_rows = (
-                assistant_db.query(SupportMemoryEvidence.message_id)
-                .filter(SupportMemoryEvidence.memory_id == int(digest.id))
-                .order_by(SupportMemoryEvidence.message_id.asc())
-                .all()
-            )
-            evidence_message_ids = [int(row[0]) for row in evidence_rows if row and int(row[0]) > 0]
+    destination_alias = _safe_str(args.get("to"), max_len=80)
+    if name == "assistant_enqueue_staff_slack_message" and not destination_alias:
+        destination_alias = "staff"
+    message_type = _safe_str(args.get("message_type"), max_len=80)
+    destination, destination_error = _resolve_assistant_slack_destination(
+        alias=destination_alias,
+        message_type=message_type,
+    )
+    if destination_error:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": destination_error,
+        }
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "digest_id": int(digest.id),
-                    "key": digest.key,
-                    "user_id": int(digest.user_id) if getattr(digest, "user_id", None) is not None else 0,
-                    "session_id": session_id,
-                    "created_at": digest.created_at.isoformat() if getattr(digest, "created_at", None) else None,
-                    "updated_at": digest.updated_at.isoformat() if getattr(digest, "updated_at", None) else None,
-                    "digest": parsed_value,
-                    "raw": raw_value if parsed_value is None else None,
-                    "evidence_message_ids": evidence_message_ids,
-                },
-            }
+    message_text = _safe_str(args.get("message"), max_len=4000)
+    if message_text is None:
+        message_text = _safe_str(args.get("text"), max_len=4000)
+    if message_text is None:
+        return {"ok": False, "tool": name, "error": "Missing argument: message (or text)"}
 
-        if name == "assistant_search_digests":
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
-            query_text = _safe_str(args.get("query"), max_len=512) or _safe_str(args.get("q"), max_len=512)
-            if not query_text:
-                return {"ok": False, "tool": name, "error": "Missing argument: query"}
+    thread_ts = _safe_str(args.get("thread_ts"), max_len=64)
+    reason = _safe_str(args.get("reason"), max_len=240)
 
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
-            key = _safe_str(args.get("key"), max_len=128)
-            user_id = _safe_int(args.get("user_id"))
+    delay_seconds = _safe_int(args.get("delay_seconds")) or 0
+    delay_seconds = max(0, min(3600, int(delay_seconds)))
 
-            pattern = f"%{query_text}%"
-            query = assistant_db.query(SupportMemory).filter(SupportMemory.kind == "digest").filter(
-                cast(SupportMemory.value_json, Text).ilike(pattern)
-            )
-            if key:
-                query = query.filter(SupportMemory.key == key)
-            if user_id is not None:
-                query = query.filter(SupportMemory.user_id == int(user_id))
-
-            rows = (
-                query.order_by(SupportMemory.created_at.desc(), SupportMemory.id.desc())
-                .limit(limit)
-                .all()
-            )
-            matches: list[dict[str, Any]] = []
-            for digest in rows:
-                raw_value = getattr(digest, "value_json", "") or ""
-                matches.append(
-                    {
-                        "digest_id": int(digest.id),
-                        "key": digest.key,
-                        "user_id": int(digest.user_id) if getattr(digest, "user_id", None) is not None else 0,
-                        "created_at": digest.created_at.isoformat() if getattr(digest, "created_at", None) else None,
-                        "snippet": _snippet_for_query(raw_value, query_text, window=80, max_len=320),
-                    }
-                )
+    priority = _safe_int(args.get("priority"))
+    priority_int = int(priority) if priority is not None else 50
+    priority_int = max(0, min(1000, int(priority_int)))
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "query": query_text,
-                    "limit": limit,
-                    "key": key,
-                    "user_id": int(user_id) if user_id is not None else None,
-                    "count": len(matches),
-                    "matches": matches,
-                },
-            }
+    now = datetime.now(UTC_TZ)
+    available_at = now + timedelta(seconds=delay_seconds) if delay_seconds > 0 else now
+
+    command_payload: dict[str, Any] = {
+        "text": message_text,
+        "destination": destination,
+        "meta": {
+            "source": name,
+            "destination_alias": destination.get("alias") if isinstance(destination, dict) else None,
+        },
+    }
+    if isinstance(destination, dict):
+        if destination.get("channel"):
+            command_payload["channel"] = str(destination["channel"])
+        if destination.get("user_id"):
+            command_payload["user_id"] = str(destination["user_id"])
+        if destination.get("email"):
+            command_payload["email"] = str(destination["email"])
+    if thread_ts:
+        command_payload["thread_ts"] = thread_ts
+    if reason:
+        command_payload["reason"] = reason
+
+    if user is not None:
+        command_payload["requested_by"] = {
+            "user_id": int(getattr(user, "id", 0) or 0),
+            "username": getattr(user, "username", None),
+            "role": str(getattr(user, "role", "")),
+        }
+    if isinstance(user_message, str) and user_message.strip():
+        command_payload["requested_via_message"] = user_message.strip()[:240]
+
+    cmd = AgentCommand(
+        command_type=COMMAND_SLACK_POST_MESSAGE,
+        status="queued",
+        priority=int(priority_int),
+        available_at=available_at,
+        attempts=0,
+        max_attempts=3,
+        payload_json=command_payload,
+        result_json={},
+    )
+    agent_db.add(cmd)
+    agent_db.commit()
+    agent_db.refresh(cmd)
 
-        if name == "assistant_list_users":
-            include_anonymous = True if args.get("include_anonymous") is None else bool(args.get("include_anonymous"))
-            limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=200)
-            linkage_session_limit = _clamp_int(
-                _safe_int(args.get("linkage_session_limit")),
-                default=50,
-                min_value=1,
-                max_value=500,
-            )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "queued": True,
+            "command_id": int(cmd.id),
+            "command_type": COMMAND_SLACK_POST_MESSAGE,
+            "to": destination.get("alias") if isinstance(destination, dict) else None,
+            "destination": destination,
+            "channel": command_payload.get("channel"),
+            "user_id": command_payload.get("user_id"),
+            "thread_ts": thread_ts,
+            "available_at": available_at.isoformat(),
+            "priority": int(priority_int),
+        },
+    }
 
-            if assistant_db is None:
-                return {"ok": False, "tool": name, "error": "assistant_db is required."}
 
-            session_counts_query = (
-                assistant_db.query(
-                    SupportSession.user_id,
-                    func.count(SupportSession.id),
-                    func.max(SupportSession.updated_at),
+@_tool_handler("assistant_recent_agent_commands")
+def _tool_assistant_recent_agent_commands(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
+    statuses = _coerce_str_list(args.get("statuses"), max_items=10) or _coerce_str_list(args.get("status"), max_items=10)
+    command_types = _coerce_str_list(args.get("command_types"), max_items=20) or _coerce_str_list(args.get("command_type"), max_items=20)
+    after_id = _safe_int(args.get("after_id"))
+    order = (_safe_str(args.get("order"), max_len=8) or "desc").lower()
+    if order not in {"asc", "desc"}:
+        return {"ok": False, "tool": name, "error": "order must be 'asc' or 'desc'."}
+    include_payload = bool(args.get("include_payload"))
+    include_result = bool(args.get("include_result"))
+    include_archive = bool(args.get("include_archive"))
+
+    items = _recent_agent_commands_from_db(
+        agent_db,
+        limit=limit,
+        statuses=statuses,
+        command_types=command_types,
+        after_id=after_id,
+        order=order,
+        include_payload=include_payload,
+        include_result=include_result,
+        source="live",
+    )
+    archive_cm = get_agent_archive_session_if_available() if include_archive else nullcontext(None)
+    with archive_cm as archive_db:
+        archive_available = archive_db is not None
+        if archive_db is not None:
+            items.extend(
+                _recent_agent_commands_from_db(
+                    archive_db,
+                    limit=limit,
+                    statuses=statuses,
+                    command_types=command_types,
+                    after_id=after_id,
+                    order=order,
+                    include_payload=include_payload,
+                    include_result=include_result,
+                    source="archive",
                 )
-                .group_by(SupportSession.user_id)
-                .order_by(func.max(SupportSession.updated_at).desc())
             )
-            if not include_anonymous:
-                session_counts_query = session_counts_query.filter(SupportSession.user_id.isnot(None))
-
-            session_counts_rows = session_counts_query.limit(limit).all()
-            user_ids: list[int] = [
-                int(user_id)
-                for user_id, _, _ in session_counts_rows
-                if user_id is not None
-            ]
+    items = _sorted_unique_agent_items(items, id_key="id", order=order, limit=limit)
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "limit": limit,
+            "order": order,
+            "after_id": after_id,
+            "include_archive": bool(include_archive),
+            "archive_available": bool(archive_available if include_archive else False),
+            "filters": {"statuses": statuses, "command_types": command_types},
+            "count": len(items),
+            "commands": items,
+        },
+    }
 
-            user_rows = []
-            if user_ids:
-                user_rows = core_db.query(AuthUser).filter(AuthUser.id.in_(user_ids)).all()
-            user_by_id = {int(user.id): user for user in user_rows}
 
-            message_counts_query = (
-                assistant_db.query(
-                    SupportSession.user_id,
-                    AssistantSupportMessage.role,
-                    func.count(AssistantSupportMessage.id),
+@_tool_handler("assistant_recent_agent_steps")
+def _tool_assistant_recent_agent_steps(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
+    kinds = _coerce_str_list(args.get("kinds"), max_items=20) or _coerce_str_list(args.get("kind"), max_items=20)
+    run_id = _safe_str(args.get("run_id"), max_len=128)
+    ok_filter = args.get("ok")
+    if ok_filter is not None and not isinstance(ok_filter, bool):
+        ok_filter = bool(ok_filter)
+    after_id = _safe_int(args.get("after_id"))
+    order = (_safe_str(args.get("order"), max_len=8) or "desc").lower()
+    if order not in {"asc", "desc"}:
+        return {"ok": False, "tool": name, "error": "order must be 'asc' or 'desc'."}
+    include_prompt = bool(args.get("include_prompt"))
+    include_response = bool(args.get("include_response"))
+    include_state = bool(args.get("include_state"))
+    include_archive = bool(args.get("include_archive"))
+
+    items = _recent_agent_steps_from_db(
+        agent_db,
+        limit=limit,
+        kinds=kinds,
+        run_id=run_id,
+        ok_filter=ok_filter,
+        after_id=after_id,
+        order=order,
+        include_prompt=include_prompt,
+        include_response=include_response,
+        include_state=include_state,
+        source="live",
+    )
+    archive_cm = get_agent_archive_session_if_available() if include_archive else nullcontext(None)
+    with archive_cm as archive_db:
+        archive_available = archive_db is not None
+        if archive_db is not None:
+            items.extend(
+                _recent_agent_steps_from_db(
+                    archive_db,
+                    limit=limit,
+                    kinds=kinds,
+                    run_id=run_id,
+                    ok_filter=ok_filter,
+                    after_id=after_id,
+                    order=order,
+                    include_prompt=include_prompt,
+                    include_response=include_response,
+                    include_state=include_state,
+                    source="archive",
                 )
-                .join(SupportSession, AssistantSupportMessage.session_pk == SupportSession.id)
-                .group_by(SupportSession.user_id, AssistantSupportMessage.role)
             )
-            if not include_anonymous:
-                message_counts_query = message_counts_query.filter(SupportSession.user_id.isnot(None))
-            message_counts_rows = message_counts_query.all()
-            message_counts: dict[int | None, dict[str, int]] = {}
-            for raw_user_id, role, count in message_counts_rows:
-                key = int(raw_user_id) if raw_user_id is not None else None
-                bucket = message_counts.get(key)
-                if bucket is None:
-                    bucket = {}
-                    message_counts[key] = bucket
-                bucket[str(role or "unknown")] = int(count or 0)
-
-            users: list[dict[str, Any]] = []
-            for raw_user_id, sessions_count, last_updated_at in session_counts_rows:
-                key = int(raw_user_id) if raw_user_id is not None else None
-                auth_user = user_by_id.get(int(raw_user_id)) if raw_user_id is not None else None
-
-                sample_sessions_query = (
-                    assistant_db.query(SupportSession)
-                    .filter(SupportSession.user_id == raw_user_id)
-                    .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
-                    .limit(5)
-                )
-                if raw_user_id is None:
-                    sample_sessions_query = (
-                        assistant_db.query(SupportSession)
-                        .filter(SupportSession.user_id.is_(None))
-                        .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
-                        .limit(5)
-                    )
-                sample_sessions = sample_sessions_query.all()
-                sample_session_ids = [str(s.session_id) for s in sample_sessions]
-
-                linkage_sessions_query = (
-                    assistant_db.query(SupportSession)
-                    .filter(SupportSession.user_id == raw_user_id)
-                    .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
-                    .limit(linkage_session_limit)
-                )
-                if raw_user_id is None:
-                    linkage_sessions_query = (
-                        assistant_db.query(SupportSession)
-                        .filter(SupportSession.user_id.is_(None))
-                        .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
-                        .limit(linkage_session_limit)
-                    )
-                linkage_sessions = linkage_sessions_query.all()
-
-                project_counts: dict[int, int] = {}
-                route_counts: dict[str, int] = {}
-                for session in linkage_sessions:
-                    raw_state = getattr(session, "state_json", None)
-                    if not raw_state:
-                        continue
-                    try:
-                        state = json.loads(raw_state)
-                    except Exception:
-                        continue
-                    if not isinstance(state, dict):
-                        continue
-
-                    for key_name in ("current_project_id", "ui_project_id"):
-                        project_id = state.get(key_name)
-                        if isinstance(project_id, int) and project_id > 0:
-                            project_counts[project_id] = project_counts.get(project_id, 0) + 1
-
-                    ui_route = state.get("ui_route")
-                    if isinstance(ui_route, dict):
-                        route_name = ui_route.get("name")
-                        if isinstance(route_name, str) and route_name.strip():
-                            cleaned = route_name.strip()
-                            route_counts[cleaned] = route_counts.get(cleaned, 0) + 1
-
-                project_items = [{"project_id": pid, "count": cnt} for pid, cnt in project_counts.items()]
-                project_items.sort(key=lambda item: (-int(item["count"]), int(item["project_id"])))
-                route_items = [{"route": route, "count": cnt} for route, cnt in route_counts.items()]
-                route_items.sort(key=lambda item: (-int(item["count"]), str(item["route"])))
-
-                assistant_brief = None
-                if auth_user is not None:
-                    raw_brief = str(getattr(auth_user, "assistant_brief", "") or "").strip()
-                    assistant_brief = raw_brief or None
-
-                users.append(
-                    {
-                        "user_id": key,
-                        "username": getattr(auth_user, "username", None) if auth_user is not None else None,
-                        "role": str(getattr(auth_user, "role", "")) if auth_user is not None else None,
-                        "assistant_brief": assistant_brief,
-                        "sessions_count": int(sessions_count or 0),
-                        "messages_count": message_counts.get(key, {}),
-                        "last_session_updated_at": last_updated_at.isoformat() if last_updated_at else None,
-                        "sample_session_ids": sample_session_ids,
-                        "linkage": {
-                            "projects": project_items[:20],
-                            "ui_routes": route_items[:20],
-                            "sessions_scanned": len(linkage_sessions),
-                        },
-                    }
-                )
+    items = _sorted_unique_agent_items(items, id_key="id", order=order, limit=limit)
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "limit": limit,
-                    "include_anonymous": include_anonymous,
-                    "count": len(users),
-                    "users": users,
-                },
-            }
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "limit": limit,
+            "order": order,
+            "after_id": after_id,
+            "include_archive": bool(include_archive),
+            "archive_available": bool(archive_available if include_archive else False),
+            "filters": {"kinds": kinds, "run_id": run_id, "ok": ok_filter},
+            "count": len(items),
+            "steps": items,
+        },
+    }
 
-        if name == "assistant_set_user_brief":
-            if not bool(args.get("confirm")):
-                return {"ok": False, "tool": name, "error": "confirm=true is required."}
 
-            user_id = _safe_int(args.get("user_id"))
-            username = _safe_str(args.get("username"), max_len=128)
-            if user_id is None and not username:
-                return {"ok": False, "tool": name, "error": "Provide user_id or username."}
+@_tool_handler("assistant_recent_session_reviews")
+def _tool_assistant_recent_session_reviews(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
+    session_id = _safe_str(args.get("session_id"), max_len=256)
+    user_id = _safe_int(args.get("user_id"))
+    after_id = _safe_int(args.get("after_id"))
+    order = (_safe_str(args.get("order"), max_len=8) or "desc").lower()
+    if order not in {"asc", "desc"}:
+        return {"ok": False, "tool": name, "error": "order must be 'asc' or 'desc'."}
+    include_review_json = bool(args.get("include_review_json"))
+
+    query = assistant_db.query(SupportSessionReview, SupportSession.session_id, SupportSession.user_id).join(
+        SupportSession, SupportSession.id == SupportSessionReview.session_pk
+    )
+    if session_id:
+        query = query.filter(SupportSession.session_id == session_id)
+    if user_id is not None:
+        query = query.filter(SupportSession.user_id == int(user_id))
+    if after_id is not None and after_id > 0:
+        query = query.filter(SupportSessionReview.id > int(after_id))
 
-            target_user = None
-            if user_id is not None:
-                target_user = core_db.get(AuthUser, int(user_id))
-            elif username:
-                target_user = core_db.query(AuthUser).filter(AuthUser.username == username).first()
+    if order == "asc":
+        query = query.order_by(SupportSessionReview.id.asc())
+    else:
+        query = query.order_by(SupportSessionReview.id.desc())
 
-            if target_user is None:
-                return {"ok": False, "tool": name, "error": "User not found."}
+    rows = query.limit(limit).all()
+    items: list[dict[str, Any]] = []
+    for review, review_session_id, review_user_id in rows:
+        review_json = review.review_json if isinstance(review.review_json, dict) else {}
+        summary = review_json.get("summary")
+        if not isinstance(summary, str):
+            summary = ""
+        issues = review_json.get("issues")
+        issue_count = len(issues) if isinstance(issues, list) else 0
+        followups = review_json.get("followups")
+        followup_count = len(followups) if isinstance(followups, list) else 0
+        repo_queries = review_json.get("repo_search_queries")
+        repo_query_count = len(repo_queries) if isinstance(repo_queries, list) else 0
 
-            normalized_brief = str(args.get("assistant_brief") or "").strip() or None
-            target_user.assistant_brief = normalized_brief
-            core_db.add(target_user)
-            core_db.commit()
-            core_db.refresh(target_user)
+        item: dict[str, Any] = {
+            "id": int(review.id),
+            "session_id": review_session_id,
+            "session_pk": int(review.session_pk),
+            "user_id": int(review_user_id) if review_user_id is not None else None,
+            "target_message_id": int(review.target_message_id),
+            "updated_at": review.updated_at.isoformat() if review.updated_at else None,
+            "issues_count": issue_count,
+            "followups_count": followup_count,
+            "repo_search_queries_count": repo_query_count,
+            "summary": summary[:400] + ("…" if isinstance(summary, str) and len(summary) > 400 else ""),
+        }
+        if include_review_json:
+            item["review_json"] = review_json
+        items.append(item)
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "user_id": int(target_user.id),
-                    "username": str(target_user.username or "") or None,
-                    "role": str(getattr(target_user.role, "value", target_user.role) or "") or None,
-                    "assistant_brief": normalized_brief,
-                },
-            }
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "limit": limit,
+            "order": order,
+            "after_id": after_id,
+            "filters": {"session_id": session_id, "user_id": user_id},
+            "count": len(items),
+            "reviews": items,
+        },
+    }
 
-        if name == "assistant_search_internal_logs":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-            query_text = _safe_str(args.get("query"), max_len=512) or _safe_str(args.get("q"), max_len=512)
-            if not query_text:
-                return {"ok": False, "tool": name, "error": "Missing argument: query"}
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
-            include_archive = True if args.get("include_archive") is None else bool(args.get("include_archive"))
-
-            pattern = f"%{query_text}%"
-            live_hits = _search_internal_logs_from_db(agent_db, query_text=query_text, limit=limit, source="live")
-            steps = list(live_hits["steps"])
-            commands = list(live_hits["commands"])
-            events = list(live_hits["events"])
-
-            run_rows = (
-                agent_db.query(AgentRun)
-                .filter(
-                    or_(
-                        AgentRun.run_id.ilike(pattern),
-                        AgentRun.agent_id.ilike(pattern),
-                        AgentRun.kind.ilike(pattern),
-                        AgentRun.status.ilike(pattern),
-                        AgentRun.last_error.ilike(pattern),
-                        AgentRun.status_bar.ilike(pattern),
-                        cast(AgentRun.summary_json, Text).ilike(pattern),
-                        cast(AgentRun.state_json, Text).ilike(pattern),
-                        cast(AgentRun.config_json, Text).ilike(pattern),
-                    )
-                )
-                .order_by(AgentRun.id.desc())
-                .limit(limit)
-                .all()
-            )
-            runs: list[dict[str, Any]] = []
-            for run in run_rows:
-                summary_preview = ""
-                if isinstance(run.summary_json, dict):
-                    summary_preview = _snippet_for_query(json.dumps(run.summary_json, ensure_ascii=False), query_text)
-                runs.append(
-                    {
-                        "run_id": run.run_id,
-                        "agent_id": run.agent_id,
-                        "kind": run.kind,
-                        "status": run.status,
-                        "updated_at": run.updated_at.isoformat() if getattr(run, "updated_at", None) else None,
-                        "status_bar": run.status_bar,
-                        "last_error": run.last_error,
-                        "summary_preview": summary_preview,
-                    }
-                )
 
-            archive_cm = get_agent_archive_session_if_available() if include_archive else nullcontext(None)
-            with archive_cm as archive_db:
-                archive_available = archive_db is not None
-                if archive_db is not None:
-                    archive_hits = _search_internal_logs_from_db(
-                        archive_db,
-                        query_text=query_text,
-                        limit=limit,
-                        source="archive",
-                    )
-                    steps.extend(archive_hits["steps"])
-                    commands.extend(archive_hits["commands"])
-                    events.extend(archive_hits["events"])
-
-            steps = _sorted_unique_agent_items(steps, id_key="step_id", order="desc", limit=limit)
-            commands = _sorted_unique_agent_items(commands, id_key="command_id", order="desc", limit=limit)
-            events = _sorted_unique_agent_items(events, id_key="event_id", order="desc", limit=limit)
+@_tool_handler("assistant_recent_sessions")
+def _tool_assistant_recent_sessions(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "query": query_text,
-                    "limit": limit,
-                    "include_archive": bool(include_archive),
-                    "archive_available": bool(archive_available if include_archive else False),
-                    "steps": steps,
-                    "commands": commands,
-                    "runs": runs,
-                    "events": events,
-                },
+    limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
+    sessions = (
+        assistant_db.query(SupportSession)
+        .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
+        .limit(limit)
+        .all()
+    )
+    session_pks = [int(session.id) for session in sessions]
+    review_by_session_pk: dict[int, dict[str, Any]] = {}
+    if session_pks:
+        review_rows = (
+            assistant_db.query(
+                SupportSessionReview.session_pk,
+                SupportSessionReview.target_message_id,
+                SupportSessionReview.updated_at,
+            )
+            .filter(SupportSessionReview.session_pk.in_(session_pks))
+            .order_by(
+                SupportSessionReview.session_pk.asc(),
+                SupportSessionReview.target_message_id.desc(),
+                SupportSessionReview.updated_at.desc(),
+                SupportSessionReview.id.desc(),
+            )
+            .all()
+        )
+        for session_pk, target_id, updated_at in review_rows:
+            key = int(session_pk)
+            if key in review_by_session_pk:
+                continue
+            review_by_session_pk[key] = {
+                "reviewed_up_to_id": int(target_id or 0),
+                "review_updated_at": updated_at.isoformat() if updated_at else None,
             }
 
-        if name == "assistant_get_agent_step":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-            step_id = _safe_int(args.get("step_id"))
-            if step_id is None:
-                step_id = _safe_int(args.get("id"))
-            if step_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: step_id (or id)"}
-
-            payload = _get_agent_step_payload(agent_db, step_id=int(step_id), source="live")
-            if payload is None:
-                with get_agent_archive_session_if_available() as archive_db:
-                    if archive_db is not None:
-                        payload = _get_agent_step_payload(archive_db, step_id=int(step_id), source="archive")
-            if payload is None:
-                return {"ok": False, "tool": name, "error": "Agent step not found.", "step_id": int(step_id)}
-            return {
-                "ok": True,
-                "tool": name,
-                "result": payload,
+    items: list[dict[str, Any]] = []
+    for session in sessions:
+        msg_count = int(
+            assistant_db.query(func.count(AssistantSupportMessage.id))
+            .filter(AssistantSupportMessage.session_pk == session.id)
+            .scalar()
+            or 0
+        )
+        last_message = (
+            assistant_db.query(AssistantSupportMessage)
+            .filter(AssistantSupportMessage.session_pk == session.id)
+            .order_by(AssistantSupportMessage.id.desc())
+            .first()
+        )
+        last_user = (
+            assistant_db.query(AssistantSupportMessage)
+            .filter(AssistantSupportMessage.session_pk == session.id)
+            .filter(AssistantSupportMessage.role == "user")
+            .order_by(AssistantSupportMessage.id.desc())
+            .first()
+        )
+        last_assistant = (
+            assistant_db.query(AssistantSupportMessage)
+            .filter(AssistantSupportMessage.session_pk == session.id)
+            .filter(AssistantSupportMessage.role == "assistant")
+            .order_by(AssistantSupportMessage.id.desc())
+            .first()
+        )
+        state: dict[str, Any] = {}
+        raw_state = getattr(session, "state_json", None)
+        if raw_state:
+            try:
+                parsed_state = json.loads(raw_state)
+                if isinstance(parsed_state, dict):
+                    state = parsed_state
+            except Exception:
+                state = {}
+        review_info = review_by_session_pk.get(int(session.id))
+        if isinstance(review_info, dict):
+            reviewed_up_to_id = _safe_int(review_info.get("reviewed_up_to_id")) or 0
+            review_updated_at = review_info.get("review_updated_at")
+        else:
+            reviewed_up_to_id = _safe_int(state.get("conversation_review_up_to_id")) or 0
+            review_updated_at = state.get("conversation_review_updated_at")
+        items.append(
+            {
+                "session_id": session.session_id,
+                "user_id": int(session.user_id) if session.user_id is not None else None,
+                "updated_at": session.updated_at.isoformat() if session.updated_at else None,
+                "message_count": msg_count,
+                "last_message_id": int(last_message.id) if last_message is not None else 0,
+                "last_message_role": getattr(last_message, "role", None),
+                "last_assistant_message_id": int(last_assistant.id) if last_assistant is not None else 0,
+                "last_user_message": _safe_str(getattr(last_user, "content", None), max_len=240),
+                "reviewed_up_to_id": reviewed_up_to_id,
+                "review_updated_at": review_updated_at,
+                "memory_up_to_id": _safe_int(state.get("conversation_memory_up_to_id")) or 0,
             }
+        )
 
-        if name == "assistant_get_agent_command":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-            command_id = _safe_int(args.get("command_id"))
-            if command_id is None:
-                command_id = _safe_int(args.get("id"))
-            if command_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: command_id (or id)"}
-
-            payload = _get_agent_command_payload(agent_db, command_id=int(command_id), source="live")
-            if payload is None:
-                with get_agent_archive_session_if_available() as archive_db:
-                    if archive_db is not None:
-                        payload = _get_agent_command_payload(archive_db, command_id=int(command_id), source="archive")
-            if payload is None:
-                return {"ok": False, "tool": name, "error": "Agent command not found.", "command_id": int(command_id)}
-            return {
-                "ok": True,
-                "tool": name,
-                "result": payload,
-            }
+    return {"ok": True, "tool": name, "result": {"limit": limit, "sessions": items}}
 
-        if name == "assistant_get_agent_run":
-            if agent_db is None:
-                return {"ok": False, "tool": name, "error": "agent_db is required."}
-            run_id = _safe_str(args.get("run_id"), max_len=128) or _safe_str(args.get("id"), max_len=128)
-            if not run_id:
-                return {"ok": False, "tool": name, "error": "Missing argument: run_id"}
-            run = agent_db.query(AgentRun).filter(AgentRun.run_id == run_id).first()
-            if run is None:
-                return {"ok": False, "tool": name, "error": "Agent run not found.", "run_id": run_id}
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "run_id": run.run_id,
-                    "agent_id": run.agent_id,
-                    "kind": run.kind,
-                    "status": run.status,
-                    "created_at": run.created_at.isoformat() if getattr(run, "created_at", None) else None,
-                    "updated_at": run.updated_at.isoformat() if getattr(run, "updated_at", None) else None,
-                    "ended_at": run.ended_at.isoformat() if getattr(run, "ended_at", None) else None,
-                    "step_index": int(run.step_index or 0),
-                    "status_bar": run.status_bar,
-                    "last_error": run.last_error,
-                    "config_json": run.config_json,
-                    "state_json": run.state_json,
-                    "summary_json": run.summary_json,
-                },
-            }
 
-        if name == "db_file_stats":
-            core_path = _sqlite_path_from_session(core_db)
-            assistant_path = (core_path.parent / "ispec-assistant.db") if core_path is not None else None
-            schedule_path = _sqlite_path_from_session(schedule_db) if schedule_db is not None else None
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "core_db": _stat_path(core_path),
-                    "assistant_db": _stat_path(assistant_path),
-                    "schedule_db": _stat_path(schedule_path) if schedule_db is not None else None,
-                },
-            }
+@_tool_handler("assistant_recent_session_work_bag")
+def _tool_assistant_recent_session_work_bag(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    support_session_id: str | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
 
-        if name == "count_all_projects":
-            count = int(core_db.query(func.count(Project.id)).scalar() or 0)
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {"count": count, "scope": "all"},
-            }
+    session_id = (
+        _safe_str(args.get("session_id"), max_len=256)
+        or _safe_str(args.get("id"), max_len=256)
+        or _safe_str(support_session_id, max_len=256)
+    )
+    if not session_id:
+        return {"ok": False, "tool": name, "error": "Missing argument: session_id"}
 
-        if name == "count_current_projects":
-            count = int(
-                core_db.query(func.count(Project.id))
-                .filter(Project.prj_Current_FLAG.is_(True))
-                .scalar()
-                or 0
-            )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {"count": count, "scope": "current"},
-            }
+    limit = _clamp_int(_safe_int(args.get("limit")), default=12, min_value=1, max_value=50)
+    session = assistant_db.query(SupportSession).filter(SupportSession.session_id == session_id).first()
+    if session is None:
+        return {"ok": False, "tool": name, "error": "Session not found.", "session_id": session_id}
 
-        if name == "project_status_counts":
-            current_only = bool(args.get("current_only"))
-            query = core_db.query(Project.prj_Status, func.count(Project.id))
-            if current_only:
-                query = query.filter(Project.prj_Current_FLAG.is_(True))
-            rows = query.group_by(Project.prj_Status).all()
-            items = [
-                {"status": (status if status is not None else None), "count": int(count or 0)}
-                for status, count in rows
-            ]
-            items.sort(
-                key=lambda item: (
-                    -int(item["count"]),
-                    "" if item["status"] is None else str(item["status"]),
-                )
-            )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "current_only": current_only,
-                    "total": int(sum(item["count"] for item in items)),
-                    "items": items,
-                },
-            }
+    state: dict[str, Any] = {}
+    raw_state = getattr(session, "state_json", None)
+    if raw_state:
+        try:
+            parsed_state = json.loads(raw_state)
+            if isinstance(parsed_state, dict):
+                state = parsed_state
+        except Exception:
+            state = {}
 
-        if name == "latest_projects":
-            limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
-            current_only = bool(args.get("current_only"))
-            sort_raw = (_safe_str(args.get("sort"), max_len=32) or "modified").strip().lower()
-
-            query = core_db.query(Project)
-            if current_only:
-                query = query.filter(Project.prj_Current_FLAG.is_(True))
-
-            if sort_raw in {"created", "creation"}:
-                query = query.order_by(Project.prj_CreationTS.desc(), Project.id.desc())
-                sort = "created"
-            elif sort_raw in {"modified", "modification", "updated", "update"}:
-                query = query.order_by(Project.prj_ModificationTS.desc(), Project.id.desc())
-                sort = "modified"
-            elif sort_raw in {"id"}:
-                query = query.order_by(Project.id.desc())
-                sort = "id"
-            else:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "sort must be one of: created, modified, id",
-                }
+    return {
+        "ok": True,
+        "tool": name,
+        "result": recent_work_bag_payload(
+            state,
+            session_id=session.session_id,
+            limit=limit,
+        ),
+    }
 
-            rows = query.limit(limit).all()
-            projects = []
-            for project in rows:
-                projects.append(
-                    {
-                        "id": int(project.id),
-                        "title": project.prj_ProjectTitle,
-                        "status": project.prj_Status,
-                        "current": bool(project.prj_Current_FLAG),
-                        "created": project.prj_CreationTS.isoformat()
-                        if getattr(project, "prj_CreationTS", None)
-                        else None,
-                        "modified": project.prj_ModificationTS.isoformat()
-                        if getattr(project, "prj_ModificationTS", None)
-                        else None,
-                        "links": {
-                            "ui": f"/project/{project.id}",
-                            "api": f"/api/projects/{project.id}",
-                        },
-                    }
-                )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "sort": sort,
-                    "current_only": current_only,
-                    "count": len(projects),
-                    "projects": projects,
-                },
-            }
 
-        if name == "latest_project_comments":
-            limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
-            project_id = _safe_int(args.get("project_id"))
-            query = (
-                core_db.query(ProjectComment, Project)
-                .join(Project, ProjectComment.project_id == Project.id)
-                .order_by(ProjectComment.com_CreationTS.desc(), ProjectComment.id.desc())
-            )
-            if project_id is not None:
-                query = query.filter(ProjectComment.project_id == project_id)
-            rows = query.limit(limit).all()
-
-            comments: list[dict[str, Any]] = []
-            for comment, project in rows:
-                created = getattr(comment, "com_CreationTS", None)
-                text = (comment.com_Comment or "").strip()
-                if len(text) > 240:
-                    text = text[:239] + "…"
-                comments.append(
-                    {
-                        "id": int(comment.id),
-                        "project_id": int(project.id),
-                        "project_title": project.prj_ProjectTitle,
-                        "type": comment.com_CommentType,
-                        "added_by": comment.com_AddedBy,
-                        "created": created.isoformat() if created else None,
-                        "comment": text or None,
-                        "links": {
-                            "ui": f"/project/{project.id}",
-                            "api": f"/api/projects/{project.id}",
-                        },
-                    }
-                )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "project_id": project_id,
-                    "count": len(comments),
-                    "comments": comments,
-                },
-            }
+@_tool_handler("assistant_get_session_review")
+def _tool_assistant_get_session_review(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    session_id = _safe_str(args.get("session_id"), max_len=256) or _safe_str(args.get("id"), max_len=256)
+    if not session_id:
+        return {"ok": False, "tool": name, "error": "Missing argument: session_id"}
+    session = assistant_db.query(SupportSession).filter(SupportSession.session_id == session_id).first()
+    if session is None:
+        return {"ok": False, "tool": name, "error": "Session not found.", "session_id": session_id}
+    review_row = (
+        assistant_db.query(SupportSessionReview)
+        .filter(SupportSessionReview.session_pk == int(session.id))
+        .order_by(
+            SupportSessionReview.target_message_id.desc(),
+            SupportSessionReview.updated_at.desc(),
+            SupportSessionReview.id.desc(),
+        )
+        .first()
+    )
+    if review_row is not None:
+        review = review_row.review_json if isinstance(review_row.review_json, dict) else None
+        reviewed_up_to_id = int(review_row.target_message_id or 0)
+        review_updated_at = review_row.updated_at.isoformat() if review_row.updated_at else None
+    else:
+        state: dict[str, Any] = {}
+        raw_state = getattr(session, "state_json", None)
+        if raw_state:
+            try:
+                parsed_state = json.loads(raw_state)
+                if isinstance(parsed_state, dict):
+                    state = parsed_state
+            except Exception:
+                state = {}
+        review = state.get("conversation_review") if isinstance(state.get("conversation_review"), dict) else None
+        reviewed_up_to_id = _safe_int(state.get("conversation_review_up_to_id")) or 0
+        review_updated_at = state.get("conversation_review_updated_at")
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "session_id": session.session_id,
+            "reviewed_up_to_id": reviewed_up_to_id,
+            "review_updated_at": review_updated_at,
+            "review": review,
+        },
+    }
 
-        if name == "search_api":
-            query = _safe_str(args.get("query"), max_len=200)
-            limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
-            if not query:
-                return {"ok": False, "tool": name, "error": "Missing string argument: query"}
-            if not isinstance(api_schema, dict):
-                return {"ok": False, "tool": name, "error": "API schema is not available."}
 
-            matches = _search_openapi_schema(api_schema, query=query, limit=limit)
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "query": query,
-                    "count": len(matches),
-                    "matches": matches,
-                    "docs_hint": "/docs (FastAPI Swagger UI), /openapi.json",
-                },
-            }
+@_tool_handler("assistant_search_messages")
+def _tool_assistant_search_messages(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    query_text = _safe_str(args.get("query"), max_len=512) or _safe_str(args.get("q"), max_len=512)
+    if not query_text:
+        return {"ok": False, "tool": name, "error": "Missing argument: query"}
 
-        if name == "experiments_for_project":
-            project_id = _safe_int(args.get("project_id"))
-            if project_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: project_id"}
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
-
-            rows = (
-                core_db.query(Experiment)
-                .filter(Experiment.project_id == project_id)
-                .order_by(Experiment.id.desc())
-                .limit(limit)
-                .all()
-            )
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+    role = _safe_str(args.get("role"), max_len=16)
+    session_id = _safe_str(args.get("session_id"), max_len=256)
+    user_id = _safe_int(args.get("user_id"))
 
-            experiments: list[dict[str, Any]] = []
-            for experiment in rows:
-                created = getattr(experiment, "Experiment_CreationTS", None)
-                experiments.append(
-                    {
-                        "id": int(experiment.id),
-                        "record_no": experiment.record_no,
-                        "name": experiment.exp_Name,
-                        "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
-                        "date": experiment.exp_Date.isoformat() if experiment.exp_Date else None,
-                        "project_id": int(experiment.project_id)
-                        if experiment.project_id is not None
-                        else None,
-                        "created": created.isoformat() if created else None,
-                        "links": {
-                            "ui": f"/experiment/{experiment.id}",
-                            "api": f"/api/experiments/{experiment.id}",
-                        },
-                    }
-                )
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "project_id": project_id,
-                    "count": len(experiments),
-                    "experiments": experiments,
-                },
+    pattern = f"%{query_text}%"
+    query = (
+        assistant_db.query(
+            AssistantSupportMessage,
+            SupportSession.session_id,
+            SupportSession.user_id,
+        )
+        .join(SupportSession, AssistantSupportMessage.session_pk == SupportSession.id)
+    )
+    if role:
+        query = query.filter(AssistantSupportMessage.role == role)
+    if session_id:
+        query = query.filter(SupportSession.session_id == session_id)
+    if user_id is not None:
+        query = query.filter(SupportSession.user_id == int(user_id))
+
+    hits = _search_index_rows(
+        assistant_db,
+        query,
+        "messages",
+        query_text,
+        limit=limit,
+        predicate=AssistantSupportMessage.content.ilike(pattern),
+    )
+    matches: list[dict[str, Any]] = []
+    for (message, sess_id, sess_user_id), snippet in hits:
+        content = getattr(message, "content", "") or ""
+        matches.append(
+            {
+                "message_id": int(message.id),
+                "session_id": sess_id,
+                "user_id": int(sess_user_id) if sess_user_id is not None else None,
+                "role": getattr(message, "role", None),
+                "created_at": message.created_at.isoformat() if getattr(message, "created_at", None) else None,
+                "snippet": snippet or _snippet_for_query(content, query_text, window=80, max_len=320),
             }
+        )
 
-        if name == "latest_experiments":
-            limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=50)
-            rows = core_db.query(Experiment).order_by(Experiment.id.desc()).limit(limit).all()
-
-            experiments: list[dict[str, Any]] = []
-            for experiment in rows:
-                created = getattr(experiment, "Experiment_CreationTS", None)
-                experiments.append(
-                    {
-                        "id": int(experiment.id),
-                        "record_no": experiment.record_no,
-                        "name": experiment.exp_Name,
-                        "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
-                        "date": experiment.exp_Date.isoformat() if experiment.exp_Date else None,
-                        "project_id": int(experiment.project_id)
-                        if experiment.project_id is not None
-                        else None,
-                        "created": created.isoformat() if created else None,
-                        "links": {
-                            "ui": f"/experiment/{experiment.id}",
-                            "api": f"/api/experiments/{experiment.id}",
-                        },
-                    }
-                )
-            return {"ok": True, "tool": name, "result": {"experiments": experiments}}
-
-        if name == "get_experiment":
-            experiment_id = _safe_int(args.get("id"))
-            if experiment_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
-            experiment = core_db.get(Experiment, experiment_id)
-            if experiment is None:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": f"Experiment {experiment_id} not found.",
-                }
-            created = getattr(experiment, "Experiment_CreationTS", None)
-            modified = getattr(experiment, "Experiment_ModificationTS", None)
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "id": int(experiment.id),
-                    "record_no": experiment.record_no,
-                    "name": experiment.exp_Name,
-                    "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
-                    "date": experiment.exp_Date.isoformat() if experiment.exp_Date else None,
-                    "project_id": int(experiment.project_id)
-                    if experiment.project_id is not None
-                    else None,
-                    "created": created.isoformat() if created else None,
-                    "modified": modified.isoformat() if modified else None,
-                    "links": {
-                        "ui": f"/experiment/{experiment.id}",
-                        "api": f"/api/experiments/{experiment.id}",
-                    },
-                },
-            }
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "query": query_text,
+            "limit": limit,
+            "role": role,
+            "session_id": session_id,
+            "user_id": int(user_id) if user_id is not None else None,
+            "count": len(matches),
+            "matches": matches,
+        },
+    }
 
-        if name == "latest_experiment_runs":
-            limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=50)
-            rows = core_db.query(ExperimentRun).order_by(ExperimentRun.id.desc()).limit(limit).all()
-
-            runs: list[dict[str, Any]] = []
-            for run in rows:
-                created = getattr(run, "ExperimentRun_CreationTS", None)
-                runs.append(
-                    {
-                        "id": int(run.id),
-                        "experiment_id": int(run.experiment_id),
-                        "run_no": int(run.run_no),
-                        "search_no": int(run.search_no),
-                        "search_engine": getattr(run, "search_engine", None),
-                        "search_state": getattr(run, "search_state", None),
-                        "created": created.isoformat() if created else None,
-                        "links": {
-                            "ui": f"/experiment-run/{run.id}",
-                            "api": f"/api/experiment-runs/{run.id}",
-                        },
-                    }
-                )
-            return {"ok": True, "tool": name, "result": {"runs": runs}}
-
-        if name == "get_experiment_run":
-            run_id = _safe_int(args.get("id"))
-            if run_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
-            run = core_db.get(ExperimentRun, run_id)
-            if run is None:
-                return {"ok": False, "tool": name, "error": f"ExperimentRun {run_id} not found."}
-            created = getattr(run, "ExperimentRun_CreationTS", None)
-            modified = getattr(run, "ExperimentRun_ModificationTS", None)
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "id": int(run.id),
-                    "experiment_id": int(run.experiment_id),
-                    "run_no": int(run.run_no),
-                    "search_no": int(run.search_no),
-                    "search_engine": getattr(run, "search_engine", None),
-                    "search_state": getattr(run, "search_state", None),
-                    "created": created.isoformat() if created else None,
-                    "modified": modified.isoformat() if modified else None,
-                    "links": {
-                        "ui": f"/experiment-run/{run.id}",
-                        "api": f"/api/experiment-runs/{run.id}",
-                    },
-                },
-            }
 
-        if name == "e2g_search_genes_in_project":
-            project_id = _safe_int(args.get("project_id"))
-            if project_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: project_id"}
-            if omics_db is None:
-                return {"ok": False, "tool": name, "error": "Omics database session is not available."}
-
-            query_text = _safe_str(args.get("query"), max_len=200)
-            if not query_text:
-                return {"ok": False, "tool": name, "error": "Missing string argument: query"}
-            if query_text.strip().lower() in {"*", "all"}:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "Use e2g_gene_in_project for a specific GeneID, or provide a keyword (GeneSymbol/description).",
-                }
+@_tool_handler("assistant_get_message_context")
+def _tool_assistant_get_message_context(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    message_id = _safe_int(args.get("message_id"))
+    if message_id is None:
+        message_id = _safe_int(args.get("id"))
+    if message_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: message_id (or id)"}
+
+    before = _clamp_int(_safe_int(args.get("before")), default=3, min_value=0, max_value=20)
+    after = _clamp_int(_safe_int(args.get("after")), default=3, min_value=0, max_value=20)
+    max_chars = _clamp_int(_safe_int(args.get("max_chars")), default=800, min_value=50, max_value=5000)
+
+    anchor = assistant_db.query(AssistantSupportMessage).filter(AssistantSupportMessage.id == int(message_id)).first()
+    if anchor is None:
+        return {"ok": False, "tool": name, "error": "Message not found.", "message_id": int(message_id)}
+
+    session = assistant_db.query(SupportSession).filter(SupportSession.id == int(anchor.session_pk)).first()
+    session_id = session.session_id if session is not None else None
+    session_user_id = int(session.user_id) if session is not None and session.user_id is not None else None
+
+    previous_rows = (
+        assistant_db.query(AssistantSupportMessage)
+        .filter(AssistantSupportMessage.session_pk == int(anchor.session_pk))
+        .filter(AssistantSupportMessage.id < int(anchor.id))
+        .order_by(AssistantSupportMessage.id.desc())
+        .limit(before)
+        .all()
+    )
+    previous_rows.reverse()
+    next_rows = (
+        assistant_db.query(AssistantSupportMessage)
+        .filter(AssistantSupportMessage.session_pk == int(anchor.session_pk))
+        .filter(AssistantSupportMessage.id > int(anchor.id))
+        .order_by(AssistantSupportMessage.id.asc())
+        .limit(after)
+        .all()
+    )
+
+    rows = [*previous_rows, anchor, *next_rows]
+    messages = [
+        {
+            "id": int(row.id),
+            "role": row.role,
+            "created_at": row.created_at.isoformat() if getattr(row, "created_at", None) else None,
+            "content": _safe_str(getattr(row, "content", None), max_len=max_chars) or "",
+        }
+        for row in rows
+    ]
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "message_id": int(anchor.id),
+            "session_id": session_id,
+            "user_id": session_user_id,
+            "before": before,
+            "after": after,
+            "count": len(messages),
+            "messages": messages,
+        },
+    }
+
+
+@_tool_handler("assistant_list_digests")
+def _tool_assistant_list_digests(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+
+    limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=100)
+    key = _safe_str(args.get("key"), max_len=128) if args.get("key") is not None else "global"
+    user_id = _safe_int(args.get("user_id"))
+
+    query = (
+        assistant_db.query(SupportMemory, SupportSession.session_id)
+        .outerjoin(SupportSession, SupportMemory.session_pk == SupportSession.id)
+        .filter(SupportMemory.kind == "digest")
+    )
+    if key:
+        query = query.filter(SupportMemory.key == key)
+    if user_id is not None:
+        query = query.filter(SupportMemory.user_id == int(user_id))
+
+    rows = (
+        query.order_by(SupportMemory.created_at.desc(), SupportMemory.id.desc())
+        .limit(limit)
+        .all()
+    )
+    items: list[dict[str, Any]] = []
+    for digest, session_id in rows:
+        digest_json: dict[str, Any] | None = None
+        raw_value = getattr(digest, "value_json", None)
+        if isinstance(raw_value, str) and raw_value.strip():
+            try:
+                parsed_value = json.loads(raw_value)
+                if isinstance(parsed_value, dict):
+                    digest_json = parsed_value
+            except Exception:
+                digest_json = None
+        summary_preview = ""
+        if isinstance(digest_json, dict):
+            summary_preview = _safe_str(digest_json.get("summary"), max_len=240) or ""
+        if not summary_preview and isinstance(raw_value, str):
+            summary_preview = _safe_str(raw_value, max_len=240) or ""
+        items.append(
+            {
+                "digest_id": int(digest.id),
+                "kind": digest.kind,
+                "key": digest.key,
+                "user_id": int(digest.user_id) if getattr(digest, "user_id", None) is not None else 0,
+                "session_id": session_id,
+                "created_at": digest.created_at.isoformat() if getattr(digest, "created_at", None) else None,
+                "updated_at": digest.updated_at.isoformat() if getattr(digest, "updated_at", None) else None,
+                "summary": summary_preview,
+            }
+        )
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "limit": limit,
+            "key": key,
+            "user_id": int(user_id) if user_id is not None else None,
+            "count": len(items),
+            "digests": items,
+        },
+    }
+
+
+@_tool_handler("assistant_get_digest")
+def _tool_assistant_get_digest(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+
+    digest_id = _safe_int(args.get("digest_id"))
+    if digest_id is None:
+        digest_id = _safe_int(args.get("id"))
+    if digest_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: digest_id (or id)"}
+
+    digest = (
+        assistant_db.query(SupportMemory)
+        .filter(SupportMemory.id == int(digest_id))
+        .filter(SupportMemory.kind == "digest")
+        .first()
+    )
+    if digest is None:
+        return {"ok": False, "tool": name, "error": "Digest not found.", "digest_id": int(digest_id)}
+
+    session_id = None
+    if getattr(digest, "session_pk", None) is not None:
+        session = assistant_db.query(SupportSession).filter(SupportSession.id == int(digest.session_pk)).first()
+        session_id = session.session_id if session is not None else None
+
+    parsed_value: dict[str, Any] | None = None
+    raw_value = getattr(digest, "value_json", None)
+    if isinstance(raw_value, str) and raw_value.strip():
+        try:
+            payload_value = json.loads(raw_value)
+            if isinstance(payload_value, dict):
+                parsed_value = payload_value
+        except Exception:
+            parsed_value = None
+
+    evidence_rows = (
+        assistant_db.query(SupportMemoryEvidence.message_id)
+        .filter(SupportMemoryEvidence.memory_id == int(digest.id))
+        .order_by(SupportMemoryEvidence.message_id.asc())
+        .all()
+    )
+    evidence_message_ids = [int(row[0]) for row in evidence_rows if row and int(row[0]) > 0]
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "digest_id": int(digest.id),
+            "key": digest.key,
+            "user_id": int(digest.user_id) if getattr(digest, "user_id", None) is not None else 0,
+            "session_id": session_id,
+            "created_at": digest.created_at.isoformat() if getattr(digest, "created_at", None) else None,
+            "updated_at": digest.updated_at.isoformat() if getattr(digest, "updated_at", None) else None,
+            "digest": parsed_value,
+            "raw": raw_value if parsed_value is None else None,
+            "evidence_message_ids": evidence_message_ids,
+        },
+    }
+
+
+@_tool_handler("assistant_search_digests")
+def _tool_assistant_search_digests(
+    *,
+    name: str,
+    args: dict[str, Any],
+    assistant_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+    query_text = _safe_str(args.get("query"), max_len=512) or _safe_str(args.get("q"), max_len=512)
+    if not query_text:
+        return {"ok": False, "tool": name, "error": "Missing argument: query"}
+
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+    key = _safe_str(args.get("key"), max_len=128)
+    user_id = _safe_int(args.get("user_id"))
+
+    pattern = f"%{query_text}%"
+    query = assistant_db.query(SupportMemory).filter(SupportMemory.kind == "digest")
+    if key:
+        query = query.filter(SupportMemory.key == key)
+    if user_id is not None:
+        query = query.filter(SupportMemory.user_id == int(user_id))
+
+    hits = _search_index_rows(
+        assistant_db,
+        query,
+        "digests",
+        query_text,
+        limit=limit,
+        predicate=cast(SupportMemory.value_json, Text).ilike(pattern),
+        order_by=(SupportMemory.created_at.desc(), SupportMemory.id.desc()),
+    )
+    matches: list[dict[str, Any]] = []
+    for digest, snippet in hits:
+        raw_value = getattr(digest, "value_json", "") or ""
+        matches.append(
+            {
+                "digest_id": int(digest.id),
+                "key": digest.key,
+                "user_id": int(digest.user_id) if getattr(digest, "user_id", None) is not None else 0,
+                "created_at": digest.created_at.isoformat() if getattr(digest, "created_at", None) else None,
+                "snippet": snippet or _snippet_for_query(raw_value, query_text, window=80, max_len=320),
+            }
+        )
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "query": query_text,
+            "limit": limit,
+            "key": key,
+            "user_id": int(user_id) if user_id is not None else None,
+            "count": len(matches),
+            "matches": matches,
+        },
+    }
+
+
+@_tool_handler("assistant_list_users")
+def _tool_assistant_list_users(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    assistant_db: Session | None,
+    user: AuthUser | None,
+    **_: Any,
+) -> dict[str, Any]:
+    include_anonymous = True if args.get("include_anonymous") is None else bool(args.get("include_anonymous"))
+    limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=200)
+    linkage_session_limit = _clamp_int(
+        _safe_int(args.get("linkage_session_limit")),
+        default=50,
+        min_value=1,
+        max_value=500,
+    )
+
+    if assistant_db is None:
+        return {"ok": False, "tool": name, "error": "assistant_db is required."}
+
+    session_counts_query = (
+        assistant_db.query(
+            SupportSession.user_id,
+            func.count(SupportSession.id),
+            func.max(SupportSession.updated_at),
+        )
+        .group_by(SupportSession.user_id)
+        .order_by(func.max(SupportSession.updated_at).desc())
+    )
+    if not include_anonymous:
+        session_counts_query = session_counts_query.filter(SupportSession.user_id.isnot(None))
+
+    session_counts_rows = session_counts_query.limit(limit).all()
+    user_ids: list[int] = [
+        int(user_id)
+        for user_id, _, _ in session_counts_rows
+        if user_id is not None
+    ]
+
+    user_rows = []
+    if user_ids:
+        user_rows = core_db.query(AuthUser).filter(AuthUser.id.in_(user_ids)).all()
+    user_by_id = {int(user.id): user for user in user_rows}
+
+    message_counts_query = (
+        assistant_db.query(
+            SupportSession.user_id,
+            AssistantSupportMessage.role,
+            func.count(AssistantSupportMessage.id),
+        )
+        .join(SupportSession, AssistantSupportMessage.session_pk == SupportSession.id)
+        .group_by(SupportSession.user_id, AssistantSupportMessage.role)
+    )
+    if not include_anonymous:
+        message_counts_query = message_counts_query.filter(SupportSession.user_id.isnot(None))
+    message_counts_rows = message_counts_query.all()
+    message_counts: dict[int | None, dict[str, int]] = {}
+    for raw_user_id, role, count in message_counts_rows:
+        key = int(raw_user_id) if raw_user_id is not None else None
+        bucket = message_counts.get(key)
+        if bucket is None:
+            bucket = {}
+            message_counts[key] = bucket
+        bucket[str(role or "unknown")] = int(count or 0)
+
+    users: list[dict[str, Any]] = []
+    for raw_user_id, sessions_count, last_updated_at in session_counts_rows:
+        key = int(raw_user_id) if raw_user_id is not None else None
+        auth_user = user_by_id.get(int(raw_user_id)) if raw_user_id is not None else None
+
+        sample_sessions_query = (
+            assistant_db.query(SupportSession)
+            .filter(SupportSession.user_id == raw_user_id)
+            .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
+            .limit(5)
+        )
+        if raw_user_id is None:
+            sample_sessions_query = (
+                assistant_db.query(SupportSession)
+                .filter(SupportSession.user_id.is_(None))
+                .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
+                .limit(5)
+            )
+        sample_sessions = sample_sessions_query.all()
+        sample_session_ids = [str(s.session_id) for s in sample_sessions]
+
+        linkage_sessions_query = (
+            assistant_db.query(SupportSession)
+            .filter(SupportSession.user_id == raw_user_id)
+            .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
+            .limit(linkage_session_limit)
+        )
+        if raw_user_id is None:
+            linkage_sessions_query = (
+                assistant_db.query(SupportSession)
+                .filter(SupportSession.user_id.is_(None))
+                .order_by(SupportSession.updated_at.desc(), SupportSession.id.desc())
+                .limit(linkage_session_limit)
+            )
+        linkage_sessions = linkage_sessions_query.all()
+
+        project_counts: dict[int, int] = {}
+        route_counts: dict[str, int] = {}
+        for session in linkage_sessions:
+            raw_state = getattr(session, "state_json", None)
+            if not raw_state:
+                continue
+            try:
+                state = json.loads(raw_state)
+            except Exception:
+                continue
+            if not isinstance(state, dict):
+                continue
+
+            for key_name in ("current_project_id", "ui_project_id"):
+                project_id = state.get(key_name)
+                if isinstance(project_id, int) and project_id > 0:
+                    project_counts[project_id] = project_counts.get(project_id, 0) + 1
+
+            ui_route = state.get("ui_route")
+            if isinstance(ui_route, dict):
+                route_name = ui_route.get("name")
+                if isinstance(route_name, str) and route_name.strip():
+                    cleaned = route_name.strip()
+                    route_counts[cleaned] = route_counts.get(cleaned, 0) + 1
+
+        project_items = [{"project_id": pid, "count": cnt} for pid, cnt in project_counts.items()]
+        project_items.sort(key=lambda item: (-int(item["count"]), int(item["project_id"])))
+        route_items = [{"route": route, "count": cnt} for route, cnt in route_counts.items()]
+        route_items.sort(key=lambda item: (-int(item["count"]), str(item["route"])))
+
+        assistant_brief = None
+        if auth_user is not None:
+            raw_brief = str(getattr(auth_user, "assistant_brief", "") or "").strip()
+            assistant_brief = raw_brief or None
+
+        users.append(
+            {
+                "user_id": key,
+                "username": getattr(auth_user, "username", None) if auth_user is not None else None,
+                "role": str(getattr(auth_user, "role", "")) if auth_user is not None else None,
+                "assistant_brief": assistant_brief,
+                "sessions_count": int(sessions_count or 0),
+                "messages_count": message_counts.get(key, {}),
+                "last_session_updated_at": last_updated_at.isoformat() if last_updated_at else None,
+                "sample_session_ids": sample_session_ids,
+                "linkage": {
+                    "projects": project_items[:20],
+                    "ui_routes": route_items[:20],
+                    "sessions_scanned": len(linkage_sessions),
+                },
+            }
+        )
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "limit": limit,
+            "include_anonymous": include_anonymous,
+            "count": len(users),
+            "users": users,
+        },
+    }
+
+
+@_tool_handler("assistant_set_user_brief")
+def _tool_assistant_set_user_brief(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    if not bool(args.get("confirm")):
+        return {"ok": False, "tool": name, "error": "confirm=true is required."}
+
+    user_id = _safe_int(args.get("user_id"))
+    username = _safe_str(args.get("username"), max_len=128)
+    if user_id is None and not username:
+        return {"ok": False, "tool": name, "error": "Provide user_id or username."}
+
+    target_user = None
+    if user_id is not None:
+        target_user = core_db.get(AuthUser, int(user_id))
+    elif username:
+        target_user = core_db.query(AuthUser).filter(AuthUser.username == username).first()
+
+    if target_user is None:
+        return {"ok": False, "tool": name, "error": "User not found."}
+
+    normalized_brief = str(args.get("assistant_brief") or "").strip() or None
+    target_user.assistant_brief = normalized_brief
+    core_db.add(target_user)
+    core_db.commit()
+    core_db.refresh(target_user)
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "user_id": int(target_user.id),
+            "username": str(target_user.username or "") or None,
+            "role": str(getattr(target_user.role, "value", target_user.role) or "") or None,
+            "assistant_brief": normalized_brief,
+        },
+    }
+
+
+@_tool_handler("assistant_search_internal_logs")
+def _tool_assistant_search_internal_logs(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+    query_text = _safe_str(args.get("query"), max_len=512) or _safe_str(args.get("q"), max_len=512)
+    if not query_text:
+        return {"ok": False, "tool": name, "error": "Missing argument: query"}
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+    include_archive = True if args.get("include_archive") is None else bool(args.get("include_archive"))
+
+    pattern = f"%{query_text}%"
+    live_hits = _search_internal_logs_from_db(agent_db, query_text=query_text, limit=limit, source="live")
+    steps = list(live_hits["steps"])
+    commands = list(live_hits["commands"])
+    events = list(live_hits["events"])
+
+    run_rows = (
+        agent_db.query(AgentRun)
+        .filter(
+            or_(
+                AgentRun.run_id.ilike(pattern),
+                AgentRun.agent_id.ilike(pattern),
+                AgentRun.kind.ilike(pattern),
+                AgentRun.status.ilike(pattern),
+                AgentRun.last_error.ilike(pattern),
+                AgentRun.status_bar.ilike(pattern),
+                cast(AgentRun.summary_json, Text).ilike(pattern),
+                cast(AgentRun.state_json, Text).ilike(pattern),
+                cast(AgentRun.config_json, Text).ilike(pattern),
+            )
+        )
+        .order_by(AgentRun.id.desc())
+        .limit(limit)
+        .all()
+    )
+    runs: list[dict[str, Any]] = []
+    for run in run_rows:
+        summary_preview = ""
+        if isinstance(run.summary_json, dict):
+            summary_preview = _snippet_for_query(json.dumps(run.summary_json, ensure_ascii=False), query_text)
+        runs.append(
+            {
+                "run_id": run.run_id,
+                "agent_id": run.agent_id,
+                "kind": run.kind,
+                "status": run.status,
+                "updated_at": run.updated_at.isoformat() if getattr(run, "updated_at", None) else None,
+                "status_bar": run.status_bar,
+                "last_error": run.last_error,
+                "summary_preview": summary_preview,
+            }
+        )
+
+    archive_cm = get_agent_archive_session_if_available() if include_archive else nullcontext(None)
+    with archive_cm as archive_db:
+        archive_available = archive_db is not None
+        if archive_db is not None:
+            archive_hits = _search_internal_logs_from_db(
+                archive_db,
+                query_text=query_text,
+                limit=limit,
+                source="archive",
+            )
+            steps.extend(archive_hits["steps"])
+            commands.extend(archive_hits["commands"])
+            events.extend(archive_hits["events"])
+
+    steps = _sorted_unique_agent_items(steps, id_key="step_id", order="desc", limit=limit)
+    commands = _sorted_unique_agent_items(commands, id_key="command_id", order="desc", limit=limit)
+    events = _sorted_unique_agent_items(events, id_key="event_id", order="desc", limit=limit)
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "query": query_text,
+            "limit": limit,
+            "include_archive": bool(include_archive),
+            "archive_available": bool(archive_available if include_archive else False),
+            "steps": steps,
+            "commands": commands,
+            "runs": runs,
+            "events": events,
+        },
+    }
+
+
+@_tool_handler("assistant_get_agent_step")
+def _tool_assistant_get_agent_step(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+    step_id = _safe_int(args.get("step_id"))
+    if step_id is None:
+        step_id = _safe_int(args.get("id"))
+    if step_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: step_id (or id)"}
+
+    payload = _get_agent_step_payload(agent_db, step_id=int(step_id), source="live")
+    if payload is None:
+        with get_agent_archive_session_if_available() as archive_db:
+            if archive_db is not None:
+                payload = _get_agent_step_payload(archive_db, step_id=int(step_id), source="archive")
+    if payload is None:
+        return {"ok": False, "tool": name, "error": "Agent step not found.", "step_id": int(step_id)}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": payload,
+    }
+
+
+@_tool_handler("assistant_get_agent_command")
+def _tool_assistant_get_agent_command(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+    command_id = _safe_int(args.get("command_id"))
+    if command_id is None:
+        command_id = _safe_int(args.get("id"))
+    if command_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: command_id (or id)"}
+
+    payload = _get_agent_command_payload(agent_db, command_id=int(command_id), source="live")
+    if payload is None:
+        with get_agent_archive_session_if_available() as archive_db:
+            if archive_db is not None:
+                payload = _get_agent_command_payload(archive_db, command_id=int(command_id), source="archive")
+    if payload is None:
+        return {"ok": False, "tool": name, "error": "Agent command not found.", "command_id": int(command_id)}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": payload,
+    }
+
+
+@_tool_handler("assistant_get_agent_run")
+def _tool_assistant_get_agent_run(
+    *,
+    name: str,
+    args: dict[str, Any],
+    agent_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if agent_db is None:
+        return {"ok": False, "tool": name, "error": "agent_db is required."}
+    run_id = _safe_str(args.get("run_id"), max_len=128) or _safe_str(args.get("id"), max_len=128)
+    if not run_id:
+        return {"ok": False, "tool": name, "error": "Missing argument: run_id"}
+    run = agent_db.query(AgentRun).filter(AgentRun.run_id == run_id).first()
+    if run is None:
+        return {"ok": False, "tool": name, "error": "Agent run not found.", "run_id": run_id}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "run_id": run.run_id,
+            "agent_id": run.agent_id,
+            "kind": run.kind,
+            "status": run.status,
+            "created_at": run.created_at.isoformat() if getattr(run, "created_at", None) else None,
+            "updated_at": run.updated_at.isoformat() if getattr(run, "updated_at", None) else None,
+            "ended_at": run.ended_at.isoformat() if getattr(run, "ended_at", None) else None,
+            "step_index": int(run.step_index or 0),
+            "status_bar": run.status_bar,
+            "last_error": run.last_error,
+            "config_json": run.config_json,
+            "state_json": run.state_json,
+            "summary_json": run.summary_json,
+        },
+    }
+
+
+@_tool_handler("db_file_stats")
+def _tool_db_file_stats(
+    *,
+    name: str,
+    core_db: Session,
+    schedule_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    core_path = _sqlite_path_from_session(core_db)
+    assistant_path = (core_path.parent / "ispec-assistant.db") if core_path is not None else None
+    schedule_path = _sqlite_path_from_session(schedule_db) if schedule_db is not None else None
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "core_db": _stat_path(core_path),
+            "assistant_db": _stat_path(assistant_path),
+            "schedule_db": _stat_path(schedule_path) if schedule_db is not None else None,
+        },
+    }
+
+
+@_tool_handler("count_all_projects")
+def _tool_count_all_projects(*, name: str, core_db: Session, **_: Any) -> dict[str, Any]:
+    count = int(core_db.query(func.count(Project.id)).scalar() or 0)
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {"count": count, "scope": "all"},
+    }
+
+
+@_tool_handler("count_current_projects")
+def _tool_count_current_projects(*, name: str, core_db: Session, **_: Any) -> dict[str, Any]:
+    count = int(
+        core_db.query(func.count(Project.id))
+        .filter(Project.prj_Current_FLAG.is_(True))
+        .scalar()
+        or 0
+    )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {"count": count, "scope": "current"},
+    }
+
+
+@_tool_handler("project_status_counts")
+def _tool_project_status_counts(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    current_only = bool(args.get("current_only"))
+    query = core_db.query(Project.prj_Status, func.count(Project.id))
+    if current_only:
+        query = query.filter(Project.prj_Current_FLAG.is_(True))
+    rows = query.group_by(Project.prj_Status).all()
+    items = [
+        {"status": (status if status is not None else None), "count": int(count or 0)}
+        for status, count in rows
+    ]
+    items.sort(
+        key=lambda item: (
+            -int(item["count"]),
+            "" if item["status"] is None else str(item["status"]),
+        )
+    )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "current_only": current_only,
+            "total": int(sum(item["count"] for item in items)),
+            "items": items,
+        },
+    }
+
+
+@_tool_handler("latest_projects")
+def _tool_latest_projects(*, name: str, args: dict[str, Any], core_db: Session, **_: Any) -> dict[str, Any]:
+    limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
+    current_only = bool(args.get("current_only"))
+    sort_raw = (_safe_str(args.get("sort"), max_len=32) or "modified").strip().lower()
+
+    query = core_db.query(Project)
+    if current_only:
+        query = query.filter(Project.prj_Current_FLAG.is_(True))
+
+    if sort_raw in {"created", "creation"}:
+        query = query.order_by(Project.prj_CreationTS.desc(), Project.id.desc())
+        sort = "created"
+    elif sort_raw in {"modified", "modification", "updated", "update"}:
+        query = query.order_by(Project.prj_ModificationTS.desc(), Project.id.desc())
+        sort = "modified"
+    elif sort_raw in {"id"}:
+        query = query.order_by(Project.id.desc())
+        sort = "id"
+    else:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "sort must be one of: created, modified, id",
+        }
+
+    rows = query.limit(limit).all()
+    projects = []
+    for project in rows:
+        projects.append(
+            {
+                "id": int(project.id),
+                "title": project.prj_ProjectTitle,
+                "status": project.prj_Status,
+                "current": bool(project.prj_Current_FLAG),
+                "created": project.prj_CreationTS.isoformat()
+                if getattr(project, "prj_CreationTS", None)
+                else None,
+                "modified": project.prj_ModificationTS.isoformat()
+                if getattr(project, "prj_ModificationTS", None)
+                else None,
+                "links": {
+                    "ui": f"/project/{project.id}",
+                    "api": f"/api/projects/{project.id}",
+                },
+            }
+        )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "sort": sort,
+            "current_only": current_only,
+            "count": len(projects),
+            "projects": projects,
+        },
+    }
+
+
+@_tool_handler("latest_project_comments")
+def _tool_latest_project_comments(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
+    project_id = _safe_int(args.get("project_id"))
+    query = (
+        core_db.query(ProjectComment, Project)
+        .join(Project, ProjectComment.project_id == Project.id)
+        .order_by(ProjectComment.com_CreationTS.desc(), ProjectComment.id.desc())
+    )
+    if project_id is not None:
+        query = query.filter(ProjectComment.project_id == project_id)
+    rows = query.limit(limit).all()
+
+    comments: list[dict[str, Any]] = []
+    for comment, project in rows:
+        created = getattr(comment, "com_CreationTS", None)
+        text = (comment.com_Comment or "").strip()
+        if len(text) > 240:
+            text = text[:239] + "…"
+        comments.append(
+            {
+                "id": int(comment.id),
+                "project_id": int(project.id),
+                "project_title": project.prj_ProjectTitle,
+                "type": comment.com_CommentType,
+                "added_by": comment.com_AddedBy,
+                "created": created.isoformat() if created else None,
+                "comment": text or None,
+                "links": {
+                    "ui": f"/project/{project.id}",
+                    "api": f"/api/projects/{project.id}",
+                },
+            }
+        )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "project_id": project_id,
+            "count": len(comments),
+            "comments": comments,
+        },
+    }
+
+
+@_tool_handler("search_api")
+def _tool_search_api(
+    *,
+    name: str,
+    args: dict[str, Any],
+    api_schema: dict[str, Any] | None,
+    **_: Any,
+) -> dict[str, Any]:
+    query = _safe_str(args.get("query"), max_len=200)
+    limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
+    if not query:
+        return {"ok": False, "tool": name, "error": "Missing string argument: query"}
+    if not isinstance(api_schema, dict):
+        return {"ok": False, "tool": name, "error": "API schema is not available."}
+
+    matches = _search_openapi_schema(api_schema, query=query, limit=limit)
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "query": query,
+            "count": len(matches),
+            "matches": matches,
+            "docs_hint": "/docs (FastAPI Swagger UI), /openapi.json",
+        },
+    }
+
+
+@_tool_handler("experiments_for_project")
+def _tool_experiments_for_project(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    project_id = _safe_int(args.get("project_id"))
+    if project_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: project_id"}
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=100)
+
+    rows = (
+        core_db.query(Experiment)
+        .filter(Experiment.project_id == project_id)
+        .order_by(Experiment.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+    experiments: list[dict[str, Any]] = []
+    for experiment in rows:
+        created = getattr(experiment, "Experiment_CreationTS", None)
+        experiments.append(
+            {
+                "id": int(experiment.id),
+                "record_no": experiment.record_no,
+                "name": experiment.exp_Name,
+                "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
+                "date": experiment.exp_Date.isoformat() if experiment.exp_Date else None,
+                "project_id": int(experiment.project_id)
+                if experiment.project_id is not None
+                else None,
+                "created": created.isoformat() if created else None,
+                "links": {
+                    "ui": f"/experiment/{experiment.id}",
+                    "api": f"/api/experiments/{experiment.id}",
+                },
+            }
+        )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "project_id": project_id,
+            "count": len(experiments),
+            "experiments": experiments,
+        },
+    }
+
+
+@_tool_handler("latest_experiments")
+def _tool_latest_experiments(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=50)
+    rows = core_db.query(Experiment).order_by(Experiment.id.desc()).limit(limit).all()
+
+    experiments: list[dict[str, Any]] = []
+    for experiment in rows:
+        created = getattr(experiment, "Experiment_CreationTS", None)
+        experiments.append(
+            {
+                "id": int(experiment.id),
+                "record_no": experiment.record_no,
+                "name": experiment.exp_Name,
+                "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
+                "date": experiment.exp_Date.isoformat() if experiment.exp_Date else None,
+                "project_id": int(experiment.project_id)
+                if experiment.project_id is not None
+                else None,
+                "created": created.isoformat() if created else None,
+                "links": {
+                    "ui": f"/experiment/{experiment.id}",
+                    "api": f"/api/experiments/{experiment.id}",
+                },
+            }
+        )
+    return {"ok": True, "tool": name, "result": {"experiments": experiments}}
+
+
+@_tool_handler("get_experiment")
+def _tool_get_experiment(*, name: str, args: dict[str, Any], core_db: Session, **_: Any) -> dict[str, Any]:
+    experiment_id = _safe_int(args.get("id"))
+    if experiment_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
+    experiment = core_db.get(Experiment, experiment_id)
+    if experiment is None:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": f"Experiment {experiment_id} not found.",
+        }
+    created = getattr(experiment, "Experiment_CreationTS", None)
+    modified = getattr(experiment, "Experiment_ModificationTS", None)
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "id": int(experiment.id),
+            "record_no": experiment.record_no,
+            "name": experiment.exp_Name,
+            "type": str(experiment.exp_Type) if experiment.exp_Type is not None else None,
+            "date": experiment.exp_Date.isoformat() if experiment.exp_Date else None,
+            "project_id": int(experiment.project_id)
+            if experiment.project_id is not None
+            else None,
+            "created": created.isoformat() if created else None,
+            "modified": modified.isoformat() if modified else None,
+            "links": {
+                "ui": f"/experiment/{experiment.id}",
+                "api": f"/api/experiments/{experiment.id}",
+            },
+        },
+    }
+
+
+@_tool_handler("latest_experiment_runs")
+def _tool_latest_experiment_runs(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=50)
+    rows = core_db.query(ExperimentRun).order_by(ExperimentRun.id.desc()).limit(limit).all()
+
+    runs: list[dict[str, Any]] = []
+    for run in rows:
+        created = getattr(run, "ExperimentRun_CreationTS", None)
+        runs.append(
+            {
+                "id": int(run.id),
+                "experiment_id": int(run.experiment_id),
+                "run_no": int(run.run_no),
+                "search_no": int(run.search_no),
+                "search_engine": getattr(run, "search_engine", None),
+                "search_state": getattr(run, "search_state", None),
+                "created": created.isoformat() if created else None,
+                "links": {
+                    "ui": f"/experiment-run/{run.id}",
+                    "api": f"/api/experiment-runs/{run.id}",
+                },
+            }
+        )
+    return {"ok": True, "tool": name, "result": {"runs": runs}}
+
+
+@_tool_handler("get_experiment_run")
+def _tool_get_experiment_run(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    **_: Any,
+) -> dict[str, Any]:
+    run_id = _safe_int(args.get("id"))
+    if run_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
+    run = core_db.get(ExperimentRun, run_id)
+    if run is None:
+        return {"ok": False, "tool": name, "error": f"ExperimentRun {run_id} not found."}
+    created = getattr(run, "ExperimentRun_CreationTS", None)
+    modified = getattr(run, "ExperimentRun_ModificationTS", None)
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "id": int(run.id),
+            "experiment_id": int(run.experiment_id),
+            "run_no": int(run.run_no),
+            "search_no": int(run.search_no),
+            "search_engine": getattr(run, "search_engine", None),
+            "search_state": getattr(run, "search_state", None),
+            "created": created.isoformat() if created else None,
+            "modified": modified.isoformat() if modified else None,
+            "links": {
+                "ui": f"/experiment-run/{run.id}",
+                "api": f"/api/experiment-runs/{run.id}",
+            },
+        },
+    }
+
+
+@_tool_handler("e2g_search_genes_in_project")
+def _tool_e2g_search_genes_in_project(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    omics_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    project_id = _safe_int(args.get("project_id"))
+    if project_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: project_id"}
+    if omics_db is None:
+        return {"ok": False, "tool": name, "error": "Omics database session is not available."}
+
+    query_text = _safe_str(args.get("query"), max_len=200)
+    if not query_text:
+        return {"ok": False, "tool": name, "error": "Missing string argument: query"}
+    if query_text.strip().lower() in {"*", "all"}:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "Use e2g_gene_in_project for a specific GeneID, or provide a keyword (GeneSymbol/description).",
+        }
+
+    limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
+    pattern = f"%{query_text}%"
+
+    run_ids = [
+        int(row[0])
+        for row in core_db.query(ExperimentRun.id)
+        .join(Experiment, ExperimentRun.experiment_id == Experiment.id)
+        .filter(Experiment.project_id == project_id)
+        .all()
+    ]
+    if not run_ids:
+        return {
+            "ok": True,
+            "tool": name,
+            "result": {
+                "project_id": project_id,
+                "query": query_text,
+                "count": 0,
+                "matches": [],
+            },
+        }
+
+    rows = (
+        omics_db.query(
+            E2G.gene,
+            E2G.gene_symbol,
+            E2G.description,
+            func.count(E2G.id).label("hits"),
+        )
+        .filter(E2G.experiment_run_id.in_(run_ids))
+        .filter(
+            or_(
+                E2G.gene.ilike(pattern),
+                E2G.gene_symbol.ilike(pattern),
+                E2G.description.ilike(pattern),
+            )
+        )
+        .group_by(E2G.gene, E2G.gene_symbol, E2G.description)
+        .order_by(func.count(E2G.id).desc(), E2G.gene.asc())
+        .limit(limit)
+        .all()
+    )
+
+    matches: list[dict[str, Any]] = []
+    for gene, symbol, description, hits in rows:
+        desc_text = (description or "").strip()
+        if len(desc_text) > 240:
+            desc_text = desc_text[:239] + "…"
+        gene_id = _safe_int(gene)
+        matches.append(
+            {
+                "gene_id": gene_id,
+                "gene_symbol": (symbol.strip() if isinstance(symbol, str) and symbol.strip() else None),
+                "description": desc_text or None,
+                "hits": int(hits or 0),
+            }
+        )
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "project_id": project_id,
+            "query": query_text,
+            "count": len(matches),
+            "matches": matches,
+        },
+    }
+
+
+@_tool_handler("e2g_gene_in_project")
+def _tool_e2g_gene_in_project(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    omics_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    project_id = _safe_int(args.get("project_id"))
+    gene_id = _safe_int(args.get("gene_id"))
+    if project_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: project_id"}
+    if gene_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: gene_id"}
+    if omics_db is None:
+        return {"ok": False, "tool": name, "error": "Omics database session is not available."}
+    limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=200)
+
+    run_rows = (
+        core_db.query(ExperimentRun, Experiment)
+        .join(Experiment, ExperimentRun.experiment_id == Experiment.id)
+        .filter(Experiment.project_id == project_id)
+        .order_by(Experiment.id.desc(), ExperimentRun.id.desc())
+        .all()
+    )
+    run_lookup: dict[int, tuple[Any, Any]] = {
+        int(run.id): (run, experiment) for run, experiment in run_rows
+    }
+    run_ids = list(run_lookup.keys())
+    if not run_ids:
+        return {
+            "ok": True,
+            "tool": name,
+            "result": {
+                "project_id": project_id,
+                "gene_id": gene_id,
+                "count": 0,
+                "hits": [],
+            },
+        }
+
+    # gene_group covers equivalent identifiers in one indexed lookup;
+    # rows imported before the column existed still match on GeneID.
+    gene_group = e2g_gene_group_keys([str(gene_id)], ["GeneID"])[0]
+    rows = (
+        omics_db.query(E2G)
+        .filter(E2G.experiment_run_id.in_(run_ids))
+        .filter(
+            or_(
+                E2G.gene_group == gene_group,
+                and_(
+                    E2G.gene_group.is_(None),
+                    E2G.geneidtype == "GeneID",
+                    E2G.gene == str(gene_id),
+                ),
+            )
+        )
+        .order_by(
+            func.coalesce(E2G.psms_u2g, E2G.psms, 0).desc(),
+            func.coalesce(E2G.iBAQ_dstrAdj, 0.0).desc(),
+            E2G.experiment_run_id.desc(),
+            E2G.id.asc(),
+        )
+        .limit(limit)
+        .all()
+    )
+
+    hits: list[dict[str, Any]] = []
+    for e2g in rows:
+        run_id = int(getattr(e2g, "experiment_run_id"))
+        run_obj, experiment_obj = run_lookup.get(run_id, (None, None))
+        if run_obj is None or experiment_obj is None:
+            continue
+        peptideprint = getattr(e2g, "peptideprint", None)
+        peptideprint_len = len(peptideprint) if isinstance(peptideprint, str) else None
+        peptideprint_preview = None
+        if isinstance(peptideprint, str) and peptideprint:
+            peptideprint_preview = peptideprint[:800]
+            if len(peptideprint) > 800:
+                peptideprint_preview = peptideprint_preview[:799] + "…"
+
+        hits.append(
+            {
+                "experiment_id": int(experiment_obj.id),
+                "experiment_record_no": experiment_obj.record_no,
+                "experiment_name": experiment_obj.exp_Name,
+                "experiment_run_id": int(run_obj.id),
+                "run_no": int(run_obj.run_no),
+                "search_no": int(run_obj.search_no),
+                "label": run_obj.label,
+                "gene_id": gene_id,
+                "gene_symbol": getattr(e2g, "gene_symbol", None),
+                "taxon_id": getattr(e2g, "taxon_id", None),
+                "sra": getattr(e2g, "sra", None),
+                "psms": getattr(e2g, "psms", None),
+                "psms_u2g": getattr(e2g, "psms_u2g", None),
+                "peptide_count": getattr(e2g, "peptide_count", None),
+                "peptide_count_u2g": getattr(e2g, "peptide_count_u2g", None),
+                "coverage": getattr(e2g, "coverage", None),
+                "coverage_u2g": getattr(e2g, "coverage_u2g", None),
+                "area_sum_u2g_all": getattr(e2g, "area_sum_u2g_all", None),
+                "iBAQ_dstrAdj": getattr(e2g, "iBAQ_dstrAdj", None),
+                "peptideprint_len": peptideprint_len,
+                "peptideprint_preview": peptideprint_preview,
+                "links": {
+                    "project_ui": f"/project/{project_id}",
+                    "experiment_ui": f"/experiment/{experiment_obj.id}",
+                    "experiment_run_ui": f"/experiment-run/{run_obj.id}",
+                },
+            }
+        )
+
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "project_id": project_id,
+            "gene_id": gene_id,
+            "count": len(hits),
+            "hits": hits,
+        },
+    }
+
+
+@_tool_handler("get_project")
+def _tool_get_project(*, name: str, args: dict[str, Any], core_db: Session, **_: Any) -> dict[str, Any]:
+    project_id = _safe_int(args.get("id"))
+    if project_id is None:
+        project_id = _safe_int(args.get("project_id"))
+    if project_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: id (or project_id)"}
+    project = core_db.get(Project, project_id)
+    if project is None:
+        return {"ok": False, "tool": name, "error": f"Project {project_id} not found."}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": cached_project_summary(core_db, project, include_details=True),
+    }
+
+
+@_tool_handler("search_projects")
+def _tool_search_projects(*, name: str, args: dict[str, Any], core_db: Session, **_: Any) -> dict[str, Any]:
+    query = _safe_str(args.get("query"), max_len=200)
+    limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=20)
+    if not query:
+        return {"ok": False, "tool": name, "error": "Missing string argument: query"}
+    if query.strip().lower() in {"*", "all"}:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "Use count_all_projects or count_current_projects to answer 'how many projects'. search_projects expects a keyword (title/PI/contact) or an id.",
+        }
+
+    matches: list[dict[str, Any]] = []
+    project_id = _safe_int(query)
+    if project_id is not None:
+        project = core_db.get(Project, project_id)
+        if project is not None:
+            matches.append(
+                {
+                    "id": int(project.id),
+                    "title": project.prj_ProjectTitle,
+                    "status": project.prj_Status,
+                    "current": bool(getattr(project, "prj_Current_FLAG", False)),
+                }
+            )
+        return {"ok": True, "tool": name, "result": {"matches": matches}}
+
+    pattern = f"%{query}%"
+    rows = (
+        core_db.query(Project)
+        .filter(
+            or_(
+                Project.prj_ProjectTitle.ilike(pattern),
+                Project.prj_PI.ilike(pattern),
+                Project.prj_Project_LabContact.ilike(pattern),
+            )
+        )
+        .order_by(Project.id.asc())
+        .limit(limit)
+        .all()
+    )
+    for project in rows:
+        matches.append(
+            {
+                "id": int(project.id),
+                "title": project.prj_ProjectTitle,
+                "status": project.prj_Status,
+                "current": bool(getattr(project, "prj_Current_FLAG", False)),
+            }
+        )
+    return {"ok": True, "tool": name, "result": {"matches": matches}}
+
+
+@_tool_handler("my_projects")
+def _tool_my_projects(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    user: AuthUser | None,
+    **_: Any,
+) -> dict[str, Any]:
+    query_text = _safe_str(args.get("query"), max_len=200)
+    limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=500)
+    current_only = bool(args.get("current_only"))
+
+    query = core_db.query(Project)
+    if uses_explicit_project_access(user):
+        query = scope_project_query(query, user)
+
+    if current_only:
+        query = query.filter(Project.prj_Current_FLAG.is_(True))
+
+    if query_text:
+        pattern = f"%{query_text}%"
+        query = query.filter(
+            or_(
+                Project.prj_ProjectTitle.ilike(pattern),
+                Project.prj_PI.ilike(pattern),
+                Project.prj_Project_LabContact.ilike(pattern),
+            )
+        )
+
+    try:
+        total = int(query.order_by(None).count())
+    except Exception:
+        total = int(query.count())
+
+    rows = query.order_by(Project.id.asc()).limit(limit).all()
+    projects = [
+        {
+            "id": int(project.id),
+            "title": project.prj_ProjectTitle,
+            "status": project.prj_Status,
+            "current": bool(getattr(project, "prj_Current_FLAG", False)),
+            "to_be_billed": bool(getattr(project, "prj_Billing_ReadyToBill", False)),
+            "links": {
+                "ui": f"/project/{project.id}",
+                "api": f"/api/projects/{project.id}",
+            },
+        }
+        for project in rows
+    ]
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "count": len(projects),
+            "total": total,
+            "projects": projects,
+        },
+    }
+
+
+@_tool_handler("project_files_for_project")
+def _tool_project_files_for_project(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    user: AuthUser | None,
+    **_: Any,
+) -> dict[str, Any]:
+    project_id = _safe_int(args.get("project_id"))
+    if project_id is None:
+        project_id = _safe_int(args.get("id"))
+    if project_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: project_id (or id)"}
+
+    query_text = _safe_str(args.get("query"), max_len=200)
+    limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=500)
 
-            limit = _clamp_int(_safe_int(args.get("limit")), default=10, min_value=1, max_value=50)
-            pattern = f"%{query_text}%"
+    project_query = core_db.query(Project).filter(Project.id == project_id)
+    if uses_explicit_project_access(user):
+        project_query = scope_project_query(project_query, user)
+    project = project_query.first()
+    if project is None:
+        return {"ok": False, "tool": name, "error": f"Project {project_id} not found."}
 
-            run_ids = [
-                int(row[0])
-                for row in core_db.query(ExperimentRun.id)
-                .join(Experiment, ExperimentRun.experiment_id == Experiment.id)
-                .filter(Experiment.project_id == project_id)
-                .all()
-            ]
-            if not run_ids:
-                return {
-                    "ok": True,
-                    "tool": name,
-                    "result": {
-                        "project_id": project_id,
-                        "query": query_text,
-                        "count": 0,
-                        "matches": [],
-                    },
-                }
+    def display_path(filename: str | None) -> str:
+        raw = (filename or "").strip()
+        if not raw:
+            return ""
+        return raw.replace("__", "/")
+
+    def analysis_key(filename: str | None) -> str:
+        display = display_path(filename)
+        if not display:
+            return "Ungrouped"
+        parts = [part for part in display.split("/") if part]
+        return parts[0] if parts else "Ungrouped"
+
+    def relative_path(filename: str | None) -> str:
+        display = display_path(filename)
+        if not display:
+            return ""
+        parts = [part for part in display.split("/") if part]
+        if len(parts) <= 1:
+            return display
+        return "/".join(parts[1:])
+
+    def file_payload(row: ProjectFile) -> dict[str, Any]:
+        analysis = analysis_key(getattr(row, "prjfile_FileName", None))
+        display = display_path(getattr(row, "prjfile_FileName", None))
+        return {
+            "id": int(row.id),
+            "project_id": int(row.project_id),
+            "analysis": analysis,
+            "path": display,
+            "name": relative_path(getattr(row, "prjfile_FileName", None)),
+            "filename_raw": getattr(row, "prjfile_FileName", None),
+            "content_type": getattr(row, "prjfile_ContentType", None),
+            "size_bytes": int(getattr(row, "prjfile_SizeBytes", 0) or 0),
+            "sha256": getattr(row, "prjfile_Sha256", None),
+            "added_by": getattr(row, "prjfile_AddedBy", None),
+            "created": row.prjfile_CreationTS.isoformat() if row.prjfile_CreationTS else None,
+            "modified": row.prjfile_ModificationTS.isoformat() if row.prjfile_ModificationTS else None,
+            "links": {
+                "download": f"/api/projects/{row.project_id}/files/{row.id}",
+                "preview": f"/api/projects/{row.project_id}/files/{row.id}/preview",
+            },
+        }
 
-            rows = (
-                omics_db.query(
-                    E2G.gene,
-                    E2G.gene_symbol,
-                    E2G.description,
-                    func.count(E2G.id).label("hits"),
-                )
-                .filter(E2G.experiment_run_id.in_(run_ids))
-                .filter(
-                    or_(
-                        E2G.gene.ilike(pattern),
-                        E2G.gene_symbol.ilike(pattern),
-                        E2G.description.ilike(pattern),
-                    )
-                )
-                .group_by(E2G.gene, E2G.gene_symbol, E2G.description)
-                .order_by(func.count(E2G.id).desc(), E2G.gene.asc())
-                .limit(limit)
-                .all()
-            )
+    file_query = (
+        core_db.query(ProjectFile)
+        .options(defer(ProjectFile.prjfile_Data))
+        .filter(ProjectFile.project_id == project_id)
+    )
+    if query_text:
+        file_query = file_query.filter(ProjectFile.prjfile_FileName.ilike(f"%{query_text}%"))
 
-            matches: list[dict[str, Any]] = []
-            for gene, symbol, description, hits in rows:
-                desc_text = (description or "").strip()
-                if len(desc_text) > 240:
-                    desc_text = desc_text[:239] + "…"
-                gene_id = _safe_int(gene)
-                matches.append(
-                    {
-                        "gene_id": gene_id,
-                        "gene_symbol": (symbol.strip() if isinstance(symbol, str) and symbol.strip() else None),
-                        "description": desc_text or None,
-                        "hits": int(hits or 0),
-                    }
-                )
+    try:
+        total = int(file_query.order_by(None).count())
+    except Exception:
+        total = int(file_query.count())
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "project_id": project_id,
-                    "query": query_text,
-                    "count": len(matches),
-                    "matches": matches,
-                },
-            }
+    rows = file_query.order_by(ProjectFile.id.asc()).limit(limit).all()
+    files = [file_payload(row) for row in rows]
 
-        if name == "e2g_gene_in_project":
-            project_id = _safe_int(args.get("project_id"))
-            gene_id = _safe_int(args.get("gene_id"))
-            if project_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: project_id"}
-            if gene_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: gene_id"}
-            if omics_db is None:
-                return {"ok": False, "tool": name, "error": "Omics database session is not available."}
-            limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=200)
-
-            run_rows = (
-                core_db.query(ExperimentRun, Experiment)
-                .join(Experiment, ExperimentRun.experiment_id == Experiment.id)
-                .filter(Experiment.project_id == project_id)
-                .order_by(Experiment.id.desc(), ExperimentRun.id.desc())
-                .all()
-            )
-            run_lookup: dict[int, tuple[Any, Any]] = {
-                int(run.id): (run, experiment) for run, experiment in run_rows
-            }
-            run_ids = list(run_lookup.keys())
-            if not run_ids:
-                return {
-                    "ok": True,
-                    "tool": name,
-                    "result": {
-                        "project_id": project_id,
-                        "gene_id": gene_id,
-                        "count": 0,
-                        "hits": [],
-                    },
-                }
+    by_analysis: dict[str, int] = {}
+    for item in files:
+        key = str(item.get("analysis") or "Ungrouped")
+        by_analysis[key] = by_analysis.get(key, 0) + 1
 
-            rows = (
-                omics_db.query(E2G)
-                .filter(E2G.experiment_run_id.in_(run_ids))
-                .filter(E2G.geneidtype == "GeneID")
-                .filter(E2G.gene == str(gene_id))
-                .order_by(
-                    func.coalesce(E2G.psms_u2g, E2G.psms, 0).desc(),
-                    func.coalesce(E2G.iBAQ_dstrAdj, 0.0).desc(),
-                    E2G.experiment_run_id.desc(),
-                    E2G.id.asc(),
-                )
-                .limit(limit)
-                .all()
-            )
+    pca_hint = re.compile(r"\bpca\b|pc1|pc2|biplot|pcaplot", re.IGNORECASE)
+    highlights = [
+        item
+        for item in files
+        if pca_hint.search(str(item.get("path") or ""))
+        or pca_hint.search(str(item.get("filename_raw") or ""))
+    ][:10]
 
-            hits: list[dict[str, Any]] = []
-            for e2g in rows:
-                run_id = int(getattr(e2g, "experiment_run_id"))
-                run_obj, experiment_obj = run_lookup.get(run_id, (None, None))
-                if run_obj is None or experiment_obj is None:
-                    continue
-                peptideprint = getattr(e2g, "peptideprint", None)
-                peptideprint_len = len(peptideprint) if isinstance(peptideprint, str) else None
-                peptideprint_preview = None
-                if isinstance(peptideprint, str) and peptideprint:
-                    peptideprint_preview = peptideprint[:800]
-                    if len(peptideprint) > 800:
-                        peptideprint_preview = peptideprint_preview[:799] + "…"
-
-                hits.append(
-                    {
-                        "experiment_id": int(experiment_obj.id),
-                        "experiment_record_no": experiment_obj.record_no,
-                        "experiment_name": experiment_obj.exp_Name,
-                        "experiment_run_id": int(run_obj.id),
-                        "run_no": int(run_obj.run_no),
-                        "search_no": int(run_obj.search_no),
-                        "label": run_obj.label,
-                        "gene_id": gene_id,
-                        "gene_symbol": getattr(e2g, "gene_symbol", None),
-                        "taxon_id": getattr(e2g, "taxon_id", None),
-                        "sra": getattr(e2g, "sra", None),
-                        "psms": getattr(e2g, "psms", None),
-                        "psms_u2g": getattr(e2g, "psms_u2g", None),
-                        "peptide_count": getattr(e2g, "peptide_count", None),
-                        "peptide_count_u2g": getattr(e2g, "peptide_count_u2g", None),
-                        "coverage": getattr(e2g, "coverage", None),
-                        "coverage_u2g": getattr(e2g, "coverage_u2g", None),
-                        "area_sum_u2g_all": getattr(e2g, "area_sum_u2g_all", None),
-                        "iBAQ_dstrAdj": getattr(e2g, "iBAQ_dstrAdj", None),
-                        "peptideprint_len": peptideprint_len,
-                        "peptideprint_preview": peptideprint_preview,
-                        "links": {
-                            "project_ui": f"/project/{project_id}",
-                            "experiment_ui": f"/experiment/{experiment_obj.id}",
-                            "experiment_run_ui": f"/experiment-run/{run_obj.id}",
-                        },
-                    }
-                )
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "project": {
+                "id": int(project.id),
+                "title": project.prj_ProjectTitle,
+                "status": project.prj_Status,
+                "links": {"ui": f"/project/{project.id}", "api": f"/api/projects/{project.id}"},
+            },
+            "count": len(files),
+            "total": total,
+            "by_analysis": by_analysis,
+            "highlights": highlights,
+            "files": files,
+        },
+    }
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "project_id": project_id,
-                    "gene_id": gene_id,
-                    "count": len(hits),
-                    "hits": hits,
-                },
-            }
 
-        if name == "get_project":
-            project_id = _safe_int(args.get("id"))
-            if project_id is None:
-                project_id = _safe_int(args.get("project_id"))
-            if project_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: id (or project_id)"}
-            project = core_db.get(Project, project_id)
-            if project is None:
-                return {"ok": False, "tool": name, "error": f"Project {project_id} not found."}
-            return {
-                "ok": True,
-                "tool": name,
-                "result": project_summary(core_db, project, include_details=True),
-            }
+@_tool_handler("get_person")
+def _tool_get_person(*, name: str, args: dict[str, Any], core_db: Session, **_: Any) -> dict[str, Any]:
+    person_id = _safe_int(args.get("id"))
+    if person_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
+    person = core_db.get(Person, person_id)
+    if person is None:
+        return {"ok": False, "tool": name, "error": f"Person {person_id} not found."}
+    return {"ok": True, "tool": name, "result": person_summary(person)}
 
-        if name == "search_projects":
-            query = _safe_str(args.get("query"), max_len=200)
-            limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=20)
-            if not query:
-                return {"ok": False, "tool": name, "error": "Missing string argument: query"}
-            if query.strip().lower() in {"*", "all"}:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "Use count_all_projects or count_current_projects to answer 'how many projects'. search_projects expects a keyword (title/PI/contact) or an id.",
-                }
 
-            matches: list[dict[str, Any]] = []
-            project_id = _safe_int(query)
-            if project_id is not None:
-                project = core_db.get(Project, project_id)
-                if project is not None:
-                    matches.append(
-                        {
-                            "id": int(project.id),
-                            "title": project.prj_ProjectTitle,
-                            "status": project.prj_Status,
-                            "current": bool(getattr(project, "prj_Current_FLAG", False)),
-                        }
-                    )
-                return {"ok": True, "tool": name, "result": {"matches": matches}}
-
-            pattern = f"%{query}%"
-            rows = (
-                core_db.query(Project)
-                .filter(
-                    or_(
-                        Project.prj_ProjectTitle.ilike(pattern),
-                        Project.prj_PI.ilike(pattern),
-                        Project.prj_Project_LabContact.ilike(pattern),
-                    )
-                )
-                .order_by(Project.id.asc())
-                .limit(limit)
-                .all()
+@_tool_handler("search_people")
+def _tool_search_people(*, name: str, args: dict[str, Any], core_db: Session, **_: Any) -> dict[str, Any]:
+    query = _safe_str(args.get("query"), max_len=200)
+    limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=20)
+    if not query:
+        return {"ok": False, "tool": name, "error": "Missing string argument: query"}
+
+    matches: list[dict[str, Any]] = []
+    person_id = _safe_int(query)
+    if person_id is not None:
+        person = core_db.get(Person, person_id)
+        if person is not None:
+            matches.append(person_summary(person))
+        return {"ok": True, "tool": name, "result": {"matches": matches}}
+
+    pattern = f"%{query}%"
+    rows = (
+        core_db.query(Person)
+        .filter(
+            or_(
+                Person.ppl_Name_First.ilike(pattern),
+                Person.ppl_Name_Last.ilike(pattern),
+                Person.ppl_Email.ilike(pattern),
             )
-            for project in rows:
-                matches.append(
-                    {
-                        "id": int(project.id),
-                        "title": project.prj_ProjectTitle,
-                        "status": project.prj_Status,
-                        "current": bool(getattr(project, "prj_Current_FLAG", False)),
-                    }
-                )
-            return {"ok": True, "tool": name, "result": {"matches": matches}}
-
-        if name == "my_projects":
-            query_text = _safe_str(args.get("query"), max_len=200)
-            limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=500)
-            current_only = bool(args.get("current_only"))
-
-            query = core_db.query(Project)
-            if uses_explicit_project_access(user):
-                query = scope_project_query(query, user)
-
-            if current_only:
-                query = query.filter(Project.prj_Current_FLAG.is_(True))
-
-            if query_text:
-                pattern = f"%{query_text}%"
-                query = query.filter(
-                    or_(
-                        Project.prj_ProjectTitle.ilike(pattern),
-                        Project.prj_PI.ilike(pattern),
-                        Project.prj_Project_LabContact.ilike(pattern),
-                    )
-                )
+        )
+        .order_by(Person.id.asc())
+        .limit(limit)
+        .all()
+    )
+    matches.extend(person_summary(person) for person in rows)
+    return {"ok": True, "tool": name, "result": {"matches": matches}}
 
-            try:
-                total = int(query.order_by(None).count())
-            except Exception:
-                total = int(query.count())
 
-            rows = query.order_by(Project.id.asc()).limit(limit).all()
-            projects = [
-                {
-                    "id": int(project.id),
-                    "title": project.prj_ProjectTitle,
-                    "status": project.prj_Status,
-                    "current": bool(getattr(project, "prj_Current_FLAG", False)),
-                    "to_be_billed": bool(getattr(project, "prj_Billing_ReadyToBill", False)),
-                    "links": {
-                        "ui": f"/project/{project.id}",
-                        "api": f"/api/projects/{project.id}",
-                    },
-                }
-                for project in rows
-            ]
+@_tool_handler("list_schedule_slots")
+def _tool_list_schedule_slots(
+    *,
+    name: str,
+    args: dict[str, Any],
+    schedule_db: Session | None,
+    **_: Any,
+) -> dict[str, Any]:
+    if schedule_db is None:
+        return {"ok": False, "tool": name, "error": "Schedule DB is not available."}
+
+    start = _safe_date(args.get("start"))
+    end = _safe_date(args.get("end"))
+    if start is None or end is None:
+        today = datetime.now(CENTRAL_TZ).date()
+        start = today
+        end = today + timedelta(days=28)
+    if end < start:
+        return {
+            "ok": False,
+            "tool": name,
+            "error": "end must be on or after start (YYYY-MM-DD).",
+        }
+
+    raw_status = _safe_str(args.get("status"), max_len=32)
+    status: str | None = None
+    if raw_status:
+        normalized = raw_status.strip().lower()
+        if normalized not in SCHEDULE_SLOT_STATUSES:
             return {
-                "ok": True,
+                "ok": False,
                 "tool": name,
-                "result": {
-                    "count": len(projects),
-                    "total": total,
-                    "projects": projects,
-                },
+                "error": f"status must be one of {sorted(SCHEDULE_SLOT_STATUSES)}",
             }
+        status = normalized
 
-        if name == "project_files_for_project":
-            project_id = _safe_int(args.get("project_id"))
-            if project_id is None:
-                project_id = _safe_int(args.get("id"))
-            if project_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: project_id (or id)"}
-
-            query_text = _safe_str(args.get("query"), max_len=200)
-            limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=500)
-
-            project_query = core_db.query(Project).filter(Project.id == project_id)
-            if uses_explicit_project_access(user):
-                project_query = scope_project_query(project_query, user)
-            project = project_query.first()
-            if project is None:
-                return {"ok": False, "tool": name, "error": f"Project {project_id} not found."}
-
-            def display_path(filename: str | None) -> str:
-                raw = (filename or "").strip()
-                if not raw:
-                    return ""
-                return raw.replace("__", "/")
-
-            def analysis_key(filename: str | None) -> str:
-                display = display_path(filename)
-                if not display:
-                    return "Ungrouped"
-                parts = [part for part in display.split("/") if part]
-                return parts[0] if parts else "Ungrouped"
-
-            def relative_path(filename: str | None) -> str:
-                display = display_path(filename)
-                if not display:
-                    return ""
-                parts = [part for part in display.split("/") if part]
-                if len(parts) <= 1:
-                    return display
-                return "/".join(parts[1:])
-
-            def file_payload(row: ProjectFile) -> dict[str, Any]:
-                analysis = analysis_key(getattr(row, "prjfile_FileName", None))
-                display = display_path(getattr(row, "prjfile_FileName", None))
-                return {
-                    "id": int(row.id),
-                    "project_id": int(row.project_id),
-                    "analysis": analysis,
-                    "path": display,
-                    "name": relative_path(getattr(row, "prjfile_FileName", None)),
-                    "filename_raw": getattr(row, "prjfile_FileName", None),
-                    "content_type": getattr(row, "prjfile_ContentType", None),
-                    "size_bytes": int(getattr(row, "prjfile_SizeBytes", 0) or 0),
-                    "sha256": getattr(row, "prjfile_Sha256", None),
-                    "added_by": getattr(row, "prjfile_AddedBy", None),
-                    "created": row.prjfile_CreationTS.isoformat() if row.prjfile_CreationTS else None,
-                    "modified": row.prjfile_ModificationTS.isoformat() if row.prjfile_ModificationTS else None,
-                    "links": {
-                        "download": f"/api/projects/{row.project_id}/files/{row.id}",
-                        "preview": f"/api/projects/{row.project_id}/files/{row.id}/preview",
-                    },
-                }
-
-            file_query = (
-                core_db.query(ProjectFile)
-                .options(defer(ProjectFile.prjfile_Data))
-                .filter(ProjectFile.project_id == project_id)
-            )
-            if query_text:
-                file_query = file_query.filter(ProjectFile.prjfile_FileName.ilike(f"%{query_text}%"))
+    limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=500)
 
-            try:
-                total = int(file_query.order_by(None).count())
-            except Exception:
-                total = int(file_query.count())
+    start_utc, end_utc = _range_bounds_local(start, end)
+    query = (
+        schedule_db.query(ScheduleSlot)
+        .filter(ScheduleSlot.start_at >= start_utc)
+        .filter(ScheduleSlot.start_at <= end_utc)
+    )
+    if status is not None:
+        query = query.filter(ScheduleSlot.status == status)
+    rows = query.order_by(ScheduleSlot.start_at.asc()).limit(limit).all()
 
-            rows = file_query.order_by(ProjectFile.id.asc()).limit(limit).all()
-            files = [file_payload(row) for row in rows]
+    items: list[dict[str, Any]] = []
+    for row in rows:
+        start_utc_aware = _as_utc_aware(row.start_at)
+        end_utc_aware = _as_utc_aware(row.end_at)
+        items.append(
+            {
+                "id": int(row.id),
+                "status": row.status,
+                "start_at": start_utc_aware.isoformat(),
+                "end_at": end_utc_aware.isoformat(),
+                "start_at_central": start_utc_aware.astimezone(CENTRAL_TZ).isoformat(),
+                "end_at_central": end_utc_aware.astimezone(CENTRAL_TZ).isoformat(),
+            }
+        )
 
-            by_analysis: dict[str, int] = {}
-            for item in files:
-                key = str(item.get("analysis") or "Ungrouped")
-                by_analysis[key] = by_analysis.get(key, 0) + 1
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "timezone": str(CENTRAL_TZ),
+            "count": len(items),
+            "items": items,
+        },
+    }
 
-            pca_hint = re.compile(r"\bpca\b|pc1|pc2|biplot|pcaplot", re.IGNORECASE)
-            highlights = [
-                item
-                for item in files
-                if pca_hint.search(str(item.get("path") or ""))
-                or pca_hint.search(str(item.get("filename_raw") or ""))
-            ][:10]
 
+@_tool_handler("list_schedule_requests")
+def _tool_list_schedule_requests(
+    *,
+    name: str,
+    args: dict[str, Any],
+    schedule_db: Session | None,
+    user: AuthUser | None,
+    **_: Any,
+) -> dict[str, Any]:
+    auth_error = _require_admin(user)
+    if auth_error:
+        return {"ok": False, "tool": name, "error": auth_error}
+    if schedule_db is None:
+        return {"ok": False, "tool": name, "error": "Schedule DB is not available."}
+
+    limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
+    raw_status = _safe_str(args.get("status"), max_len=32)
+    status: str | None = None
+    if raw_status:
+        normalized = raw_status.strip().lower()
+        if normalized not in SCHEDULE_REQUEST_STATUSES:
             return {
-                "ok": True,
+                "ok": False,
                 "tool": name,
-                "result": {
-                    "project": {
-                        "id": int(project.id),
-                        "title": project.prj_ProjectTitle,
-                        "status": project.prj_Status,
-                        "links": {"ui": f"/project/{project.id}", "api": f"/api/projects/{project.id}"},
-                    },
-                    "count": len(files),
-                    "total": total,
-                    "by_analysis": by_analysis,
-                    "highlights": highlights,
-                    "files": files,
-                },
+                "error": f"status must be one of {sorted(SCHEDULE_REQUEST_STATUSES)}",
             }
+        status = normalized
 
-        if name == "get_person":
-            person_id = _safe_int(args.get("id"))
-            if person_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
-            person = core_db.get(Person, person_id)
-            if person is None:
-                return {"ok": False, "tool": name, "error": f"Person {person_id} not found."}
-            return {"ok": True, "tool": name, "result": person_summary(person)}
-
-        if name == "search_people":
-            query = _safe_str(args.get("query"), max_len=200)
-            limit = _clamp_int(_safe_int(args.get("limit")), default=5, min_value=1, max_value=20)
-            if not query:
-                return {"ok": False, "tool": name, "error": "Missing string argument: query"}
-
-            matches: list[dict[str, Any]] = []
-            person_id = _safe_int(query)
-            if person_id is not None:
-                person = core_db.get(Person, person_id)
-                if person is not None:
-                    matches.append(person_summary(person))
-                return {"ok": True, "tool": name, "result": {"matches": matches}}
-
-            pattern = f"%{query}%"
-            rows = (
-                core_db.query(Person)
-                .filter(
-                    or_(
-                        Person.ppl_Name_First.ilike(pattern),
-                        Person.ppl_Name_Last.ilike(pattern),
-                        Person.ppl_Email.ilike(pattern),
-                    )
-                )
-                .order_by(Person.id.asc())
-                .limit(limit)
-                .all()
-            )
-            matches.extend(person_summary(person) for person in rows)
-            return {"ok": True, "tool": name, "result": {"matches": matches}}
-
-        if name == "list_schedule_slots":
-            if schedule_db is None:
-                return {"ok": False, "tool": name, "error": "Schedule DB is not available."}
-
-            start = _safe_date(args.get("start"))
-            end = _safe_date(args.get("end"))
-            if start is None or end is None:
-                today = datetime.now(CENTRAL_TZ).date()
-                start = today
-                end = today + timedelta(days=28)
-            if end < start:
-                return {
-                    "ok": False,
-                    "tool": name,
-                    "error": "end must be on or after start (YYYY-MM-DD).",
-                }
+    query = schedule_db.query(ScheduleRequest)
+    if status is not None:
+        query = query.filter(ScheduleRequest.status == status)
+    rows = query.order_by(ScheduleRequest.created_at.desc()).limit(limit).all()
 
-            raw_status = _safe_str(args.get("status"), max_len=32)
-            status: str | None = None
-            if raw_status:
-                normalized = raw_status.strip().lower()
-                if normalized not in SCHEDULE_SLOT_STATUSES:
-                    return {
-                        "ok": False,
-                        "tool": name,
-                        "error": f"status must be one of {sorted(SCHEDULE_SLOT_STATUSES)}",
-                    }
-                status = normalized
+    items: list[dict[str, Any]] = []
+    for row in rows:
+        slot_ids = [link.slot_id for link in sorted(row.slots, key=lambda link: link.rank)]
+        items.append(
+            {
+                "id": int(row.id),
+                "status": row.status,
+                "created_at": _as_utc_aware(row.created_at).isoformat(),
+                "requester_name": row.requester_name,
+                "requester_email": row.requester_email,
+                "requester_org": row.requester_org,
+                "project_title": row.project_title,
+                "cancer_related": bool(row.cancer_related),
+                "slot_ids": slot_ids,
+            }
+        )
 
-            limit = _clamp_int(_safe_int(args.get("limit")), default=50, min_value=1, max_value=500)
+    return {"ok": True, "tool": name, "result": {"count": len(items), "items": items}}
 
-            start_utc, end_utc = _range_bounds_local(start, end)
-            query = (
-                schedule_db.query(ScheduleSlot)
-                .filter(ScheduleSlot.start_at >= start_utc)
-                .filter(ScheduleSlot.start_at <= end_utc)
-            )
-            if status is not None:
-                query = query.filter(ScheduleSlot.status == status)
-            rows = query.order_by(ScheduleSlot.start_at.asc()).limit(limit).all()
-
-            items: list[dict[str, Any]] = []
-            for row in rows:
-                start_utc_aware = _as_utc_aware(row.start_at)
-                end_utc_aware = _as_utc_aware(row.end_at)
-                items.append(
-                    {
-                        "id": int(row.id),
-                        "status": row.status,
-                        "start_at": start_utc_aware.isoformat(),
-                        "end_at": end_utc_aware.isoformat(),
-                        "start_at_central": start_utc_aware.astimezone(CENTRAL_TZ).isoformat(),
-                        "end_at_central": end_utc_aware.astimezone(CENTRAL_TZ).isoformat(),
-                    }
-                )
 
-            return {
-                "ok": True,
-                "tool": name,
-                "result": {
-                    "start": start.isoformat(),
-                    "end": end.isoformat(),
-                    "timezone": str(CENTRAL_TZ),
-                    "count": len(items),
-                    "items": items,
-                },
-            }
+@_tool_handler("get_schedule_request")
+def _tool_get_schedule_request(
+    *,
+    name: str,
+    args: dict[str, Any],
+    schedule_db: Session | None,
+    user: AuthUser | None,
+    **_: Any,
+) -> dict[str, Any]:
+    auth_error = _require_admin(user)
+    if auth_error:
+        return {"ok": False, "tool": name, "error": auth_error}
+    if schedule_db is None:
+        return {"ok": False, "tool": name, "error": "Schedule DB is not available."}
+
+    request_id = _safe_int(args.get("id"))
+    if request_id is None:
+        return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
+    row = schedule_db.get(ScheduleRequest, request_id)
+    if row is None:
+        return {"ok": False, "tool": name, "error": f"Request {request_id} not found."}
 
-        if name == "list_schedule_requests":
-            auth_error = _require_admin(user)
-            if auth_error:
-                return {"ok": False, "tool": name, "error": auth_error}
-            if schedule_db is None:
-                return {"ok": False, "tool": name, "error": "Schedule DB is not available."}
-
-            limit = _clamp_int(_safe_int(args.get("limit")), default=20, min_value=1, max_value=200)
-            raw_status = _safe_str(args.get("status"), max_len=32)
-            status: str | None = None
-            if raw_status:
-                normalized = raw_status.strip().lower()
-                if normalized not in SCHEDULE_REQUEST_STATUSES:
-                    return {
-                        "ok": False,
-                        "tool": name,
-                        "error": f"status must be one of {sorted(SCHEDULE_REQUEST_STATUSES)}",
-                    }
-                status = normalized
-
-            query = schedule_db.query(ScheduleRequest)
-            if status is not None:
-                query = query.filter(ScheduleRequest.status == status)
-            rows = query.order_by(ScheduleRequest.created_at.desc()).limit(limit).all()
-
-            items: list[dict[str, Any]] = []
-            for row in rows:
-                slot_ids = [link.slot_id for link in sorted(row.slots, key=lambda link: link.rank)]
-                items.append(
-                    {
-                        "id": int(row.id),
-                        "status": row.status,
-                        "created_at": _as_utc_aware(row.created_at).isoformat(),
-                        "requester_name": row.requester_name,
-                        "requester_email": row.requester_email,
-                        "requester_org": row.requester_org,
-                        "project_title": row.project_title,
-                        "cancer_related": bool(row.cancer_related),
-                        "slot_ids": slot_ids,
-                    }
-                )
+    slot_ids = [link.slot_id for link in sorted(row.slots, key=lambda link: link.rank)]
+    description = row.project_description or ""
+    if len(description) > 2000:
+        description = description[:1999] + "…"
 
-            return {"ok": True, "tool": name, "result": {"count": len(items), "items": items}}
+    return {
+        "ok": True,
+        "tool": name,
+        "result": {
+            "id": int(row.id),
+            "status": row.status,
+            "created_at": _as_utc_aware(row.created_at).isoformat(),
+            "updated_at": _as_utc_aware(row.updated_at).isoformat(),
+            "requester_name": row.requester_name,
+            "requester_email": row.requester_email,
+            "requester_org": row.requester_org,
+            "requester_phone": row.requester_phone,
+            "project_title": row.project_title,
+            "project_description": description,
+            "cancer_related": bool(row.cancer_related),
+            "slot_ids": slot_ids,
+        },
+    }
 
-        if name == "get_schedule_request":
-            auth_error = _require_admin(user)
-            if auth_error:
-                return {"ok": False, "tool": name, "error": auth_error}
-            if schedule_db is None:
-                return {"ok": False, "tool": name, "error": "Schedule DB is not available."}
 
-            request_id = _safe_int(args.get("id"))
-            if request_id is None:
-                return {"ok": False, "tool": name, "error": "Missing integer argument: id"}
-            row = schedule_db.get(ScheduleRequest, request_id)
-            if row is None:
-                return {"ok": False, "tool": name, "error": f"Request {request_id} not found."}
+def run_tool(
+    *,
+    name: str,
+    args: dict[str, Any],
+    core_db: Session,
+    assistant_db: Session | None = None,
+    agent_db: Session | None = None,
+    schedule_db: Session | None = None,
+    omics_db: Session | None = None,
+    user: AuthUser | None = None,
+    api_schema: dict[str, Any] | None = None,
+    user_message: str | None = None,
+    project_comment_save_authorized: bool = False,
+    support_session_id: str | None = None,
+) -> dict[str, Any]:
+    try:
+        if name == "projects":
+            project_id = _safe_int(args.get("id"))
+            if project_id is None:
+                project_id = _safe_int(args.get("project_id"))
+            if project_id is None:
+                return {"ok": False, "tool": name, "error": "Missing integer argument: id (or project_id)"}
+            name = "get_project"
+            args = {"id": project_id}
 
-            slot_ids = [link.slot_id for link in sorted(row.slots, key=lambda link: link.rank)]
-            description = row.project_description or ""
-            if len(description) > 2000:
-                description = description[:1999] + "…"
+        scope = _TOOL_SCOPES.get(name, ToolScope.staff)
+        scope_error = _scope_error(scope, user)
+        if scope_error:
+            return {"ok": False, "tool": name, "error": scope_error}
+        if _tool_requires_code_access(name):
+            code_tools_enabled, code_tools_reason = _code_tool_access_status(user)
+            if not code_tools_enabled:
+                return {
+                    "ok": False,
+                    "tool": name,
+                    "error": code_tools_reason or "Code tools are unavailable.",
+                }
 
+        entry = TOOL_REGISTRY.get(name)
+        if entry is None or entry.handler is None:
             return {
-                "ok": True,
+                "ok": False,
                 "tool": name,
-                "result": {
-                    "id": int(row.id),
-                    "status": row.status,
-                    "created_at": _as_utc_aware(row.created_at).isoformat(),
-                    "updated_at": _as_utc_aware(row.updated_at).isoformat(),
-                    "requester_name": row.requester_name,
-                    "requester_email": row.requester_email,
-                    "requester_org": row.requester_org,
-                    "requester_phone": row.requester_phone,
-                    "project_title": row.project_title,
-                    "project_description": description,
-                    "cancer_related": bool(row.cancer_related),
-                    "slot_ids": slot_ids,
-                },
+                "error": f"Unknown tool '{name}'.",
+                "available": [
+                    "project_counts_snapshot",
+                    "latest_activity",
+                    "billing_category_counts",
+                    "db_file_stats",
+                    "count_all_projects",
+                    "count_current_projects",
+                    "project_status_counts",
+                    "latest_projects",
+                    "latest_project_comments",
+                    "search_projects",
+                    "get_project",
+                    "search_api",
+                    "repo_list_files",
+                    "repo_search",
+                    "repo_read_file",
+                    "experiments_for_project",
+                    "latest_experiments",
+                    "get_experiment",
+                    "latest_experiment_runs",
+                    "get_experiment_run",
+                    "e2g_search_genes_in_project",
+                    "e2g_gene_in_project",
+                    "search_people",
+                    "get_person",
+                    "list_schedule_slots",
+                    "list_schedule_requests",
+                    "get_schedule_request",
+                ],
             }
 
-        return {
-            "ok": False,
-            "tool": name,
-            "error": f"Unknown tool '{name}'.",
-            "available": [
-                "project_counts_snapshot",
-                "latest_activity",
-                "billing_category_counts",
-                "db_file_stats",
-                "count_all_projects",
-                "count_current_projects",
-                "project_status_counts",
-                "latest_projects",
-                "latest_project_comments",
-                "search_projects",
-                "get_project",
-                "search_api",
-                "repo_list_files",
-                "repo_search",
-                "repo_read_file",
-                "experiments_for_project",
-                "latest_experiments",
-                "get_experiment",
-                "latest_experiment_runs",
-                "get_experiment_run",
-                "e2g_search_genes_in_project",
-                "e2g_gene_in_project",
-                "search_people",
-                "get_person",
-                "list_schedule_slots",
-                "list_schedule_requests",
-                "get_schedule_request",
-            ],
-        }
+        if entry.gate_error is not None:
+            enabled, reason = entry.status()
+            if not enabled:
+                return {
+                    "ok": False,
+                    "tool": name,
+                    "error": reason or entry.gate_error,
+                    "hint": reason or None,
+                }
+
+        started = perf_counter()
+        payload = None
+        try:
+            payload = entry.handler(
+                name=name,
+                args=args,
+                core_db=core_db,
+                assistant_db=assistant_db,
+                agent_db=agent_db,
+                schedule_db=schedule_db,
+                omics_db=omics_db,
+                user=user,
+                api_schema=api_schema,
+                user_message=user_message,
+                project_comment_save_authorized=project_comment_save_authorized,
+                support_session_id=support_session_id,
+            )
+        finally:
+            _record_tool_call(
+                name,
+                (perf_counter() - started) * 1000,
+                ok=isinstance(payload, dict) and bool(payload.get("ok")),
+            )
+        return payload
     except Exception as exc:
         return {
             "ok": False,
@@ -6442,7 +6939,7 @@ _OPENAI_TOOL_SPECS: dict[str, dict[str, Any]] = {
         "type": "function",
         "function": {
             "name": "assistant_stats",
-            "description": "Return internal assistant/support-session stats plus supervisor/orchestrator health.",
+            "description": "Return internal assistant/support-session stats, supervisor/orchestrator health, and rolled-up inference latency/token throughput.",
             "parameters": {"type": "object", "properties": {}},
         },
     },
@@ -7497,49 +7994,126 @@ _OPENAI_TOOL_SPECS: dict[str, dict[str, Any]] = {
 }
 
 
-def openai_tools_for_user(user: AuthUser | None) -> list[dict[str, Any]]:
-    """Return OpenAI-compatible tool schemas, filtered by tool scope."""
+@dataclass(frozen=True)
+class RegisteredTool:
+    """Everything known about one tool, resolved once at import."""
+
+    name: str
+    handler: ToolHandler | None
+    scope: ToolScope
+    writes: bool
+    schema: dict[str, Any] | None
+    # Name of the module-level ``() -> (enabled, reason)`` status function,
+    # looked up per call so deployments (and tests) can change it. With
+    # ``gate_error`` set, run_tool refuses the call up front when unavailable;
+    # other tools report unavailability themselves.
+    availability: str | None = None
+    gate_error: str | None = None
+
+    def status(self) -> tuple[bool, str | None]:
+        if self.availability is None:
+            return True, None
+        return globals()[self.availability]()
+
+
+_TMUX_TOOL_NAMES = (
+    "assistant_list_tmux_panes",
+    "assistant_capture_tmux_pane",
+    "assistant_compare_tmux_pane",
+    "assistant_relay_slack_reply_to_tmux",
+)
+
+
+def _tool_availability(name: str) -> tuple[str | None, str | None]:
+    if name == "assistant_list_scheduled_jobs":
+        return "_assistant_schedule_tools_status", "Assistant schedule-management tools are unavailable."
+    if name in {"assistant_upsert_scheduled_job", "assistant_delete_scheduled_job"}:
+        return "_assistant_schedule_write_tools_status", "Assistant schedule-management tools are unavailable."
+    if name in _TMUX_TOOL_NAMES:
+        return "_tmux_tools_status", "tmux monitoring tools are unavailable."
+    if name == "assistant_enqueue_dev_restart_services":
+        return "_dev_restart_enabled_status", None
+    if name == "assistant_enqueue_slack_message":
+        return "_assistant_slack_tool_status", None
+    if name == "assistant_enqueue_staff_slack_message":
+        return "_staff_slack_tool_status", None
+    if name.startswith("repo_"):
+        return "_repo_tools_enabled_status", None
+    return None, None
+
+
+def _build_tool_registry() -> dict[str, RegisteredTool]:
+    registry: dict[str, RegisteredTool] = {}
+    for tool_name in [*_TOOL_HANDLERS, *(n for n in _OPENAI_TOOL_SPECS if n not in _TOOL_HANDLERS)]:
+        availability, gate_error = _tool_availability(tool_name)
+        registry[tool_name] = RegisteredTool(
+            name=tool_name,
+            handler=_TOOL_HANDLERS.get(tool_name),
+            scope=_TOOL_SCOPES.get(tool_name, ToolScope.staff),
+            writes=tool_name in _WRITE_TOOL_NAMES,
+            schema=_OPENAI_TOOL_SPECS.get(tool_name),
+            availability=availability,
+            gate_error=gate_error,
+        )
+    return registry
+
+
+TOOL_REGISTRY: dict[str, RegisteredTool] = _build_tool_registry()
+# Spec order is the order tools are offered to the model.
+_LISTED_TOOLS: tuple[RegisteredTool, ...] = tuple(
+    TOOL_REGISTRY[tool_name] for tool_name in _OPENAI_TOOL_SPECS
+)
 
+
+@functools.lru_cache(maxsize=128)
+def _openai_tools_for_key(
+    user_kind: str,
+    code_tools_enabled: bool,
+    unavailable: frozenset[str],
+) -> tuple[dict[str, Any], ...]:
+    # ``user_kind`` is "anonymous", "explicit" (project-scoped) or "staff";
+    # scope checks and write-tool rules only depend on that.
     tools: list[dict[str, Any]] = []
-    repo_enabled = _repo_tools_enabled()
-    dev_restart_enabled, _ = _dev_restart_enabled_status()
-    assistant_slack_enabled, _ = _assistant_slack_tool_status()
-    staff_slack_enabled, _ = _staff_slack_tool_status()
-    assistant_schedule_tools_enabled, _ = _assistant_schedule_tools_status()
-    assistant_schedule_write_enabled, _ = _assistant_schedule_write_tools_status()
-    tmux_tools_enabled, _ = _tmux_tools_status()
-    code_tools_enabled, _ = _code_tool_access_status(user)
-    for name, spec in _OPENAI_TOOL_SPECS.items():
-        if _tool_requires_code_access(name) and not code_tools_enabled:
-            continue
-        if name == "assistant_enqueue_dev_restart_services" and not dev_restart_enabled:
-            continue
-        if name == "assistant_enqueue_slack_message" and not assistant_slack_enabled:
-            continue
-        if name == "assistant_enqueue_staff_slack_message" and not staff_slack_enabled:
-            continue
-        if name == "assistant_list_scheduled_jobs" and not assistant_schedule_tools_enabled:
-            continue
-        if name in {"assistant_upsert_scheduled_job", "assistant_delete_scheduled_job"} and not assistant_schedule_write_enabled:
-            continue
-        if name in {
-            "assistant_list_tmux_panes",
-            "assistant_capture_tmux_pane",
-            "assistant_compare_tmux_pane",
-            "assistant_relay_slack_reply_to_tmux",
-        } and not tmux_tools_enabled:
+    for entry in _LISTED_TOOLS:
+        if _tool_requires_code_access(entry.name) and not code_tools_enabled:
             continue
-        if name.startswith("repo_") and not repo_enabled:
+        if entry.name in unavailable:
             continue
-        if name in _WRITE_TOOL_NAMES:
-            if user is None:
+        if entry.writes:
+            if user_kind == "anonymous":
                 continue
-            if uses_explicit_project_access(user) and name != "create_project_comment":
+            if user_kind == "explicit" and entry.name != "create_project_comment":
                 continue
-        scope = _TOOL_SCOPES.get(name, ToolScope.staff)
-        if _scope_error(scope, user) is None:
-            tools.append(spec)
-    return tools
+        if user_kind == "explicit" and entry.scope not in {ToolScope.public, ToolScope.user}:
+            continue
+        tools.append(entry.schema)  # type: ignore[arg-type]
+    return tuple(tools)
+
+
+def openai_tools_for_user(user: AuthUser | None) -> list[dict[str, Any]]:
+    """Return OpenAI-compatible tool schemas, filtered by tool scope.
+
+    Availability checks run once per distinct status function; the filtered
+    list is cached per user kind and availability combination.
+    """
+
+    if user is None:
+        user_kind = "anonymous"
+    elif uses_explicit_project_access(user):
+        user_kind = "explicit"
+    else:
+        user_kind = "staff"
+    code_tools_enabled, _ = _code_tool_access_status(user)
+    statuses: dict[str, bool] = {}
+    unavailable: set[str] = set()
+    for entry in _LISTED_TOOLS:
+        if entry.availability is None:
+            continue
+        if entry.availability not in statuses:
+            statuses[entry.availability] = bool(entry.status()[0])
+        if not statuses[entry.availability]:
+            unavailable.add(entry.name)
+    return list(_openai_tools_for_key(user_kind, code_tools_enabled, frozenset(unavailable)))
 
 
 def openai_tool_names_all() -> set[str]:
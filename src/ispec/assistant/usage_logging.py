@@ -1,17 +1,31 @@
+"""Per-call inference usage events, appended to daily JSONL files.
+
+Events are queued on a :class:`~ispec.logging.writers.JsonlBatchWriter` and
+written by its background thread, so inference calls never wait on disk.
+Pending events are written once ``ISPEC_INFERENCE_USAGE_LOG_BATCH_SIZE`` of
+them are queued or ``ISPEC_INFERENCE_USAGE_LOG_FLUSH_SECONDS`` after the
+oldest one, and on shutdown via :func:`ispec.logging.flush_log_writers`.
+"""
+
 from __future__ import annotations
 
 import json
 import os
+import threading
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 from ispec.config.paths import resolve_log_dir
 from ispec.logging import get_logger
+from ispec.logging.writers import DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_SECONDS, JsonlBatchWriter
 
 
 logger = get_logger(__name__)
 
+_writer_lock = threading.Lock()
+_writer: JsonlBatchWriter | None = None
+
 
 def inference_usage_logging_enabled() -> bool:
     raw = str(os.getenv("ISPEC_INFERENCE_USAGE_LOG_ENABLED") or "").strip().lower()
@@ -28,6 +42,48 @@ def resolve_inference_usage_log_dir() -> Path:
     return base / "inference-usage"
 
 
+def usage_log_flush_seconds() -> float:
+    raw = (os.getenv("ISPEC_INFERENCE_USAGE_LOG_FLUSH_SECONDS") or "").strip()
+    if not raw:
+        return DEFAULT_FLUSH_SECONDS
+    try:
+        return max(0.0, min(60.0, float(raw)))
+    except ValueError:
+        return DEFAULT_FLUSH_SECONDS
+
+
+def usage_log_batch_size() -> int:
+    raw = (os.getenv("ISPEC_INFERENCE_USAGE_LOG_BATCH_SIZE") or "").strip()
+    if not raw:
+        return DEFAULT_BATCH_SIZE
+    try:
+        return max(1, min(10_000, int(raw)))
+    except ValueError:
+        return DEFAULT_BATCH_SIZE
+
+
+def _usage_writer() -> JsonlBatchWriter:
+    global _writer
+    writer = _writer
+    if writer is not None:
+        return writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = JsonlBatchWriter(
+                name="inference-usage",
+                batch_size=usage_log_batch_size(),
+                flush_seconds=usage_log_flush_seconds(),
+            )
+        return _writer
+
+
+def flush_inference_usage_log(timeout: float = 5.0) -> bool:
+    """Write all queued usage events; return False if ``timeout`` expired first."""
+
+    writer = _writer
+    return True if writer is None else writer.flush(timeout)
+
+
 def _jsonl_path(now: datetime | None = None) -> Path:
     current = now or datetime.now(UTC)
     return resolve_inference_usage_log_dir() / f"usage-{current.strftime('%Y%m%d')}.jsonl"
@@ -85,6 +141,11 @@ def record_inference_usage_event(
             for key, value in fallback.items()
             if isinstance(key, str) and key
         }
+    timing = meta_dict.get("timing")
+    if isinstance(timing, dict):
+        for key in ("connect_ms", "ttfb_ms", "total_ms", "new_connections"):
+            if key in timing:
+                event[key] = _clean_scalar(timing.get(key))
     for key in ("tool_call_dialect", "tool_parser_fallback_used", "tool_parser_fallback_shape"):
         if key in meta_dict:
             event[key] = _clean_scalar(meta_dict.get(key))
@@ -108,10 +169,4 @@ def record_inference_usage_event(
         if key in context:
             event[key] = _clean_scalar(context.get(key))
 
-    path = _jsonl_path(now)
-    try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(event, ensure_ascii=False, sort_keys=True) + "\n")
-    except Exception:
-        logger.exception("Failed to append inference usage event to %s", path)
+    _usage_writer().write(_jsonl_path(now), json.dumps(event, ensure_ascii=False, sort_keys=True))
@@ -0,0 +1,429 @@
+"""Latency and token-throughput analytics over the inference usage JSONL logs.
+
+:mod:`ispec.assistant.usage_logging` appends one line per inference call to
+``usage-YYYYMMDD.jsonl``. This module reads those files back one line at a
+time and aggregates them by hour and by ``(provider, model, surface, stage)``:
+
+- call and error counts
+- fallback counts
+- latency percentiles from a log-bucketed histogram (about 2% relative error)
+- prompt and completion tokens per second of call time
+
+The histogram's memory is bounded by the latency range, not the call count.
+
+A :class:`UsageLogScanner` remembers how far it has read each file and the
+partial aggregates so far. Repeated scans only parse lines appended since the
+last scan. The supervisor uses one to refresh ``usage-summary.json`` on a
+poll. The ``assistant_stats`` tool and the ops snapshot serve that file via
+:func:`load_usage_summary` without touching the logs.
+
+Time windows have hour granularity. An hour is included when any part of it
+falls inside ``[since, until)``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable
+
+from ispec.assistant.usage_logging import resolve_inference_usage_log_dir
+from ispec.logging import get_logger
+
+logger = get_logger(__name__)
+
+DIMENSIONS = ("provider", "model", "surface", "stage")
+DEFAULT_GROUP_BY = ("surface", "stage", "model")
+DEFAULT_WINDOW_HOURS = 24
+DEFAULT_SUMMARY_GROUPS = 50
+SUMMARY_FILENAME = "usage-summary.json"
+BUCKETS = ("hour", "day")
+
+_GROWTH = 1.04
+_LOG_GROWTH = math.log(_GROWTH)
+_HOUR_FORMAT = "%Y-%m-%dT%H"
+
+
+class LatencyHistogram:
+    """Sparse histogram over geometrically sized buckets; mergeable."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        value = max(0.0, float(value))
+        idx = 0 if value <= 1.0 else math.ceil(math.log(value) / _LOG_GROWTH)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for idx, count in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                # Geometric midpoint of (G**(idx-1), G**idx]: within ~2% of any value in it.
+                return min(self.max, _GROWTH ** (idx - 0.5) if idx else 1.0)
+        return self.max
+
+    def summary(self, quantiles: Iterable[int] = (50, 95, 99)) -> dict[str, Any] | None:
+        if not self.count:
+            return None
+        out: dict[str, Any] = {f"p{q}": round(self.percentile(q) or 0.0, 1) for q in quantiles}
+        out["mean"] = round(self.total / self.count, 1)
+        out["max"] = round(self.max, 1)
+        return out
+
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+@dataclass
+class UsageStats:
+    calls: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    tool_parser_fallbacks: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Call time of the calls that reported token usage, for per-second rates.
+    token_seconds: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ttfb: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def add(self, event: dict[str, Any]) -> None:
+        self.calls += 1
+        if event.get("ok") is False:
+            self.errors += 1
+        if isinstance(event.get("fallback"), dict) and event["fallback"]:
+            self.fallbacks += 1
+        if event.get("tool_parser_fallback_used") is True:
+            self.tool_parser_fallbacks += 1
+        latency = _number(event.get("total_ms"))
+        if latency is None:
+            latency = _number(event.get("elapsed_ms"))
+        if latency is not None:
+            self.latency.add(latency)
+        ttfb = _number(event.get("ttfb_ms"))
+        if ttfb is not None:
+            self.ttfb.add(ttfb)
+        usage = event.get("usage")
+        if isinstance(usage, dict):
+            prompt = _number(usage.get("prompt_tokens")) or 0.0
+            completion = _number(usage.get("completion_tokens")) or 0.0
+            self.prompt_tokens += int(prompt)
+            self.completion_tokens += int(completion)
+            if latency and (prompt or completion):
+                self.token_seconds += latency / 1000.0
+
+    def merge(self, other: "UsageStats") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.fallbacks += other.fallbacks
+        self.tool_parser_fallbacks += other.tool_parser_fallbacks
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.token_seconds += other.token_seconds
+        self.latency.merge(other.latency)
+        self.ttfb.merge(other.ttfb)
+
+    def as_dict(self) -> dict[str, Any]:
+        def per_second(tokens: int) -> float | None:
+            return round(tokens / self.token_seconds, 1) if self.token_seconds > 0 else None
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else None,
+            "fallbacks": self.fallbacks,
+            "tool_parser_fallbacks": self.tool_parser_fallbacks,
+            "latency_ms": self.latency.summary(),
+            "ttfb_ms": self.ttfb.summary((50, 95)),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_tokens_per_second": per_second(self.prompt_tokens),
+            "completion_tokens_per_second": per_second(self.completion_tokens),
+        }
+
+
+# (hour key "YYYY-MM-DDTHH", provider, model, surface, stage) -> stats
+_BucketKey = tuple[str, str | None, str | None, str | None, str | None]
+
+
+@dataclass
+class _FileState:
+    inode: tuple[int, int]
+    offset: int = 0
+    lines: int = 0
+    skipped: int = 0
+    buckets: dict[_BucketKey, UsageStats] = field(default_factory=dict)
+
+
+def _dimension(event: dict[str, Any], name: str) -> str | None:
+    value = event.get(name)
+    if value is None:
+        return None
+    return str(value)
+
+
+def _file_day(path: Path) -> str | None:
+    stem = path.stem
+    if not stem.startswith("usage-"):
+        return None
+    day = stem[len("usage-") :]
+    return day if len(day) == 8 and day.isdigit() else None
+
+
+class UsageLogScanner:
+    """Incrementally aggregates usage log files, resuming from the last offset."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._files: dict[Path, _FileState] = {}
+
+    def _read(self, path: Path) -> _FileState | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            self._files.pop(path, None)
+            return None
+        inode = (stat.st_dev, stat.st_ino)
+        state = self._files.get(path)
+        if state is None or state.inode != inode or stat.st_size < state.offset:
+            state = _FileState(inode=inode)
+            self._files[path] = state
+        if stat.st_size == state.offset:
+            return state
+        with path.open("rb") as handle:
+            handle.seek(state.offset)
+            for raw in handle:
+                if not raw.endswith(b"\n"):
+                    break  # partially written line; picked up on the next scan
+                state.offset += len(raw)
+                try:
+                    event = json.loads(raw)
+                except ValueError:
+                    state.skipped += 1
+                    continue
+                ts = event.get("ts_utc") if isinstance(event, dict) else None
+                if not isinstance(ts, str) or len(ts) < 13:
+                    state.skipped += 1
+                    continue
+                key = (ts[:13], *(_dimension(event, name) for name in DIMENSIONS))
+                stats = state.buckets.get(key)
+                if stats is None:
+                    stats = state.buckets[key] = UsageStats()
+                stats.add(event)
+                state.lines += 1
+        return state
+
+    def scan(
+        self,
+        log_dir: Path,
+        *,
+        since: datetime,
+        until: datetime,
+    ) -> tuple[dict[_BucketKey, UsageStats], dict[str, int]]:
+        """Return per-hour, per-dimension stats for ``[since, until)`` plus scan counters."""
+
+        first_day = since.strftime("%Y%m%d")
+        last_day = until.strftime("%Y%m%d")
+        first_hour = since.strftime(_HOUR_FORMAT)
+        last_hour = until.strftime(_HOUR_FORMAT)
+        paths = sorted(
+            path
+            for path in log_dir.glob("usage-*.jsonl")
+            if (day := _file_day(path)) is not None and first_day <= day <= last_day
+        )
+        merged: dict[_BucketKey, UsageStats] = {}
+        counters = {"files": 0, "lines": 0, "skipped": 0}
+        with self._lock:
+            for stale in set(self._files) - set(paths):
+                del self._files[stale]
+            for path in paths:
+                state = self._read(path)
+                if state is None:
+                    continue
+                counters["files"] += 1
+                counters["lines"] += state.lines
+                counters["skipped"] += state.skipped
+                for key, stats in state.buckets.items():
+                    if not first_hour <= key[0] <= last_hour:
+                        continue
+                    target = merged.get(key)
+                    if target is None:
+                        target = merged[key] = UsageStats()
+                    target.merge(stats)
+        return merged, counters
+
+
+def _parse_group_by(group_by: Iterable[str] | str | None) -> tuple[str, ...]:
+    if group_by is None:
+        return DEFAULT_GROUP_BY
+    names = group_by.split(",") if isinstance(group_by, str) else list(group_by)
+    cleaned = tuple(name.strip().lower() for name in names if name and name.strip())
+    unknown = [name for name in cleaned if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown usage report dimension(s): {', '.join(unknown)}")
+    return cleaned
+
+
+def _series_key(hour: str, bucket: str) -> str:
+    return hour[:10] if bucket == "day" else hour + ":00"
+
+
+def build_usage_report(
+    *,
+    log_dir: Path | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    hours: int = DEFAULT_WINDOW_HOURS,
+    group_by: Iterable[str] | str | None = None,
+    bucket: str = "hour",
+    scanner: UsageLogScanner | None = None,
+) -> dict[str, Any]:
+    """Aggregate usage events in a time window.
+
+    ``groups`` rolls the whole window up by ``group_by`` (a subset of
+    :data:`DIMENSIONS`), busiest first. ``series`` holds totals per ``hour``
+    or ``day``, oldest first. Without ``since``, the window covers the last
+    ``hours`` hours up to ``until``, which defaults to now. A ``scanner`` is
+    reused across calls so it only reads new lines.
+    """
+
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    dims = _parse_group_by(group_by)
+    until = (until or datetime.now(UTC)).astimezone(UTC)
+    since = (since or until - timedelta(hours=max(1, int(hours)))).astimezone(UTC)
+    directory = Path(log_dir) if log_dir is not None else resolve_inference_usage_log_dir()
+    buckets, counters = (scanner or UsageLogScanner()).scan(directory, since=since, until=until)
+
+    totals = UsageStats()
+    groups: dict[tuple[str | None, ...], UsageStats] = {}
+    series: dict[str, UsageStats] = {}
+    for key, stats in buckets.items():
+        values = dict(zip(DIMENSIONS, key[1:]))
+        totals.merge(stats)
+        group_key = tuple(values[name] for name in dims)
+        groups.setdefault(group_key, UsageStats()).merge(stats)
+        series.setdefault(_series_key(key[0], bucket), UsageStats()).merge(stats)
+
+    return {
+        "generated_at": datetime.now(UTC).isoformat(),
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "log_dir": str(directory),
+        "group_by": list(dims),
+        "bucket": bucket,
+        **counters,
+        "totals": totals.as_dict(),
+        "groups": [
+            {**dict(zip(dims, group_key)), **stats.as_dict()}
+            for group_key, stats in sorted(groups.items(), key=lambda item: (-item[1].calls, str(item[0])))
+        ],
+        "series": [{"bucket": name, **series[name].as_dict()} for name in sorted(series)],
+    }
+
+
+def usage_summary_path(log_dir: Path | None = None) -> Path:
+    directory = Path(log_dir) if log_dir is not None else resolve_inference_usage_log_dir()
+    return directory / SUMMARY_FILENAME
+
+
+def write_usage_summary(report: dict[str, Any], path: Path | None = None) -> Path:
+    """Atomically write ``report`` (groups capped at :data:`DEFAULT_SUMMARY_GROUPS`)."""
+
+    target = Path(path) if path is not None else usage_summary_path(Path(report["log_dir"]))
+    compact = dict(report)
+    compact["groups_total"] = len(report.get("groups") or [])
+    compact["groups"] = list(report.get("groups") or [])[:DEFAULT_SUMMARY_GROUPS]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(compact, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, target)
+    return target
+
+
+_scanner = UsageLogScanner()
+
+
+def refresh_usage_summary(*, hours: int = DEFAULT_WINDOW_HOURS, log_dir: Path | None = None) -> dict[str, Any]:
+    """Rebuild the rolled-up summary file from the process-wide incremental scanner."""
+
+    report = build_usage_report(log_dir=log_dir, hours=hours, scanner=_scanner)
+    path = write_usage_summary(report)
+    return {"path": str(path), "calls": report["totals"]["calls"], "files": report["files"]}
+
+
+def usage_summary_digest(summary: dict[str, Any] | None, *, top: int = 10) -> dict[str, Any] | None:
+    """The headline numbers of a summary: window, totals and the ``top`` busiest groups."""
+
+    if not isinstance(summary, dict):
+        return None
+    return {
+        "generated_at": summary.get("generated_at"),
+        "since": summary.get("since"),
+        "until": summary.get("until"),
+        "group_by": summary.get("group_by"),
+        "totals": summary.get("totals"),
+        "groups": list(summary.get("groups") or [])[: max(0, int(top))],
+        "groups_total": summary.get("groups_total"),
+    }
+
+
+_summary_lock = threading.Lock()
+_summary_cache: dict[Path, tuple[tuple[int, int, int], dict[str, Any]]] = {}
+
+
+def load_usage_summary(path: Path | None = None) -> dict[str, Any] | None:
+    """Return the last written summary, or ``None`` if none exists yet.
+
+    The parsed file is kept until it is replaced or modified, so callers can
+    read it on every request.
+    """
+
+    target = Path(path) if path is not None else usage_summary_path()
+    try:
+        stat = target.stat()
+    except OSError:
+        return None
+    version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _summary_lock:
+        cached = _summary_cache.get(target)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    try:
+        data = json.loads(target.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.warning("Could not read inference usage summary %s", target)
+        return None
+    if not isinstance(data, dict):
+        return None
+    with _summary_lock:
+        _summary_cache[target] = (version, data)
+    return data
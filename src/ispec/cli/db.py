@@ -204,6 +204,52 @@ def register_subcommands(subparsers):
         action="store_true",
         help="Delete existing E2G rows for affected ExperimentRuns and re-import.",
     )
+    import_e2g_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parser processes; >1 parses TSVs in parallel while one writer updates the DB (default: 1).",
+    )
+
+    search_index_parser = subparsers.add_parser(
+        "rebuild-search-index",
+        help="Create or rebuild the full-text (FTS5) search indexes for q= and /options",
+    )
+    search_index_parser.add_argument(
+        "--database",
+        dest="database",
+        help="SQLite database URL or filesystem path (defaults to ISPEC_DB_PATH/default)",
+    )
+    search_index_parser.add_argument(
+        "--table",
+        dest="tables",
+        action="append",
+        default=[],
+        help="Table to index (repeatable; default: project, person, project_comment, letter_of_support).",
+    )
+
+    backfill_groups_parser = subparsers.add_parser(
+        "backfill-gene-groups",
+        help="Populate canonical gene_group keys on existing E2G rows",
+    )
+    backfill_groups_parser.add_argument(
+        "--database",
+        dest="database",
+        help="SQLite database URL or filesystem path (defaults to ISPEC_DB_PATH/default)",
+    )
+    _add_analysis_database_args(backfill_groups_parser)
+    backfill_groups_parser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="Recompute keys for every row (use after changing the gene mapping file).",
+    )
+    backfill_groups_parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=5000,
+        help="Rows updated per transaction (default: 5000).",
+    )
 
     import_volcano_parser = subparsers.add_parser(
         "import-volcano", help="Import a gene-level volcano TSV (contrast stats)"
@@ -497,6 +543,12 @@ def register_subcommands(subparsers):
         action="store_true",
         help="Delete existing PSM rows for affected ExperimentRuns and re-import.",
     )
+    import_psm_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parser processes; >1 parses files in parallel while one writer updates the DB (default: 1).",
+    )
 
     scaffold_import_script_parser = subparsers.add_parser(
         "scaffold-import-script",
@@ -1147,6 +1199,26 @@ def register_subcommands(subparsers):
         dest="archive_journal_mode",
         help="Optional journal mode override for the archive DB (e.g. DELETE on removable storage).",
     )
+    archive_agent_logs_parser.add_argument(
+        "--compress-json",
+        dest="compress_json",
+        action="store_true",
+        help="Store large JSON payloads zstd-compressed in the archive DB (requires zstandard).",
+    )
+    archive_agent_logs_parser.add_argument(
+        "--vacuum-pages",
+        dest="vacuum_pages",
+        type=int,
+        default=None,
+        help="Free pages to release with incremental VACUUM after pruning (default: all).",
+    )
+    archive_agent_logs_parser.add_argument(
+        "--no-vacuum",
+        dest="vacuum",
+        action="store_false",
+        default=True,
+        help="Skip the incremental VACUUM of the live DB after pruning.",
+    )
 
 
 def dispatch(args):
@@ -1197,8 +1269,23 @@ def dispatch(args):
             store_metadata=bool(getattr(args, "store_metadata", False)),
             skip_imported=bool(getattr(args, "skip_imported", True)),
             force=bool(getattr(args, "force", False)),
+            workers=int(getattr(args, "workers", 1) or 1),
         )
         logger.info("E2G import summary: %s", summary)
+    elif args.subcommand == "rebuild-search-index":
+        summary = operations.rebuild_search_index(
+            db_file_path=getattr(args, "database", None),
+            tables=list(getattr(args, "tables", []) or []) or None,
+        )
+        logger.info("search index rebuild summary: %s", summary)
+    elif args.subcommand == "backfill-gene-groups":
+        summary = operations.backfill_e2g_gene_groups(
+            db_file_path=getattr(args, "database", None),
+            omics_db_file_path=_analysis_database_arg_value(args),
+            recompute=bool(getattr(args, "recompute", False)),
+            batch_size=int(getattr(args, "batch_size", 5000) or 5000),
+        )
+        logger.info("E2G gene-group backfill summary: %s", summary)
     elif args.subcommand == "import-volcano":
         summary = operations.import_gene_contrasts(
             project_id=int(getattr(args, "project_id")),
@@ -1258,6 +1345,7 @@ def dispatch(args):
             store_metadata=bool(getattr(args, "store_metadata", False)),
             skip_imported=bool(getattr(args, "skip_imported", True)),
             force=bool(getattr(args, "force", False)),
+            workers=int(getattr(args, "workers", 1) or 1),
         )
         logger.info("PSM import summary: %s", summary)
     elif args.subcommand == "scaffold-import-script":
@@ -1447,6 +1535,9 @@ def dispatch(args):
             archive_events=bool(getattr(args, "archive_events", True)),
             archive_commands=bool(getattr(args, "archive_commands", True)),
             archive_journal_mode=getattr(args, "archive_journal_mode", None),
+            compress_json=bool(getattr(args, "compress_json", False)),
+            vacuum_pages=getattr(args, "vacuum_pages", None),
+            vacuum=bool(getattr(args, "vacuum", True)),
         )
         logger.info("agent log archive summary: %s", summary)
     else:
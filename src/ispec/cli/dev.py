@@ -1,14 +1,18 @@
 """Dev helpers for controlling local iSPEC services (tmux-based).
 
 These are intentionally lightweight wrappers around the top-level Makefile +
-tmux layout used by `scripts/dev-tmux.sh`.
+tmux layout used by `scripts/dev-tmux.sh`. ``import-time`` reports the
+cold-start import cost of a CLI command from ``python -X importtime``.
 """
 
 from __future__ import annotations
 
+import json
 import os
 from pathlib import Path
+import re
 import subprocess
+import sys
 
 from ispec.logging import get_logger
 
@@ -105,8 +109,114 @@ def register_subcommands(subparsers) -> None:
         help="Path to the directory containing the top-level Makefile (auto-detected by default).",
     )
 
+    import_time_parser = subparsers.add_parser(
+        "import-time",
+        help="Report the import cost of `ispec <command> --help` (python -X importtime)",
+    )
+    import_time_parser.add_argument(
+        "cli_command",
+        nargs="*",
+        help="CLI words to measure, e.g. `config` or `db status` (default: no command).",
+    )
+    import_time_parser.add_argument("--top", type=int, default=15, help="Modules to list (default: 15).")
+    import_time_parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Exit non-zero when the total import time exceeds this many milliseconds.",
+    )
+    import_time_parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> list[dict[str, object]]:
+    """Parse ``-X importtime`` lines into ``{module, self_us, cumulative_us, depth}`` rows."""
+
+    rows: list[dict[str, object]] = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        rows.append(
+            {
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            }
+        )
+    return rows
+
+
+def import_time_report(rows: list[dict[str, object]], *, top: int = 15) -> dict[str, object]:
+    total_us = sum(int(row["cumulative_us"]) for row in rows if row["depth"] == 0)
+    ispec_modules = [row for row in rows if str(row["module"]).startswith("ispec")]
+    slowest = sorted(rows, key=lambda row: int(row["self_us"]), reverse=True)[: max(0, int(top))]
+    heaviest_ispec = sorted(ispec_modules, key=lambda row: int(row["cumulative_us"]), reverse=True)
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(rows),
+        "slowest_self": [
+            {"module": row["module"], "self_ms": round(int(row["self_us"]) / 1000, 1)} for row in slowest
+        ],
+        "heaviest_ispec": [
+            {"module": row["module"], "cumulative_ms": round(int(row["cumulative_us"]) / 1000, 1)}
+            for row in heaviest_ispec[: max(0, int(top))]
+        ],
+    }
+
+
+def _measure_import_time(cli_words: list[str]) -> list[dict[str, object]]:
+    argv = ["ispec", *cli_words, "--help"]
+    code = (
+        "import sys\n"
+        f"sys.argv = {argv!r}\n"
+        "from ispec.cli.main import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows = parse_importtime(proc.stderr or "")
+    if not rows:
+        raise SystemExit(f"No -X importtime output (exit {proc.returncode}): {(proc.stderr or '').strip()[-500:]}")
+    return rows
+
+
+def _import_time(args) -> None:
+    words = list(getattr(args, "cli_command", []) or [])
+    report = import_time_report(_measure_import_time(words), top=args.top)
+    report["command"] = " ".join(["ispec", *words])
+    budget = getattr(args, "budget_ms", None)
+    if budget is not None:
+        report["budget_ms"] = float(budget)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['command']}: {report['total_ms']} ms across {report['modules']} modules")
+        print("Slowest modules (self):")
+        for row in report["slowest_self"]:
+            print(f"  {row['self_ms']:>8.1f} ms  {row['module']}")
+        print("Heaviest ispec modules (cumulative):")
+        for row in report["heaviest_ispec"]:
+            print(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+    if budget is not None and float(report["total_ms"]) > float(budget):
+        raise SystemExit(f"Import time {report['total_ms']} ms exceeds budget {float(budget)} ms")
+
 
 def dispatch(args) -> None:
+    if args.subcommand == "import-time":
+        _import_time(args)
+        return
     if args.subcommand != "restart":
         raise SystemExit(f"Unknown dev subcommand: {args.subcommand}")
 
@@ -1,31 +1,44 @@
 # ispec/cli/main.py
 import argparse
+import importlib
 import sys
 
 from ispec.cli.env import extract_env_files, load_env_files
 
 
+# Top-level commands: name -> (module under ``ispec.cli``, help). Only the
+# module of the command being run is imported, so ``ispec config ...`` does not
+# pay for the supervisor, assistant tools or pandas.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "db": ("db", "Database operations"),
+    "api": ("api", "api control"),
+    "dev": ("dev", "Dev helpers (tmux, import-time report)"),
+    "backup": ("backup", "Operational backup helpers"),
+    "prompt": ("prompt", "Prompt registry helpers"),
+    "auth": ("auth", "Authentication/user helpers"),
+    "logging": ("logging", "Logging utilities"),
+    "agent": ("agent", "Local agent helpers"),
+    "slack": ("slack", "Slack bot helpers"),
+    "support": ("support", "Support assistant helpers"),
+    "config": ("config", "Config/env auditing and initialization helpers"),
+    "supervisor": ("supervisor", "Supervisor loop helpers"),
+}
+
+
+def _selected_command(argv):
+    for token in argv:
+        if token.startswith("-"):
+            continue
+        return token if token in COMMANDS else None
+    return None
+
+
 def main():
 
     env_files, argv = extract_env_files(sys.argv[1:])
     if env_files:
         load_env_files(env_files, override=True)
 
-    from ispec.cli import (
-        prompt,
-        agent,
-        api,
-        auth,
-        backup,
-        dev,
-        config as config_cli,
-        db,
-        logging as logging_cli,
-        slack,
-        support,
-        supervisor,
-    )
-
     parser = argparse.ArgumentParser(prog="ispec", description="iSPEC CLI toolkit")
     parser.add_argument(
         "--env-file",
@@ -38,85 +51,18 @@ def main():
     )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    db_parser = subparsers.add_parser("db", help="Database operations")
-    db_subparsers = db_parser.add_subparsers(dest="subcommand", required=True)
-    db.register_subcommands(db_subparsers)
-
-    api_parser = subparsers.add_parser("api", help="api control")
-    api_subparsers = api_parser.add_subparsers(dest="subcommand", required=True)
-    api.register_subcommands(api_subparsers)
-
-    dev_parser = subparsers.add_parser("dev", help="Dev helpers (tmux)")
-    dev_subparsers = dev_parser.add_subparsers(dest="subcommand", required=True)
-    dev.register_subcommands(dev_subparsers)
-
-    backup_parser = subparsers.add_parser("backup", help="Operational backup helpers")
-    backup_subparsers = backup_parser.add_subparsers(dest="subcommand", required=True)
-    backup.register_subcommands(backup_subparsers)
-
-    prompt_parser = subparsers.add_parser("prompt", help="Prompt registry helpers")
-    prompt_subparsers = prompt_parser.add_subparsers(dest="subcommand", required=True)
-    prompt.register_subcommands(prompt_subparsers)
-
-    auth_parser = subparsers.add_parser("auth", help="Authentication/user helpers")
-    auth_subparsers = auth_parser.add_subparsers(dest="subcommand", required=True)
-    auth.register_subcommands(auth_subparsers)
-
-    logging_parser = subparsers.add_parser("logging", help="Logging utilities")
-    logging_subparsers = logging_parser.add_subparsers(
-        dest="subcommand", required=True
-    )
-    logging_cli.register_subcommands(logging_subparsers)
-
-    agent_parser = subparsers.add_parser("agent", help="Local agent helpers")
-    agent_subparsers = agent_parser.add_subparsers(dest="subcommand", required=True)
-    agent.register_subcommands(agent_subparsers)
-
-    slack_parser = subparsers.add_parser("slack", help="Slack bot helpers")
-    slack_subparsers = slack_parser.add_subparsers(dest="subcommand", required=True)
-    slack.register_subcommands(slack_subparsers)
-
-    support_parser = subparsers.add_parser("support", help="Support assistant helpers")
-    support_subparsers = support_parser.add_subparsers(dest="subcommand", required=True)
-    support.register_subcommands(support_subparsers)
-
-    config_parser = subparsers.add_parser(
-        "config", help="Config/env auditing and initialization helpers"
-    )
-    config_subparsers = config_parser.add_subparsers(dest="subcommand", required=True)
-    config_cli.register_subcommands(config_subparsers)
-
-    supervisor_parser = subparsers.add_parser("supervisor", help="Supervisor loop helpers")
-    supervisor_subparsers = supervisor_parser.add_subparsers(dest="subcommand", required=True)
-    supervisor.register_subcommands(supervisor_subparsers)
+    selected = _selected_command(argv)
+    module = None
+    for name, (module_name, help_text) in COMMANDS.items():
+        command_parser = subparsers.add_parser(name, help=help_text)
+        if name != selected:
+            continue
+        module = importlib.import_module(f"ispec.cli.{module_name}")
+        command_subparsers = command_parser.add_subparsers(dest="subcommand", required=True)
+        module.register_subcommands(command_subparsers)
 
     args = parser.parse_args(argv)
-
-    # can expand this later, can use a hashmap/dict lookup if becomes larger
-    if args.command == "db":
-        db.dispatch(args)
-    elif args.command == "api":
-        api.dispatch(args)
-    elif args.command == "dev":
-        dev.dispatch(args)
-    elif args.command == "backup":
-        backup.dispatch(args)
-    elif args.command == "prompt":
-        prompt.dispatch(args)
-    elif args.command == "auth":
-        auth.dispatch(args)
-    elif args.command == "logging":
-        logging_cli.dispatch(args)
-    elif args.command == "agent":
-        agent.dispatch(args)
-    elif args.command == "slack":
-        slack.dispatch(args)
-    elif args.command == "support":
-        support.dispatch(args)
-    elif args.command == "config":
-        config_cli.dispatch(args)
-    elif args.command == "supervisor":
-        supervisor.dispatch(args)
+    module.dispatch(args)
 
 
 if __name__ == "__main__":
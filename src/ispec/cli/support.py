@@ -4,6 +4,9 @@ This is intentionally a minimal, one-shot dev interface that talks to the same
 HTTP endpoints used by the UI and Slack bridge:
   - POST /api/support/chat
   - POST /api/support/choose
+
+``usage-report`` works locally instead: it aggregates the inference usage
+JSONL logs (see :mod:`ispec.assistant.usage_report`).
 """
 
 from __future__ import annotations
@@ -14,6 +17,8 @@ import sys
 import time
 import uuid
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
 from typing import Any
 
 import requests
@@ -90,6 +95,41 @@ def register_subcommands(subparsers) -> None:
         help="Print the raw JSON response (instead of just the message text).",
     )
 
+    report_parser = subparsers.add_parser(
+        "usage-report",
+        help="Summarise inference latency, token throughput and errors from the usage logs",
+    )
+    report_parser.add_argument(
+        "--hours",
+        type=int,
+        default=24,
+        help="Window length ending at --until (default: 24)",
+    )
+    report_parser.add_argument("--since", default=None, help="Window start (ISO 8601, UTC if no offset)")
+    report_parser.add_argument("--until", default=None, help="Window end (ISO 8601, UTC if no offset; default: now)")
+    report_parser.add_argument(
+        "--group-by",
+        default="surface,stage,model",
+        help="Comma-separated dimensions: provider, model, surface, stage (default: surface,stage,model)",
+    )
+    report_parser.add_argument(
+        "--bucket",
+        choices=["hour", "day"],
+        default="hour",
+        help="Granularity of the time series (default: hour)",
+    )
+    report_parser.add_argument(
+        "--log-dir",
+        default=None,
+        help="Usage log directory (default: $ISPEC_INFERENCE_USAGE_LOG_DIR or <log dir>/inference-usage)",
+    )
+    report_parser.add_argument(
+        "--write-summary",
+        action="store_true",
+        help="Also write the rolled-up summary file served by assistant_stats and the ops snapshot.",
+    )
+    report_parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+
 
 def dispatch(args) -> None:
     if args.subcommand == "chat":
@@ -98,6 +138,9 @@ def dispatch(args) -> None:
     if args.subcommand == "choose":
         _cmd_choose(args)
         return
+    if args.subcommand == "usage-report":
+        _cmd_usage_report(args)
+        return
     raise SystemExit(f"Unknown support subcommand: {args.subcommand}")
 
 
@@ -330,3 +373,75 @@ def _cmd_choose(args) -> None:
         print(msg.strip())
         return
     print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def _parse_utc(value: str | None, *, flag: str) -> datetime | None:
+    raw = (value or "").strip()
+    if not raw:
+        return None
+    try:
+        parsed = datetime.fromisoformat(raw)
+    except ValueError as exc:
+        raise SystemExit(f"{flag} must be an ISO 8601 date or datetime: {raw!r}") from exc
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def _fmt(value: Any) -> str:
+    return "-" if value is None else str(value)
+
+
+def _cmd_usage_report(args) -> None:
+    from ispec.assistant.usage_report import build_usage_report, write_usage_summary
+
+    try:
+        report = build_usage_report(
+            log_dir=Path(args.log_dir).expanduser() if args.log_dir else None,
+            since=_parse_utc(args.since, flag="--since"),
+            until=_parse_utc(args.until, flag="--until"),
+            hours=int(args.hours),
+            group_by=args.group_by,
+            bucket=args.bucket,
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    if args.write_summary:
+        path = write_usage_summary(report)
+        print(f"summary={path}", file=sys.stderr)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    totals = report["totals"]
+    latency = totals["latency_ms"] or {}
+    print(f"{report['since']} .. {report['until']}  files={report['files']} lines={report['lines']}")
+    print(
+        f"calls={totals['calls']} errors={totals['errors']} fallbacks={totals['fallbacks']} "
+        f"p50={_fmt(latency.get('p50'))}ms p95={_fmt(latency.get('p95'))}ms p99={_fmt(latency.get('p99'))}ms "
+        f"prompt_tok/s={_fmt(totals['prompt_tokens_per_second'])} "
+        f"completion_tok/s={_fmt(totals['completion_tokens_per_second'])}"
+    )
+    if not report["groups"]:
+        return
+    dims = report["group_by"]
+    header = [*dims, "calls", "err%", "fallbacks", "p50_ms", "p95_ms", "p99_ms", "prompt_tok/s", "compl_tok/s"]
+    rows = []
+    for group in report["groups"]:
+        group_latency = group["latency_ms"] or {}
+        error_rate = group["error_rate"]
+        rows.append(
+            [
+                *(_fmt(group.get(name)) for name in dims),
+                str(group["calls"]),
+                "-" if error_rate is None else f"{error_rate * 100:.1f}",
+                str(group["fallbacks"]),
+                _fmt(group_latency.get("p50")),
+                _fmt(group_latency.get("p95")),
+                _fmt(group_latency.get("p99")),
+                _fmt(group["prompt_tokens_per_second"]),
+                _fmt(group["completion_tokens_per_second"]),
+            ]
+        )
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    print()
+    for row in (header, *rows):
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
@@ -1,2 +1,11 @@
 # __init__.py
-from .connect import get_session
+__all__ = ["get_session"]
+
+
+def __getattr__(name):
+    # Lazy so importing a light submodule does not pull in every ORM model.
+    if name == "get_session":
+        from .connect import get_session
+
+        return get_session
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
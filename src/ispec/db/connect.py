@@ -1,10 +1,15 @@
 # ispec/db/connect.py
 
+import os
+import threading
+from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Iterator
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.engine import Engine
 
@@ -77,6 +82,132 @@ def make_session_factory(engine: Engine):
     return get_session
 
 
+@dataclass
+class _EngineEntry:
+    """A cached engine plus the session factory and counters for one URI."""
+
+    engine: Engine
+    session_factory: sessionmaker
+    path: Path | None
+    file_identity: tuple[int, int] | None = None
+    initializations: int = 0
+    checkouts: int = 0
+    sessions: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_engines_lock = threading.Lock()
+_engines: dict[str, _EngineEntry] = {}
+_engines_created = 0
+
+
+def _file_identity(path: Path | None) -> tuple[int, int] | None:
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+def _create_entry(db_uri: str, path: Path | None) -> _EngineEntry:
+    global _engines_created
+
+    engine = sqlite_engine(db_uri)
+    entry = _EngineEntry(engine=engine, session_factory=sessionmaker(bind=engine), path=path)
+
+    @event.listens_for(engine, "checkout")
+    def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+        entry.checkouts += 1
+
+    _engines_created += 1
+    logger.debug("Created engine for %s", db_uri)
+    return entry
+
+
+def _ensure_initialized(entry: _EngineEntry) -> None:
+    """Run schema creation/migrations once per engine, or again if the file was replaced."""
+
+    if entry.initializations and (entry.path is None or _file_identity(entry.path) == entry.file_identity):
+        return
+    with entry.lock:
+        identity = _file_identity(entry.path)
+        if entry.initializations and (entry.path is None or identity == entry.file_identity):
+            return
+        if entry.initializations:
+            # Pooled connections still point at the old file.
+            entry.engine.dispose()
+        initialize_db(engine=entry.engine)
+        entry.file_identity = _file_identity(entry.path)
+        entry.initializations += 1
+
+
+def get_engine(file_path: str | Path | None = None) -> Engine:
+    """Return the process-wide, schema-initialized engine for a core DB.
+
+    Engines are cached per resolved URI, so connection pooling and the
+    ``create_all``/``_ensure_*`` migrations happen once per database per
+    process rather than on every :func:`get_session`. If the database file
+    is deleted or replaced, the schema is initialized again on next use.
+    """
+
+    return _engine_entry(file_path).engine
+
+
+def _engine_entry(file_path: str | Path | None) -> _EngineEntry:
+    resolved = resolve_db_location("core", file=file_path)
+    path = Path(resolved.path) if resolved.path is not None else None
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    db_uri = resolved.uri or str(resolved.value)
+    if make_url(db_uri).database in (None, "", ":memory:"):
+        # Each in-memory engine is its own database; keep them per call.
+        entry = _create_entry(db_uri, None)
+        _ensure_initialized(entry)
+        return entry
+
+    entry = _engines.get(db_uri)
+    if entry is None:
+        with _engines_lock:
+            entry = _engines.get(db_uri)
+            if entry is None:
+                entry = _create_entry(db_uri, path)
+                _engines[db_uri] = entry
+    _ensure_initialized(entry)
+    return entry
+
+
+def engine_stats() -> dict[str, Any]:
+    """Counters for the engine registry (engine creations, schema inits, checkouts)."""
+
+    with _engines_lock:
+        entries = dict(_engines)
+        created = _engines_created
+    return {
+        "engines_created": created,
+        "engines": {
+            uri: {
+                "initializations": entry.initializations,
+                "sessions": entry.sessions,
+                "checkouts": entry.checkouts,
+                "pool": entry.engine.pool.status(),
+            }
+            for uri, entry in entries.items()
+        },
+    }
+
+
+def dispose_engines() -> None:
+    """Dispose and forget all cached engines (e.g. after ``fork`` or in tests)."""
+
+    with _engines_lock:
+        entries = list(_engines.values())
+        _engines.clear()
+    for entry in entries:
+        entry.engine.dispose()
+
+
 # Session Context Manager
 @contextmanager
 def get_session(file_path: str | Path | None = None) -> Session:
@@ -90,16 +221,9 @@ def get_session(file_path: str | Path | None = None) -> Session:
         :func:`get_db_path` is used.
     """
 
-    resolved = resolve_db_location("core", file=file_path)
-    if resolved.path is not None:
-        Path(resolved.path).parent.mkdir(parents=True, exist_ok=True)
-    db_uri = resolved.uri or str(resolved.value)
-
-    engine = sqlite_engine(db_uri)
-    initialize_db(engine=engine)
-
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
+    entry = _engine_entry(file_path)
+    entry.sessions += 1
+    session = entry.session_factory()
     try:
         yield session
         session.commit()
@@ -4,25 +4,35 @@
 import json
 from typing import Any, Iterable, List, Optional, Sequence
 
-from sqlalchemy import select, func, cast, and_, or_
+from sqlalchemy import bindparam, case, insert, literal_column, select, func, cast, and_, or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import sqltypes as T  # canonical type classes (String, Text, etc.)
 
+from ispec.db import fts
 from ispec.logging import get_logger
 
 # Optional gene identifier normalizer (file-driven; may be None)
 try:
-    from ispec.genomics.identifiers import GeneNormalizer, TackleGeneNormalizer  # type: ignore
+    from ispec.genomics.identifiers import (  # type: ignore
+        GeneNormalizer,
+        TackleGeneNormalizer,
+        gene_group_keys,
+    )
 except Exception:  # pragma: no cover - optional component
     GeneNormalizer = None  # type: ignore
     TackleGeneNormalizer = None  # type: ignore
+    gene_group_keys = None  # type: ignore
 
 _GENE_NORMALIZER = None
+_GENE_NORMALIZER_RESOLVED = False
 
 
 def _get_gene_normalizer():  # pragma: no cover - trivial
-    global _GENE_NORMALIZER
-    if _GENE_NORMALIZER is None:
+    global _GENE_NORMALIZER, _GENE_NORMALIZER_RESOLVED
+    if not _GENE_NORMALIZER_RESOLVED:
+        # Resolve once per process: E2G validation calls this for every row.
+        _GENE_NORMALIZER_RESOLVED = True
         # 1) file-driven mapping via env
         if GeneNormalizer is not None:
             try:
@@ -39,6 +49,20 @@ def _get_gene_normalizer():  # pragma: no cover - trivial
     return _GENE_NORMALIZER
 
 
+def e2g_gene_group_keys(
+    genes: Sequence[str], geneidtypes: Sequence[str], normalizer: Any = None
+) -> list[str]:
+    """Canonical ``E2G.gene_group`` keys using the configured gene normalizer."""
+
+    norm = normalizer if normalizer is not None else _get_gene_normalizer()
+    if gene_group_keys is None:  # pragma: no cover - optional component
+        return [f"{(t or '').strip().lower()}:{(g or '').strip()}" for g, t in zip(genes, geneidtypes)]
+    try:
+        return gene_group_keys(genes, geneidtypes, norm)
+    except Exception:
+        return gene_group_keys(genes, geneidtypes, None)
+
+
 from ispec.db.models import (
     Person,
     Project,
@@ -60,6 +84,52 @@ from ispec.omics.models import E2G, PSM
 logger = get_logger(__file__)
 
 
+def _merge_metadata_json(existing_json: str | None, new_json: str) -> str:
+    """Shallow-merge two JSON object strings, preferring keys from ``new_json``."""
+
+    try:
+        left = json.loads(existing_json) if existing_json else {}
+    except Exception:
+        left = {}
+    try:
+        right = json.loads(new_json)
+    except Exception:
+        return new_json
+    if not isinstance(left, dict) or not isinstance(right, dict):
+        return new_json
+    merged = dict(left)
+    merged.update(right)
+    return json.dumps(merged, ensure_ascii=False, separators=(",", ":"))
+
+
+def _shallow_json_merge(table_name: str):
+    """SQL for an ON CONFLICT update matching :func:`_merge_metadata_json`.
+
+    ``json_patch`` is a recursive RFC 7396 merge that drops null keys, so the
+    merge is rebuilt per top-level key instead: existing keys keep their place
+    and take the incoming value, new keys follow in incoming order.
+    """
+
+    current = f'"{table_name}".metadata_json'
+    incoming = "excluded.metadata_json"
+    # json_each values lose their JSON subtype through the subquery; restore it
+    # so json_group_object does not quote objects or turn booleans into 0/1.
+    return literal_column(
+        "(SELECT json_group_object(key, CASE type"
+        " WHEN 'true' THEN json('true') WHEN 'false' THEN json('false')"
+        " WHEN 'null' THEN json('null') WHEN 'object' THEN json(value)"
+        " WHEN 'array' THEN json(value) ELSE value END) FROM ("
+        " SELECT 0 AS part, c.id AS ord, c.key AS key, coalesce(i.type, c.type) AS type,"
+        " CASE WHEN i.key IS NULL THEN c.value ELSE i.value END AS value"
+        f" FROM json_each({current}) AS c"
+        f" LEFT JOIN json_each({incoming}) AS i ON i.key = c.key"
+        " UNION ALL"
+        f" SELECT 1, i.id, i.key, i.type, i.value FROM json_each({incoming}) AS i"
+        f" WHERE i.key NOT IN (SELECT key FROM json_each({current}))"
+        " ORDER BY part, ord))"
+    )
+
+
 class CRUDBase:
     """Base class providing common CRUD helpers for SQLAlchemy models."""
 
@@ -205,12 +275,14 @@ class CRUDBase:
         # fallback: cast id to text
         return cast(getattr(M, "id"), T.String())
 
-    def search_predicate(self, q: str):
+    def search_predicate(self, q: str, *, session: Session | None = None):
         """Return a SQLAlchemy predicate for ``q`` search.
 
         The generic API routers use this hook to apply ``?q=...`` filtering.
         By default it searches across every string-like column on the model,
-        which provides a FileMaker-style "find across fields" experience.
+        which provides a FileMaker-style "find across fields" experience. When
+        ``session`` is given and the table has an FTS5 index (see
+        :mod:`ispec.db.fts`), the search becomes an indexed token-prefix match.
         """
 
         needle = (q or "").strip()
@@ -218,6 +290,11 @@ class CRUDBase:
             return None
 
         M = self.model
+        if session is not None and fts.has_search_index(session, M):
+            matches = fts.match_ids(M, needle)
+            if matches is not None:
+                return getattr(M, "id").in_(matches)
+
         predicates = []
         for col in M.__table__.columns:
             if col.name == "id":
@@ -257,13 +334,21 @@ class CRUDBase:
         if exclude_ids:
             stmt = stmt.where(~getattr(M, "id").in_(exclude_ids))
 
-        if q:
+        ranked = None
+        if q and fts.has_search_index(db, M):
+            ranked = fts.ranked_matches(M, q)
+        if ranked is not None:
+            # Indexed prefix match over all text columns, best bm25 rank first.
+            stmt = stmt.join(ranked, ranked.c.rowid == getattr(M, "id"))
+        elif q:
             # Case-insensitive match; .ilike turns into LIKE on SQLite (still case-insensitive)
             stmt = stmt.where(lbl.ilike(f"%{q}%"))
 
         # Sort by label unless caller wants something else
         if order == "id":
             stmt = stmt.order_by(getattr(M, "id").asc())
+        elif ranked is not None:
+            stmt = stmt.order_by(ranked.c.rank.asc(), lbl.asc())
         else:
             stmt = stmt.order_by(lbl.asc())
 
@@ -519,6 +604,8 @@ class AssayCRUD(CRUDBase):
 
 
 class E2GCRUD(CRUDBase):
+    _BULK_BATCH_SIZE = 500
+
     def __init__(self):
         super().__init__(
             E2G,
@@ -529,30 +616,67 @@ class E2GCRUD(CRUDBase):
             ],
         )
         self._normalizer = None  # lazy-load to avoid heavy import costs
+        # (db url, experiment_run_id) -> whether the run still has rows without a gene_group.
+        self._unkeyed_runs: dict[tuple[str, int], bool] = {}
+
+    def _run_has_unkeyed_rows(self, session: Session, exp_run_id: int) -> bool:
+        """Whether ``exp_run_id`` has rows predating ``gene_group``, checked once per run.
+
+        New rows always get a key, so the answer can only flip from True to
+        False, and only through :meth:`backfill_gene_groups`, which clears it.
+        """
+
+        cache_key = (str(session.get_bind().url), int(exp_run_id))
+        cached = self._unkeyed_runs.get(cache_key)
+        if cached is None:
+            cached = (
+                session.query(E2G.id)
+                .filter(E2G.experiment_run_id == exp_run_id, E2G.gene_group.is_(None))
+                .first()
+                is not None
+            )
+            self._unkeyed_runs[cache_key] = cached
+        return cached
+
+    def _equivalent_pairs(self, gene: str, geneidtype: str) -> tuple[tuple[str, str], ...]:
+        return self._equivalent_pairs_many([gene], [geneidtype])[0]
+
+    def _equivalent_pairs_many(
+        self, genes: Sequence[str], geneidtypes: Sequence[str]
+    ) -> list[tuple[tuple[str, str], ...]]:
+        """Resolve equivalent pairs for a column of genes in one normalizer call."""
 
-    def _equivalent_pairs(self, gene: str, geneidtype: str) -> list[tuple[str, str]]:
-        pairs = [(geneidtype, gene)]
         norm = self._normalizer or _get_gene_normalizer()
         self._normalizer = norm
+        originals = [((t, g),) for g, t in zip(genes, geneidtypes)]
         if norm is None:
-            return pairs
+            return originals
         try:
-            equivalents = norm.equivalents(gene, geneidtype) or []
-            combined = pairs + list(equivalents)
-            seen: set[tuple[str, str]] = set()
-            out: list[tuple[str, str]] = []
-            for pair in combined:
+            batch = getattr(norm, "equivalents_many", None)
+            if batch is not None:
+                resolved = batch(genes, geneidtypes)
+            else:
+                resolved = [norm.equivalents(g, t) for g, t in zip(genes, geneidtypes)]
+        except Exception:
+            return originals
+
+        out: list[tuple[tuple[str, str], ...]] = []
+        for pairs, equivalents in zip(originals, resolved):
+            if not equivalents or pairs[0] == equivalents[0]:
+                out.append(tuple(equivalents) or pairs)
+                continue
+            combined = dict.fromkeys(pairs)
+            for pair in equivalents:
                 try:
-                    key = (str(pair[0]), str(pair[1]))
+                    combined[(str(pair[0]), str(pair[1]))] = None
                 except Exception:
                     continue
-                if key in seen:
-                    continue
-                seen.add(key)
-                out.append(key)
-            return out or pairs
-        except Exception:
-            return pairs
+            out.append(tuple(combined))
+        return out
+
+    def _gene_group_key(self, gene: str, geneidtype: str) -> str:
+        self._normalizer = self._normalizer or _get_gene_normalizer()
+        return e2g_gene_group_keys([gene], [geneidtype], self._normalizer)[0]
 
     def validate_input(
         self,
@@ -586,22 +710,27 @@ class E2GCRUD(CRUDBase):
         cleaned["label"] = normalize_legacy_label(cleaned.get("label"))
         cleaned["gene"] = gene
         cleaned["geneidtype"] = geneidtype
+        cleaned["gene_group"] = self._gene_group_key(gene, geneidtype)
 
         if allow_existing:
             return cleaned
 
-        # Best-effort duplicate check (per run, identifier, label).
-        pairs = self._equivalent_pairs(gene, geneidtype)
-        conds = [and_(E2G.geneidtype == t, E2G.gene == v) for (t, v) in pairs]
-        dup = (
-            session.query(E2G)
-            .filter(
-                E2G.experiment_run_id == exp_run_id,
-                E2G.label == cleaned["label"],
-                or_(*conds),
-            )
-            .first()
+        # Best-effort duplicate check (per run, identifier, label): one indexed
+        # equality on gene_group, then equivalents among rows not yet
+        # backfilled when the run still has any.
+        scope = (
+            E2G.experiment_run_id == exp_run_id,
+            E2G.label == cleaned["label"],
         )
+        dup = session.query(E2G.id).filter(*scope, E2G.gene_group == cleaned["gene_group"]).first()
+        if dup is None and self._run_has_unkeyed_rows(session, exp_run_int):
+            pairs = self._equivalent_pairs(gene, geneidtype)
+            conds = [and_(E2G.geneidtype == t, E2G.gene == v) for (t, v) in pairs]
+            dup = (
+                session.query(E2G.id)
+                .filter(*scope, E2G.gene_group.is_(None), or_(*conds))
+                .first()
+            )
         if dup:
             return None
 
@@ -638,71 +767,271 @@ class E2GCRUD(CRUDBase):
             "iBAQ_dstrAdj",
             "peptideprint",
             "metadata_json",
+            "gene_group",
         ),
+        key_indexes: dict[tuple[int, str], dict[tuple[str, str], dict[str, Any]]] | None = None,
+        commit: bool = True,
     ) -> dict[str, int]:
-        inserted = 0
-        updated = 0
-
-        def merge_metadata_json(existing_json: str | None, new_json: str) -> str:
-            try:
-                left = json.loads(existing_json) if existing_json else {}
-            except Exception:
-                left = {}
-            try:
-                right = json.loads(new_json)
-            except Exception:
-                return new_json
-            if not isinstance(left, dict) or not isinstance(right, dict):
-                return new_json
-            merged = dict(left)
-            merged.update(right)
-            return json.dumps(merged, ensure_ascii=False, separators=(",", ":"))
+        """Insert or update E2G rows in a set-based pass.
+
+        Records are validated in memory, grouped by ``(experiment_run_id,
+        label)``, and resolved against a key index loaded once per group, so
+        gene-equivalence matching costs one query per run/label instead of one
+        per record. Writes go out as batched executemany statements; inserts use
+        ``ON CONFLICT(uq_e2g_run_gene_type_label) DO UPDATE`` on SQLite so a
+        concurrent writer cannot trip the unique constraint.
+
+        Callers writing one run in several batches can pass the same
+        ``key_indexes`` dict to every call. Indexes are then loaded once and
+        kept current with the rows each call inserts, instead of re-reading
+        every row written so far on each batch. With ``commit=False`` the
+        writes are only flushed, so the caller can commit (or roll back) all
+        batches together.
+        """
 
+        groups: dict[tuple[int, str], list[dict[str, Any]]] = {}
         for rec in records:
             rec = dict(rec)
             rec.setdefault("label", "0")
             validated = self.validate_input(session, rec, allow_existing=True)
             if validated is None:
                 continue
+            validated["label"] = (validated.get("label") or "0").strip()
+            key = (int(validated["experiment_run_id"]), validated["label"])
+            groups.setdefault(key, []).append(validated)
 
-            exp_run_id = validated.get("experiment_run_id")
-            gene = (validated.get("gene") or "").strip()
-            geneidtype = (validated.get("geneidtype") or "").strip()
-            label = (validated.get("label") or "0").strip()
+        inserted = 0
+        updated = 0
+        pending_inserts: list[dict[str, Any]] = []
+        pending_updates: dict[int, dict[str, Any]] = {}
+        indexes = key_indexes if key_indexes is not None else {}
+
+        for (exp_run_id, label), group in groups.items():
+            index = indexes.get((exp_run_id, label))
+            if index is None:
+                index = self._load_key_index(
+                    session, exp_run_id=exp_run_id, label=label, fields=update_fields
+                )
+                indexes[(exp_run_id, label)] = index
+            equivalents = self._equivalent_pairs_many(
+                [validated["gene"] for validated in group],
+                [validated["geneidtype"] for validated in group],
+            )
+            for validated, pairs in zip(group, equivalents):
+                matches = [index[pair] for pair in pairs if pair in index]
+                if not matches:
+                    row = dict(validated)
+                    pending_inserts.append(row)
+                    index[(row["geneidtype"], row["gene"])] = {"id": None, "row": row}
+                    inserted += 1
+                    continue
 
-            pairs = self._equivalent_pairs(gene, geneidtype)
-            conds = [and_(E2G.geneidtype == t, E2G.gene == v) for (t, v) in pairs]
-            existing = (
-                session.query(E2G)
-                .filter(
-                    E2G.experiment_run_id == exp_run_id, E2G.label == label, or_(*conds)
+                # Prefer persisted rows (lowest id, like ``.first()``) over rows
+                # queued earlier in this same batch.
+                entry = min(
+                    matches,
+                    key=lambda item: (item["id"] is None, item["id"] or 0),
                 )
-                .first()
+                changes = self._diff_update_fields(entry["row"], validated, update_fields)
+                if not changes:
+                    continue
+                entry["row"].update(changes)
+                if entry["id"] is not None:
+                    pending_updates.setdefault(entry["id"], {}).update(changes)
+                updated += 1
+
+        self._flush_updates(session, pending_updates)
+        new_ids = self._flush_inserts(session, pending_inserts, update_fields=update_fields)
+        for (exp_run_id, label, geneidtype, gene), row_id in new_ids.items():
+            entry = indexes.get((exp_run_id, label), {}).get((geneidtype, gene))
+            if entry is not None and entry["id"] is None:
+                entry["id"] = row_id
+        if commit:
+            session.commit()
+        else:
+            session.flush()
+        return {"inserted": inserted, "updated": updated}
+
+    def backfill_gene_groups(
+        self,
+        session: Session,
+        *,
+        recompute: bool = False,
+        batch_size: int = 5000,
+    ) -> dict[str, int]:
+        """Populate ``gene_group`` for existing rows, committing per batch.
+
+        Only rows with a NULL key are visited unless ``recompute`` is set (use
+        that after changing the gene mapping file).
+        """
+
+        self._normalizer = self._normalizer or _get_gene_normalizer()
+        batch_size = max(1, int(batch_size))
+        table = E2G.__table__
+        stmt = update(table).where(table.c.id == bindparam("match_id")).values(
+            gene_group=bindparam("new_gene_group")
+        )
+        scanned = 0
+        updated = 0
+        last_id = 0
+        while True:
+            query = (
+                select(E2G.id, E2G.gene, E2G.geneidtype, E2G.gene_group)
+                .where(E2G.id > last_id)
+                .order_by(E2G.id.asc())
+                .limit(batch_size)
+            )
+            if not recompute:
+                query = query.where(E2G.gene_group.is_(None))
+            rows = session.execute(query).all()
+            if not rows:
+                break
+            last_id = int(rows[-1].id)
+            scanned += len(rows)
+            keys = e2g_gene_group_keys(
+                [row.gene for row in rows],
+                [row.geneidtype for row in rows],
+                self._normalizer,
+            )
+            params = [
+                {"match_id": int(row.id), "new_gene_group": key}
+                for row, key in zip(rows, keys)
+                if row.gene_group != key
+            ]
+            if params:
+                session.execute(stmt, params)
+                updated += len(params)
+            session.commit()
+        self._unkeyed_runs.clear()
+        return {"scanned": scanned, "updated": updated}
+
+    def _load_key_index(
+        self,
+        session: Session,
+        *,
+        exp_run_id: int,
+        label: str,
+        fields: Sequence[str],
+    ) -> dict[tuple[str, str], dict[str, Any]]:
+        """Return ``{(geneidtype, gene): {"id", "row"}}`` for one run/label."""
+
+        columns = [E2G.id, E2G.gene, E2G.geneidtype]
+        field_names = [name for name in fields if hasattr(E2G, name)]
+        columns.extend(getattr(E2G, name) for name in field_names)
+        stmt = (
+            select(*columns)
+            .where(E2G.experiment_run_id == exp_run_id, E2G.label == label)
+            .order_by(E2G.id.asc())
+        )
+        index: dict[tuple[str, str], dict[str, Any]] = {}
+        for row in session.execute(stmt):
+            values = dict(zip(field_names, row[3:]))
+            index.setdefault((row.geneidtype, row.gene), {"id": int(row.id), "row": values})
+        return index
+
+    @staticmethod
+    def _diff_update_fields(
+        existing: dict[str, Any],
+        validated: dict[str, Any],
+        update_fields: Sequence[str],
+    ) -> dict[str, Any]:
+        changes: dict[str, Any] = {}
+        for field in update_fields:
+            if field not in validated or not hasattr(E2G, field):
+                continue
+            value = validated[field]
+            if field == "metadata_json" and value is not None:
+                value = _merge_metadata_json(existing.get(field), str(value))
+            if existing.get(field) != value:
+                changes[field] = value
+        return changes
+
+    def _flush_updates(self, session: Session, updates: dict[int, dict[str, Any]]) -> None:
+        if not updates:
+            return
+        table = E2G.__table__
+        # executemany needs a uniform parameter shape; group rows by changed columns.
+        by_shape: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for row_id, changes in updates.items():
+            shape = tuple(sorted(changes))
+            params = {f"new_{name}": value for name, value in changes.items()}
+            params["match_id"] = row_id
+            by_shape.setdefault(shape, []).append(params)
+
+        for shape, params in by_shape.items():
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("match_id"))
+                .values({name: bindparam(f"new_{name}") for name in shape})
             )
-            if existing:
-                changed = False
-                for field in update_fields:
-                    if field not in validated:
-                        continue
-                    if not hasattr(existing, field):
-                        continue
-                    value = validated[field]
-                    if field == "metadata_json" and value is not None:
-                        value = merge_metadata_json(
-                            getattr(existing, field, None), str(value)
+            for start in range(0, len(params), self._BULK_BATCH_SIZE):
+                session.execute(stmt, params[start : start + self._BULK_BATCH_SIZE])
+
+    def _flush_inserts(
+        self,
+        session: Session,
+        rows: list[dict[str, Any]],
+        *,
+        update_fields: Sequence[str],
+    ) -> dict[tuple[int, str, str, str], int]:
+        """Insert ``rows``; return their ids keyed by ``(run, label, geneidtype, gene)``."""
+
+        if not rows:
+            return {}
+        table = E2G.__table__
+        is_sqlite = session.get_bind().dialect.name == "sqlite"
+        by_shape: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for row in rows:
+            by_shape.setdefault(tuple(sorted(row)), []).append(row)
+
+        new_ids: dict[tuple[int, str, str, str], int] = {}
+        for shape, params in by_shape.items():
+            if is_sqlite:
+                stmt = sqlite_insert(table)
+                conflict_fields = [
+                    name for name in update_fields if name in shape and name in table.c
+                ]
+                if conflict_fields:
+                    set_ = {
+                        name: getattr(stmt.excluded, name) for name in conflict_fields
+                    }
+                    if "metadata_json" in set_:
+                        current = table.c.metadata_json
+                        incoming = stmt.excluded.metadata_json
+                        set_["metadata_json"] = case(
+                            (
+                                and_(
+                                    func.json_valid(current) == 1,
+                                    func.json_valid(incoming) == 1,
+                                    func.json_type(current) == "object",
+                                    func.json_type(incoming) == "object",
+                                ),
+                                _shallow_json_merge(table.name),
+                            ),
+                            else_=incoming,
                         )
-                    if getattr(existing, field) != value:
-                        setattr(existing, field, value)
-                        changed = True
-                if changed:
-                    session.add(existing)
-                    updated += 1
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["experiment_run_id", "gene", "geneidtype", "label"],
+                        set_=set_,
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(
+                        index_elements=["experiment_run_id", "gene", "geneidtype", "label"],
+                    )
             else:
-                session.add(self.model(**validated))
-                inserted += 1
-
-        session.commit()
-        return {"inserted": inserted, "updated": updated}
+                stmt = insert(table)
+            stmt = stmt.returning(
+                table.c.id,
+                table.c.experiment_run_id,
+                table.c.label,
+                table.c.geneidtype,
+                table.c.gene,
+            )
+            for start in range(0, len(params), self._BULK_BATCH_SIZE):
+                result = session.execute(stmt, params[start : start + self._BULK_BATCH_SIZE])
+                for row in result:
+                    new_ids[(int(row.experiment_run_id), row.label, row.geneidtype, row.gene)] = int(row.id)
+        return new_ids
 
 
 class PSMCRUD(CRUDBase):
@@ -0,0 +1,222 @@
+"""SQLite FTS5 search indexes for the core text tables.
+
+Each indexed table gets an external-content FTS5 table (``<table>_fts``) over
+its string columns, kept in sync by ``AFTER INSERT/UPDATE/DELETE`` triggers so
+ORM writes, bulk Core statements and legacy syncs all stay covered. Indexes
+are opt-in: :func:`rebuild_search_indexes` (``ispec db rebuild-search-index``)
+creates them, and :class:`ispec.db.crud.CRUDBase` uses them for ``q=`` and
+``/options`` lookups whenever they are present.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Any, Iterable
+
+from sqlalchemy import String, bindparam, column, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import sqltypes as T
+
+from ispec.logging import get_logger
+
+logger = get_logger(__file__)
+
+FTS_TABLE_SUFFIX = "_fts"
+# Tables indexed by default; every String/Enum column except ``id`` is included.
+INDEXED_TABLES = ("project", "person", "project_comment", "letter_of_support")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Presence checks are cached briefly so an index built by another process
+# (e.g. the CLI) is picked up by a running API without a restart.
+_PRESENCE_TTL_SECONDS = 30.0
+_present_lock = threading.Lock()
+_present: dict[tuple[str, str], tuple[float, bool]] = {}
+
+
+def fts_table_name(table_name: str) -> str:
+    return f"{table_name}{FTS_TABLE_SUFFIX}"
+
+
+def searchable_columns(model) -> list[str]:
+    return [
+        col.name
+        for col in model.__table__.columns
+        if col.name != "id" and isinstance(col.type, (T.String, T.Enum))
+    ]
+
+
+def match_expression(q: str | None) -> str | None:
+    """Turn free text into an FTS5 query: every token must match as a prefix.
+
+    Tokens are quoted so user input can never inject FTS5 operators.
+    """
+
+    tokens = _TOKEN_RE.findall(q or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _bind_key(bind: Engine | Connection) -> str | None:
+    engine = getattr(bind, "engine", bind)
+    database = engine.url.database
+    if not database or database == ":memory:":
+        return None  # every in-memory engine is a different database
+    return str(engine.url)
+
+
+def _forget(bind: Engine | Connection) -> None:
+    key = _bind_key(bind)
+    if key is None:
+        return
+    with _present_lock:
+        for cached in [k for k in _present if k[0] == key]:
+            _present.pop(cached, None)
+
+
+def has_search_index(session: Session, model) -> bool:
+    """Return True when ``model``'s table has an FTS index in this database."""
+
+    bind = session.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    table_name = model.__table__.name
+    bind_key = _bind_key(bind)
+    key = (bind_key, table_name) if bind_key is not None else None
+    if key is not None:
+        with _present_lock:
+            cached = _present.get(key)
+        if cached is not None and time.monotonic() - cached[0] < _PRESENCE_TTL_SECONDS:
+            return cached[1]
+    try:
+        present = (
+            session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": fts_table_name(table_name)},
+            ).first()
+            is not None
+        )
+    except Exception:
+        return False
+    if key is not None:
+        with _present_lock:
+            _present[key] = (time.monotonic(), present)
+    return present
+
+
+def _fts_table(model):
+    name = fts_table_name(model.__table__.name)
+    return table(name, column("rowid"), column(name, String), column("rank"))
+
+
+def match_ids(model, q: str):
+    """``SELECT rowid`` of FTS matches for ``q`` (``None`` if ``q`` has no tokens)."""
+
+    expr = match_expression(q)
+    if expr is None:
+        return None
+    fts = _fts_table(model)
+    return select(fts.c.rowid).where(
+        fts.c[fts.name].op("MATCH")(bindparam("fts_q", expr, unique=True))
+    )
+
+
+def ranked_matches(model, q: str, *, snippet_tokens: int | None = None):
+    """Subquery of ``(rowid, rank)`` matches, ``rank`` being FTS5's bm25 score.
+
+    With ``snippet_tokens`` a ``snippet`` column is added holding FTS5's
+    best-matching excerpt of the first indexed column.
+    """
+
+    expr = match_expression(q)
+    if expr is None:
+        return None
+    fts = _fts_table(model)
+    columns = [fts.c.rowid.label("rowid"), fts.c.rank.label("rank")]
+    if snippet_tokens is not None:
+        tokens = max(1, min(64, int(snippet_tokens)))
+        columns.append(
+            func.snippet(literal_column(_quote(fts.name)), 0, "", "", "…", tokens).label("snippet")
+        )
+    return (
+        select(*columns)
+        .where(fts.c[fts.name].op("MATCH")(bindparam("fts_q", expr, unique=True)))
+        .subquery()
+    )
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _create_statements(table_name: str, columns: list[str]) -> list[str]:
+    fts = fts_table_name(table_name)
+    cols = ", ".join(_quote(c) for c in columns)
+    new_cols = ", ".join(f"new.{_quote(c)}" for c in columns)
+    old_cols = ", ".join(f"old.{_quote(c)}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {_quote(fts)} USING fts5("
+        f"{cols}, content={_quote(table_name)}, content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {_quote(fts + '_ai')} AFTER INSERT ON {_quote(table_name)} BEGIN "
+        f"INSERT INTO {_quote(fts)}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {_quote(fts + '_ad')} AFTER DELETE ON {_quote(table_name)} BEGIN "
+        f"INSERT INTO {_quote(fts)}({_quote(fts)}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {_quote(fts + '_au')} AFTER UPDATE ON {_quote(table_name)} BEGIN "
+        f"INSERT INTO {_quote(fts)}({_quote(fts)}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+        f"INSERT INTO {_quote(fts)}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+    ]
+
+
+def drop_search_index(conn: Connection, table_name: str) -> None:
+    fts = fts_table_name(table_name)
+    for suffix in ("_ai", "_ad", "_au"):
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {_quote(fts + suffix)}")
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {_quote(fts)}")
+    _forget(conn)
+
+
+def _models_by_table() -> dict[str, Any]:
+    from ispec.db.models import Base
+
+    return {mapper.local_table.name: mapper.class_ for mapper in Base.registry.mappers}
+
+
+def rebuild_search_indexes(
+    engine: Engine,
+    *,
+    tables: Iterable[str] | None = None,
+) -> dict[str, Any]:
+    """(Re)create FTS tables and triggers, then repopulate from the base tables.
+
+    Existing indexes are dropped first so column changes are picked up.
+    """
+
+    if engine.dialect.name != "sqlite":
+        raise ValueError("Full-text search indexes require SQLite.")
+
+    models = _models_by_table()
+    summary: dict[str, Any] = {}
+    with engine.begin() as conn:
+        for table_name in tables or INDEXED_TABLES:
+            model = models.get(table_name)
+            if model is None:
+                raise ValueError(f"Unknown table: {table_name}")
+            columns = searchable_columns(model)
+            if not columns:
+                continue
+            drop_search_index(conn, table_name)
+            for statement in _create_statements(table_name, columns):
+                conn.exec_driver_sql(statement)
+            fts = _quote(fts_table_name(table_name))
+            conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            rows = conn.execute(
+                select(func.count()).select_from(model.__table__)
+            ).scalar_one()
+            summary[table_name] = {"columns": len(columns), "rows": int(rows)}
+    _forget(engine)
+    logger.info("Rebuilt full-text search indexes: %s", summary)
+    return summary
@@ -39,7 +39,7 @@ def convert_timestamp(s: bytes):
     return pd.Timestamp(s.decode())
 
 
-def sqlite_engine(db_path: str = "sqlite:///./example.db") -> Engine:
+def sqlite_engine(db_path: str = "sqlite:///./example.db", **engine_kwargs: Any) -> Engine:
     sqlite3.register_adapter(pd.Timestamp, adapt_timestamp)
     sqlite3.register_converter("TIMESTAMP", convert_timestamp)
 
@@ -50,6 +50,7 @@ def sqlite_engine(db_path: str = "sqlite:///./example.db") -> Engine:
             "detect_types": sqlite3.PARSE_DECLTYPES,
         },
         echo=False,
+        **engine_kwargs,
     )
 
     trace_sql = os.getenv("ISPEC_SQL_TRACE")
@@ -324,6 +325,7 @@ def _ensure_e2g_columns(engine: Engine) -> None:
         ("iBAQ_dstrAdj", "FLOAT"),
         ("peptideprint", "TEXT"),
         ("metadata_json", "TEXT"),
+        ("gene_group", "TEXT"),
     ]
 
     try:
@@ -334,19 +336,40 @@ def _ensure_e2g_columns(engine: Engine) -> None:
         return
 
     missing = [(name, ddl) for (name, ddl) in desired if name not in columns]
-    if not missing:
-        return
+    if missing:
+        with engine.begin() as conn:
+            for name, ddl in missing:
+                conn.execute(
+                    text(f'ALTER TABLE experiment_to_gene ADD COLUMN "{name}" {ddl}')
+                )
 
-    with engine.begin() as conn:
-        for name, ddl in missing:
+        logger.info(
+            "Added missing columns experiment_to_gene.%s",
+            ", ".join(name for name, _ in missing),
+        )
+
+    _ensure_e2g_gene_group_indexes(engine)
+
+
+def _ensure_e2g_gene_group_indexes(engine: Engine) -> None:
+    """Create the gene-group lookup indexes on pre-existing E2G tables."""
+
+    try:
+        with engine.begin() as conn:
             conn.execute(
-                text(f'ALTER TABLE experiment_to_gene ADD COLUMN "{name}" {ddl}')
+                text(
+                    'CREATE INDEX IF NOT EXISTS "ix_e2g_run_label_group" '
+                    'ON experiment_to_gene("experiment_run_id", "label", "gene_group")'
+                )
             )
-
-    logger.info(
-        "Added missing columns experiment_to_gene.%s",
-        ", ".join(name for name, _ in missing),
-    )
+            conn.execute(
+                text(
+                    'CREATE INDEX IF NOT EXISTS "ix_e2g_group_run" '
+                    'ON experiment_to_gene("gene_group", "experiment_run_id")'
+                )
+            )
+    except Exception:
+        logger.debug("Unable to create gene-group indexes on experiment_to_gene.")
 
 
 def _ensure_auth_user_columns(engine: Engine) -> None:
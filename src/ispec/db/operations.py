@@ -116,6 +116,31 @@ def check_status():
         return None
 
 
+def rebuild_search_index(
+    *,
+    db_file_path: str | None = None,
+    tables: list[str] | None = None,
+) -> dict[str, Any]:
+    """Create or rebuild the FTS5 search indexes used by ``q=`` and ``/options``.
+
+    Parameters
+    ----------
+    db_file_path:
+        Core SQLite database URL or filesystem path.
+    tables:
+        Tables to index (defaults to :data:`ispec.db.fts.INDEXED_TABLES`).
+    """
+
+    from ispec.db.fts import INDEXED_TABLES, rebuild_search_indexes
+
+    targets = list(tables or INDEXED_TABLES)
+    _log_info("rebuilding search indexes: %s", ", ".join(targets))
+    with get_session(file_path=db_file_path) as session:
+        engine = session.get_bind()
+        session.close()
+        return rebuild_search_indexes(engine, tables=targets)
+
+
 def show_tables(file_path: str | None = None) -> dict[str, list[dict[str, Any]]]:
     """Return table and column metadata for the SQLite database.
 
@@ -650,6 +675,7 @@ def import_e2g(
     store_metadata: bool = False,
     skip_imported: bool = True,
     force: bool = False,
+    workers: int = 1,
 ) -> dict[str, Any]:
     """Import gpgrouper experiment-to-gene tables (QUAL/QUANT TSVs).
 
@@ -673,6 +699,8 @@ def import_e2g(
         When True, skip importing a file if that run already has QUAL/QUANT fields populated.
     force:
         When True, delete existing E2G rows for affected ExperimentRuns and re-import.
+    workers:
+        Number of parser processes; values above 1 overlap TSV parsing with DB writes.
     """
 
     from ispec.omics.e2g_import import discover_e2g_tsvs, import_e2g_files
@@ -711,7 +739,7 @@ def import_e2g(
     resolved_quant = uniq(resolved_quant)
 
     _log_info(
-        "importing E2G TSVs: qual=%d, quant=%d, create_missing_runs=%s, create_missing_experiments=%s, skip_imported=%s, force=%s, store_metadata=%s",
+        "importing E2G TSVs: qual=%d, quant=%d, create_missing_runs=%s, create_missing_experiments=%s, skip_imported=%s, force=%s, store_metadata=%s, workers=%d",
         len(resolved_qual),
         len(resolved_quant),
         bool(create_missing_runs),
@@ -719,6 +747,7 @@ def import_e2g(
         bool(skip_imported),
         bool(force),
         bool(store_metadata),
+        int(workers),
     )
 
     with get_session(file_path=db_file_path) as core_session:
@@ -738,6 +767,51 @@ def import_e2g(
                 store_metadata=store_metadata,
                 skip_imported=skip_imported,
                 force=force,
+                workers=workers,
+            )
+
+
+def backfill_e2g_gene_groups(
+    *,
+    db_file_path: str | None = None,
+    omics_db_file_path: str | None = None,
+    recompute: bool = False,
+    batch_size: int = 5000,
+) -> dict[str, Any]:
+    """Populate the canonical ``gene_group`` key on existing E2G rows.
+
+    Parameters
+    ----------
+    db_file_path:
+        Core SQLite database URL or filesystem path.
+    omics_db_file_path:
+        Analysis SQLite database URL or filesystem path holding E2G rows.
+    recompute:
+        When True, recompute every row (e.g. after changing ISPEC_GENE_MAP_PATH);
+        otherwise only rows without a key are visited.
+    batch_size:
+        Rows updated per transaction.
+    """
+
+    from ispec.db.crud import E2GCRUD
+
+    _log_info(
+        "backfilling E2G gene groups: recompute=%s, batch_size=%d",
+        bool(recompute),
+        int(batch_size),
+    )
+
+    with get_session(file_path=db_file_path) as core_session:
+        with _get_import_omics_session(
+            core_session=core_session,
+            db_file_path=db_file_path,
+            logical_name="analysis",
+            omics_db_file_path=omics_db_file_path,
+        ) as omics_session:
+            return E2GCRUD().backfill_gene_groups(
+                omics_session,
+                recompute=recompute,
+                batch_size=batch_size,
             )
 
 
@@ -896,8 +970,12 @@ def import_psms(
     store_metadata: bool = False,
     skip_imported: bool = True,
     force: bool = False,
+    workers: int = 1,
 ) -> dict[str, Any]:
-    """Import peptide-spectrum-match tables into the PSM database."""
+    """Import peptide-spectrum-match tables into the PSM database.
+
+    ``workers`` above 1 parses files in a process pool while writes stay serial.
+    """
 
     from ispec.omics.psm_import import import_psm_files
 
@@ -909,7 +987,7 @@ def import_psms(
         raise ValueError("Provide one or more PSM TSV/CSV paths.")
 
     _log_info(
-        "importing PSM tables: files=%d, experiment_run_id=%s, experiment_id=%s, run_no=%s, search_no=%s, label=%s, skip_imported=%s, force=%s, store_metadata=%s",
+        "importing PSM tables: files=%d, experiment_run_id=%s, experiment_id=%s, run_no=%s, search_no=%s, label=%s, skip_imported=%s, force=%s, store_metadata=%s, workers=%d",
         len(resolved),
         experiment_run_id,
         experiment_id,
@@ -919,6 +997,7 @@ def import_psms(
         bool(skip_imported),
         bool(force),
         bool(store_metadata),
+        int(workers),
     )
 
     with get_session(file_path=db_file_path) as core_session:
@@ -942,6 +1021,7 @@ def import_psms(
                 store_metadata=store_metadata,
                 skip_imported=skip_imported,
                 force=force,
+                workers=workers,
             )
 
 
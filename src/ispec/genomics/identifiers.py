@@ -13,20 +13,37 @@ Usage:
   - The API/CRUD will use the normalizer, when available, to avoid creating
     duplicate E2G rows across different identifier types.
 
+The mapping file is compiled once into an equivalence index (canonical group
+per identifier) and cached under ISPEC_GENE_INDEX_DIR (default
+``~/.ispec/cache/gene-index``), keyed by the file's SHA-256, so later processes
+load it instead of re-parsing the mapping.
+
 If no mapping file is configured, the normalizer behaves as a no-op.
 """
 
 from __future__ import annotations
 
 import csv
+import hashlib
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Sequence
+
+import numpy as np
 
 
 _ID_KEYS = ("entrezid", "ensembl", "symbol")
 
+# Compiled indices are written as ``<sha256>-<order>.npz`` so a changed mapping
+# file (or preferred order) never reuses a stale index.
+_INDEX_VERSION = 1
+_INDEX_DIR_ENV = "ISPEC_GENE_INDEX_DIR"
+_EQUIVALENTS_CACHE_SIZE = 65536
+
+Pair = tuple[str, str]
+
 
 @dataclass
 class _GeneGroup:
@@ -35,28 +52,32 @@ class _GeneGroup:
     symbol: str | None = None
     synonyms: list[str] | None = None
 
+    def pairs(self, preferred_order: Sequence[str]) -> tuple[Pair, ...]:
+        pairs: list[Pair] = []
+        for key in preferred_order:
+            val = getattr(self, key, None)
+            if val:
+                pairs.append((key, val))
+        # include symbol synonyms to catch different spellings
+        if self.synonyms:
+            pairs.extend(("symbol", s) for s in self.synonyms)
+        # also include the canonical symbol if present
+        if self.symbol:
+            pairs.append(("symbol", self.symbol))
+        return tuple(dict.fromkeys(pairs))
 
-class GeneNormalizer:
-    def __init__(self, mapping_path: str | os.PathLike | None = None,
-                 preferred_order: tuple[str, ...] = ("entrezid", "ensembl", "symbol")) -> None:
-        self.preferred_order = tuple(preferred_order)
-        self._groups: list[_GeneGroup] = []
-        self._index: dict[tuple[str, str], int] = {}
 
-        if mapping_path:
-            self._load_mapping(Path(mapping_path))
+@dataclass(frozen=True)
+class _EquivalenceIndex:
+    """Canonical group id per ``(type, id)`` plus each group's equivalents."""
 
-    @classmethod
-    def from_env(cls) -> "GeneNormalizer | None":
-        path = os.getenv("ISPEC_GENE_MAP_PATH")
-        if not path:
-            return None
-        p = Path(path)
-        if not p.exists():
-            return None
-        return cls(p)
+    groups: tuple[tuple[Pair, ...], ...]
+    lookup: dict[Pair, int]
 
-    def _load_mapping(self, path: Path) -> None:
+    @classmethod
+    def compile(cls, path: Path, preferred_order: Sequence[str]) -> "_EquivalenceIndex":
+        groups: list[tuple[Pair, ...]] = []
+        lookup: dict[Pair, int] = {}
         with path.open("r", newline="") as f:
             sample = f.read(1024)
             f.seek(0)
@@ -69,47 +90,195 @@ class GeneNormalizer:
                     symbol=(row.get("symbol") or row.get("gene_symbol") or "").strip() or None,
                     synonyms=[s.strip() for s in (row.get("synonyms") or "").split("|") if s.strip()] or None,
                 )
-                idx = len(self._groups)
-                self._groups.append(group)
+                idx = len(groups)
+                groups.append(group.pairs(preferred_order))
                 for key in _ID_KEYS:
                     val = getattr(group, key)
                     if val:
-                        self._index[(key, val)] = idx
+                        lookup[(key, val)] = idx
                 if group.synonyms:
                     for s in group.synonyms:
-                        self._index[("symbol", s)] = idx
+                        lookup[("symbol", s)] = idx
+        return cls(groups=tuple(groups), lookup=lookup)
+
+    def save(self, target: Path) -> None:
+        """Write the index as flat arrays: a pair table plus group offsets."""
+
+        pair_ids: dict[Pair, int] = {}
+        members: list[int] = []
+        offsets = [0]
+        for pairs in self.groups:
+            for pair in pairs:
+                members.append(pair_ids.setdefault(pair, len(pair_ids)))
+            offsets.append(len(members))
+        key_pairs = [pair_ids.setdefault(pair, len(pair_ids)) for pair in self.lookup]
+        table = np.array(list(pair_ids) or [("", "")], dtype=str).reshape(-1, 2)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as handle:
+            np.savez(
+                handle,
+                version=np.array([_INDEX_VERSION], dtype=np.int32),
+                pairs=table,
+                members=np.array(members, dtype=np.int32),
+                offsets=np.array(offsets, dtype=np.int64),
+                key_pairs=np.array(key_pairs, dtype=np.int32),
+                key_groups=np.array(list(self.lookup.values()), dtype=np.int32),
+            )
+        os.replace(tmp, target)
+
+    @classmethod
+    def load(cls, source: Path) -> "_EquivalenceIndex | None":
+        try:
+            with np.load(source, allow_pickle=False) as data:
+                if int(data["version"][0]) != _INDEX_VERSION:
+                    return None
+                table = [(str(t), str(v)) for t, v in data["pairs"].tolist()]
+                members = data["members"].tolist()
+                offsets = data["offsets"].tolist()
+                key_pairs = data["key_pairs"].tolist()
+                key_groups = data["key_groups"].tolist()
+        except Exception:
+            return None
+        groups = tuple(
+            tuple(table[m] for m in members[offsets[i]:offsets[i + 1]])
+            for i in range(len(offsets) - 1)
+        )
+        lookup = {table[p]: g for p, g in zip(key_pairs, key_groups)}
+        return cls(groups=groups, lookup=lookup)
+
+
+# Identifier types that name the same namespace under a different label.
+_TYPE_ALIASES = {"geneid": "entrezid", "entrez": "entrezid", "gene_symbol": "symbol"}
+
+
+def canonical_geneidtype(geneidtype: str | None) -> str:
+    """Lower-case ``geneidtype`` and fold aliases (``GeneID`` -> ``entrezid``)."""
+
+    t = (geneidtype or "").strip().lower()
+    return _TYPE_ALIASES.get(t, t)
+
+
+def gene_group_keys(
+    genes: Sequence[str],
+    geneidtypes: Sequence[str],
+    normalizer: "GeneNormalizer | TackleGeneNormalizer | None" = None,
+) -> list[str]:
+    """Return a canonical ``"<type>:<id>"`` group key per identifier.
+
+    Identifiers the normalizer treats as equivalent share a key (the first,
+    most preferred pair of their group); unmapped identifiers key on
+    themselves.
+    """
+
+    genes = [(g or "").strip() for g in genes]
+    types = [canonical_geneidtype(t) for t in geneidtypes]
+    if normalizer is None:
+        firsts = list(zip(types, genes))
+    else:
+        firsts = [
+            pairs[0] if pairs else (t, g)
+            for pairs, t, g in zip(normalizer.equivalents_many(genes, types), types, genes)
+        ]
+    return [f"{t}:{g}" for t, g in firsts]
+
 
-    def equivalents(self, gene: str, geneidtype: str) -> list[tuple[str, str]]:
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _index_dir() -> Path:
+    configured = os.getenv(_INDEX_DIR_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    return Path.home() / ".ispec" / "cache" / "gene-index"
+
+
+def _normalize_types(geneidtypes: str | Iterable[str], count: int) -> list[str]:
+    if isinstance(geneidtypes, str):
+        return [geneidtypes] * count
+    types = list(geneidtypes)
+    if len(types) != count:
+        raise ValueError("geneidtypes must be a string or match the number of genes")
+    return types
+
+
+class GeneNormalizer:
+    def __init__(self, mapping_path: str | os.PathLike | None = None,
+                 preferred_order: tuple[str, ...] = ("entrezid", "ensembl", "symbol"),
+                 *, index_dir: str | os.PathLike | None = None) -> None:
+        self.preferred_order = tuple(preferred_order)
+        self._mapping_path = Path(mapping_path) if mapping_path else None
+        self._index_dir = Path(index_dir) if index_dir else None
+        self._compiled: _EquivalenceIndex | None = None
+        self._cached_equivalents = lru_cache(maxsize=_EQUIVALENTS_CACHE_SIZE)(self._lookup)
+
+    @classmethod
+    def from_env(cls) -> "GeneNormalizer | None":
+        path = os.getenv("ISPEC_GENE_MAP_PATH")
+        if not path:
+            return None
+        p = Path(path)
+        if not p.exists():
+            return None
+        return cls(p)
+
+    @property
+    def _index(self) -> _EquivalenceIndex:
+        if self._compiled is None:
+            self._compiled = self._load_index()
+        return self._compiled
+
+    def _load_index(self) -> _EquivalenceIndex:
+        if self._mapping_path is None:
+            return _EquivalenceIndex(groups=(), lookup={})
+
+        order_tag = hashlib.sha1("|".join(self.preferred_order).encode("utf-8")).hexdigest()[:8]
+        cache_file = (self._index_dir or _index_dir()) / (
+            f"{_file_sha256(self._mapping_path)}-{order_tag}.npz"
+        )
+        if cache_file.exists():
+            cached = _EquivalenceIndex.load(cache_file)
+            if cached is not None:
+                return cached
+
+        compiled = _EquivalenceIndex.compile(self._mapping_path, self.preferred_order)
+        try:
+            compiled.save(cache_file)
+        except OSError:
+            pass  # read-only cache dir: keep the in-memory index
+        return compiled
+
+    def _lookup(self, gene: str, geneidtype: str) -> tuple[Pair, ...]:
+        index = self._index
+        idx = index.lookup.get((geneidtype, gene))
+        if idx is None:
+            return ((geneidtype, gene),)
+        return index.groups[idx] or ((geneidtype, gene),)
+
+    def equivalents(self, gene: str, geneidtype: str) -> tuple[Pair, ...]:
         """Return equivalent (type, id) pairs for the supplied identifier.
 
-        If the gene is not in the mapping, returns the original pair.
+        If the gene is not in the mapping, returns the original pair. The
+        result is cached and shared between calls, hence a tuple.
         """
         gene = (gene or "").strip()
         geneidtype = (geneidtype or "").strip().lower()
-        idx = self._index.get((geneidtype, gene))
-        if idx is None:
-            return [(geneidtype, gene)]
+        return self._cached_equivalents(gene, geneidtype)
 
-        group = self._groups[idx]
-        pairs: list[tuple[str, str]] = []
-        for key in self.preferred_order:
-            val = getattr(group, key)
-            if val:
-                pairs.append((key, val))
-        # include symbol synonyms to catch different spellings
-        if group.synonyms:
-            pairs.extend(("symbol", s) for s in group.synonyms)
-        # also include the canonical symbol if present
-        if group.symbol:
-            pairs.append(("symbol", group.symbol))
-        # de-duplicate while preserving order
-        seen = set()
-        uniq: list[tuple[str, str]] = []
-        for p in pairs:
-            if p not in seen:
-                uniq.append(p)
-                seen.add(p)
-        return uniq or [(geneidtype, gene)]
+    def equivalents_many(
+        self, genes: Iterable[str], geneidtypes: str | Iterable[str]
+    ) -> list[tuple[Pair, ...]]:
+        """Map a column of identifiers at once (one result per input gene)."""
+
+        genes = list(genes)
+        types = _normalize_types(geneidtypes, len(genes))
+        return [self.equivalents(g, t) for g, t in zip(genes, types)]
 
 
 class TackleGeneNormalizer:
@@ -125,18 +294,20 @@ class TackleGeneNormalizer:
         m = importlib.import_module("tackle.containers")
         self._hm = m.get_hgene_mapper()
         self._taxon = str(taxon_id)
-        # build quick indices
+        # build quick indices: one groupby per direction instead of iterrows
         df = self._hm.df
-        self._by_symbol = {}
-        self._by_entrez = {}
-        sub = df[df["TaxonID"].astype(str) == self._taxon]
-        for _, row in sub.iterrows():
-            sym = str(row.get("Symbol", "")).strip()
-            eid = str(row.get("GeneID", "")).strip()
-            if sym:
-                self._by_symbol.setdefault(sym, set()).add(eid)
-            if eid:
-                self._by_entrez.setdefault(eid, set()).add(sym)
+        sub = df.loc[df["TaxonID"].astype(str) == self._taxon, ["Symbol", "GeneID"]]
+        sym = sub["Symbol"].astype(str).str.strip()
+        eid = sub["GeneID"].astype(str).str.strip()
+        by_symbol = eid[sym != ""].groupby(sym[sym != ""]).unique()
+        by_entrez = sym[eid != ""].groupby(eid[eid != ""]).unique()
+        self._by_symbol: dict[str, tuple[str, ...]] = {
+            str(k): tuple(sorted(v)) for k, v in by_symbol.items()
+        }
+        self._by_entrez: dict[str, tuple[str, ...]] = {
+            str(k): tuple(sorted(v)) for k, v in by_entrez.items()
+        }
+        self._cached_equivalents = lru_cache(maxsize=_EQUIVALENTS_CACHE_SIZE)(self._lookup)
 
     @classmethod
     def available(cls) -> bool:
@@ -147,25 +318,26 @@ class TackleGeneNormalizer:
         except Exception:
             return False
 
-    def equivalents(self, gene: str, geneidtype: str) -> list[tuple[str, str]]:
-        gene = (gene or "").strip()
-        t = (geneidtype or "").strip().lower()
-        pairs: list[tuple[str, str]] = []
+    def _lookup(self, gene: str, t: str) -> tuple[Pair, ...]:
+        pairs: list[Pair] = []
         if t == "symbol":
-            ents = sorted(self._by_symbol.get(gene, []))
-            pairs.extend(("entrezid", e) for e in ents)
+            pairs.extend(("entrezid", e) for e in self._by_symbol.get(gene, ()))
             pairs.append(("symbol", gene))
         elif t in ("entrez", "entrezid"):
-            syms = sorted(self._by_entrez.get(gene, []))
             pairs.append(("entrezid", gene))
-            pairs.extend(("symbol", s) for s in syms)
+            pairs.extend(("symbol", s) for s in self._by_entrez.get(gene, ()))
         else:
             pairs.append((t, gene))
-        # de-dup
-        seen = set()
-        out = []
-        for p in pairs:
-            if p not in seen:
-                out.append(p)
-                seen.add(p)
-        return out
+        return tuple(dict.fromkeys(pairs))
+
+    def equivalents(self, gene: str, geneidtype: str) -> tuple[Pair, ...]:
+        gene = (gene or "").strip()
+        t = (geneidtype or "").strip().lower()
+        return self._cached_equivalents(gene, t)
+
+    def equivalents_many(
+        self, genes: Iterable[str], geneidtypes: str | Iterable[str]
+    ) -> list[tuple[Pair, ...]]:
+        genes = list(genes)
+        types = _normalize_types(geneidtypes, len(genes))
+        return [self.equivalents(g, t) for g, t in zip(genes, types)]
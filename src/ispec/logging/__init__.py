@@ -1,2 +1,3 @@
 # src/ispec/logging/__init__.py
 from .logging import get_logger, reset_logger
+from .writers import flush_log_writers
@@ -6,6 +6,7 @@ from pathlib import Path
 from ispec.config.paths import resolve_log_dir
 
 from .config import load_log_level
+from .writers import async_file_handler, async_logging_enabled
 
 _DEFAULT_LOG_DIR = Path(resolve_log_dir().path or resolve_log_dir().value)
 _DEFAULT_LOG_FILE = _DEFAULT_LOG_DIR / "ispec.log"
@@ -86,7 +87,12 @@ def get_logger(
                 file_path = _resolve_log_file()
 
             try:
-                fh = logging.FileHandler(file_path, mode=filemode, encoding=encoding)
+                # File writes happen on a shared background thread per file
+                # (see ispec.logging.writers); ISPEC_LOG_ASYNC=0 writes inline.
+                if async_logging_enabled():
+                    fh = async_file_handler(file_path, mode=filemode, encoding=encoding)
+                else:
+                    fh = logging.FileHandler(file_path, mode=filemode, encoding=encoding)
                 fh.setFormatter(formatter)
                 logger.addHandler(fh)
             except OSError:
@@ -0,0 +1,290 @@
+"""Background writers that keep log I/O off request and inference threads.
+
+:func:`async_file_handler` returns a ``QueueHandler`` for a log file. Each
+file path has one ``QueueListener`` thread that owns the only ``FileHandler``
+for that path, so every logger writing to ``ispec.log`` shares one open file.
+Records are formatted on the calling thread with the logger's own formatter.
+This keeps per-logger formats and freezes ``args``/``exc_info`` before the
+record crosses threads. The listener only writes the finished line.
+
+:class:`JsonlBatchWriter` buffers pre-serialised JSONL lines and appends them
+from a background thread. It flushes once ``batch_size`` lines are pending or
+``flush_seconds`` after the oldest pending line, whichever is first. Each line
+carries its target path, so daily rotation is just a new path.
+
+:func:`flush_log_writers` drains every writer. It runs at interpreter exit
+and from the supervisor and API shutdown paths. ``ISPEC_LOG_ASYNC=0``
+restores plain synchronous file handlers.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Any
+
+DEFAULT_FLUSH_SECONDS = 1.0
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_TIMEOUT_SECONDS = 5.0
+
+
+def async_logging_enabled() -> bool:
+    raw = (os.getenv("ISPEC_LOG_ASYNC") or "").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+class _FileWriter:
+    """One listener thread and file handler per log file, shared by reference count."""
+
+    def __init__(self, path: Path, *, mode: str, encoding: str) -> None:
+        self.path = path
+        self.mode = mode
+        self.queue: queue.Queue[logging.LogRecord] = queue.Queue()
+        self.handler = logging.FileHandler(path, mode=mode, encoding=encoding)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+        self.listener = QueueListener(self.queue, self.handler)
+        self.refs = 0
+        self.listener.start()
+
+    def restart(self) -> None:
+        # Threads do not survive fork(), and the old queue's condition still lists
+        # the parent listener as a waiter, so the child starts a new queue and listener.
+        # The parent still owns (and will write) anything queued before the fork.
+        self.queue = queue.Queue()
+        self.listener = QueueListener(self.queue, self.handler)
+        self.listener.start()
+
+    def drain(self, timeout: float) -> bool:
+        deadline = time.monotonic() + max(0.0, timeout)
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.002)
+        self.handler.flush()
+        return True
+
+    def stop(self) -> None:
+        try:
+            self.listener.stop()
+        finally:
+            self.handler.close()
+
+
+_file_writers_lock = threading.Lock()
+_file_writers: dict[Path, _FileWriter] = {}
+
+
+class AsyncFileHandler(QueueHandler):
+    """``QueueHandler`` feeding the shared writer thread for one log file."""
+
+    def __init__(self, writer: _FileWriter) -> None:
+        super().__init__(writer.queue)
+        self.writer = writer
+        self._released = False
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Go through the writer so records follow its queue across fork().
+        self.writer.queue.put_nowait(record)
+
+    def flush(self) -> None:
+        self.writer.drain(DEFAULT_FLUSH_TIMEOUT_SECONDS)
+
+    def close(self) -> None:
+        if not self._released:
+            self._released = True
+            _release_file_writer(self.writer)
+        super().close()
+
+
+def async_file_handler(path: str | Path, *, mode: str = "a", encoding: str = "utf-8") -> AsyncFileHandler:
+    """Return a handler whose records are written to ``path`` by a background thread.
+
+    The file is opened with ``mode`` by the first caller for ``path``; later
+    callers share that writer and get a warning if they ask for another mode.
+    Raises ``OSError`` when the file cannot be opened, like ``FileHandler``.
+    """
+
+    key = Path(path).expanduser().resolve()
+    with _file_writers_lock:
+        writer = _file_writers.get(key)
+        if writer is None:
+            writer = _FileWriter(key, mode=mode, encoding=encoding)
+            _file_writers[key] = writer
+        elif writer.mode != mode:
+            logging.getLogger("ispec").warning(
+                "Log file %s is already open with mode %r; ignoring mode %r", key, writer.mode, mode
+            )
+        writer.refs += 1
+    return AsyncFileHandler(writer)
+
+
+def _release_file_writer(writer: _FileWriter) -> None:
+    with _file_writers_lock:
+        writer.refs -= 1
+        if writer.refs > 0:
+            return
+        if _file_writers.get(writer.path) is writer:
+            del _file_writers[writer.path]
+    writer.stop()
+
+
+class JsonlBatchWriter:
+    """Append JSONL lines to files from a background thread, in batches."""
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+    ) -> None:
+        self.name = name
+        self.batch_size = max(1, int(batch_size))
+        self.flush_seconds = max(0.0, float(flush_seconds))
+        self._cond = threading.Condition()
+        self._pending: list[tuple[Path, str]] = []
+        self._oldest: float | None = None
+        self._writing = 0
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._known_dirs: set[Path] = set()
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        _batch_writers.add(self)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name=f"log-writer-{self.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, path: Path, line: str) -> None:
+        """Queue ``line`` (without trailing newline) for ``path``."""
+
+        with self._cond:
+            self._ensure_thread()
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((path, line))
+            if len(self._pending) >= self.batch_size or self.flush_seconds == 0.0:
+                self._cond.notify_all()
+
+    def _take_batch(self) -> list[tuple[Path, str]]:
+        with self._cond:
+            while True:
+                if self._pending:
+                    due = (self._oldest or 0.0) + self.flush_seconds
+                    remaining = due - time.monotonic()
+                    if len(self._pending) >= self.batch_size or remaining <= 0:
+                        batch, self._pending, self._oldest = self._pending, [], None
+                        self._writing += 1
+                        return batch
+                    self._cond.wait(timeout=remaining)
+                else:
+                    self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._cond:
+                    self._writing -= 1
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch: list[tuple[Path, str]]) -> None:
+        by_path: dict[Path, list[str]] = {}
+        for path, line in batch:
+            by_path.setdefault(path, []).append(line)
+        for path, lines in by_path.items():
+            try:
+                if path.parent not in self._known_dirs:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    self._known_dirs.add(path.parent)
+                with path.open("a", encoding="utf-8") as handle:
+                    handle.write("\n".join(lines) + "\n")
+                self.written += len(lines)
+            except Exception:
+                self.failed += len(lines)
+                self._known_dirs.discard(path.parent)
+                logging.getLogger("ispec").exception("Failed to append %d %s lines to %s", len(lines), self.name, path)
+        self.batches += 1
+
+    def flush(self, timeout: float = DEFAULT_FLUSH_TIMEOUT_SECONDS) -> bool:
+        """Write everything queued so far; return False if ``timeout`` expired first."""
+
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            if self._pending:
+                self._ensure_thread()
+                self._oldest = float("-inf")
+                self._cond.notify_all()
+            while self._pending or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining)
+        return True
+
+    def reset_after_fork(self) -> None:
+        # The parent still owns (and will write) anything queued before the fork.
+        self._cond = threading.Condition()
+        self._pending, self._oldest, self._writing = [], None, 0
+        self._thread = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+
+
+_batch_writers: weakref.WeakSet[JsonlBatchWriter] = weakref.WeakSet()
+
+
+def flush_log_writers(timeout: float = DEFAULT_FLUSH_TIMEOUT_SECONDS) -> bool:
+    """Drain every background log writer; return False if any did not finish in time."""
+
+    deadline = time.monotonic() + max(0.0, timeout)
+    ok = True
+    for writer in list(_batch_writers):
+        ok = writer.flush(max(0.0, deadline - time.monotonic())) and ok
+    with _file_writers_lock:
+        file_writers = list(_file_writers.values())
+    for file_writer in file_writers:
+        ok = file_writer.drain(max(0.0, deadline - time.monotonic())) and ok
+    return ok
+
+
+def _after_fork_in_child() -> None:
+    for writer in list(_batch_writers):
+        writer.reset_after_fork()
+    for file_writer in list(_file_writers.values()):
+        file_writer.restart()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+atexit.register(flush_log_writers)
+
+
+__all__ = [
+    "AsyncFileHandler",
+    "JsonlBatchWriter",
+    "async_file_handler",
+    "async_logging_enabled",
+    "flush_log_writers",
+]
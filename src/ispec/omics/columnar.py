@@ -0,0 +1,443 @@
+"""Optional columnar sidecar for omics tables.
+
+SQLite stays the source of truth; the sidecar is a read-optimized cache of the
+same values laid out one ``.npy`` file per column, partitioned per experiment
+run (E2G, PSM) or per contrast (gene contrast stats). Partitions are opened
+with ``numpy.load(mmap_mode="r")`` so matrix queries read columns straight
+from the page cache instead of hydrating ORM rows.
+
+The sidecar is enabled by pointing ``ISPEC_OMICS_COLUMNAR_DIR`` at a directory
+(or passing ``sidecar_dir``). Each partition records a fingerprint (row count
+and latest modification timestamp) of the SQLite rows it was built from;
+readers compare it against SQLite in one grouped query and fall back to SQLite
+for partitions that are missing or stale.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ispec.db.models import Experiment, ExperimentRun
+from ispec.logging import get_logger
+from ispec.omics.models import E2G, PSM, GeneContrast, GeneContrastStat
+
+
+logger = get_logger(__file__)
+
+SIDECAR_DIR_ENV = "ISPEC_OMICS_COLUMNAR_DIR"
+_META_FILENAME = "_meta.json"
+_FORMAT_VERSION = 1
+
+E2G_VALUE_COLUMNS = (
+    "psms",
+    "psms_u2g",
+    "peptide_count",
+    "peptide_count_u2g",
+    "coverage",
+    "coverage_u2g",
+    "area_sum_u2g_0",
+    "area_sum_u2g_all",
+    "area_sum_max",
+    "area_sum_dstrAdj",
+    "iBAQ_dstrAdj",
+)
+PSM_VALUE_COLUMNS = (
+    "scan_number",
+    "charge",
+    "score",
+    "q_value",
+    "precursor_mz",
+    "retention_time",
+    "intensity",
+)
+GENE_CONTRAST_VALUE_COLUMNS = ("log2_fc", "p_value", "p_adj", "t_stat", "signed_log_p")
+
+
+@dataclass(frozen=True)
+class _TableSpec:
+    name: str
+    model: Any
+    key_column: str
+    text_columns: tuple[str, ...]
+    value_columns: tuple[str, ...]
+    modified_column: str
+
+
+_E2G = _TableSpec(
+    name="e2g",
+    model=E2G,
+    key_column="experiment_run_id",
+    text_columns=("gene", "geneidtype", "label"),
+    value_columns=E2G_VALUE_COLUMNS,
+    modified_column="E2G_ModificationTS",
+)
+_PSM = _TableSpec(
+    name="psm",
+    model=PSM,
+    key_column="experiment_run_id",
+    text_columns=("peptide",),
+    value_columns=PSM_VALUE_COLUMNS,
+    modified_column="psm_ModificationTS",
+)
+_GENE_CONTRAST = _TableSpec(
+    name="gene_contrast",
+    model=GeneContrastStat,
+    key_column="gene_contrast_id",
+    text_columns=(),
+    value_columns=("gene_id",) + GENE_CONTRAST_VALUE_COLUMNS,
+    modified_column="GeneContrastStat_ModificationTS",
+)
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A memory-mapped sidecar partition."""
+
+    path: Path
+    meta: dict[str, Any]
+    columns: dict[str, np.ndarray]
+
+    @property
+    def fingerprint(self) -> dict[str, Any] | None:
+        value = self.meta.get("fingerprint")
+        return value if isinstance(value, dict) else None
+
+
+def resolve_sidecar_dir(sidecar_dir: str | os.PathLike[str] | None = None) -> Path | None:
+    """Return the sidecar root, or ``None`` when the sidecar is disabled."""
+
+    raw = str(sidecar_dir).strip() if sidecar_dir is not None else ""
+    if not raw:
+        raw = (os.getenv(SIDECAR_DIR_ENV) or "").strip()
+    if not raw:
+        return None
+    return Path(raw).expanduser()
+
+
+def _partition_dir(root: Path, table: str, key: int) -> Path:
+    return root / table / f"{int(key)}"
+
+
+def write_partition(
+    root: Path,
+    table: str,
+    key: int,
+    columns: dict[str, np.ndarray],
+    *,
+    fingerprint: dict[str, Any] | None,
+) -> Path:
+    """Atomically (re)write one partition directory."""
+
+    final = _partition_dir(root, table, key)
+    final.parent.mkdir(parents=True, exist_ok=True)
+    tmp = final.with_name(f".{final.name}.tmp-{os.getpid()}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir()
+    for name, values in columns.items():
+        np.save(tmp / f"{name}.npy", values, allow_pickle=False)
+    rows = len(next(iter(columns.values()))) if columns else 0
+    meta = {
+        "version": _FORMAT_VERSION,
+        "table": table,
+        "key": int(key),
+        "rows": rows,
+        "columns": sorted(columns),
+        "fingerprint": fingerprint,
+    }
+    (tmp / _META_FILENAME).write_text(json.dumps(meta, sort_keys=True), encoding="utf-8")
+
+    stale = final.with_name(f".{final.name}.old-{os.getpid()}")
+    if final.exists():
+        os.replace(final, stale)
+    os.replace(tmp, final)
+    if stale.exists():
+        shutil.rmtree(stale, ignore_errors=True)
+    return final
+
+
+def read_partition(root: Path, table: str, key: int) -> Partition | None:
+    """Open a partition with memory-mapped columns, or return ``None``."""
+
+    path = _partition_dir(root, table, key)
+    meta_path = path / _META_FILENAME
+    if not meta_path.exists():
+        return None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if meta.get("version") != _FORMAT_VERSION:
+        return None
+    columns: dict[str, np.ndarray] = {}
+    for name in meta.get("columns") or []:
+        try:
+            columns[name] = np.load(path / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+    return Partition(path=path, meta=meta, columns=columns)
+
+
+def _fingerprints(session: Session, spec: _TableSpec, keys: Iterable[int]) -> dict[int, dict[str, Any]]:
+    key_list = sorted({int(k) for k in keys})
+    if not key_list:
+        return {}
+    model = spec.model
+    key_col = getattr(model, spec.key_column)
+    stmt = (
+        select(key_col, func.count(model.id), func.max(getattr(model, spec.modified_column)))
+        .where(key_col.in_(key_list))
+        .group_by(key_col)
+    )
+    out: dict[int, dict[str, Any]] = {}
+    for key, count, modified in session.execute(stmt):
+        out[int(key)] = {
+            "rows": int(count or 0),
+            "modified": modified.isoformat() if hasattr(modified, "isoformat") else modified,
+        }
+    return out
+
+
+def _text_array(values: list[Any]) -> np.ndarray:
+    return np.array(["" if v is None else str(v) for v in values], dtype=str)
+
+
+def _float_array(values: list[Any]) -> np.ndarray:
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _write_table_partitions(
+    session: Session,
+    spec: _TableSpec,
+    keys: Iterable[int],
+    *,
+    sidecar_dir: str | os.PathLike[str] | None,
+) -> list[Path]:
+    root = resolve_sidecar_dir(sidecar_dir)
+    key_list = sorted({int(k) for k in keys})
+    if root is None or not key_list:
+        return []
+
+    fingerprints = _fingerprints(session, spec, key_list)
+    model = spec.model
+    names = spec.text_columns + spec.value_columns
+    written: list[Path] = []
+    for key in key_list:
+        stmt = (
+            select(*(getattr(model, name) for name in names))
+            .where(getattr(model, spec.key_column) == key)
+            .order_by(model.id.asc())
+        )
+        rows = session.execute(stmt).all()
+        transposed = list(zip(*rows)) if rows else [() for _ in names]
+        columns: dict[str, np.ndarray] = {}
+        for name, values in zip(names, transposed):
+            values = list(values)
+            if name in spec.text_columns:
+                columns[name] = _text_array(values)
+            else:
+                columns[name] = _float_array(values)
+        written.append(
+            write_partition(root, spec.name, key, columns, fingerprint=fingerprints.get(key))
+        )
+    return written
+
+
+def _write_safely(
+    spec: _TableSpec,
+    session: Session,
+    keys: Iterable[int],
+    sidecar_dir: str | os.PathLike[str] | None,
+) -> list[Path]:
+    try:
+        return _write_table_partitions(session, spec, keys, sidecar_dir=sidecar_dir)
+    except Exception:
+        # The sidecar is a cache; a failed write must never fail the import.
+        logger.warning("Unable to write %s columnar sidecar partitions.", spec.name, exc_info=True)
+        return []
+
+
+def write_e2g_partitions(
+    omics_session: Session,
+    run_ids: Iterable[int],
+    *,
+    sidecar_dir: str | os.PathLike[str] | None = None,
+) -> list[Path]:
+    """Rebuild E2G sidecar partitions for ``run_ids`` (no-op when disabled)."""
+
+    return _write_safely(_E2G, omics_session, run_ids, sidecar_dir)
+
+
+def write_psm_partitions(
+    omics_session: Session,
+    run_ids: Iterable[int],
+    *,
+    sidecar_dir: str | os.PathLike[str] | None = None,
+) -> list[Path]:
+    """Rebuild PSM sidecar partitions for ``run_ids`` (no-op when disabled)."""
+
+    return _write_safely(_PSM, omics_session, run_ids, sidecar_dir)
+
+
+def write_gene_contrast_partitions(
+    omics_session: Session,
+    gene_contrast_ids: Iterable[int],
+    *,
+    sidecar_dir: str | os.PathLike[str] | None = None,
+) -> list[Path]:
+    """Rebuild gene-contrast stat partitions (no-op when disabled)."""
+
+    return _write_safely(_GENE_CONTRAST, omics_session, gene_contrast_ids, sidecar_dir)
+
+
+def _fresh_partitions(
+    session: Session,
+    spec: _TableSpec,
+    keys: list[int],
+    *,
+    sidecar_dir: str | os.PathLike[str] | None,
+) -> tuple[dict[int, Partition], list[int]]:
+    """Split ``keys`` into usable partitions and keys that need SQLite."""
+
+    fingerprints = _fingerprints(session, spec, keys)
+    root = resolve_sidecar_dir(sidecar_dir)
+    fresh: dict[int, Partition] = {}
+    fallback: list[int] = []
+    for key in keys:
+        if key not in fingerprints:
+            continue  # no rows in SQLite either
+        part = read_partition(root, spec.name, key) if root is not None else None
+        if part is not None and part.fingerprint == fingerprints[key]:
+            fresh[key] = part
+        else:
+            fallback.append(key)
+    return fresh, fallback
+
+
+def _series(index: np.ndarray, values: np.ndarray, *, name: Any) -> pd.Series:
+    series = pd.Series(values, index=pd.Index(index), name=name)
+    if not series.index.is_unique:
+        series = series[~series.index.duplicated(keep="first")]
+    return series
+
+
+def _assemble(series: dict[Any, pd.Series], *, sources: dict[str, int]) -> pd.DataFrame:
+    frame = pd.DataFrame(series) if series else pd.DataFrame()
+    frame = frame.sort_index(axis=1)
+    frame.attrs["sources"] = sources
+    return frame
+
+
+def project_run_ids(core_session: Session, project_id: int) -> list[int]:
+    stmt = (
+        select(ExperimentRun.id)
+        .join(Experiment, Experiment.id == ExperimentRun.experiment_id)
+        .where(Experiment.project_id == int(project_id))
+        .order_by(ExperimentRun.id.asc())
+    )
+    return [int(run_id) for run_id in core_session.execute(stmt).scalars()]
+
+
+def e2g_matrix(
+    core_session: Session,
+    omics_session: Session,
+    *,
+    project_id: int,
+    value: str = "iBAQ_dstrAdj",
+    label: str = "0",
+    geneidtype: str | None = "GeneID",
+    sidecar_dir: str | os.PathLike[str] | None = None,
+) -> pd.DataFrame:
+    """Return a gene × experiment-run matrix of ``value`` for a project.
+
+    Columns are ``experiment_run.id``; the index is the E2G ``gene``. Runs with
+    a fresh sidecar partition are read from memory-mapped columns; the rest
+    come from one grouped SQLite query. ``frame.attrs["sources"]`` reports how
+    many runs came from each.
+    """
+
+    if value not in E2G_VALUE_COLUMNS:
+        raise ValueError(f"Unsupported E2G value column: {value}")
+    run_ids = project_run_ids(core_session, project_id)
+    fresh, fallback = _fresh_partitions(omics_session, _E2G, run_ids, sidecar_dir=sidecar_dir)
+
+    series: dict[int, pd.Series] = {}
+    for run_id, part in fresh.items():
+        mask = part.columns["label"] == label
+        if geneidtype is not None:
+            mask &= part.columns["geneidtype"] == geneidtype
+        series[run_id] = _series(part.columns["gene"][mask], part.columns[value][mask], name=run_id)
+
+    if fallback:
+        stmt = (
+            select(E2G.experiment_run_id, E2G.gene, getattr(E2G, value))
+            .where(E2G.experiment_run_id.in_(fallback), E2G.label == label)
+            .order_by(E2G.id.asc())
+        )
+        if geneidtype is not None:
+            stmt = stmt.where(E2G.geneidtype == geneidtype)
+        grouped: dict[int, tuple[list[str], list[Any]]] = {run_id: ([], []) for run_id in fallback}
+        for run_id, gene, val in omics_session.execute(stmt):
+            genes, values = grouped[int(run_id)]
+            genes.append(gene)
+            values.append(val)
+        for run_id, (genes, values) in grouped.items():
+            series[run_id] = _series(np.array(genes, dtype=str), _float_array(values), name=run_id)
+
+    return _assemble(series, sources={"sidecar": len(fresh), "sqlite": len(fallback)})
+
+
+def gene_contrast_matrix(
+    omics_session: Session,
+    *,
+    project_id: int,
+    value: str = "log2_fc",
+    sidecar_dir: str | os.PathLike[str] | None = None,
+) -> pd.DataFrame:
+    """Return a gene_id × contrast matrix of ``value`` for a project's contrasts."""
+
+    if value not in GENE_CONTRAST_VALUE_COLUMNS:
+        raise ValueError(f"Unsupported gene contrast value column: {value}")
+    contrasts = {
+        int(contrast_id): name
+        for contrast_id, name in omics_session.execute(
+            select(GeneContrast.id, GeneContrast.name)
+            .where(GeneContrast.project_id == int(project_id))
+            .order_by(GeneContrast.id.asc())
+        )
+    }
+    fresh, fallback = _fresh_partitions(
+        omics_session, _GENE_CONTRAST, list(contrasts), sidecar_dir=sidecar_dir
+    )
+
+    series: dict[str, pd.Series] = {}
+    for contrast_id, part in fresh.items():
+        name = contrasts[contrast_id]
+        series[name] = _series(part.columns["gene_id"].astype(np.int64), part.columns[value], name=name)
+
+    if fallback:
+        stmt = (
+            select(GeneContrastStat.gene_contrast_id, GeneContrastStat.gene_id, getattr(GeneContrastStat, value))
+            .where(GeneContrastStat.gene_contrast_id.in_(fallback))
+            .order_by(GeneContrastStat.id.asc())
+        )
+        grouped: dict[int, tuple[list[int], list[Any]]] = {cid: ([], []) for cid in fallback}
+        for contrast_id, gene_id, val in omics_session.execute(stmt):
+            gene_ids, values = grouped[int(contrast_id)]
+            gene_ids.append(int(gene_id))
+            values.append(val)
+        for contrast_id, (gene_ids, values) in grouped.items():
+            name = contrasts[contrast_id]
+            series[name] = _series(np.array(gene_ids, dtype=np.int64), _float_array(values), name=name)
+
+    return _assemble(series, sources={"sidecar": len(fresh), "sqlite": len(fallback)})
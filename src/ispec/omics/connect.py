@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from ispec.config.paths import resolve_db_location
 from ispec.db.models import OmicsDatabaseRegistry, sqlite_engine
+from ispec.db.models.engine import _ensure_e2g_columns
 from ispec.logging import get_logger
 from ispec.omics.models import OmicsBase
 
@@ -117,6 +118,7 @@ def _get_registry_row(
 def _get_engine(db_uri: str, *, logical_name: str = DEFAULT_OMICS_LOGICAL_NAME) -> Engine:
     engine = sqlite_engine(db_uri)
     OmicsBase.metadata.create_all(bind=engine)
+    _ensure_e2g_columns(engine)
     journal_mode = _omics_sqlite_journal_mode(logical_name=logical_name)
     if journal_mode is None:
         return engine
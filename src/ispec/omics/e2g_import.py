@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-import csv
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from sqlalchemy.orm import Session
 
 from ispec.db.crud import E2GCRUD
 from ispec.db.models import Experiment, ExperimentRun
 from ispec.logging import get_logger
+from ispec.omics.columnar import write_e2g_partitions
 from ispec.omics.labels import experiment_run_legacy_key, normalize_legacy_label
-from ispec.omics.models import E2G
+from ispec.omics.models import E2G, OmicsImport
+from ispec.omics.pipeline import ImportThroughput, iter_parsed
+from ispec.omics.tabular import DEFAULT_BATCH_SIZE, ColumnBatch, iter_column_batches
 
 
 logger = get_logger(__file__)
@@ -37,6 +41,23 @@ class E2GImportFileResult:
     cleared_existing: bool = False
 
 
+@dataclass(frozen=True)
+class _ParsedE2GFile:
+    """Parse-stage output for one QUAL/QUANT TSV (no DB access needed).
+
+    ``record_batches`` is a lazy stream when read in-process and a list when
+    the file was parsed in a pool worker.
+    """
+
+    path: Path
+    kind: str
+    experiment_id: int
+    run_no: int
+    search_no: int
+    label: str
+    record_batches: Iterable[list[dict[str, Any]]]
+
+
 def discover_e2g_tsvs(data_dir: str | Path) -> tuple[list[Path], list[Path]]:
     root = Path(data_dir).expanduser().resolve()
     if not root.exists():
@@ -184,14 +205,19 @@ def _resolve_experiment_run(
     return run, created_experiment, True
 
 
-def _extract_file_run_info(path: Path) -> tuple[int, int, int, str, list[dict[str, str]]]:
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle, delimiter="\t")
-        rows = [row for row in reader if row]
-    if not rows:
+def _extract_file_run_info(
+    path: Path,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> tuple[int, int, int, str, Iterator[ColumnBatch]]:
+    """Read run identifiers from the first row and return a stream of all rows."""
+
+    batches = iter_column_batches(path, delimiter="\t", batch_size=batch_size)
+    first_batch = next(batches, None)
+    if first_batch is None:
         raise ValueError(f"{path.name} is empty.")
 
-    first = rows[0]
+    first = next(first_batch.rows(("EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG")))
     experiment_id = _safe_int(first.get("EXPRecNo"))
     run_no = _safe_int(first.get("EXPRunNo"))
     search_no = _safe_int(first.get("EXPSearchNo"))
@@ -202,7 +228,13 @@ def _extract_file_run_info(path: Path) -> tuple[int, int, int, str, list[dict[st
             "(EXPRecNo/EXPRunNo/EXPSearchNo/LabelFLAG)."
         )
 
-    return experiment_id, run_no, search_no, normalize_legacy_label(raw_label), rows
+    return (
+        experiment_id,
+        run_no,
+        search_no,
+        normalize_legacy_label(raw_label),
+        chain((first_batch,), batches),
+    )
 
 
 def _row_to_e2g_record(
@@ -271,49 +303,131 @@ def _row_to_e2g_record(
     return record
 
 
-def _run_has_kind_data(omics_session: Session, *, run_id: int, kind: str) -> bool:
-    query = omics_session.query(E2G.id).filter(E2G.experiment_run_id == run_id)
-    if kind == "qual":
-        query = query.filter(
-            (E2G.psms.is_not(None))
-            | (E2G.psms_u2g.is_not(None))
-            | (E2G.peptide_count.is_not(None))
-            | (E2G.peptide_count_u2g.is_not(None))
-            | (E2G.coverage.is_not(None))
-            | (E2G.coverage_u2g.is_not(None))
-            | (E2G.peptideprint.is_not(None))
-        )
-    elif kind == "quant":
-        query = query.filter(
-            (E2G.area_sum_u2g_0.is_not(None))
-            | (E2G.area_sum_u2g_all.is_not(None))
-            | (E2G.area_sum_max.is_not(None))
-            | (E2G.area_sum_dstrAdj.is_not(None))
-            | (E2G.iBAQ_dstrAdj.is_not(None))
+def _import_is_marked(omics_session: Session, *, run_id: int, kind: str) -> bool:
+    """True once a ``kind`` file has been fully imported for the run (see :class:`OmicsImport`)."""
+
+    return (
+        omics_session.query(OmicsImport.id)
+        .filter(OmicsImport.experiment_run_id == int(run_id), OmicsImport.kind == kind)
+        .limit(1)
+        .first()
+        is not None
+    )
+
+
+def _mark_imported(
+    omics_session: Session,
+    *,
+    run_id: int,
+    kind: str,
+    source_path: str,
+    rows: int,
+) -> None:
+    marker = (
+        omics_session.query(OmicsImport)
+        .filter(OmicsImport.experiment_run_id == int(run_id), OmicsImport.kind == kind)
+        .one_or_none()
+    )
+    if marker is None:
+        omics_session.add(
+            OmicsImport(experiment_run_id=int(run_id), kind=kind, source_path=source_path, rows=rows)
         )
     else:
+        marker.source_path = source_path
+        marker.rows = rows
+
+
+def _clear_import_markers(omics_session: Session, *, run_id: int, kinds: Iterable[str]) -> None:
+    (
+        omics_session.query(OmicsImport)
+        .filter(OmicsImport.experiment_run_id == int(run_id), OmicsImport.kind.in_(list(kinds)))
+        .delete(synchronize_session=False)
+    )
+
+
+def _iter_e2g_record_batches(
+    batches: Iterable[ColumnBatch],
+    *,
+    kind: str,
+    store_metadata: bool,
+) -> Iterator[list[dict[str, Any]]]:
+    for batch in batches:
+        records: list[dict[str, Any]] = []
+        for row in batch.rows():
+            rec = _row_to_e2g_record(
+                row=row,
+                experiment_run_id=0,
+                kind=kind,
+                store_metadata=store_metadata,
+            )
+            if rec is not None:
+                records.append(rec)
+        yield records
+
+
+def _parse_e2g_file(
+    path: Path,
+    *,
+    kind: str,
+    store_metadata: bool,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> _ParsedE2GFile:
+    """Open an E2G TSV as a lazy record stream.
+
+    ``experiment_run_id`` is filled in by the writer once the run is resolved.
+    """
+
+    if kind not in ("qual", "quant"):
         raise ValueError(f"Unknown kind: {kind}")
-    return query.limit(1).first() is not None
+    experiment_id, run_no, search_no, label, batches = _extract_file_run_info(
+        path, batch_size=batch_size
+    )
+    return _ParsedE2GFile(
+        path=path,
+        kind=kind,
+        experiment_id=experiment_id,
+        run_no=run_no,
+        search_no=search_no,
+        label=label,
+        record_batches=_iter_e2g_record_batches(
+            batches, kind=kind, store_metadata=store_metadata
+        ),
+    )
 
 
-def import_e2g_tsv(
+def _parse_e2g_item(
+    item: tuple[Path, str],
+    *,
+    store_metadata: bool,
+    materialize: bool = False,
+) -> _ParsedE2GFile:
+    path, kind = item
+    if not path.exists():
+        raise FileNotFoundError(str(path))
+    parsed = _parse_e2g_file(path, kind=kind, store_metadata=store_metadata)
+    if materialize:
+        # Pool workers must hand back picklable data, not a live file stream.
+        parsed = replace(parsed, record_batches=list(parsed.record_batches))
+    return parsed
+
+
+def _write_parsed_e2g_file(
     *,
     core_session: Session,
     omics_session: Session,
-    path: str | Path,
-    kind: str,
-    create_missing_runs: bool = True,
-    create_missing_experiments: bool = True,
-    store_metadata: bool = False,
-    skip_imported: bool = True,
-    force: bool = False,
-    cleared_run_ids: set[int] | None = None,
+    parsed: _ParsedE2GFile,
+    create_missing_runs: bool,
+    create_missing_experiments: bool,
+    skip_imported: bool,
+    force: bool,
+    cleared_run_ids: set[int] | None,
 ) -> E2GImportFileResult:
-    tsv_path = Path(path).expanduser().resolve()
-    if not tsv_path.exists():
-        raise FileNotFoundError(str(tsv_path))
-
-    experiment_id, run_no, search_no, label, rows = _extract_file_run_info(tsv_path)
+    tsv_path = parsed.path
+    kind = parsed.kind
+    experiment_id = parsed.experiment_id
+    run_no = parsed.run_no
+    search_no = parsed.search_no
+    label = parsed.label
     run, created_experiment, created_run = _resolve_experiment_run(
         core_session,
         experiment_id=experiment_id,
@@ -324,23 +438,8 @@ def import_e2g_tsv(
         create_missing_experiments=create_missing_experiments,
     )
 
-    cleared_existing = False
-    if force:
-        if cleared_run_ids is None or int(run.id) not in cleared_run_ids:
-            deleted = (
-                omics_session.query(E2G)
-                .filter(E2G.experiment_run_id == int(run.id))
-                .delete(synchronize_session=False)
-            )
-            if deleted:
-                logger.info("Cleared %d existing E2G rows for ExperimentRun %s", int(deleted), int(run.id))
-            cleared_existing = True
-            if cleared_run_ids is not None:
-                cleared_run_ids.add(int(run.id))
-            omics_session.commit()
-
     if skip_imported and not force:
-        if _run_has_kind_data(omics_session, run_id=int(run.id), kind=kind):
+        if _import_is_marked(omics_session, run_id=int(run.id), kind=kind):
             return E2GImportFileResult(
                 path=str(tsv_path),
                 kind=kind,
@@ -359,19 +458,46 @@ def import_e2g_tsv(
                 cleared_existing=False,
             )
 
-    records: list[dict[str, Any]] = []
-    for row in rows:
-        rec = _row_to_e2g_record(
-            row=row,
-            experiment_run_id=int(run.id),
-            kind=kind,
-            store_metadata=store_metadata,
-        )
-        if rec is not None:
-            records.append(rec)
-
+    # The file is one transaction: batches are flushed as they stream in and
+    # committed together with the completion marker, so a file that fails
+    # partway (a forced reimport included) leaves the run as it was. The key
+    # index is shared across batches so it is read once per file.
     crud = E2GCRUD()
-    result = crud.bulk_upsert(omics_session, records)
+    key_indexes: dict[tuple[int, str], dict] = {}
+    cleared_existing = False
+    rows = 0
+    inserted = 0
+    updated = 0
+    try:
+        if force and (cleared_run_ids is None or int(run.id) not in cleared_run_ids):
+            deleted = (
+                omics_session.query(E2G)
+                .filter(E2G.experiment_run_id == int(run.id))
+                .delete(synchronize_session=False)
+            )
+            _clear_import_markers(omics_session, run_id=int(run.id), kinds=("qual", "quant"))
+            if deleted:
+                logger.info("Cleared %d existing E2G rows for ExperimentRun %s", int(deleted), int(run.id))
+            cleared_existing = True
+
+        for batch in parsed.record_batches:
+            records = [dict(rec, experiment_run_id=int(run.id)) for rec in batch]
+            result = crud.bulk_upsert(
+                omics_session, records, key_indexes=key_indexes, commit=False
+            )
+            rows += len(records)
+            inserted += int(result.get("inserted", 0))
+            updated += int(result.get("updated", 0))
+
+        _mark_imported(
+            omics_session, run_id=int(run.id), kind=kind, source_path=str(tsv_path), rows=rows
+        )
+        omics_session.commit()
+    except BaseException:
+        omics_session.rollback()
+        raise
+    if cleared_existing and cleared_run_ids is not None:
+        cleared_run_ids.add(int(run.id))
 
     # Mark flags for discoverability in the UI.
     experiment = core_session.get(Experiment, experiment_id)
@@ -389,9 +515,9 @@ def import_e2g_tsv(
         search_no=search_no,
         label=label,
         experiment_run_id=int(run.id),
-        rows=len(records),
-        inserted=int(result.get("inserted", 0)),
-        updated=int(result.get("updated", 0)),
+        rows=rows,
+        inserted=inserted,
+        updated=updated,
         skipped=False,
         skip_reason=None,
         created_experiment=created_experiment,
@@ -400,6 +526,47 @@ def import_e2g_tsv(
     )
 
 
+def import_e2g_tsv(
+    *,
+    core_session: Session,
+    omics_session: Session,
+    path: str | Path,
+    kind: str,
+    create_missing_runs: bool = True,
+    create_missing_experiments: bool = True,
+    store_metadata: bool = False,
+    skip_imported: bool = True,
+    force: bool = False,
+    cleared_run_ids: set[int] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> E2GImportFileResult:
+    """Import one QUAL/QUANT TSV, streaming ``batch_size`` rows at a time.
+
+    The file commits as a whole; if it fails, none of its rows are kept.
+    """
+
+    tsv_path = Path(path).expanduser().resolve()
+    if not tsv_path.exists():
+        raise FileNotFoundError(str(tsv_path))
+
+    parsed = _parse_e2g_file(
+        tsv_path, kind=kind, store_metadata=store_metadata, batch_size=batch_size
+    )
+    result = _write_parsed_e2g_file(
+        core_session=core_session,
+        omics_session=omics_session,
+        parsed=parsed,
+        create_missing_runs=create_missing_runs,
+        create_missing_experiments=create_missing_experiments,
+        skip_imported=skip_imported,
+        force=force,
+        cleared_run_ids=cleared_run_ids,
+    )
+    if not result.skipped:
+        write_e2g_partitions(omics_session, [result.experiment_run_id])
+    return result
+
+
 def import_e2g_files(
     *,
     core_session: Session,
@@ -411,7 +578,15 @@ def import_e2g_files(
     store_metadata: bool = False,
     skip_imported: bool = True,
     force: bool = False,
+    workers: int = 1,
 ) -> dict[str, Any]:
+    """Import QUAL then QUANT files, optionally parsing them in a process pool.
+
+    With ``workers > 1`` TSV parsing/normalization overlaps with writes; all DB
+    work still happens on the calling thread in file order, so results match
+    the serial import.
+    """
+
     qual_paths = qual_paths or []
     quant_paths = quant_paths or []
 
@@ -421,42 +596,39 @@ def import_e2g_files(
     updated_total = 0
     skipped_total = 0
     cleared_run_ids: set[int] = set()
+    throughput = ImportThroughput(workers=max(1, int(workers or 1)))
 
+    items: list[tuple[Path, str]] = []
     for path in qual_paths:
-        try:
-            res = import_e2g_tsv(
-                core_session=core_session,
-                omics_session=omics_session,
-                path=path,
-                kind="qual",
-                create_missing_runs=create_missing_runs,
-                create_missing_experiments=create_missing_experiments,
-                store_metadata=store_metadata,
-                skip_imported=skip_imported,
-                force=force,
-                cleared_run_ids=cleared_run_ids,
-            )
-        except Exception as exc:
-            errors.append(f"{path.name}: {type(exc).__name__}: {exc}")
-            continue
-        results.append(res)
-        inserted_total += res.inserted
-        updated_total += res.updated
-        skipped_total += 1 if res.skipped else 0
-
+        items.append((Path(path).expanduser().resolve(), "qual"))
     for path in quant_paths:
+        items.append((Path(path).expanduser().resolve(), "quant"))
+
+    parse_fn = partial(
+        _parse_e2g_item,
+        store_metadata=store_metadata,
+        materialize=throughput.workers > 1,
+    )
+    for (path, _kind), parsed, parse_seconds, parse_error in iter_parsed(
+        items, parse_fn, workers=throughput.workers
+    ):
+        if parse_error is not None:
+            errors.append(f"{path.name}: {type(parse_error).__name__}: {parse_error}")
+            continue
         try:
-            res = import_e2g_tsv(
-                core_session=core_session,
-                omics_session=omics_session,
-                path=path,
-                kind="quant",
-                create_missing_runs=create_missing_runs,
-                create_missing_experiments=create_missing_experiments,
-                store_metadata=store_metadata,
-                skip_imported=skip_imported,
-                force=force,
-                cleared_run_ids=cleared_run_ids,
+            res = throughput.write_file(
+                parsed.record_batches,
+                lambda batches: _write_parsed_e2g_file(
+                    core_session=core_session,
+                    omics_session=omics_session,
+                    parsed=replace(parsed, record_batches=batches),
+                    create_missing_runs=create_missing_runs,
+                    create_missing_experiments=create_missing_experiments,
+                    skip_imported=skip_imported,
+                    force=force,
+                    cleared_run_ids=cleared_run_ids,
+                ),
+                parse_seconds=parse_seconds,
             )
         except Exception as exc:
             errors.append(f"{path.name}: {type(exc).__name__}: {exc}")
@@ -466,12 +638,17 @@ def import_e2g_files(
         updated_total += res.updated
         skipped_total += 1 if res.skipped else 0
 
+    write_e2g_partitions(
+        omics_session, {res.experiment_run_id for res in results if not res.skipped}
+    )
+
     payload = {
         "files": [res.__dict__ for res in results],
         "inserted": inserted_total,
         "updated": updated_total,
         "skipped": skipped_total,
         "errors": errors,
+        "throughput": throughput.as_dict(),
     }
     logger.info("E2G import summary: %s", payload)
     return payload
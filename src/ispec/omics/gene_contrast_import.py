@@ -12,6 +12,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ispec.db.models import Project
+from ispec.omics.columnar import write_gene_contrast_partitions
 from ispec.omics.models import GeneContrast, GeneContrastStat
 
 
@@ -262,6 +263,7 @@ def import_gene_contrast_file(
         contrast_row.metadata_json = json.dumps(meta_payload, ensure_ascii=False, separators=(",", ":"))
 
     omics_session.flush()
+    write_gene_contrast_partitions(omics_session, [int(contrast_row.id)])
 
     return GeneContrastImportResult(
         path=str(file_path),
@@ -16,6 +16,7 @@ GeneContrastTimestamp = make_timestamp_mixin("GeneContrast")
 GeneContrastStatTimestamp = make_timestamp_mixin("GeneContrastStat")
 GSEAAnalysisTimestamp = make_timestamp_mixin("GSEAAnalysis")
 GSEAResultTimestamp = make_timestamp_mixin("GSEAResult")
+OmicsImportTimestamp = make_timestamp_mixin("OmicsImport")
 
 
 class E2G(E2GTimestamp, OmicsBase):
@@ -33,6 +34,8 @@ class E2G(E2GTimestamp, OmicsBase):
         Index("ix_e2g_run", "experiment_run_id"),
         Index("ix_e2g_gene", "gene"),
         Index("ix_e2g_symbol", "gene_symbol"),
+        Index("ix_e2g_run_label_group", "experiment_run_id", "label", "gene_group"),
+        Index("ix_e2g_group_run", "gene_group", "experiment_run_id"),
         {"sqlite_autoincrement": True},
     )
 
@@ -41,6 +44,9 @@ class E2G(E2GTimestamp, OmicsBase):
     gene: Mapped[str] = mapped_column(Text, nullable=False)
     geneidtype: Mapped[str] = mapped_column(Text, nullable=False)
     label: Mapped[str] = mapped_column(Text, nullable=False, default="0")
+    # Canonical "<type>:<id>" key shared by equivalent identifiers (see
+    # ispec.genomics.identifiers.gene_group_keys); NULL until backfilled.
+    gene_group: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     # Convenience columns (GeneID is canonical; the others help search/display).
     gene_symbol: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -88,6 +94,26 @@ class PSM(PSMTimestamp, OmicsBase):
     metadata_json: Mapped[str | None] = mapped_column(Text, nullable=True)
 
 
+class OmicsImport(OmicsImportTimestamp, OmicsBase):
+    """Marks one kind of data (``qual``, ``quant``, ``psm``) as fully imported for a run.
+
+    Written in the same transaction as the file's last rows, so a run with
+    rows but no marker holds an import that did not finish.
+    """
+
+    __tablename__ = "omics_import"
+    __table_args__ = (
+        UniqueConstraint("experiment_run_id", "kind", name="uq_omics_import_run_kind"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    experiment_run_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    kind: Mapped[str] = mapped_column(Text, nullable=False)
+    source_path: Mapped[str | None] = mapped_column(Text, nullable=True)
+    rows: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
 class GeneContrast(GeneContrastTimestamp, OmicsBase):
     """A named differential-analysis contrast for a project (e.g. a volcano table)."""
 
@@ -0,0 +1,156 @@
+"""Parse/write pipeline shared by the multi-file omics importers.
+
+Importers split each file into a pure parse stage (read + normalize rows, no DB
+access) and a write stage (resolve runs, upsert rows). With ``workers > 1`` the
+parse stage runs in a process pool while the calling thread stays the single
+SQLite writer; at most ``queue_size`` parsed files are held in flight so memory
+stays bounded on folders with hundreds of TSVs.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Sized, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_QUEUE_SIZE_PER_WORKER = 2
+
+
+def _timed_call(fn: Callable[[T], R], item: T) -> tuple[R, float]:
+    started = time.perf_counter()
+    result = fn(item)
+    return result, time.perf_counter() - started
+
+
+@dataclass
+class _StageStats:
+    files: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        rate = (self.rows / self.seconds) if self.seconds > 0 else None
+        return {
+            "files": self.files,
+            "rows": self.rows,
+            "seconds": round(self.seconds, 6),
+            "rows_per_second": round(rate, 2) if rate is not None else None,
+        }
+
+
+@dataclass
+class ImportThroughput:
+    """Per-stage counters reported alongside import summaries."""
+
+    workers: int = 1
+    started: float = field(default_factory=time.perf_counter)
+    parse: _StageStats = field(default_factory=_StageStats)
+    write: _StageStats = field(default_factory=_StageStats)
+
+    def track_parse(self, batches: Iterable[Sized], *, seconds: float = 0.0) -> Iterator[Any]:
+        """Count a file's parse stage and time each batch pulled from ``batches``.
+
+        ``seconds`` covers parse work already done elsewhere (e.g. in a pool
+        worker); time spent producing lazily streamed batches is added as they
+        are consumed.
+        """
+
+        self.parse.files += 1
+        self.parse.seconds += float(seconds)
+        return self._timed_batches(iter(batches))
+
+    def _timed_batches(self, iterator: Iterator[Sized]) -> Iterator[Any]:
+        while True:
+            started = time.perf_counter()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                self.parse.seconds += time.perf_counter() - started
+                return
+            self.parse.seconds += time.perf_counter() - started
+            self.parse.rows += len(batch)
+            yield batch
+
+    def write_file(
+        self,
+        batches: Iterable[Sized],
+        write: Callable[[Iterator[Any]], R],
+        *,
+        parse_seconds: float = 0.0,
+    ) -> R:
+        """Run ``write`` over tracked ``batches``; parse time is not billed as write time."""
+
+        tracked = self.track_parse(batches, seconds=parse_seconds)
+        parse_mark = self.parse.seconds
+        started = time.perf_counter()
+        result = write(tracked)
+        elapsed = time.perf_counter() - started - (self.parse.seconds - parse_mark)
+        self.write.files += 1
+        self.write.rows += int(getattr(result, "rows", 0) or 0)
+        self.write.seconds += max(0.0, elapsed)
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "parse": self.parse.as_dict(),
+            "write": self.write.as_dict(),
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+        }
+
+
+def iter_parsed(
+    items: Iterable[T],
+    parse_fn: Callable[[T], R],
+    *,
+    workers: int = 1,
+    queue_size: int | None = None,
+) -> Iterator[tuple[T, R | None, float, BaseException | None]]:
+    """Yield ``(item, parsed, parse_seconds, error)`` in input order.
+
+    ``parse_fn`` must be picklable (a module-level function or a
+    ``functools.partial`` of one) when ``workers > 1``. Parse errors are
+    yielded rather than raised so callers can record them per file the same
+    way the serial importers do.
+    """
+
+    workers = max(1, int(workers or 1))
+    if workers == 1:
+        for item in items:
+            try:
+                parsed, seconds = _timed_call(parse_fn, item)
+            except Exception as exc:
+                yield item, None, 0.0, exc
+                continue
+            yield item, parsed, seconds, None
+        return
+
+    limit = max(workers, int(queue_size or workers * DEFAULT_QUEUE_SIZE_PER_WORKER))
+    source = iter(items)
+    pending: deque[tuple[T, Future]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def submit_next() -> None:
+            for item in source:
+                pending.append((item, pool.submit(_timed_call, parse_fn, item)))
+                return
+
+        for _ in range(limit):
+            submit_next()
+        while pending:
+            item, future = pending.popleft()
+            try:
+                parsed, seconds = future.result()
+            except Exception as exc:
+                submit_next()
+                yield item, None, 0.0, exc
+                continue
+            # Refill before yielding so workers parse while the caller writes.
+            submit_next()
+            yield item, parsed, seconds, None
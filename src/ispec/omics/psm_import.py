@@ -1,18 +1,29 @@
 from __future__ import annotations
 
-import csv
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from sqlalchemy.orm import Session
 
 from ispec.db.models import Experiment, ExperimentRun
 from ispec.logging import get_logger
-from ispec.omics.e2g_import import _resolve_experiment_run, _safe_float, _safe_int, _safe_str
+from ispec.omics.columnar import write_psm_partitions
+from ispec.omics.e2g_import import (
+    _clear_import_markers,
+    _import_is_marked,
+    _mark_imported,
+    _resolve_experiment_run,
+    _safe_float,
+    _safe_int,
+    _safe_str,
+)
 from ispec.omics.labels import normalize_legacy_label
 from ispec.omics.models import PSM
+from ispec.omics.pipeline import ImportThroughput, iter_parsed
+from ispec.omics.tabular import DEFAULT_BATCH_SIZE, iter_column_batches, sniff_delimiter
 
 
 logger = get_logger(__file__)
@@ -44,6 +55,7 @@ _KNOWN_COLUMNS = set(
     + _INTENSITY_COLUMNS
     + ("EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG")
 )
+_RUN_KEY_COLUMNS = frozenset(_RUN_ID_COLUMNS) | {"EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG"}
 
 
 @dataclass(frozen=True)
@@ -88,23 +100,7 @@ def _first_value(row: dict[str, str], names: tuple[str, ...]) -> str | None:
 
 
 def _detect_delimiter(path: Path) -> str:
-    sample = path.read_text(encoding="utf-8", errors="ignore")[:2048]
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters="\t,")
-        return dialect.delimiter
-    except Exception:
-        return "\t"
-
-
-def _load_rows(path: Path) -> tuple[list[dict[str, str]], list[str]]:
-    delimiter = _detect_delimiter(path)
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle, delimiter=delimiter)
-        fieldnames = [str(name) for name in (reader.fieldnames or []) if name]
-        rows = [row for row in reader if row]
-    if not rows:
-        raise ValueError(f"{path.name} is empty.")
-    return rows, fieldnames
+    return sniff_delimiter(path)
 
 
 def _normalize_score_type(row: dict[str, str]) -> str | None:
@@ -174,16 +170,6 @@ def _resolve_target_run(
     return run, bool(created_experiment), bool(created_run)
 
 
-def _run_has_psm_data(omics_session: Session, *, run_id: int) -> bool:
-    return (
-        omics_session.query(PSM.id)
-        .filter(PSM.experiment_run_id == int(run_id))
-        .limit(1)
-        .first()
-        is not None
-    )
-
-
 def _metadata_json(
     row: dict[str, str],
     *,
@@ -255,62 +241,141 @@ def _mark_run_flags(core_session: Session, *, run: ExperimentRun) -> None:
     core_session.flush()
 
 
-def import_psm_file(
+@dataclass(frozen=True)
+class _ParsedPSMFile:
+    """Parse-stage output for one PSM table.
+
+    ``run_keys`` holds the distinct run-identifying column values in first-seen
+    order; ``entry_batches`` yields ``(run_key_index, record)`` lists, where the
+    record is ``None`` for rows lacking a scan number or peptide. Batches are a
+    lazy stream when read in-process and a list when parsed in a pool worker.
+    """
+
+    path: Path
+    run_keys: list[dict[str, str]]
+    entry_batches: Iterable[list[tuple[int, dict[str, Any] | None]]]
+
+
+def _run_key(row: dict[str, Any]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((str(k), str(v)) for k, v in row.items()))
+
+
+def _scan_run_keys(path: Path, *, delimiter: str, batch_size: int) -> list[dict[str, str]]:
+    """First pass: collect distinct run identifiers without holding rows."""
+
+    seen: dict[tuple[tuple[str, str], ...], dict[str, str]] = {}
+    rows_seen = 0
+    for batch in iter_column_batches(
+        path, delimiter=delimiter, batch_size=batch_size, usecols=_RUN_KEY_COLUMNS
+    ):
+        rows_seen += len(batch)
+        for row in batch.rows():
+            seen.setdefault(_run_key(row), row)
+    if not rows_seen:
+        raise ValueError(f"{path.name} is empty.")
+    return list(seen.values())
+
+
+def _iter_psm_entry_batches(
+    path: Path,
+    *,
+    delimiter: str,
+    batch_size: int,
+    run_keys: list[dict[str, str]],
+    store_metadata: bool,
+) -> Iterator[list[tuple[int, dict[str, Any] | None]]]:
+    key_index = {_run_key(row): idx for idx, row in enumerate(run_keys)}
+    for batch in iter_column_batches(path, delimiter=delimiter, batch_size=batch_size):
+        fieldnames = list(batch.fieldnames)
+        entries: list[tuple[int, dict[str, Any] | None]] = []
+        for row in batch.rows():
+            key = _run_key({k: v for k, v in row.items() if k in _RUN_KEY_COLUMNS})
+            entries.append(
+                (
+                    key_index[key],
+                    _row_to_record(
+                        row=row,
+                        experiment_run_id=0,
+                        fieldnames=fieldnames,
+                        filename=path.name,
+                        store_metadata=store_metadata,
+                    ),
+                )
+            )
+        yield entries
+
+
+def _parse_psm_file(
+    path: Path,
+    *,
+    store_metadata: bool,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    materialize: bool = False,
+) -> _ParsedPSMFile:
+    """Open a PSM table as a two-pass stream (run keys first, then records).
+
+    ``experiment_run_id`` is filled in by the writer once runs are resolved.
+    ``materialize`` reads every batch eagerly so the result can be pickled
+    back from a pool worker.
+    """
+
+    if not path.exists():
+        raise FileNotFoundError(str(path))
+    delimiter = _detect_delimiter(path)
+    run_keys = _scan_run_keys(path, delimiter=delimiter, batch_size=batch_size)
+    entry_batches: Iterable[list[tuple[int, dict[str, Any] | None]]] = _iter_psm_entry_batches(
+        path,
+        delimiter=delimiter,
+        batch_size=batch_size,
+        run_keys=run_keys,
+        store_metadata=store_metadata,
+    )
+    if materialize:
+        entry_batches = list(entry_batches)
+    return _ParsedPSMFile(path=path, run_keys=run_keys, entry_batches=entry_batches)
+
+
+def _write_parsed_psm_file(
     *,
     core_session: Session,
     omics_session: Session,
-    path: str | Path,
-    experiment_run_id: int | None = None,
-    experiment_id: int | None = None,
-    run_no: int | None = None,
-    search_no: int | None = None,
-    label: str | None = None,
-    create_missing_runs: bool = True,
-    create_missing_experiments: bool = True,
-    store_metadata: bool = False,
-    skip_imported: bool = True,
-    force: bool = False,
+    parsed: _ParsedPSMFile,
+    experiment_run_id: int | None,
+    experiment_id: int | None,
+    run_no: int | None,
+    search_no: int | None,
+    label: str | None,
+    create_missing_runs: bool,
+    create_missing_experiments: bool,
+    skip_imported: bool,
+    force: bool,
 ) -> PSMImportFileResult:
-    file_path = Path(path).expanduser().resolve()
-    if not file_path.exists():
-        raise FileNotFoundError(str(file_path))
-
-    rows, fieldnames = _load_rows(file_path)
-    run_cache: dict[tuple[tuple[str, str], ...], tuple[ExperimentRun, bool, bool]] = {}
+    file_path = parsed.path
+    runs: list[ExperimentRun] = []
     run_ids: list[int] = []
     created_experiment = False
     created_run = False
 
-    for row in rows:
-        key = tuple(
-            sorted(
-                (str(k), str(v))
-                for k, v in row.items()
-                if k in _RUN_ID_COLUMNS or k in {"EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG"}
-            )
+    for row in parsed.run_keys:
+        run, created_exp, created_run_row = _resolve_target_run(
+            core_session=core_session,
+            row=row,
+            experiment_run_id=experiment_run_id,
+            experiment_id=experiment_id,
+            run_no=run_no,
+            search_no=search_no,
+            label=label,
+            create_missing_runs=create_missing_runs,
+            create_missing_experiments=create_missing_experiments,
         )
-        if key in run_cache:
-            run, created_exp, created_run_row = run_cache[key]
-        else:
-            run, created_exp, created_run_row = _resolve_target_run(
-                core_session=core_session,
-                row=row,
-                experiment_run_id=experiment_run_id,
-                experiment_id=experiment_id,
-                run_no=run_no,
-                search_no=search_no,
-                label=label,
-                create_missing_runs=create_missing_runs,
-                create_missing_experiments=create_missing_experiments,
-            )
-            run_cache[key] = (run, created_exp, created_run_row)
+        runs.append(run)
         if int(run.id) not in run_ids:
             run_ids.append(int(run.id))
         created_experiment = created_experiment or bool(created_exp)
         created_run = created_run or bool(created_run_row)
 
     if run_ids and skip_imported and not force:
-        if any(_run_has_psm_data(omics_session, run_id=run_id) for run_id in run_ids):
+        if any(_import_is_marked(omics_session, run_id=run_id, kind="psm") for run_id in run_ids):
             return PSMImportFileResult(
                 path=str(file_path),
                 experiment_run_id=experiment_run_id if experiment_run_id is not None else (run_ids[0] if len(run_ids) == 1 else None),
@@ -325,68 +390,72 @@ def import_psm_file(
                 cleared_existing=False,
             )
 
+    # The file is one transaction: batches are flushed as they stream in and
+    # committed together with the completion markers, so a file that fails
+    # partway (a forced reimport included) leaves its runs as they were.
     cleared_existing = False
-    if run_ids and force:
-        for run_id in run_ids:
-            (
-                omics_session.query(PSM)
-                .filter(PSM.experiment_run_id == int(run_id))
-                .delete(synchronize_session=False)
-            )
-        cleared_existing = True
-
     inserted = 0
     updated = 0
     rows_read = 0
-    for row in rows:
-        rows_read += 1
-        run, _, _ = _resolve_target_run(
-            core_session=core_session,
-            row=row,
-            experiment_run_id=experiment_run_id,
-            experiment_id=experiment_id,
-            run_no=run_no,
-            search_no=search_no,
-            label=label,
-            create_missing_runs=create_missing_runs,
-            create_missing_experiments=create_missing_experiments,
-        )
-        _mark_run_flags(core_session, run=run)
-        record = _row_to_record(
-            row=row,
-            experiment_run_id=int(run.id),
-            fieldnames=fieldnames,
-            filename=file_path.name,
-            store_metadata=store_metadata,
-        )
-        if record is None:
-            continue
-
-        existing_query = (
-            omics_session.query(PSM)
-            .filter(PSM.experiment_run_id == int(run.id))
-            .filter(PSM.scan_number == int(record["scan_number"]))
-            .filter(PSM.peptide == str(record["peptide"]))
-        )
-        if record.get("charge") is None:
-            existing_query = existing_query.filter(PSM.charge.is_(None))
-        else:
-            existing_query = existing_query.filter(PSM.charge == int(record["charge"]))
-        existing = existing_query.one_or_none()
-        if existing is None:
-            omics_session.add(PSM(**record))
-            inserted += 1
-            continue
+    run_rows = {run_id: 0 for run_id in run_ids}
+    try:
+        if run_ids and force:
+            for run_id in run_ids:
+                (
+                    omics_session.query(PSM)
+                    .filter(PSM.experiment_run_id == int(run_id))
+                    .delete(synchronize_session=False)
+                )
+                _clear_import_markers(omics_session, run_id=run_id, kinds=("psm",))
+            cleared_existing = True
+
+        for batch in parsed.entry_batches:
+            for run_index, parsed_record in batch:
+                rows_read += 1
+                if parsed_record is None:
+                    continue
+                run = runs[run_index]
+                run_rows[int(run.id)] += 1
+                record = dict(parsed_record, experiment_run_id=int(run.id))
+
+                existing_query = (
+                    omics_session.query(PSM)
+                    .filter(PSM.experiment_run_id == int(run.id))
+                    .filter(PSM.scan_number == int(record["scan_number"]))
+                    .filter(PSM.peptide == str(record["peptide"]))
+                )
+                if record.get("charge") is None:
+                    existing_query = existing_query.filter(PSM.charge.is_(None))
+                else:
+                    existing_query = existing_query.filter(PSM.charge == int(record["charge"]))
+                existing = existing_query.one_or_none()
+                if existing is None:
+                    omics_session.add(PSM(**record))
+                    inserted += 1
+                    continue
+
+                changed = False
+                for field, value in record.items():
+                    if getattr(existing, field) != value:
+                        setattr(existing, field, value)
+                        changed = True
+                if changed:
+                    updated += 1
+            # Flush per batch so pending objects do not pile up in the session.
+            omics_session.flush()
+
+        for run_id, count in run_rows.items():
+            _mark_imported(
+                omics_session, run_id=run_id, kind="psm", source_path=str(file_path), rows=count
+            )
+        omics_session.commit()
+    except BaseException:
+        omics_session.rollback()
+        raise
 
-        changed = False
-        for field, value in record.items():
-            if getattr(existing, field) != value:
-                setattr(existing, field, value)
-                changed = True
-        if changed:
-            updated += 1
+    for run in runs:
+        _mark_run_flags(core_session, run=run)
 
-    omics_session.flush()
     return PSMImportFileResult(
         path=str(file_path),
         experiment_run_id=experiment_run_id if experiment_run_id is not None else (run_ids[0] if len(run_ids) == 1 else None),
@@ -402,6 +471,52 @@ def import_psm_file(
     )
 
 
+def import_psm_file(
+    *,
+    core_session: Session,
+    omics_session: Session,
+    path: str | Path,
+    experiment_run_id: int | None = None,
+    experiment_id: int | None = None,
+    run_no: int | None = None,
+    search_no: int | None = None,
+    label: str | None = None,
+    create_missing_runs: bool = True,
+    create_missing_experiments: bool = True,
+    store_metadata: bool = False,
+    skip_imported: bool = True,
+    force: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> PSMImportFileResult:
+    """Import one PSM table, streaming ``batch_size`` rows at a time.
+
+    The file commits as a whole; if it fails, none of its rows are kept.
+    """
+
+    file_path = Path(path).expanduser().resolve()
+    if not file_path.exists():
+        raise FileNotFoundError(str(file_path))
+
+    parsed = _parse_psm_file(file_path, store_metadata=store_metadata, batch_size=batch_size)
+    result = _write_parsed_psm_file(
+        core_session=core_session,
+        omics_session=omics_session,
+        parsed=parsed,
+        experiment_run_id=experiment_run_id,
+        experiment_id=experiment_id,
+        run_no=run_no,
+        search_no=search_no,
+        label=label,
+        create_missing_runs=create_missing_runs,
+        create_missing_experiments=create_missing_experiments,
+        skip_imported=skip_imported,
+        force=force,
+    )
+    if not result.skipped:
+        write_psm_partitions(omics_session, result.experiment_run_ids)
+    return result
+
+
 def import_psm_files(
     *,
     core_session: Session,
@@ -417,31 +532,61 @@ def import_psm_files(
     store_metadata: bool = False,
     skip_imported: bool = True,
     force: bool = False,
+    workers: int = 1,
 ) -> dict[str, Any]:
+    """Import PSM tables, optionally parsing them in a process pool.
+
+    With ``workers > 1`` parsing overlaps with writes; run resolution and all
+    DB writes stay on the calling thread in file order.
+    """
+
     results: list[PSMImportFileResult] = []
     errors: list[dict[str, str]] = []
+    throughput = ImportThroughput(workers=max(1, int(workers or 1)))
 
-    for path in [Path(p).expanduser().resolve() for p in paths]:
+    parse_fn = partial(
+        _parse_psm_file,
+        store_metadata=store_metadata,
+        materialize=throughput.workers > 1,
+    )
+    for path, parsed, parse_seconds, parse_error in iter_parsed(
+        [Path(p).expanduser().resolve() for p in paths],
+        parse_fn,
+        workers=throughput.workers,
+    ):
+        if parse_error is not None:
+            logger.error("Failed parsing PSM file %s: %s", path, parse_error)
+            errors.append({"path": str(path), "error": str(parse_error)})
+            continue
         try:
-            result = import_psm_file(
-                core_session=core_session,
-                omics_session=omics_session,
-                path=path,
-                experiment_run_id=experiment_run_id,
-                experiment_id=experiment_id,
-                run_no=run_no,
-                search_no=search_no,
-                label=label,
-                create_missing_runs=create_missing_runs,
-                create_missing_experiments=create_missing_experiments,
-                store_metadata=store_metadata,
-                skip_imported=skip_imported,
-                force=force,
+            result = throughput.write_file(
+                parsed.entry_batches,
+                lambda batches: _write_parsed_psm_file(
+                    core_session=core_session,
+                    omics_session=omics_session,
+                    parsed=replace(parsed, entry_batches=batches),
+                    experiment_run_id=experiment_run_id,
+                    experiment_id=experiment_id,
+                    run_no=run_no,
+                    search_no=search_no,
+                    label=label,
+                    create_missing_runs=create_missing_runs,
+                    create_missing_experiments=create_missing_experiments,
+                    skip_imported=skip_imported,
+                    force=force,
+                ),
+                parse_seconds=parse_seconds,
             )
-            results.append(result)
         except Exception as exc:
             logger.exception("Failed importing PSM file: %s", path)
             errors.append({"path": str(path), "error": str(exc)})
+            continue
+        results.append(result)
+
+    write_psm_partitions(
+        omics_session,
+        {run_id for result in results if not result.skipped for run_id in result.experiment_run_ids},
+    )
 
     return {
         "files": [result.__dict__ for result in results],
@@ -449,4 +594,5 @@ def import_psm_files(
         "updated": sum(result.updated for result in results),
         "skipped": sum(1 for result in results if result.skipped),
         "errors": errors,
+        "throughput": throughput.as_dict(),
     }
@@ -0,0 +1,115 @@
+"""Streaming readers for delimited omics exports (E2G, PSM).
+
+Readers yield fixed-size :class:`ColumnBatch` objects (one list per column)
+instead of materializing a dict per row, so importers can commit batch by
+batch with peak memory bounded by ``batch_size`` rather than file size.
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+DEFAULT_BATCH_SIZE = 5000
+_SNIFF_BYTES = 2048
+
+
+@dataclass(frozen=True)
+class ColumnBatch:
+    """A block of consecutive rows stored column-wise.
+
+    Missing trailing cells are ``None`` (matching :class:`csv.DictReader`);
+    cells beyond the header are dropped.
+    """
+
+    fieldnames: tuple[str, ...]
+    columns: dict[str, list[str | None]]
+    start_row: int
+    size: int
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> list[str | None]:
+        values = self.columns.get(name)
+        if values is None:
+            return [None] * len(self)
+        return values
+
+    def rows(self, names: Iterable[str] | None = None) -> Iterator[dict[str, str | None]]:
+        """Yield transient per-row dicts, optionally restricted to ``names``."""
+
+        keys = self.fieldnames if names is None else tuple(n for n in names if n in self.columns)
+        if not keys:
+            for _ in range(self.size):
+                yield {}
+            return
+        for values in zip(*(self.columns[key] for key in keys)):
+            yield dict(zip(keys, values))
+
+
+def sniff_delimiter(path: str | Path, *, default: str = "\t", delimiters: str = "\t,") -> str:
+    """Detect the delimiter from the first few KB of ``path``."""
+
+    with Path(path).open("r", encoding="utf-8", errors="ignore", newline="") as handle:
+        sample = handle.read(_SNIFF_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=delimiters).delimiter
+    except Exception:
+        return default
+
+
+def read_fieldnames(path: str | Path, *, delimiter: str) -> list[str]:
+    with Path(path).open("r", encoding="utf-8", newline="") as handle:
+        header = next(csv.reader(handle, delimiter=delimiter), None)
+    return [str(name) for name in (header or [])]
+
+
+def iter_column_batches(
+    path: str | Path,
+    *,
+    delimiter: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    usecols: Iterable[str] | None = None,
+) -> Iterator[ColumnBatch]:
+    """Yield :class:`ColumnBatch` blocks of up to ``batch_size`` rows.
+
+    Blank lines are skipped like :class:`csv.DictReader`. ``usecols`` limits
+    which columns are kept (unknown names are ignored).
+    """
+
+    file_path = Path(path)
+    if delimiter is None:
+        delimiter = sniff_delimiter(file_path)
+    batch_size = max(1, int(batch_size))
+
+    with file_path.open("r", encoding="utf-8", newline="") as handle:
+        reader = csv.reader(handle, delimiter=delimiter)
+        header = next(reader, None) or []
+        wanted = None if usecols is None else set(usecols)
+        selected = [
+            (idx, str(name))
+            for idx, name in enumerate(header)
+            if name and (wanted is None or name in wanted)
+        ]
+        fieldnames = tuple(name for _, name in selected)
+        start_row = 0
+        rows = (row for row in reader if row)
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                return
+            columns: dict[str, list[str | None]] = {}
+            for idx, name in selected:
+                columns[name] = [row[idx] if idx < len(row) else None for row in chunk]
+            yield ColumnBatch(
+                fieldnames=fieldnames,
+                columns=columns,
+                start_row=start_row,
+                size=len(chunk),
+            )
+            start_row += len(chunk)
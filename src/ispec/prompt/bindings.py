@@ -29,6 +29,10 @@ def prompt_family_for(binding: Callable[..., Any]) -> str:
 
 
 def binding_meta_for_callable(binding: Callable[..., Any]) -> PromptBindingMeta:
+    # Source lookups read the module file, so the result is kept on the callable.
+    cached = getattr(binding, "__prompt_binding_meta__", None)
+    if isinstance(cached, PromptBindingMeta):
+        return cached
     family = prompt_family_for(binding)
     module = str(getattr(binding, "__module__", "") or "").strip()
     qualname = str(getattr(binding, "__qualname__", getattr(binding, "__name__", "")) or "").strip()
@@ -39,7 +43,7 @@ def binding_meta_for_callable(binding: Callable[..., Any]) -> PromptBindingMeta:
         _lines, source_line = inspect.getsourcelines(binding)
     except Exception:
         source_line = None
-    return PromptBindingMeta(
+    meta = PromptBindingMeta(
         family=family,
         module=module,
         qualname=qualname,
@@ -47,6 +51,11 @@ def binding_meta_for_callable(binding: Callable[..., Any]) -> PromptBindingMeta:
         source_file=source_file,
         source_line=source_line,
     )
+    try:
+        setattr(binding, "__prompt_binding_meta__", meta)
+    except (AttributeError, TypeError):
+        pass
+    return meta
 
 
 def _decorator_family(decorator: ast.AST) -> tuple[str, str] | None:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterator
@@ -78,30 +81,84 @@ def ensure_prompts_schema(conn: sqlite3.Connection) -> None:
     conn.executescript(_SCHEMA_SQL)
 
 
-def lookup_prompt_version(*, family: str, body_sha256: str, file: str | Path | None = None) -> PromptVersionInfo:
-    db_path = get_prompts_db_path(file=file)
-    if db_path is None or not db_path.exists():
-        return PromptVersionInfo()
+def prompt_recheck_seconds() -> float:
+    """How long cached prompt files and version maps are trusted without a stat."""
+
+    raw = (os.getenv("ISPEC_PROMPT_RECHECK_SECONDS") or "").strip()
+    if not raw:
+        return 2.0
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 2.0
+
+
+_VersionMap = dict[tuple[str, str], PromptVersionInfo]
+_version_lock = threading.Lock()
+# db path -> (checked_at, db mtime_ns or None when missing, (family, body_sha256) -> version)
+_version_maps: dict[str, tuple[float, int | None, _VersionMap]] = {}
+
+
+def _load_version_map(db_path: Path) -> _VersionMap:
     conn = sqlite3.connect(str(db_path))
     conn.row_factory = sqlite3.Row
     try:
-        row = conn.execute(
+        rows = conn.execute(
             """
-            SELECT pv.id, pv.version_num
+            SELECT pf.family, pv.body_sha256, pv.id, pv.version_num
             FROM prompt_version pv
             JOIN prompt_family pf ON pf.id = pv.family_id
-            WHERE pf.family = ? AND pv.body_sha256 = ?
-            LIMIT 1
-            """,
-            (family, body_sha256),
-        ).fetchone()
+            """
+        ).fetchall()
     except sqlite3.DatabaseError:
-        return PromptVersionInfo()
+        return {}
     finally:
         conn.close()
-    if row is None:
+    return {
+        (str(row["family"]), str(row["body_sha256"])): PromptVersionInfo(
+            version_id=int(row["id"]) if row["id"] is not None else None,
+            version_num=int(row["version_num"]) if row["version_num"] is not None else None,
+        )
+        for row in rows
+    }
+
+
+def _version_map(db_path: Path) -> _VersionMap:
+    key = str(db_path)
+    now = time.monotonic()
+    with _version_lock:
+        cached = _version_maps.get(key)
+    if cached is not None and now - cached[0] < prompt_recheck_seconds():
+        return cached[2]
+    try:
+        mtime_ns: int | None = db_path.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    if cached is not None and cached[1] == mtime_ns:
+        versions = cached[2]
+    else:
+        versions = _load_version_map(db_path) if mtime_ns is not None else {}
+    with _version_lock:
+        _version_maps[key] = (now, mtime_ns, versions)
+    return versions
+
+
+def refresh_prompt_versions() -> None:
+    """Drop the cached version maps; the next lookup reloads from prompts.db."""
+
+    with _version_lock:
+        _version_maps.clear()
+
+
+def lookup_prompt_version(*, family: str, body_sha256: str, file: str | Path | None = None) -> PromptVersionInfo:
+    """Version of a prompt body, from an in-memory map of prompts.db.
+
+    The map is loaded once per database and reloaded when the file's mtime
+    changes (checked at most every :func:`prompt_recheck_seconds`) or when
+    :func:`ispec.prompt.sync.sync_prompts` calls :func:`refresh_prompt_versions`.
+    """
+
+    db_path = get_prompts_db_path(file=file)
+    if db_path is None:
         return PromptVersionInfo()
-    return PromptVersionInfo(
-        version_id=int(row["id"]) if row["id"] is not None else None,
-        version_num=int(row["version_num"]) if row["version_num"] is not None else None,
-    )
+    return _version_map(db_path).get((family, body_sha256), PromptVersionInfo())
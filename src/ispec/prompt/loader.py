@@ -1,21 +1,41 @@
 from __future__ import annotations
 
 import json
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from string import Template
 from typing import Any
 
 from .bindings import binding_meta_for_callable
-from .connect import lookup_prompt_version
+from .connect import lookup_prompt_version, prompt_recheck_seconds
 from .models import PromptBindingMeta, PromptSource, RenderedPrompt
 from .parser import parse_prompt_file
 
 
-_PROMPT_SOURCE_CACHE: dict[str, tuple[int, PromptSource]] = {}
+@dataclass
+class _CachedPrompt:
+    """A parsed prompt file with its compiled template.
+
+    ``checked_at`` is when the file's mtime was last compared; within
+    :func:`ispec.prompt.connect.prompt_recheck_seconds` of it the entry is
+    used without touching the filesystem.
+    """
+
+    mtime_ns: int
+    checked_at: float
+    source: PromptSource
+    template: Template
+
+
+_PROMPT_SOURCE_CACHE: dict[str, _CachedPrompt] = {}
+# (family, binding) -> last value-free render; reused while source and version are unchanged.
+_RENDER_CACHE: dict[tuple[str, PromptBindingMeta | None], RenderedPrompt] = {}
+_PROMPT_ROOT = Path(__file__).resolve().parents[1] / "prompts"
 
 
 def resolve_prompt_root() -> Path:
-    return Path(__file__).resolve().parents[1] / "prompts"
+    return _PROMPT_ROOT
 
 
 def prompt_source_path_for_family(family: str) -> Path:
@@ -25,16 +45,30 @@ def prompt_source_path_for_family(family: str) -> Path:
     return resolve_prompt_root() / f"{cleaned}.md"
 
 
-def load_prompt_source(family: str) -> PromptSource:
+def _cached_prompt(family: str) -> _CachedPrompt:
     path = prompt_source_path_for_family(family)
-    stat = path.stat()
     cache_key = str(path)
+    now = time.monotonic()
     cached = _PROMPT_SOURCE_CACHE.get(cache_key)
-    if cached is not None and cached[0] == stat.st_mtime_ns:
-        return cached[1]
+    if cached is not None and now - cached.checked_at < prompt_recheck_seconds():
+        return cached
+    stat = path.stat()
+    if cached is not None and cached.mtime_ns == stat.st_mtime_ns:
+        cached.checked_at = now
+        return cached
     source = parse_prompt_file(path)
-    _PROMPT_SOURCE_CACHE[cache_key] = (stat.st_mtime_ns, source)
-    return source
+    cached = _CachedPrompt(
+        mtime_ns=stat.st_mtime_ns,
+        checked_at=now,
+        source=source,
+        template=Template(source.body),
+    )
+    _PROMPT_SOURCE_CACHE[cache_key] = cached
+    return cached
+
+
+def load_prompt_source(family: str) -> PromptSource:
+    return _cached_prompt(family).source
 
 
 def _render_value(value: Any) -> str:
@@ -55,11 +89,18 @@ def render_prompt(
     values: dict[str, Any] | None = None,
     binding: PromptBindingMeta | None = None,
 ) -> RenderedPrompt:
-    source = load_prompt_source(family)
-    template = Template(source.body)
-    render_values = {str(key): _render_value(value) for key, value in (values or {}).items()}
-    text = template.substitute(render_values) if render_values else source.body
+    cached = _cached_prompt(family)
+    source = cached.source
     version = lookup_prompt_version(family=source.family, body_sha256=source.body_sha256)
+    if not values:
+        memo_key = (family, binding)
+        rendered = _RENDER_CACHE.get(memo_key)
+        if rendered is None or rendered.source is not source or rendered.version != version:
+            rendered = RenderedPrompt(text=source.body, source=source, binding=binding, version=version)
+            _RENDER_CACHE[memo_key] = rendered
+        return rendered
+    render_values = {str(key): _render_value(value) for key, value in values.items()}
+    text = cached.template.substitute(render_values)
     return RenderedPrompt(text=text, source=source, binding=binding, version=version)
 
 
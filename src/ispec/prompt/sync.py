@@ -6,7 +6,7 @@ from pathlib import Path
 import sqlite3
 
 from .bindings import discover_prompt_bindings_ast
-from .connect import connect_prompts_db, ensure_prompts_schema
+from .connect import connect_prompts_db, ensure_prompts_schema, refresh_prompt_versions
 from .loader import resolve_prompt_root
 from .models import PromptSource
 from .parser import parse_prompt_file
@@ -221,4 +221,5 @@ def sync_prompts(
             conn.rollback()
         else:
             conn.commit()
+    refresh_prompt_versions()
     return summary
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import queue
 import threading
+import time
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Any
 
 from ispec.assistant.service import AssistantReply, generate_reply
@@ -11,10 +12,15 @@ from ispec.logging import get_logger
 
 logger = get_logger(__name__)
 
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+DEFAULT_LANES: dict[str, int] = {LANE_INTERACTIVE: 1, LANE_BACKGROUND: 1}
+_MAX_WORKERS_PER_LANE = 16
+
 
 @dataclass(frozen=True)
 class InferenceRequest:
-    """A single blocking LLM call to be executed by the inference thread."""
+    """A single blocking LLM call to be executed by an inference thread."""
 
     messages: list[dict[str, Any]]
     tools: list[dict[str, Any]] | None = None
@@ -29,6 +35,8 @@ class InferenceJob:
     job_id: str
     command_id: int
     request: InferenceRequest
+    lane: str = LANE_BACKGROUND
+    supersede_key: str | None = None
 
 
 @dataclass(frozen=True)
@@ -36,55 +44,221 @@ class InferenceResult:
     job_id: str
     command_id: int
     reply: AssistantReply
+    cancelled: bool = False
+
+
+def parse_lane_spec(raw: str | None) -> dict[str, int]:
+    """Parse ``"interactive=2,background=1"`` into a lane -> worker count map.
+
+    Only lanes in :data:`DEFAULT_LANES` are accepted; other names and
+    malformed entries are ignored with a warning. Missing lanes keep their
+    defaults and counts are clamped to ``1..16``.
+    """
+
+    lanes = dict(DEFAULT_LANES)
+    for part in (raw or "").split(","):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition("=")
+        name = name.strip().lower()
+        if not sep or not name:
+            logger.warning("Ignoring malformed inference lane entry %r", part.strip())
+            continue
+        if name not in DEFAULT_LANES:
+            logger.warning(
+                "Ignoring unknown inference lane %r (expected one of %s)",
+                name,
+                ", ".join(DEFAULT_LANES),
+            )
+            continue
+        try:
+            count = int(value.strip())
+        except ValueError:
+            logger.warning("Ignoring inference lane %r with non-integer count %r", name, value.strip())
+            continue
+        lanes[name] = max(1, min(_MAX_WORKERS_PER_LANE, count))
+    return lanes
+
+
+@dataclass
+class _LaneStats:
+    submitted: int = 0
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    max_depth: int = 0
+    wait_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "max_depth": self.max_depth,
+            "avg_wait_seconds": round(self.wait_seconds / self.started, 6) if self.started else None,
+        }
+
+
+@dataclass
+class _Lane:
+    name: str
+    workers: int
+    queue: deque[tuple[InferenceJob, float]] = field(default_factory=deque)
+    running: dict[str, InferenceJob] = field(default_factory=dict)
+    stats: _LaneStats = field(default_factory=_LaneStats)
+    threads: list[threading.Thread] = field(default_factory=list)
 
 
 class InferenceBroker:
-    """Runs model inference on a dedicated thread (single-lane).
+    """Runs model inference on dedicated threads, grouped into lanes.
+
+    Each lane (e.g. ``interactive`` for user-facing prompts, ``background``
+    for reviews and digests) owns a FIFO queue and its own worker threads,
+    so a long background call never delays interactive work queued behind
+    it. Multi-step tasks re-submit each follow-up request to the tail of
+    their lane, which round-robins between commands sharing a lane.
 
-    Main thread submits `InferenceJob`s via `submit(...)` and receives results
-    via `poll_result(...)` or `drain_results(...)`.
+    Main thread submits jobs via `submit(...)` and receives results via
+    `poll_result(...)` or `drain_results(...)`. Submitting with a
+    ``supersede_key`` cancels other commands' jobs with the same key: queued
+    ones are dropped immediately, running ones finish but their results come
+    back flagged ``cancelled``.
 
     Important invariant:
-    - The inference thread must never touch SQLite or other shared state.
+    - Inference threads must never touch SQLite or other shared state.
     """
 
-    def __init__(self) -> None:
-        self._in_q: queue.Queue[InferenceJob | None] = queue.Queue()
-        self._out_q: queue.Queue[InferenceResult] = queue.Queue()
+    def __init__(self, lanes: dict[str, int] | None = None) -> None:
+        spec = dict(lanes) if lanes else dict(DEFAULT_LANES)
+        self._lanes: dict[str, _Lane] = {
+            name: _Lane(name=name, workers=max(1, min(_MAX_WORKERS_PER_LANE, int(count))))
+            for name, count in spec.items()
+        }
+        self._default_lane = LANE_BACKGROUND if LANE_BACKGROUND in self._lanes else next(iter(self._lanes))
+        self._cond = threading.Condition()
+        self._results: deque[InferenceResult] = deque()
+        self._results_lock = threading.Lock()
+        self._cancelled: set[str] = set()
         self._stop = threading.Event()
-        self._thread = threading.Thread(target=self._worker, name="supervisor-inference", daemon=True)
+        self._started = False
+        for lane in self._lanes.values():
+            for idx in range(lane.workers):
+                lane.threads.append(
+                    threading.Thread(
+                        target=self._worker,
+                        args=(lane,),
+                        name=f"supervisor-inference-{lane.name}-{idx}",
+                        daemon=True,
+                    )
+                )
+
+    @property
+    def threads(self) -> list[threading.Thread]:
+        return [thread for lane in self._lanes.values() for thread in lane.threads]
 
     @property
     def thread(self) -> threading.Thread:
-        return self._thread
+        return self.threads[0]
+
+    @property
+    def lanes(self) -> dict[str, int]:
+        return {name: lane.workers for name, lane in self._lanes.items()}
+
+    def lane_for(self, lane: str | None) -> str:
+        return lane if lane in self._lanes else self._default_lane
+
+    def capacity(self, lane: str | None) -> int:
+        return self._lanes[self.lane_for(lane)].workers
 
     def start(self) -> None:
-        if self._thread.is_alive():
+        if self._started:
             return
-        self._thread.start()
+        self._started = True
+        for thread in self.threads:
+            thread.start()
 
     def stop(self, *, join_seconds: float = 2.0) -> None:
         self._stop.set()
-        try:
-            # Unblock the queue.get() call.
-            self._in_q.put_nowait(None)
-        except Exception:
-            pass
-        try:
-            self._thread.join(timeout=max(0.0, float(join_seconds)))
-        except Exception:
-            pass
+        with self._cond:
+            self._cond.notify_all()
+        deadline = time.monotonic() + max(0.0, float(join_seconds))
+        for thread in self.threads:
+            if not thread.is_alive():
+                continue
+            try:
+                thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                pass
+
+    def submit(
+        self,
+        *,
+        command_id: int,
+        request: InferenceRequest,
+        lane: str | None = None,
+        supersede_key: str | None = None,
+    ) -> str:
+        job = InferenceJob(
+            job_id=uuid.uuid4().hex,
+            command_id=int(command_id),
+            request=request,
+            lane=self.lane_for(lane),
+            supersede_key=supersede_key,
+        )
+        with self._cond:
+            if supersede_key is not None:
+                self._supersede_locked(job)
+            target = self._lanes[job.lane]
+            target.queue.append((job, time.monotonic()))
+            target.stats.submitted += 1
+            target.stats.max_depth = max(target.stats.max_depth, len(target.queue))
+            self._cond.notify_all()
+        return job.job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; return False if it is unknown."""
+
+        with self._cond:
+            return self._cancel_locked(str(job_id))
+
+    def _supersede_locked(self, job: InferenceJob) -> None:
+        for lane in self._lanes.values():
+            candidates = [queued for queued, _ in lane.queue] + list(lane.running.values())
+            for other in candidates:
+                if other.supersede_key == job.supersede_key and other.command_id != job.command_id:
+                    logger.info(
+                        "Superseding inference job_id=%s command_id=%s (key=%s)",
+                        other.job_id,
+                        other.command_id,
+                        job.supersede_key,
+                    )
+                    self._cancel_locked(other.job_id)
 
-    def submit(self, *, command_id: int, request: InferenceRequest) -> str:
-        job_id = uuid.uuid4().hex
-        self._in_q.put(InferenceJob(job_id=job_id, command_id=int(command_id), request=request))
-        return job_id
+    def _cancel_locked(self, job_id: str) -> bool:
+        for lane in self._lanes.values():
+            for idx, (queued, _) in enumerate(lane.queue):
+                if queued.job_id == job_id:
+                    del lane.queue[idx]
+                    lane.stats.cancelled += 1
+                    self._publish(_cancelled_result(queued))
+                    return True
+            if job_id in lane.running:
+                self._cancelled.add(job_id)
+                return True
+        return False
+
+    def _publish(self, result: InferenceResult) -> None:
+        with self._results_lock:
+            self._results.append(result)
 
     def poll_result(self) -> InferenceResult | None:
-        try:
-            return self._out_q.get_nowait()
-        except queue.Empty:
-            return None
+        with self._results_lock:
+            if not self._results:
+                return None
+            return self._results.popleft()
 
     def drain_results(self, *, limit: int = 50) -> list[InferenceResult]:
         results: list[InferenceResult] = []
@@ -95,14 +269,40 @@ class InferenceBroker:
             results.append(item)
         return results
 
-    def _worker(self) -> None:
+    def stats(self) -> dict[str, Any]:
+        """Per-lane worker counts, queue depth, running jobs and counters."""
+
+        with self._cond:
+            return {
+                name: {
+                    "workers": lane.workers,
+                    "queued": len(lane.queue),
+                    "running": len(lane.running),
+                    **lane.stats.as_dict(),
+                }
+                for name, lane in self._lanes.items()
+            }
+
+    def _next_job(self, lane: _Lane) -> InferenceJob | None:
+        with self._cond:
+            while not lane.queue:
+                if self._stop.is_set():
+                    return None
+                self._cond.wait(timeout=0.2)
+            if self._stop.is_set():
+                return None
+            job, queued_at = lane.queue.popleft()
+            lane.stats.started += 1
+            lane.stats.wait_seconds += time.monotonic() - queued_at
+            lane.running[job.job_id] = job
+            return job
+
+    def _worker(self, lane: _Lane) -> None:
         while not self._stop.is_set():
-            try:
-                job = self._in_q.get(timeout=0.2)
-            except queue.Empty:
-                continue
+            job = self._next_job(lane)
             if job is None:
                 continue
+            ok = True
             try:
                 req = job.request
                 reply = generate_reply(
@@ -115,10 +315,12 @@ class InferenceBroker:
                         "surface": "supervisor_task",
                         "command_id": int(job.command_id),
                         "stage": req.stage,
+                        "inference_lane": job.lane,
                         **(req.observability_context or {}),
                     },
                 )
             except Exception as exc:
+                ok = False
                 error = f"{type(exc).__name__}: {exc}"
                 logger.warning("Inference worker crashed during generate_reply: %s", error)
                 reply = AssistantReply(
@@ -129,9 +331,41 @@ class InferenceBroker:
                     ok=False,
                     error=error,
                 )
+            with self._cond:
+                lane.running.pop(job.job_id, None)
+                cancelled = job.job_id in self._cancelled
+                self._cancelled.discard(job.job_id)
+                if cancelled:
+                    lane.stats.cancelled += 1
+                elif ok:
+                    lane.stats.completed += 1
+                else:
+                    lane.stats.failed += 1
             try:
-                self._out_q.put(InferenceResult(job_id=job.job_id, command_id=int(job.command_id), reply=reply))
+                self._publish(
+                    InferenceResult(
+                        job_id=job.job_id,
+                        command_id=int(job.command_id),
+                        reply=reply,
+                        cancelled=cancelled,
+                    )
+                )
             except Exception:
                 # Last resort: swallow. The supervisor loop will treat this as a timeout and retry.
                 logger.exception("Inference worker failed to publish result (job_id=%s)", job.job_id)
 
+
+def _cancelled_result(job: InferenceJob) -> InferenceResult:
+    return InferenceResult(
+        job_id=job.job_id,
+        command_id=int(job.command_id),
+        reply=AssistantReply(
+            content="",
+            provider="supervisor_inference_worker",
+            model=None,
+            meta={"cancelled": True},
+            ok=False,
+            error="inference_cancelled",
+        ),
+        cancelled=True,
+    )
@@ -8,6 +8,7 @@ import subprocess
 import threading
 import time
 import uuid
+from collections import deque
 from collections.abc import Generator
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
@@ -17,6 +18,8 @@ from zoneinfo import ZoneInfo
 
 import psutil
 import requests
+from sqlalchemy import Select, and_, func, or_, select, update
+from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 
 from ispec.agent.connect import get_agent_db_uri, get_agent_session
@@ -61,6 +64,7 @@ from ispec.assistant.schedules import (
     parse_hhmm as _parse_hhmm,
     parse_weekday as _parse_weekday,
 )
+from ispec.assistant import search_index
 from ispec.assistant.service import AssistantReply, _system_prompt_planner, generate_reply
 from ispec.assistant.tool_routing import tool_groups_for_available_tools
 from ispec.assistant.turn_decision import (
@@ -68,6 +72,7 @@ from ispec.assistant.turn_decision import (
     run_turn_decision_pipeline,
     selected_tool_names_from_decision,
 )
+from ispec.assistant.usage_logging import inference_usage_logging_enabled
 from ispec.prompt import load_bound_prompt, prompt_binding, prompt_observability_context
 from ispec.assistant.tools import (
     TOOL_CALL_PREFIX,
@@ -86,10 +91,16 @@ from ispec.config.paths import (
 )
 from ispec.db.connect import get_session
 from ispec.db.models import UserRole
-from ispec.logging import get_logger
+from ispec.logging import flush_log_writers, get_logger
 from ispec.omics.connect import get_omics_session
 from ispec.schedule.connect import get_schedule_db_uri, get_schedule_session
-from ispec.supervisor.inference_broker import InferenceBroker, InferenceRequest
+from ispec.supervisor.inference_broker import (
+    LANE_BACKGROUND,
+    LANE_INTERACTIVE,
+    InferenceBroker,
+    InferenceRequest,
+    parse_lane_spec,
+)
 from ispec.supervisor.sentinel import (
     build_sentinel_report,
     next_state_from_report,
@@ -984,6 +995,7 @@ class ClaimedCommand:
     payload: dict[str, Any]
     attempts: int
     max_attempts: int
+    priority: int = 0
 
 
 @dataclass(frozen=True)
@@ -1045,44 +1057,205 @@ def _run_llm_task_sync(task: LLMTask) -> CommandExecution:
         )
 
 
-def _claim_next_command(
+def _command_lease_seconds() -> int:
+    """How long a claim stays valid without a heartbeat before recovery may requeue it."""
+
+    return _running_command_stale_seconds()
+
+
+def _command_claim_batch_size() -> int:
+    return _clamp_int(
+        _safe_int(os.getenv("ISPEC_SUPERVISOR_CLAIM_BATCH_SIZE")) or 1,
+        min_value=1,
+        max_value=64,
+    )
+
+
+def _claimable_commands(*, now: datetime, exclude_command_types: set[str] | None = None) -> Select:
+    """Queued, available commands not reserved by a live lease, best first."""
+
+    stmt = (
+        select(AgentCommand.id, AgentCommand.priority)
+        .where(AgentCommand.status == "queued")
+        .where(AgentCommand.available_at <= now)
+        .where(
+            or_(
+                AgentCommand.claimed_by_run_id.is_(None),
+                AgentCommand.lease_expires_at.is_(None),
+                AgentCommand.lease_expires_at <= now,
+            )
+        )
+    )
+    if exclude_command_types:
+        stmt = stmt.where(
+            ~AgentCommand.command_type.in_(sorted({str(x) for x in exclude_command_types if x}))
+        )
+    return stmt.order_by(AgentCommand.priority.desc(), AgentCommand.id.asc())
+
+
+def _claimed_from_rows(rows: list[Any]) -> list[ClaimedCommand]:
+    # RETURNING order is unspecified in SQLite; restore claim order.
+    rows = sorted(rows, key=lambda row: (-int(row.priority or 0), int(row.id)))
+    return [
+        ClaimedCommand(
+            id=int(row.id),
+            command_type=str(row.command_type or ""),
+            payload=dict(row.payload_json or {}),
+            attempts=int(row.attempts or 0),
+            max_attempts=int(row.max_attempts or 0),
+            priority=int(row.priority or 0),
+        )
+        for row in rows
+    ]
+
+
+_CLAIM_RETURNING = (
+    AgentCommand.id,
+    AgentCommand.command_type,
+    AgentCommand.priority,
+    AgentCommand.payload_json,
+    AgentCommand.attempts,
+    AgentCommand.max_attempts,
+)
+
+
+def _claim_commands(
     *,
     agent_id: str,
     run_id: str,
+    limit: int = 1,
     exclude_command_types: set[str] | None = None,
-) -> ClaimedCommand | None:
-    assert_main_thread("supervisor._claim_next_command")
+    reserve: bool = False,
+) -> list[ClaimedCommand]:
+    """Lease up to ``limit`` queued commands in a single ``UPDATE ... RETURNING``.
+
+    The candidate ids are picked by a subquery inside the same statement, so
+    the select-and-mark is atomic under SQLite's single writer: two claimers
+    can never lease the same row (the equivalent of ``FOR UPDATE SKIP
+    LOCKED``). Returned commands are ordered by priority, then id.
+
+    Claimed commands are started (``running``, ``started_at`` set, one more
+    attempt). With ``reserve`` they stay ``queued`` under this run's lease
+    instead; :func:`_start_reserved_command` starts them when their turn comes.
+    """
+
+    assert_main_thread("supervisor._claim_commands")
     now = utcnow()
-    with get_agent_session() as db:
-        query = (
-            db.query(AgentCommand)
-            .filter(AgentCommand.status == "queued")
-            .filter(AgentCommand.available_at <= now)
+    candidates = (
+        _claimable_commands(now=now, exclude_command_types=exclude_command_types)
+        .with_only_columns(AgentCommand.id)
+        .limit(max(1, int(limit)))
+    )
+    values: dict[str, Any] = {
+        "claimed_at": now,
+        "claimed_by_agent_id": agent_id,
+        "claimed_by_run_id": run_id,
+        "updated_at": now,
+        "lease_expires_at": now + timedelta(seconds=_command_lease_seconds()),
+    }
+    if not reserve:
+        values.update(
+            status="running",
+            started_at=now,
+            attempts=func.coalesce(AgentCommand.attempts, 0) + 1,
         )
-        if exclude_command_types:
-            query = query.filter(~AgentCommand.command_type.in_(sorted({str(x) for x in exclude_command_types if x})))
-        cmd = query.order_by(AgentCommand.priority.desc(), AgentCommand.id.asc()).first()
-        if cmd is None:
-            return None
+    stmt = (
+        update(AgentCommand)
+        .where(AgentCommand.id.in_(candidates.scalar_subquery()))
+        .where(AgentCommand.status == "queued")
+        .values(**values)
+        .returning(*_CLAIM_RETURNING)
+        .execution_options(synchronize_session=False)
+    )
+    with get_agent_session() as db:
+        rows = db.execute(stmt).all()
+        db.commit()
+    return _claimed_from_rows(rows)
 
-        cmd.status = "running"
-        cmd.claimed_at = now
-        cmd.claimed_by_agent_id = agent_id
-        cmd.claimed_by_run_id = run_id
-        cmd.started_at = now
-        cmd.updated_at = now
-        cmd.attempts = int(cmd.attempts or 0) + 1
 
-        db.commit()
-        db.refresh(cmd)
+def _start_reserved_command(*, command_id: int, run_id: str) -> ClaimedCommand | None:
+    """Move a command reserved by ``run_id`` to ``running``.
 
-        return ClaimedCommand(
-            id=int(cmd.id),
-            command_type=str(cmd.command_type or ""),
-            payload=dict(cmd.payload_json or {}),
-            attempts=int(cmd.attempts or 0),
-            max_attempts=int(cmd.max_attempts or 0),
+    Returns None if the reservation was lost or the command was pushed back
+    (``available_at`` moved into the future) since it was reserved.
+    """
+
+    assert_main_thread("supervisor._start_reserved_command")
+    now = utcnow()
+    stmt = (
+        update(AgentCommand)
+        .where(AgentCommand.id == int(command_id))
+        .where(AgentCommand.status == "queued")
+        .where(AgentCommand.claimed_by_run_id == run_id)
+        .where(AgentCommand.available_at <= now)
+        .values(
+            status="running",
+            started_at=now,
+            updated_at=now,
+            lease_expires_at=now + timedelta(seconds=_command_lease_seconds()),
+            attempts=func.coalesce(AgentCommand.attempts, 0) + 1,
         )
+        .returning(*_CLAIM_RETURNING)
+        .execution_options(synchronize_session=False)
+    )
+    with get_agent_session() as db:
+        rows = db.execute(stmt).all()
+        db.commit()
+    claimed = _claimed_from_rows(rows)
+    return claimed[0] if claimed else None
+
+
+def _top_claimable_priority(*, exclude_command_types: set[str] | None = None) -> int | None:
+    """Priority of the best command another claim would get right now, if any."""
+
+    stmt = _claimable_commands(now=utcnow(), exclude_command_types=exclude_command_types).with_only_columns(
+        AgentCommand.priority
+    )
+    with get_agent_session() as db:
+        priority = db.execute(stmt.limit(1)).scalar()
+    return None if priority is None else int(priority)
+
+
+def _claim_next_command(
+    *,
+    agent_id: str,
+    run_id: str,
+    exclude_command_types: set[str] | None = None,
+) -> ClaimedCommand | None:
+    claimed = _claim_commands(
+        agent_id=agent_id,
+        run_id=run_id,
+        limit=1,
+        exclude_command_types=exclude_command_types,
+    )
+    return claimed[0] if claimed else None
+
+
+def _release_claimed_commands(*, command_ids: list[int], run_id: str) -> int:
+    """Drop this run's reservations on unstarted commands so anyone can claim them."""
+
+    assert_main_thread("supervisor._release_claimed_commands")
+    ids = sorted({int(command_id) for command_id in command_ids})
+    if not ids:
+        return 0
+    now = utcnow()
+    with get_agent_session() as db:
+        released = db.execute(
+            update(AgentCommand)
+            .where(AgentCommand.id.in_(ids))
+            .where(AgentCommand.status == "queued")
+            .where(AgentCommand.claimed_by_run_id == run_id)
+            .values(
+                claimed_at=None,
+                claimed_by_agent_id=None,
+                claimed_by_run_id=None,
+                updated_at=now,
+                lease_expires_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+    return int(released or 0)
 
 
 def _finish_command(
@@ -1091,40 +1264,68 @@ def _finish_command(
     ok: bool,
     result: dict[str, Any] | None,
     error: str | None,
+    db: Session | None = None,
 ) -> None:
+    """Mark a command succeeded/failed; with ``db`` the write joins that transaction."""
+
     assert_main_thread("supervisor._finish_command")
     now = utcnow()
-    with get_agent_session() as db:
-        cmd = db.query(AgentCommand).filter(AgentCommand.id == int(command_id)).first()
-        if cmd is None:
-            return
-        cmd.status = "succeeded" if ok else "failed"
-        cmd.ended_at = now
-        cmd.updated_at = now
-        cmd.error = error
-        if result is not None:
-            cmd.result_json = dict(result)
-        db.commit()
+    values: dict[str, Any] = {
+        "status": "succeeded" if ok else "failed",
+        "ended_at": now,
+        "updated_at": now,
+        "lease_expires_at": None,
+        "error": error,
+    }
+    if result is not None:
+        values["result_json"] = dict(result)
+    stmt = (
+        update(AgentCommand)
+        .where(AgentCommand.id == int(command_id))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if db is not None:
+        db.execute(stmt)
+        return
+    with get_agent_session() as own_db:
+        own_db.execute(stmt)
+        own_db.commit()
 
 
-def _touch_command_updated_at(*, command_id: int) -> None:
-    """Bump `agent_command.updated_at` for a running command.
+def _touch_commands_updated_at(*, command_ids: list[int] | set[int], run_id: str | None = None) -> int:
+    """Bump `updated_at` and extend the lease for running commands in one write.
 
     This prevents long-running work (e.g. model inference) from being recovered
-    as "stale" while it is legitimately in-flight.
+    as "stale" while it is legitimately in-flight. With ``run_id``, queued
+    commands reserved by that run have their reservation extended too.
     """
 
-    assert_main_thread("supervisor._touch_command_updated_at")
+    assert_main_thread("supervisor._touch_commands_updated_at")
+    ids = sorted({int(command_id) for command_id in command_ids})
+    if not ids:
+        return 0
     now = utcnow()
+    touchable = AgentCommand.status == "running"
+    if run_id is not None:
+        touchable = or_(
+            touchable,
+            and_(AgentCommand.status == "queued", AgentCommand.claimed_by_run_id == run_id),
+        )
     with get_agent_session() as db:
-        cmd = db.query(AgentCommand).filter(AgentCommand.id == int(command_id)).first()
-        if cmd is None:
-            return
-        status = str(getattr(cmd, "status", "") or "").strip().lower()
-        if status != "running":
-            return
-        cmd.updated_at = now
+        touched = db.execute(
+            update(AgentCommand)
+            .where(AgentCommand.id.in_(ids))
+            .where(touchable)
+            .values(updated_at=now, lease_expires_at=now + timedelta(seconds=_command_lease_seconds()))
+            .execution_options(synchronize_session=False)
+        ).rowcount
         db.commit()
+    return int(touched or 0)
+
+
+def _touch_command_updated_at(*, command_id: int) -> None:
+    _touch_commands_updated_at(command_ids=[int(command_id)])
 
 
 def _defer_command(
@@ -1133,26 +1334,37 @@ def _defer_command(
     delay_seconds: int,
     result: dict[str, Any] | None,
     error: str | None,
+    db: Session | None = None,
 ) -> None:
     assert_main_thread("supervisor._defer_command")
     now = utcnow()
     available_at = now + timedelta(seconds=max(1, int(delay_seconds)))
-    with get_agent_session() as db:
-        cmd = db.query(AgentCommand).filter(AgentCommand.id == int(command_id)).first()
-        if cmd is None:
-            return
-        cmd.status = "queued"
-        cmd.available_at = available_at
-        cmd.claimed_at = None
-        cmd.claimed_by_agent_id = None
-        cmd.claimed_by_run_id = None
-        cmd.started_at = None
-        cmd.ended_at = None
-        cmd.updated_at = now
-        cmd.error = error
-        if result is not None:
-            cmd.result_json = dict(result)
-        db.commit()
+    values: dict[str, Any] = {
+        "status": "queued",
+        "available_at": available_at,
+        "claimed_at": None,
+        "claimed_by_agent_id": None,
+        "claimed_by_run_id": None,
+        "started_at": None,
+        "ended_at": None,
+        "updated_at": now,
+        "lease_expires_at": None,
+        "error": error,
+    }
+    if result is not None:
+        values["result_json"] = dict(result)
+    stmt = (
+        update(AgentCommand)
+        .where(AgentCommand.id == int(command_id))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if db is not None:
+        db.execute(stmt)
+        return
+    with get_agent_session() as own_db:
+        own_db.execute(stmt)
+        own_db.commit()
 
 
 def _enqueue_command(
@@ -1258,6 +1470,11 @@ def _recover_stale_running_commands(*, agent_id: str, run_id: str) -> dict[str,
                 skipped_other_agent += 1
                 continue
 
+            lease_expires_at = _as_utc_datetime(cmd.lease_expires_at)
+            if isinstance(lease_expires_at, datetime) and lease_expires_at > now:
+                skipped_not_stale += 1
+                continue
+
             last_activity = _as_utc_datetime(_command_last_activity_at(cmd))
             if isinstance(last_activity, datetime) and last_activity > stale_before:
                 skipped_not_stale += 1
@@ -1298,6 +1515,7 @@ def _recover_stale_running_commands(*, agent_id: str, run_id: str) -> dict[str,
             cmd.started_at = None
             cmd.ended_at = None
             cmd.updated_at = now
+            cmd.lease_expires_at = None
             cmd.error = "recovered_stale_running_command"
 
             result_payload = dict(cmd.result_json or {})
@@ -6523,6 +6741,41 @@ def _run_legacy_push_project_comments(payload: dict[str, Any]) -> CommandExecuti
         return CommandExecution(ok=False, result={"ok": False, "error": error}, error=error)
 
 
+def _search_index_enabled() -> bool:
+    parsed, err = _parse_env_tristate_bool(
+        os.getenv("ISPEC_SEARCH_INDEX_ENABLED"),
+        key="ISPEC_SEARCH_INDEX_ENABLED",
+    )
+    if err:
+        logger.warning("%s", err)
+    return parsed is not False
+
+
+def _refresh_search_indexes() -> dict[str, int]:
+    """Index assistant messages/digests and agent logs written since the last poll."""
+
+    assert_main_thread("supervisor._refresh_search_indexes")
+    summary: dict[str, int] = {}
+    with get_assistant_session() as db:
+        summary.update(search_index.refresh_search_index(db, search_index.ASSISTANT_SOURCES))
+    with get_agent_session() as db:
+        summary.update(search_index.refresh_search_index(db, search_index.AGENT_SOURCES))
+    return summary
+
+
+def _refresh_inference_usage_summary() -> dict[str, Any]:
+    """Roll the recent inference usage logs up into the summary file served by ops/tools."""
+
+    from ispec.assistant.usage_report import refresh_usage_summary
+
+    hours = _clamp_int(
+        _safe_int(os.getenv("ISPEC_INFERENCE_USAGE_SUMMARY_HOURS")) or 24,
+        min_value=1,
+        max_value=24 * 31,
+    )
+    return refresh_usage_summary(hours=hours)
+
+
 def _agent_log_archive_enabled() -> bool:
     return _is_truthy(os.getenv("ISPEC_AGENT_LOG_ARCHIVE_ENABLED"))
 
@@ -6719,6 +6972,8 @@ def _run_agent_log_archive(payload: dict[str, Any]) -> CommandExecution:
                 payload.get("archive_commands") if payload.get("archive_commands") is not None else True
             ),
             archive_journal_mode=payload.get("archive_journal_mode"),
+            compress_json=bool(payload.get("compress_json") or False),
+            vacuum_pages=_safe_int(payload.get("vacuum_pages")),
         )
         return CommandExecution(ok=True, result=dict(summary))
     except Exception as exc:
@@ -6753,6 +7008,8 @@ def _seed_orchestrator_tick(
 
 def _log_command_done(*, cmd: ClaimedCommand, execution: CommandExecution, duration_ms: int) -> None:
     status_label = "deferred" if execution.defer_seconds is not None else ("succeeded" if execution.ok else "failed")
+    if execution.ok and isinstance(execution.result, dict) and execution.result.get("superseded") is True:
+        status_label = "superseded"
     extra_parts: list[str] = []
     if cmd.command_type == COMMAND_ORCHESTRATOR_TICK:
         decision = execution.result.get("decision") if isinstance(execution.result, dict) else None
@@ -6830,23 +7087,11 @@ def _persist_command_execution(
     step_ended: datetime,
     duration_ms: int,
 ) -> None:
-    if execution.defer_seconds is not None:
-        _defer_command(
-            command_id=cmd.id,
-            delay_seconds=int(execution.defer_seconds),
-            result=dict(execution.result or {}),
-            error=execution.error,
-        )
-    else:
-        _finish_command(
-            command_id=cmd.id,
-            ok=bool(execution.ok),
-            result=dict(execution.result or {}),
-            error=execution.error,
-        )
-
+    # The command status write and its step share one transaction; if the
+    # step cannot be recorded the status is still settled on its own.
     try:
         with get_agent_session() as db:
+            _settle_command(cmd=cmd, execution=execution, db=db)
             run = db.query(AgentRun).filter(AgentRun.run_id == run_id).one()
             step_index = int(run.step_index or 0)
 
@@ -6949,6 +7194,26 @@ def _persist_command_execution(
             db.commit()
     except Exception:
         logger.exception("Failed to persist command step (command_id=%s)", cmd.id)
+        _settle_command(cmd=cmd, execution=execution)
+
+
+def _settle_command(*, cmd: ClaimedCommand, execution: CommandExecution, db: Session | None = None) -> None:
+    if execution.defer_seconds is not None:
+        _defer_command(
+            command_id=cmd.id,
+            delay_seconds=int(execution.defer_seconds),
+            result=dict(execution.result or {}),
+            error=execution.error,
+            db=db,
+        )
+    else:
+        _finish_command(
+            command_id=cmd.id,
+            ok=bool(execution.ok),
+            result=dict(execution.result or {}),
+            error=execution.error,
+            db=db,
+        )
 
 
 def _process_one_command(*, agent_id: str, run_id: str) -> bool:
@@ -7187,6 +7452,39 @@ def _llm_task_for_command(*, cmd: ClaimedCommand, agent_id: str, run_id: str) ->
     return None
 
 
+# User-facing LLM commands run on the interactive inference lane; everything
+# else (reviews, digests, orchestrator ticks, scheduled prompts) is background.
+_INTERACTIVE_LLM_COMMAND_TYPES = {
+    COMMAND_RUN_TACKLE_PROMPT,
+    COMMAND_ASSESS_TACKLE_RESULTS,
+}
+
+
+def _inference_lane_for_command(command_type: str) -> str:
+    if command_type in _INTERACTIVE_LLM_COMMAND_TYPES:
+        return LANE_INTERACTIVE
+    return LANE_BACKGROUND
+
+
+def _inference_supersede_key(cmd: ClaimedCommand) -> str | None:
+    """Key under which a newer command makes an older in-flight one redundant."""
+
+    if cmd.command_type == COMMAND_REVIEW_SUPPORT_SESSION:
+        session_id = str((cmd.payload or {}).get("session_id") or "").strip()
+        return f"{cmd.command_type}:{session_id}" if session_id else None
+    if cmd.command_type == COMMAND_BUILD_SUPPORT_DIGEST:
+        # Same scope as the orchestrator's digest dedupe: the review cursor.
+        cursor = _safe_int((cmd.payload or {}).get("cursor_review_id"))
+        if cursor is None:
+            cursor = _safe_int((cmd.payload or {}).get("from_review_id"))
+        return f"{cmd.command_type}:{int(cursor or 0)}"
+    return None
+
+
+def _inference_broker_lanes() -> dict[str, int]:
+    return parse_lane_spec(os.getenv("ISPEC_SUPERVISOR_INFERENCE_LANES"))
+
+
 @dataclass
 class _InflightInference:
     cmd: ClaimedCommand
@@ -7194,14 +7492,25 @@ class _InflightInference:
     step_started: datetime
     step_monotonic: float
     job_id: str
+    lane: str = LANE_BACKGROUND
 
 
 class _SupervisorCommandProcessor:
     """Supervisor command processor with optional inference broker.
 
-    When `broker` is enabled, LLM calls are executed on a dedicated thread and
-    the main supervisor thread stays responsive (heartbeats, non-LLM commands,
-    and inference result finalization).
+    When `broker` is enabled, LLM calls are executed on the broker's lane
+    threads and the main supervisor thread stays responsive (heartbeats,
+    non-LLM commands, and inference result finalization). Several LLM
+    commands can be in flight at once: one per worker of each lane. All
+    SQLite access (claiming, heartbeats, task steps, finalization) stays on
+    the main thread.
+
+    With `ISPEC_SUPERVISOR_CLAIM_BATCH_SIZE` above 1, one claim reserves up to
+    that many commands and buffers them locally. Reserved commands stay
+    `queued` until they start, which is when `started_at` and `attempts` are
+    written. The buffer is released whenever a higher-priority command becomes
+    claimable, so priority order holds. Reservations are kept alive by the same
+    batched heartbeat as in-flight work and handed back to the queue on `stop()`.
     """
 
     def __init__(
@@ -7214,7 +7523,17 @@ class _SupervisorCommandProcessor:
         self._agent_id = agent_id
         self._run_id = run_id
         self._broker = broker
-        self._inflight: _InflightInference | None = None
+        self._inflight: dict[str, _InflightInference] = {}
+        self._claimed: deque[ClaimedCommand] = deque()
+        self._claim_batch_size = _command_claim_batch_size()
+        self._counters = {
+            "claim_queries": 0,
+            "claimed": 0,
+            "released": 0,
+            "finished": 0,
+            "heartbeat_writes": 0,
+        }
+        self._started_monotonic = time.monotonic()
 
         heartbeat_seconds = float(_supervisor_heartbeat_seconds())
         now_mono = time.monotonic()
@@ -7224,7 +7543,24 @@ class _SupervisorCommandProcessor:
 
     @property
     def inflight(self) -> _InflightInference | None:
-        return self._inflight
+        """The oldest in-flight inference, or None when nothing is in flight."""
+
+        return next(iter(self._inflight.values()), None)
+
+    @property
+    def inflight_jobs(self) -> list[_InflightInference]:
+        return list(self._inflight.values())
+
+    def _track_inflight(self, item: _InflightInference) -> None:
+        self._inflight[item.job_id] = item
+
+    def _llm_lanes_full(self) -> set[str]:
+        if self._broker is None:
+            return set()
+        counts: dict[str, int] = {}
+        for item in self._inflight.values():
+            counts[item.lane] = counts.get(item.lane, 0) + 1
+        return {lane for lane, count in counts.items() if count >= self._broker.capacity(lane)}
 
     def start(self) -> None:
         if self._broker is not None:
@@ -7233,16 +7569,102 @@ class _SupervisorCommandProcessor:
     def stop(self) -> None:
         if self._broker is not None:
             self._broker.stop()
+        if self._claimed:
+            pending = [int(cmd.id) for cmd in self._claimed]
+            try:
+                self._release_buffer()
+            except Exception:
+                logger.exception("Failed releasing claimed commands %s", pending)
+
+    def queue_stats(self) -> dict[str, Any]:
+        """Claim/finish throughput counters for the supervisor state file."""
+
+        elapsed = max(1e-6, time.monotonic() - self._started_monotonic)
+        claim_queries = int(self._counters["claim_queries"])
+        return {
+            **self._counters,
+            "batch_size": int(self._claim_batch_size),
+            "buffered": len(self._claimed),
+            "inflight": len(self._inflight),
+            "claimed_per_query": round(self._counters["claimed"] / claim_queries, 3) if claim_queries else None,
+            "finished_per_minute": round(self._counters["finished"] * 60.0 / elapsed, 3),
+        }
 
     def _maybe_heartbeat(self) -> None:
         now_mono = time.monotonic()
         if now_mono >= self._heartbeat_due_at:
             _touch_supervisor_run(run_id=self._run_id)
             self._heartbeat_due_at = now_mono + float(self._heartbeat_seconds)
-        if self._inflight is not None and now_mono >= self._command_touch_due_at:
-            _touch_command_updated_at(command_id=int(self._inflight.cmd.id))
+        if (self._inflight or self._claimed) and now_mono >= self._command_touch_due_at:
+            command_ids = {int(item.cmd.id) for item in self._inflight.values()}
+            command_ids.update(int(cmd.id) for cmd in self._claimed)
+            _touch_commands_updated_at(command_ids=command_ids, run_id=self._run_id)
+            self._counters["heartbeat_writes"] += 1
             self._command_touch_due_at = now_mono + min(float(self._heartbeat_seconds), 10.0)
 
+    def _lane_blocked(self, command_type: str, full_lanes: set[str]) -> bool:
+        if not full_lanes or self._broker is None or command_type not in _LLM_COMMAND_TYPES:
+            return False
+        return self._broker.lane_for(_inference_lane_for_command(command_type)) in full_lanes
+
+    def _release_buffer(self) -> None:
+        pending = [int(cmd.id) for cmd in self._claimed]
+        self._claimed.clear()
+        self._counters["released"] += _release_claimed_commands(command_ids=pending, run_id=self._run_id)
+
+    def _next_command(self) -> ClaimedCommand | None:
+        """Start the next buffered command, refilling the buffer in one claim.
+
+        Batch size 1 claims and starts a command in the same statement.
+        """
+
+        # Only start LLM commands whose inference lane has a free worker.
+        full_lanes = self._llm_lanes_full()
+        exclude = {
+            command_type for command_type in _LLM_COMMAND_TYPES if self._lane_blocked(command_type, full_lanes)
+        }
+        startable = [cmd for cmd in self._claimed if not self._lane_blocked(cmd.command_type, full_lanes)]
+        if startable:
+            top = _top_claimable_priority(exclude_command_types=exclude or None)
+            if top is not None and top > startable[0].priority:
+                # Something more urgent was queued after our claim; re-claim in order.
+                self._release_buffer()
+                startable = []
+        started = self._start_buffered(startable)
+        if started is not None:
+            return started
+
+        room = self._claim_batch_size - len(self._claimed)
+        if room <= 0:
+            return None
+        claimed = _claim_commands(
+            agent_id=self._agent_id,
+            run_id=self._run_id,
+            limit=room,
+            exclude_command_types=exclude or None,
+            reserve=self._claim_batch_size > 1,
+        )
+        self._counters["claim_queries"] += 1
+        self._counters["claimed"] += len(claimed)
+        if not claimed:
+            return None
+        if self._claim_batch_size == 1:
+            return claimed[0]
+        self._claimed.extend(claimed)
+        return self._start_buffered(claimed)
+
+    def _start_buffered(self, candidates: list[ClaimedCommand]) -> ClaimedCommand | None:
+        """Start the first reservation in ``candidates`` that is still ours."""
+
+        for cmd in candidates:
+            self._claimed.remove(cmd)
+            started = _start_reserved_command(command_id=cmd.id, run_id=self._run_id)
+            if started is not None:
+                return started
+            # Lost or pushed back: drop any reservation we still hold.
+            self._counters["released"] += _release_claimed_commands(command_ids=[cmd.id], run_id=self._run_id)
+        return None
+
     def _finalize_command(
         self,
         *,
@@ -7262,6 +7684,7 @@ class _SupervisorCommandProcessor:
             step_ended=step_ended,
             duration_ms=duration_ms,
         )
+        self._counters["finished"] += 1
 
     def _handle_claimed_non_llm(self, cmd: ClaimedCommand) -> None:
         step_started = utcnow()
@@ -7468,37 +7891,82 @@ class _SupervisorCommandProcessor:
             self._finalize_command(cmd=cmd, execution=execution, step_started=step_started, step_monotonic=step_monotonic)
             return
 
-        job_id = self._broker.submit(command_id=int(cmd.id), request=request)
-        self._inflight = _InflightInference(
+        self._submit_inference(
             cmd=cmd,
             task=task,
+            request=request,
             step_started=step_started,
             step_monotonic=step_monotonic,
-            job_id=str(job_id),
+        )
+
+    def _submit_inference(
+        self,
+        *,
+        cmd: ClaimedCommand,
+        task: LLMTask,
+        request: InferenceRequest,
+        step_started: datetime,
+        step_monotonic: float,
+    ) -> None:
+        assert self._broker is not None
+        lane = self._broker.lane_for(_inference_lane_for_command(cmd.command_type))
+        job_id = self._broker.submit(
+            command_id=int(cmd.id),
+            request=request,
+            lane=lane,
+            supersede_key=_inference_supersede_key(cmd),
+        )
+        self._track_inflight(
+            _InflightInference(
+                cmd=cmd,
+                task=task,
+                step_started=step_started,
+                step_monotonic=step_monotonic,
+                job_id=str(job_id),
+                lane=lane,
+            )
         )
 
     def _poll_inflight_result(self) -> bool:
-        if self._inflight is None or self._broker is None:
+        if not self._inflight or self._broker is None:
             return False
         result = self._broker.poll_result()
         if result is None:
             return False
-        if str(result.job_id) != str(self._inflight.job_id) or int(result.command_id) != int(self._inflight.cmd.id):
+        inflight = self._inflight.pop(str(result.job_id), None)
+        if inflight is None or int(result.command_id) != int(inflight.cmd.id):
             logger.warning(
-                "Dropping unexpected inference result job_id=%s command_id=%s inflight_job_id=%s inflight_command_id=%s",
+                "Dropping unexpected inference result job_id=%s command_id=%s inflight_job_ids=%s",
                 result.job_id,
                 result.command_id,
-                self._inflight.job_id,
-                self._inflight.cmd.id,
+                sorted(self._inflight),
             )
+            if inflight is not None:
+                self._inflight[inflight.job_id] = inflight
             return True
 
-        cmd = self._inflight.cmd
-        task = self._inflight.task
-        step_started = self._inflight.step_started
-        step_monotonic = self._inflight.step_monotonic
+        cmd = inflight.cmd
+        task = inflight.task
+        step_started = inflight.step_started
+        step_monotonic = inflight.step_monotonic
         reply = result.reply
 
+        if result.cancelled:
+            # A newer command covers the same work; that is not a failure.
+            task.close()
+            execution = CommandExecution(
+                ok=True,
+                result={
+                    "ok": True,
+                    "superseded": True,
+                    "reason": "Inference was superseded by a newer command.",
+                    "supersede_key": _inference_supersede_key(cmd),
+                },
+                error=None,
+            )
+            self._finalize_command(cmd=cmd, execution=execution, step_started=step_started, step_monotonic=step_monotonic)
+            return True
+
         try:
             next_item = task.send(reply)
         except StopIteration as stop:
@@ -7508,13 +7976,11 @@ class _SupervisorCommandProcessor:
                 result={"ok": False, "error": "LLM task returned invalid result type."},
                 error="invalid_llm_task_result",
             )
-            self._inflight = None
             self._finalize_command(cmd=cmd, execution=execution, step_started=step_started, step_monotonic=step_monotonic)
             return True
         except Exception as exc:
             error = f"{type(exc).__name__}: {exc}"
             execution = CommandExecution(ok=False, result={"ok": False, "error": error}, error=error)
-            self._inflight = None
             self._finalize_command(cmd=cmd, execution=execution, step_started=step_started, step_monotonic=step_monotonic)
             return True
 
@@ -7524,17 +7990,15 @@ class _SupervisorCommandProcessor:
                 result={"ok": False, "error": "LLM task yielded invalid request type."},
                 error="invalid_llm_task_request",
             )
-            self._inflight = None
             self._finalize_command(cmd=cmd, execution=execution, step_started=step_started, step_monotonic=step_monotonic)
             return True
 
-        job_id = self._broker.submit(command_id=int(cmd.id), request=next_item)
-        self._inflight = _InflightInference(
+        self._submit_inference(
             cmd=cmd,
             task=task,
+            request=next_item,
             step_started=step_started,
             step_monotonic=step_monotonic,
-            job_id=str(job_id),
         )
         return True
 
@@ -7544,12 +8008,11 @@ class _SupervisorCommandProcessor:
         assert_main_thread("supervisor.processor.tick")
         self._maybe_heartbeat()
 
-        if self._inflight is not None and self._broker is not None:
+        if self._inflight and self._broker is not None:
             if self._poll_inflight_result():
                 return True
 
-        exclude = _LLM_COMMAND_TYPES if (self._inflight is not None and self._broker is not None) else None
-        cmd = _claim_next_command(agent_id=self._agent_id, run_id=self._run_id, exclude_command_types=exclude)
+        cmd = self._next_command()
         if cmd is None:
             return False
 
@@ -7870,7 +8333,7 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
         logger.warning("Inference broker disabled: %s", broker_error)
     broker: InferenceBroker | None = None
     if broker_enabled:
-        broker = InferenceBroker()
+        broker = InferenceBroker(lanes=_inference_broker_lanes())
         broker.start()
     inference_broker_info: dict[str, Any] = {
         "enabled": bool(broker_enabled),
@@ -7883,24 +8346,24 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
             if broker is not None
             else None
         ),
+        "lanes": broker.lanes if broker is not None else None,
     }
-    _write_supervisor_state(
-        {
-            "schema_version": 1,
-            "kind": "supervisor",
-            "status": "running",
-            "run_id": run_id,
-            "agent_id": config.agent_id,
-            "pid": os.getpid(),
-            "thread_main": thread_main,
-            "inference_broker": inference_broker_info,
-            "started_at": started_at.isoformat(),
-            "backend_base_url": config.backend_base_url,
-            "frontend_url": config.frontend_url,
-            "interval_seconds": int(config.interval_seconds),
-            "timeout_seconds": float(config.timeout_seconds),
-        }
-    )
+    running_state: dict[str, Any] = {
+        "schema_version": 1,
+        "kind": "supervisor",
+        "status": "running",
+        "run_id": run_id,
+        "agent_id": config.agent_id,
+        "pid": os.getpid(),
+        "thread_main": thread_main,
+        "inference_broker": inference_broker_info,
+        "started_at": started_at.isoformat(),
+        "backend_base_url": config.backend_base_url,
+        "frontend_url": config.frontend_url,
+        "interval_seconds": int(config.interval_seconds),
+        "timeout_seconds": float(config.timeout_seconds),
+    }
+    _write_supervisor_state(running_state)
     with get_agent_session() as db:
         previous_orchestrator: dict[str, Any] | None = None
         previous_scheduler: dict[str, Any] | None = None
@@ -8001,6 +8464,20 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
         max_value=3600,
     )
     last_agent_log_archive_poll_at: datetime | None = None
+    search_index_enabled = _search_index_enabled()
+    search_index_poll_seconds = _clamp_int(
+        _safe_int(os.getenv("ISPEC_SEARCH_INDEX_POLL_SECONDS")) or 15,
+        min_value=1,
+        max_value=3600,
+    )
+    last_search_index_poll_at: datetime | None = None
+    usage_summary_enabled = inference_usage_logging_enabled()
+    usage_summary_poll_seconds = _clamp_int(
+        _safe_int(os.getenv("ISPEC_INFERENCE_USAGE_SUMMARY_POLL_SECONDS")) or 300,
+        min_value=10,
+        max_value=24 * 3600,
+    )
+    last_usage_summary_poll_at: datetime | None = None
     once_command_started = False
 
     final_status = "stopped"
@@ -8083,6 +8560,29 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
                     logger.exception("Failed ensuring agent log archive commands")
                 last_agent_log_archive_poll_at = now
 
+            if search_index_enabled and (
+                last_search_index_poll_at is None
+                or (now - last_search_index_poll_at).total_seconds() >= search_index_poll_seconds
+            ):
+                try:
+                    indexed = _refresh_search_indexes()
+                    if any(indexed.values()):
+                        logger.debug("Indexed assistant/agent search rows %s", indexed)
+                except Exception:
+                    logger.exception("Failed refreshing assistant/agent search indexes")
+                last_search_index_poll_at = now
+
+            if usage_summary_enabled and (
+                last_usage_summary_poll_at is None
+                or (now - last_usage_summary_poll_at).total_seconds() >= usage_summary_poll_seconds
+            ):
+                try:
+                    summary = _refresh_inference_usage_summary()
+                    logger.debug("Refreshed inference usage summary %s", summary)
+                except Exception:
+                    logger.exception("Failed refreshing inference usage summary")
+                last_usage_summary_poll_at = now
+
             did_command_work = processor.tick()
             if did_command_work:
                 if once:
@@ -8135,6 +8635,9 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
                     checks = {}
                 checks[action_id] = {"checked_at": step_ended.isoformat(), **result}
                 state_after = {**state_before, "checks": checks, "last_action": action_id}
+                if broker is not None:
+                    state_after["inference_lanes"] = broker.stats()
+                state_after["command_queue"] = processor.queue_stats()
                 prev_failure_streak = _safe_int(state_before.get("check_failure_streak")) or 0
                 if _supervisor_has_check_failures(state_after):
                     state_after["check_failure_streak"] = int(prev_failure_streak) + 1
@@ -8198,6 +8701,14 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
                 )
                 db.commit()
 
+            _write_supervisor_state(
+                {
+                    **running_state,
+                    "updated_at": utcnow().isoformat(),
+                    "command_queue": processor.queue_stats(),
+                    "inference_lanes": broker.stats() if broker is not None else None,
+                }
+            )
             if once:
                 break
             _supervisor_sleep_with_command_polling(
@@ -8243,6 +8754,7 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
                 "pid": os.getpid(),
                 "thread_main": thread_main,
                 "inference_broker": inference_broker_info,
+                "command_queue": processor.queue_stats(),
                 "started_at": started_at.isoformat(),
                 "ended_at": utcnow().isoformat(),
                 "error": final_error,
@@ -8259,4 +8771,6 @@ def run_supervisor(config: SupervisorConfig, *, once: bool = False) -> str:
             pass
 
     logger.info("Supervisor run stopped (run_id=%s)", run_id)
+    if not flush_log_writers():
+        logger.warning("Log writers did not finish flushing before shutdown (run_id=%s)", run_id)
     return run_id
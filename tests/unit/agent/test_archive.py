@@ -4,7 +4,7 @@ from datetime import UTC, datetime, timedelta
 
 import pytest
 
-from ispec.agent.archive import archive_agent_logs
+from ispec.agent.archive import archive_agent_logs, get_agent_archive_session
 from ispec.agent.connect import _get_engine, get_agent_session
 from ispec.agent.models import AgentCommand, AgentEvent, AgentRun, AgentStep
 
@@ -189,5 +189,55 @@ def test_archive_agent_logs_requires_archive_path_when_not_dry_run(tmp_path, mon
         archive_agent_logs(agent_db_file_path=str(live_db), archive_db_file_path=None, dry_run=False)
 
 
+def test_archive_agent_logs_bulk_moves_json_payloads_and_can_compress_them(tmp_path):
+    pytest.importorskip("zstandard")
+    live_db = tmp_path / "agent-live.db"
+    archive_db = tmp_path / "agent-archive.db"
+    old_ts = _utcnow() - timedelta(days=30)
+    big_response = {"text": "spectra " * 400, "items": list(range(50))}
+
+    with get_agent_session(live_db) as db:
+        run = AgentRun(run_id="run-1", agent_id="agent-1", created_at=old_ts, updated_at=old_ts)
+        db.add(run)
+        db.flush()
+        db.add_all(
+            [
+                AgentStep(
+                    run_pk=run.id,
+                    step_index=idx,
+                    kind="old_step",
+                    started_at=old_ts,
+                    ended_at=old_ts,
+                    ok=True,
+                    response_json=big_response,
+                    chosen_json={"command_id": idx},
+                )
+                for idx in range(5)
+            ]
+        )
+
+    summary = archive_agent_logs(
+        agent_db_file_path=str(live_db),
+        archive_db_file_path=str(archive_db),
+        batch_size=2,
+        max_batches=None,
+        compress_json=True,
+    )
+
+    assert summary["steps"]["batches"] == 3
+    assert summary["steps"]["archived"] == summary["steps"]["pruned"] == 5
+    assert summary["steps"]["rows_per_second"] is not None
+    assert summary["vacuum"]["vacuumed"] is False
+    with get_agent_session(live_db) as db:
+        assert db.query(AgentStep).count() == 0
+
+    with get_agent_archive_session(archive_db) as db:
+        steps = db.query(AgentStep).order_by(AgentStep.id.asc()).all()
+        assert [step.chosen_json for step in steps] == [{"command_id": idx} for idx in range(5)]
+        assert all(step.response_json == big_response for step in steps)
+        stored = db.connection().exec_driver_sql("SELECT response_json FROM agent_step LIMIT 1").scalar()
+        assert isinstance(stored, bytes) and len(stored) < len(str(big_response))
+
+
 def teardown_function() -> None:
     _get_engine.cache_clear()
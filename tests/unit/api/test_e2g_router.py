@@ -79,3 +79,31 @@ def test_e2g_crud(e2g_router_env):
         with pytest.raises(HTTPException) as exc:
             get_item(e2g_id, request=_DummyRequest(), db=db)
         assert exc.value.status_code == 404
+
+
+def test_e2g_by_run_pages_with_cursor(e2g_router_env):
+    from fastapi import Response
+
+    router, SessionLocal = e2g_router_env
+    list_by_run = _find_endpoint(router, path="/experiment_to_gene/by_run/{run_id}", method="GET")
+    with SessionLocal() as db:
+        db.add_all(E2G(experiment_run_id=1, gene=str(idx), geneidtype="GeneID") for idx in range(5))
+        db.commit()
+
+        pages: list[list[str]] = []
+        cursor = None
+        while True:
+            response = Response()
+            rows = list_by_run(
+                run_id=1, q=None, geneidtype=None, limit=2, offset=0, cursor=cursor, response=response, db=db
+            )
+            pages.append([row["gene"] for row in rows])
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert pages == [["0", "1"], ["2", "3"], ["4"]]
+
+        with pytest.raises(HTTPException) as exc:
+            list_by_run(run_id=1, q=None, geneidtype=None, limit=2, offset=0, cursor="bogus", db=db)
+        assert exc.value.status_code == 400
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
 from ispec.agent_state.connect import get_agent_state_session
 from ispec.agent_state.store import append_observation, register_schema_version
 from ispec.agent.connect import get_agent_session
 from ispec.agent.models import AgentCommand, AgentRun
-from ispec.api.routes.ops import snapshot
-from ispec.assistant.connect import get_assistant_session
-from ispec.assistant.models import SupportMessage, SupportSession
+from ispec.agent.connect import get_agent_session_dep
+from ispec.agent_state.connect import get_agent_state_session_dep
+from ispec.api.routes.ops import router, snapshot
+from ispec.api.security import require_assistant_access
+from ispec.assistant.connect import get_assistant_session, get_assistant_session_dep
+from ispec.assistant.models import SupportMessage, SupportOpsCounter, SupportSession
+from ispec.db.connect import get_session_dep
 
 
 def test_ops_snapshot_reports_counts_and_review_backlog(tmp_path):
@@ -87,3 +94,66 @@ def test_ops_snapshot_reports_counts_and_review_backlog(tmp_path):
         assert isinstance(latest, dict)
         assert "orchestrator_action_summary" in latest
         assert "orchestrator_thought_advisory" in latest
+
+
+def test_ops_counters_follow_inserts_and_deletes(tmp_path):
+    assistant_db_path = tmp_path / "assistant.db"
+    with get_assistant_session(assistant_db_path) as assistant_db:
+        session = SupportSession(session_id="s1", user_id=None)
+        assistant_db.add(session)
+        assistant_db.flush()
+        messages = [
+            SupportMessage(session_pk=session.id, role="user", content=f"question {idx}") for idx in range(3)
+        ]
+        assistant_db.add_all(messages)
+        assistant_db.commit()
+        assistant_db.delete(messages[-1])
+        assistant_db.commit()
+
+        counters = dict(assistant_db.query(SupportOpsCounter.name, SupportOpsCounter.value).all())
+        assert counters == {"sessions_total": 1, "messages_total": 2, "reviews_total": 0}
+
+
+def test_ops_snapshot_endpoint_sends_etag_and_honours_if_none_match(tmp_path):
+    assistant_db_path = tmp_path / "assistant.db"
+    with get_assistant_session(assistant_db_path) as assistant_db:
+        session = SupportSession(session_id="s1", user_id=None)
+        assistant_db.add(session)
+        assistant_db.flush()
+        assistant_db.add_all(
+            [
+                SupportMessage(session_pk=session.id, role="user", content="Where is my data?"),
+                SupportMessage(session_pk=session.id, role="assistant", content="In the share."),
+            ]
+        )
+        assistant_db.commit()
+
+    def _dep(factory, path):
+        def override():
+            with factory(path) as db:
+                yield db
+
+        return override
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_assistant_session_dep] = _dep(get_assistant_session, assistant_db_path)
+    app.dependency_overrides[get_agent_session_dep] = _dep(get_agent_session, tmp_path / "agent.db")
+    app.dependency_overrides[get_agent_state_session_dep] = _dep(
+        get_agent_state_session, tmp_path / "agent-state.db"
+    )
+    app.dependency_overrides[get_session_dep] = lambda: None
+    app.dependency_overrides[require_assistant_access] = lambda: None
+
+    with TestClient(app) as client:
+        first = client.get("/ops/snapshot")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        recent = first.json()["assistant"]["recent_sessions"][0]
+        assert recent["message_count"] == 2
+        assert recent["last_message_role"] == "assistant"
+        assert recent["last_user_message"] == "Where is my data?"
+
+        second = client.get("/ops/snapshot", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -183,3 +184,53 @@ def test_project_router_scopes_viewer_to_explicit_project_grants(client):
     staff_list = client.get("/projects", headers={"x-test-user": "staff"})
     assert staff_list.status_code == 200
     assert [row["id"] for row in staff_list.json()] == [201, 202]
+
+
+def test_project_list_keyset_pagination_and_export(client):
+    with client.session_factory() as db:  # type: ignore[attr-defined]
+        for idx in range(5):
+            db.add(Project(prj_AddedBy="tester", prj_ProjectTitle=f"P{idx % 2}"))
+        db.commit()
+
+    seen: list[int] = []
+    params = {"limit": 2, "wrap": "true", "order": "-prj_ProjectTitle"}
+    resp = client.get("/projects", params=params)
+    while True:
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["total"] == 5
+        seen.extend(item["id"] for item in body["items"])
+        if not body["next_cursor"]:
+            break
+        assert resp.headers["X-Next-Cursor"] == body["next_cursor"]
+        resp = client.get("/projects", params={**params, "cursor": body["next_cursor"]})
+
+    offset_ids = [
+        item["id"]
+        for item in client.get("/projects", params={"limit": 10, "order": "-prj_ProjectTitle"}).json()
+    ]
+    assert seen == offset_ids
+    assert len(set(seen)) == 5
+
+    # Cursors are bound to their ordering.
+    resp = client.get("/projects", params={"limit": 2, "cursor": body["next_cursor"] or "x"})
+    assert resp.status_code == 400
+
+    resp = client.get("/projects", params={"limit": 2, "wrap": "true", "count": "none"})
+    assert resp.json()["total"] is None
+    assert "X-Total-Count" not in resp.headers
+
+    resp = client.get("/projects", params={"count": "estimate"})
+    assert resp.headers["X-Total-Count"] == "5"
+    assert resp.headers["X-Total-Count-Estimated"] == "1"
+
+    resp = client.get("/projects/export")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [line for line in resp.text.splitlines() if line]
+    assert [json.loads(line)["id"] for line in lines] == sorted(seen)
+
+    resp = client.get("/projects/export", params={"format": "csv"})
+    rows = resp.text.strip().splitlines()
+    assert "id" in rows[0].split(",")
+    assert len(rows) == 6
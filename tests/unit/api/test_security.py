@@ -2,7 +2,10 @@ import pytest
 from starlette.requests import Request
 from fastapi import HTTPException
 
+from sqlalchemy import event
+
 from ispec.api.security import (
+    auth_cache_stats,
     create_session,
     delete_session,
     get_current_user,
@@ -80,6 +83,49 @@ def test_session_round_trip_and_delete(db_session):
     assert db_session.query(AuthSession).count() == 0
 
 
+def test_current_user_is_cached_until_invalidated(db_session):
+    user = AuthUser(
+        username="carol",
+        password_hash="x",
+        password_salt="y",
+        password_iterations=1,
+        role=UserRole.viewer,
+        is_active=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    token = create_session(db_session, user=user)
+    request = _make_request(method="GET", cookie=f"{session_cookie_name()}={token}")
+
+    assert get_current_user(request, db_session) is not None
+    db_session.expunge_all()
+
+    statements: list[str] = []
+    engine = db_session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        hits = auth_cache_stats()["hits"]
+        current = get_current_user(request, db_session)
+        assert statements == []
+        assert auth_cache_stats()["hits"] == hits + 1
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert current.username == "carol"
+    assert current in db_session
+    invalidations = auth_cache_stats()["invalidations"]
+    db_session.commit()  # merging the cached user must not mark it dirty
+    assert auth_cache_stats()["invalidations"] == invalidations
+
+    current.role = UserRole.editor
+    db_session.commit()
+    db_session.expunge_all()
+    assert get_current_user(request, db_session).role == UserRole.editor
+
+    delete_session(db_session, token=token)
+    assert get_current_user(request, db_session) is None
+
+
 def test_require_access_enforces_viewer_is_read_only(db_session, monkeypatch):
     monkeypatch.setenv("ISPEC_REQUIRE_LOGIN", "1")
 
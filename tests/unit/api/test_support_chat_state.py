@@ -6,8 +6,10 @@ from typing import Any
 from ispec.api.routes import support as support_routes
 from ispec.api.routes.support import ChatRequest, chat
 from ispec.assistant.connect import get_assistant_session
+from ispec.assistant.context import clear_project_summary_cache
 from ispec.assistant.models import SupportMessage, SupportSession
 from ispec.assistant.service import AssistantReply
+from ispec.db.models import Project
 from ispec.schedule.connect import get_schedule_session
 
 
@@ -121,6 +123,62 @@ def test_support_chat_versions_context_and_budgets_history(tmp_path, db_session,
         assert persisted_state["conversation_summary"]
 
 
+def test_support_chat_reports_project_cache_counts_for_both_budget_passes(tmp_path, db_session, monkeypatch):
+    monkeypatch.setenv("ISPEC_ASSISTANT_MAX_TOOL_CALLS", "0")
+    monkeypatch.setenv("ISPEC_ASSISTANT_HISTORY_LIMIT", "50")
+    monkeypatch.setenv("ISPEC_ASSISTANT_MAX_PROMPT_TOKENS", "256")
+    monkeypatch.setenv("ISPEC_ASSISTANT_SUMMARY_MAX_CHARS", "2000")
+
+    clear_project_summary_cache()
+    project = Project(prj_AddedBy="test", prj_ProjectTitle="Cached Project")
+    db_session.add(project)
+    db_session.commit()
+    db_session.refresh(project)
+
+    def fake_generate_reply(*, messages=None, tools=None, **_) -> AssistantReply:
+        return AssistantReply(content="OK", provider="test", model="test-model", meta=None)
+
+    monkeypatch.setattr(support_routes, "generate_reply", fake_generate_reply)
+
+    db_path = tmp_path / "assistant.db"
+    with get_assistant_session(db_path) as assistant_db:
+        support_session = SupportSession(session_id="session-1", user_id=None, state_json=json.dumps({}))
+        assistant_db.add(support_session)
+        assistant_db.flush()
+        for idx in range(8):
+            assistant_db.add(
+                SupportMessage(
+                    session_pk=support_session.id,
+                    role="user" if idx % 2 == 0 else "assistant",
+                    content=f"message {idx} " + "x" * 1200,
+                    provider="test",
+                )
+            )
+        assistant_db.flush()
+
+        payload = ChatRequest.model_validate(
+            {"sessionId": "session-1", "message": f"Tell me about project {project.id}", "history": [], "ui": None}
+        )
+        with get_schedule_session(tmp_path / "schedule.db") as schedule_db:
+            chat(payload, assistant_db=assistant_db, core_db=db_session, schedule_db=schedule_db, user=None)
+
+        # The history overflowed the budget, so the summary grew and the
+        # context was built twice: a miss on the first pass, a hit on the second.
+        assistant_db.refresh(support_session)
+        assert json.loads(support_session.state_json)["conversation_summary_up_to_id"] == 8
+
+        assistant_row = (
+            assistant_db.query(SupportMessage)
+            .filter(SupportMessage.session_pk == support_session.id)
+            .filter(SupportMessage.role == "assistant")
+            .order_by(SupportMessage.id.desc())
+            .first()
+        )
+        project_cache = json.loads(assistant_row.meta_json)["context"]["project_cache"]
+        assert project_cache["misses"] == 1
+        assert project_cache["hits"] == 1
+
+
 def test_support_chat_prompt_state_prefers_memory_over_summary_in_context(tmp_path, db_session, monkeypatch):
     monkeypatch.setenv("ISPEC_ASSISTANT_MAX_TOOL_CALLS", "0")
     monkeypatch.setenv("ISPEC_ASSISTANT_HISTORY_LIMIT", "10")
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from ispec.agent.connect import get_agent_session
+from ispec.api.routes import support as support_routes
+from ispec.api.routes.support import ChatRequest, chat_stream
+from ispec.assistant.connect import get_assistant_session
+from ispec.assistant.models import SupportMessage
+from ispec.assistant.service import AssistantReply
+from ispec.db.models import Project
+from ispec.schedule.connect import get_schedule_session
+
+
+def _collect_events(response) -> list[dict]:
+    async def _read() -> list[str]:
+        return [chunk async for chunk in response.body_iterator]
+
+    return [json.loads(line) for chunk in asyncio.run(_read()) for line in chunk.splitlines() if line]
+
+
+def test_support_chat_stream_emits_stages_deltas_and_persisted_reply(tmp_path, db_session, monkeypatch):
+    monkeypatch.setenv("ISPEC_ASSISTANT_CHAT_QUEUE_ENABLED", "0")
+    monkeypatch.setenv("ISPEC_ASSISTANT_TOOL_PROTOCOL", "openai")
+    monkeypatch.setenv("ISPEC_ASSISTANT_MAX_TOOL_CALLS", "2")
+    monkeypatch.setenv("ISPEC_ASSISTANT_SUMMARY_MAX_CHARS", "0")
+
+    db_session.add_all([Project(prj_AddedBy="test", prj_ProjectTitle="One"), Project(prj_AddedBy="test", prj_ProjectTitle="Two")])
+    db_session.commit()
+
+    calls: list[bool] = []
+
+    def fake_generate_reply(*, messages=None, tools=None, on_delta=None, **_) -> AssistantReply:
+        calls.append(on_delta is not None)
+        if len(calls) == 1:
+            on_delta("Let me check")
+            return AssistantReply(
+                content="Let me check",
+                provider="test",
+                model="test-model",
+                tool_calls=[{"id": "call_1", "type": "function", "function": {"name": "count_all_projects", "arguments": "{}"}}],
+            )
+        for piece in ("FINAL:\n", "We have ", "2 projects."):
+            on_delta(piece)
+        return AssistantReply(content="FINAL:\nWe have 2 projects.", provider="test", model="test-model")
+
+    monkeypatch.setattr(support_routes, "generate_reply", fake_generate_reply)
+
+    with (
+        get_assistant_session(tmp_path / "assistant.db") as assistant_db,
+        get_agent_session(tmp_path / "agent.db") as agent_db,
+        get_schedule_session(tmp_path / "schedule.db") as schedule_db,
+    ):
+        payload = ChatRequest.model_validate({"sessionId": "stream-1", "message": "How many projects do we have?"})
+        response = chat_stream(
+            payload,
+            assistant_db=assistant_db,
+            agent_db=agent_db,
+            core_db=db_session,
+            schedule_db=schedule_db,
+            user=None,
+        )
+        assert response.media_type == "application/x-ndjson"
+        events = _collect_events(response)
+
+    assert calls == [True, True]
+    stages = [event["stage"] for event in events if event["type"] == "stage"]
+    assert stages[0] == "received"
+    assert "tool" in stages and "review" in stages
+    assert {"type": "reset", "round": 1} in events
+    round_two = "".join(event["text"] for event in events if event["type"] == "delta" and event["round"] == 2)
+    assert round_two == "FINAL:\nWe have 2 projects."
+
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["response"]["message"] == "We have 2 projects."
+    with get_assistant_session(tmp_path / "assistant.db") as assistant_db:
+        stored = assistant_db.get(SupportMessage, done["response"]["messageId"])
+        assert stored is not None and stored.content == "We have 2 projects."
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
-from ispec.assistant.context import build_ispec_context, extract_project_ids
-from ispec.db.models import Project
+from datetime import UTC, datetime
+
+from ispec.assistant.context import (
+    build_ispec_context,
+    clear_project_summary_cache,
+    extract_project_ids,
+    project_summary_cache_stats,
+)
+from ispec.db.models import Person, Project, ProjectComment
 
 
 def test_build_ispec_context_does_not_inject_current_project_for_plural_project_questions(db_session):
@@ -91,3 +98,43 @@ def test_build_ispec_context_includes_current_project_for_results_followup(db_se
 
     assert context["current_project"]["id"] == int(project.id)
     assert context["current_project"]["question"] == "Are the filtered samples still informative?"
+
+
+def test_project_summary_cache_reuses_summaries_until_the_project_changes(db_session):
+    clear_project_summary_cache()
+    project = Project(prj_AddedBy="test", prj_ProjectTitle="Cached Project")
+    person = Person(ppl_AddedBy="test", ppl_Name_First="Ada", ppl_Name_Last="Lovelace")
+    db_session.add_all([project, person])
+    db_session.commit()
+    db_session.refresh(project)
+    message = f"Tell me about project {project.id}"
+
+    first: dict[str, int] = {}
+    build_ispec_context(db_session, message=message, state={}, cache_stats=first)
+    second: dict[str, int] = {}
+    context = build_ispec_context(db_session, message=message, state={}, cache_stats=second)
+    assert first == {"misses": 1}
+    assert second == {"hits": 1}
+    assert context["projects"][0]["comments"]["count"] == 0
+
+    db_session.add(
+        ProjectComment(
+            project_id=project.id,
+            person_id=person.id,
+            com_Comment="New comment",
+            com_CreationTS=datetime(2024, 1, 1, tzinfo=UTC),
+        )
+    )
+    db_session.commit()
+    after_comment: dict[str, int] = {}
+    context = build_ispec_context(db_session, message=message, state={}, cache_stats=after_comment)
+    assert after_comment == {"misses": 1}
+    assert context["projects"][0]["comments"]["count"] == 1
+
+    project.prj_ProjectTitle = "Renamed Project"
+    db_session.commit()
+    after_edit: dict[str, int] = {}
+    context = build_ispec_context(db_session, message=message, state={}, cache_stats=after_edit)
+    assert after_edit == {"misses": 1}
+    assert context["projects"][0]["title"] == "Renamed Project"
+    assert project_summary_cache_stats()["hits"] == 1
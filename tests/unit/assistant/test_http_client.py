@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ispec.assistant import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        payload = json.dumps({"echo": body}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        return None
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    http_client.reset()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        http_client.reset()
+        server.shutdown()
+        server.server_close()
+
+
+def test_post_reuses_pooled_connection_and_reports_timing(server_url):
+    first = http_client.post(f"{server_url}/v1/chat/completions", json={"n": 1}, timeout=5)
+    assert first.json() == {"echo": {"n": 1}}
+    assert first.ispec_timing["new_connections"] == 1
+    assert first.ispec_timing["ttfb_ms"] >= first.ispec_timing["connect_ms"] >= 0
+
+    second = http_client.post(f"{server_url}/v1/chat/completions", json={"n": 2}, timeout=5)
+    assert second.json() == {"echo": {"n": 2}}
+    assert second.ispec_timing["new_connections"] == 0
+    assert second.ispec_timing["connect_ms"] == 0
+
+    timing = http_client.call_timing(second, 0.0)
+    assert set(timing) == {"connect_ms", "ttfb_ms", "new_connections", "total_ms"}
+
+
+def test_reset_closes_async_clients_on_their_loop():
+    import asyncio
+
+    class _FakeAsyncClient:
+        is_closed = False
+
+        async def aclose(self) -> None:
+            self.is_closed = True
+
+    loop = asyncio.new_event_loop()
+    client = _FakeAsyncClient()
+    try:
+        http_client._async_clients[loop] = client
+        http_client.reset()
+    finally:
+        loop.close()
+    assert client.is_closed is True
+    assert len(http_client._async_clients) == 0
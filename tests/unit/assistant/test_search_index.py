@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from ispec.agent.connect import get_agent_session
+from ispec.agent.models import AgentCommand, AgentRun, AgentStep
+from ispec.assistant import search_index
+from ispec.assistant.connect import get_assistant_session
+from ispec.assistant.models import SupportMessage, SupportSession
+from ispec.assistant.tools import run_tool
+
+
+def _search_messages(assistant_db, db_session, query):
+    payload = run_tool(
+        name="assistant_search_messages",
+        args={"query": query, "limit": 10},
+        core_db=db_session,
+        assistant_db=assistant_db,
+        schedule_db=None,
+        omics_db=None,
+        user=None,
+        api_schema=None,
+    )
+    assert payload["ok"] is True
+    return payload["result"]["matches"]
+
+
+def test_message_index_is_incremental_and_covers_unindexed_tail(tmp_path, db_session):
+    assistant_db_path = tmp_path / "assistant.db"
+    with get_assistant_session(assistant_db_path) as assistant_db:
+        session = SupportSession(session_id="s1", user_id=None)
+        assistant_db.add(session)
+        assistant_db.flush()
+        first = SupportMessage(session_pk=session.id, role="user", content="The centrifuge rotor is unbalanced again.")
+        other = SupportMessage(session_pk=session.id, role="user", content="Unrelated chatter.")
+        assistant_db.add_all([first, other])
+        assistant_db.commit()
+        first_id = int(first.id)
+
+        summary = search_index.refresh_search_index(assistant_db, ["messages"])
+        assert summary == {"messages": 2}
+        assert search_index.refresh_search_index(assistant_db, ["messages"]) == {"messages": 0}
+
+        late = SupportMessage(session_pk=session.id, role="assistant", content="Rotor replaced.")
+        assistant_db.add(late)
+        assistant_db.commit()
+        late_id = int(late.id)
+
+    with get_assistant_session(assistant_db_path) as assistant_db:
+        assert search_index.has_search_index(assistant_db, "messages")
+        matches = _search_messages(assistant_db, db_session, "rotor")
+        # The unindexed row is found via the ILIKE tail and listed first.
+        assert [m["message_id"] for m in matches] == [late_id, first_id]
+        assert "rotor" in matches[1]["snippet"].lower()
+
+        assert search_index.refresh_search_index(assistant_db, ["messages"]) == {"messages": 1}
+        matches = _search_messages(assistant_db, db_session, "rot")
+        assert {m["message_id"] for m in matches} == {late_id, first_id}
+
+
+def test_agent_index_flattens_json_and_reindexes_updated_commands(tmp_path, db_session):
+    agent_db_path = tmp_path / "agent.db"
+    with get_agent_session(agent_db_path) as agent_db:
+        run = AgentRun(run_id="run-1", agent_id="agent-1", config_json={}, state_json={}, summary_json={})
+        agent_db.add(run)
+        agent_db.flush()
+        step = AgentStep(
+            run_pk=int(run.id),
+            step_index=0,
+            kind="orchestrator_tick_v1",
+            response_json={"note": {"detail": ["vacuum pump alarm"]}},
+        )
+        cmd = AgentCommand(command_type="assistant_compact", payload_json={"reason": "idle"})
+        agent_db.add_all([step, cmd])
+        agent_db.commit()
+        step_id = int(step.id)
+        cmd_id = int(cmd.id)
+
+        search_index.refresh_search_index(agent_db, search_index.AGENT_SOURCES)
+
+        cmd.result_json = {"summary": "flagged the turbopump"}
+        cmd.status = "succeeded"
+        agent_db.commit()
+        assert search_index.refresh_search_index(agent_db, ["commands"]) == {"commands": 1}
+
+    with get_agent_session(agent_db_path) as agent_db:
+        payload = run_tool(
+            name="assistant_search_internal_logs",
+            args={"query": "vacuum pump", "limit": 10},
+            core_db=db_session,
+            agent_db=agent_db,
+            schedule_db=None,
+            omics_db=None,
+            user=None,
+            api_schema=None,
+        )
+        steps = payload["result"]["steps"]
+        assert [item["step_id"] for item in steps] == [step_id]
+        assert steps[0]["response_preview"] == "orchestrator_tick_v1\nnote detail vacuum pump alarm"
+
+        payload = run_tool(
+            name="assistant_search_internal_logs",
+            args={"query": "turbopump", "limit": 10},
+            core_db=db_session,
+            agent_db=agent_db,
+            schedule_db=None,
+            omics_db=None,
+            user=None,
+            api_schema=None,
+        )
+        commands = payload["result"]["commands"]
+        assert [item["command_id"] for item in commands] == [cmd_id]
+        assert "turbopump" in commands[0]["snippet"]
+
+
+def test_deleting_source_rows_removes_their_index_entries(tmp_path):
+    from sqlalchemy import text
+
+    with get_assistant_session(tmp_path / "assistant.db") as assistant_db:
+        session = SupportSession(session_id="s1", user_id=None)
+        assistant_db.add(session)
+        assistant_db.flush()
+        message = SupportMessage(session_pk=session.id, role="user", content="Pruned centrifuge notes.")
+        assistant_db.add(message)
+        assistant_db.commit()
+        search_index.refresh_search_index(assistant_db, ["messages"])
+        fts_count = text("SELECT count(*) FROM support_message_fts")
+        assert assistant_db.execute(fts_count).scalar() == 1
+
+        assistant_db.delete(message)
+        assistant_db.commit()
+        assert assistant_db.execute(fts_count).scalar() == 0
@@ -54,7 +54,7 @@ def test_generate_reply_vllm_calls_chat_completions(monkeypatch):
             }
         )
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     reply = service.generate_reply(
         message="Hello",
@@ -121,7 +121,7 @@ def test_generate_reply_vllm_passes_temperature_from_env(monkeypatch):
             {"choices": [{"message": {"role": "assistant", "content": "OK"}}], "usage": {"total_tokens": 1}}
         )
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     reply = service.generate_reply(message="Ping", history=None, context=None)
     assert reply.provider == "vllm"
@@ -168,7 +168,7 @@ def test_generate_reply_vllm_can_send_and_parse_openai_tool_calls(monkeypatch):
             }
         )
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     tools = [
         {
@@ -213,7 +213,7 @@ def test_generate_reply_vllm_can_override_tool_choice(monkeypatch):
             }
         )
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     tools = [
         {
@@ -241,6 +241,7 @@ def test_generate_reply_vllm_can_auto_select_first_model(monkeypatch):
     monkeypatch.setenv("ISPEC_VLLM_URL", "http://localhost:8000")
     monkeypatch.delenv("ISPEC_VLLM_MODEL", raising=False)
     monkeypatch.setenv("ISPEC_VLLM_API_KEY", "secret-key")
+    service.clear_vllm_model_cache()
 
     calls: list[tuple[str, str]] = []
 
@@ -261,8 +262,8 @@ def test_generate_reply_vllm_can_auto_select_first_model(monkeypatch):
         assert json["model"] == "auto-model"
         return _DummyResponse({"choices": [{"message": {"content": "Auto model reply"}}]})
 
-    monkeypatch.setattr(service.requests, "get", fake_get)
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "get", fake_get)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     reply = service.generate_reply(message="Ping", history=None, context=None)
     assert reply.provider == "vllm"
@@ -274,6 +275,11 @@ def test_generate_reply_vllm_can_auto_select_first_model(monkeypatch):
         ("post", "http://localhost:8000/v1/chat/completions"),
     ]
 
+    # The resolved model is cached per base URL; /v1/models is not hit again.
+    reply = service.generate_reply(message="Ping again", history=None, context=None)
+    assert reply.model == "auto-model"
+    assert [call for call in calls if call[0] == "get"] == [("get", "http://localhost:8000/v1/models")]
+
 
 def test_generate_reply_vllm_can_accept_extra_body(monkeypatch):
     monkeypatch.setenv("ISPEC_ASSISTANT_PROVIDER", "vllm")
@@ -292,7 +298,7 @@ def test_generate_reply_vllm_can_accept_extra_body(monkeypatch):
         captured["json"] = json
         return _DummyResponse({"choices": [{"message": {"role": "assistant", "content": "OK"}}]})
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     reply = service.generate_reply(
         message="Ping",
@@ -328,7 +334,7 @@ def test_generate_reply_vllm_normalizes_guided_json_to_structured_outputs(monkey
         captured["json"] = json
         return _DummyResponse({"choices": [{"message": {"role": "assistant", "content": "OK"}}]})
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     reply = service.generate_reply(
         message="Ping",
@@ -362,7 +368,7 @@ def test_generate_reply_vllm_normalizes_base_url_suffix(monkeypatch):
         captured["url"] = url
         return _DummyResponse({"choices": [{"message": {"role": "assistant", "content": "OK"}}]})
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     reply = service.generate_reply(message="Ping", history=None, context=None)
     assert reply.provider == "vllm"
@@ -389,7 +395,7 @@ def test_generate_reply_vllm_drops_tools_on_400(monkeypatch):
             return _DummyErrorResponse(400, text="tools not supported")
         return _DummyResponse({"choices": [{"message": {"role": "assistant", "content": "OK"}}]})
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     tools = [
         {
@@ -426,7 +432,7 @@ def test_generate_reply_ollama_passes_temperature_as_options(monkeypatch):
         captured["timeout"] = timeout
         return _DummyResponse({"message": {"content": "OK"}})
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     reply = service.generate_reply(message="Ping", history=None, context=None)
     assert reply.provider == "ollama"
@@ -526,7 +532,7 @@ def test_generate_reply_vllm_enriches_stage_prompt_observability(monkeypatch):
         captured["ok"] = ok
         captured["observability_context"] = observability_context
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
     monkeypatch.setattr(service, "record_inference_usage_event", fake_record_inference_usage_event)
 
     reply = service.generate_reply(message="Plan this", history=None, context=None, stage="planner")
@@ -565,7 +571,7 @@ def test_generate_reply_vllm_salvages_name_arguments_tool_call_from_content(monk
             }
         )
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     tools = [
         {
@@ -614,7 +620,7 @@ def test_generate_reply_vllm_salvages_wrapped_function_tool_call_from_content(mo
             }
         )
 
-    monkeypatch.setattr(service.requests, "post", fake_post)
+    monkeypatch.setattr(service.http_client, "post", fake_post)
 
     tools = [
         {
@@ -633,3 +639,73 @@ def test_generate_reply_vllm_salvages_wrapped_function_tool_call_from_content(mo
     assert reply.tool_calls and reply.tool_calls[0]["function"]["name"] == "count_all_projects"
     assert reply.meta["tool_parser_fallback_used"] is True
     assert reply.meta["tool_parser_fallback_shape"] == "function_wrapper"
+
+
+class _DummyStreamResponse(_DummyResponse):
+    def __init__(self, lines: list[str]):
+        super().__init__(None)
+        self._lines = lines
+
+    ok = True
+    closed = False
+
+    def iter_lines(self, decode_unicode: bool = False):
+        yield from self._lines
+
+    def close(self) -> None:
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def test_generate_reply_vllm_streams_content_and_tool_call_deltas(monkeypatch):
+    import json as json_module
+
+    monkeypatch.setenv("ISPEC_ASSISTANT_PROVIDER", "vllm")
+    monkeypatch.setenv("ISPEC_VLLM_URL", "http://127.0.0.1:8000")
+    monkeypatch.setenv("ISPEC_VLLM_MODEL", "test-model")
+
+    captured: dict[str, Any] = {}
+
+    def chunk(delta: dict[str, Any], **extra: Any) -> str:
+        return "data: " + json_module.dumps({"choices": [{"delta": delta}], **extra})
+
+    def fake_post(url: str, *, json: dict[str, Any], headers: dict[str, str], timeout: float, stream: bool):
+        captured["json"] = json
+        captured["stream"] = stream
+        captured["response"] = _DummyStreamResponse(
+            [
+                chunk({"role": "assistant", "content": "Count"}),
+                "",
+                chunk({"content": "ing."}),
+                chunk({"tool_calls": [{"index": 0, "id": "call_1", "function": {"name": "count_all_projects", "arguments": "{"}}]}),
+                chunk({"tool_calls": [{"index": 0, "function": {"arguments": "}"}}]}),
+                "data: " + json_module.dumps({"choices": [], "usage": {"total_tokens": 7}}),
+                "data: [DONE]",
+            ]
+        )
+        return captured["response"]
+
+    monkeypatch.setattr(service.http_client, "post", fake_post)
+
+    pieces: list[str] = []
+    reply = service.generate_reply(
+        messages=[{"role": "user", "content": "How many?"}],
+        tools=[{"type": "function", "function": {"name": "count_all_projects", "parameters": {}}}],
+        on_delta=pieces.append,
+    )
+
+    assert captured["stream"] is True
+    assert captured["json"]["stream"] is True
+    assert pieces == ["Count", "ing."]
+    assert reply.content == "Counting."
+    assert reply.tool_calls == [
+        {"type": "function", "id": "call_1", "function": {"name": "count_all_projects", "arguments": "{}"}}
+    ]
+    assert reply.meta["usage"] == {"total_tokens": 7}
+    assert reply.meta["streamed"] is True
+    assert captured["response"].closed is True
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from ispec.assistant import token_counter
+from ispec.assistant.prompting import estimate_tokens_for_messages, estimate_tokens_per_message
+
+
+class _WordTokenizer:
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def encode_batch(self, texts, add_special_tokens=True):
+        self.encoded.extend(texts)
+        return [SimpleNamespace(ids=list(range(len(text.split())))) for text in texts]
+
+
+@pytest.fixture
+def word_counter():
+    tokenizer = _WordTokenizer()
+    counter = token_counter.TokenizerCounter(tokenizer, name="words", cache_size=2)
+    token_counter.set_token_counter(counter)
+    try:
+        yield counter, tokenizer
+    finally:
+        token_counter.set_token_counter(None)
+
+
+def test_heuristic_counter_is_the_default(monkeypatch):
+    monkeypatch.delenv("ISPEC_ASSISTANT_TOKENIZER_PATH", raising=False)
+    token_counter.set_token_counter(None)
+    assert token_counter.count_tokens("abcdefgh") == 2
+    assert estimate_tokens_for_messages([{"role": "user", "content": "abcd"}]) == 5
+
+
+def test_missing_tokenizer_file_falls_back_to_heuristic(monkeypatch, tmp_path):
+    monkeypatch.setenv("ISPEC_ASSISTANT_TOKENIZER_PATH", str(tmp_path / "missing.json"))
+    token_counter.set_token_counter(None)
+    try:
+        assert token_counter.get_token_counter().name == "heuristic"
+    finally:
+        token_counter.set_token_counter(None)
+
+
+def test_tokenizer_counts_are_batched_and_memoized(word_counter):
+    counter, tokenizer = word_counter
+    messages = [
+        {"role": "system", "content": "stable system prompt"},
+        {"role": "user", "content": "hello there"},
+        {"role": "assistant", "content": ""},
+    ]
+
+    assert estimate_tokens_per_message(messages) == [7, 6, 4]
+    assert tokenizer.encoded == ["stable system prompt", "hello there"]
+
+    assert token_counter.count_tokens_batch(["stable system prompt", "one two three four"]) == [3, 4]
+    assert tokenizer.encoded[-1] == "one two three four"
+    assert counter.stats() == {"counter": "words", "cached": 2, "hits": 1, "misses": 3}
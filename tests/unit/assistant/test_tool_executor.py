@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from ispec.assistant.connect import get_assistant_session
+from ispec.assistant.tool_executor import ToolInvocation, execute_tool_calls
+
+
+def test_reads_run_concurrently_between_writes_in_model_order(tmp_path):
+    barrier = threading.Barrier(2, timeout=5)
+    seen: list[tuple[str, str, object]] = []
+
+    with get_assistant_session(tmp_path / "assistant.db") as assistant_db:
+
+        def fake_run(*, name, args, assistant_db, **_):
+            seen.append((name, threading.current_thread().name, assistant_db))
+            if name in {"get_project", "latest_activity"} and len(seen) <= 2:
+                barrier.wait()  # both leading reads must be in flight at once
+            return {"ok": True, "tool": name, "result": args}
+
+        outcomes = execute_tool_calls(
+            [
+                ToolInvocation("get_project", {"id": 1}),
+                ToolInvocation("latest_activity", {}),
+                ToolInvocation("create_project_comment", {"project_id": 1}),
+                ToolInvocation("get_project", {"id": 1}),
+            ],
+            run=fake_run,
+            sessions={"assistant_db": assistant_db},
+        )
+
+    assert [outcome.payload["tool"] for outcome in outcomes] == [
+        "get_project",
+        "latest_activity",
+        "create_project_comment",
+        "get_project",
+    ]
+    # Reads after a write run inline on the request session, so they see the write.
+    assert [outcome.concurrent for outcome in outcomes] == [True, True, False, False]
+    assert all(outcome.elapsed_ms >= 0 for outcome in outcomes)
+    assert [name for name, _, _ in seen[2:]] == ["create_project_comment", "get_project"]
+    assert all(db is assistant_db for _, _, db in seen[2:])
+    assert all(db is not assistant_db for _, _, db in seen[:2])
+
+
+def test_deadline_reports_slow_read_tools_as_timed_out(tmp_path):
+    release = threading.Event()
+
+    def fake_run(*, name, **_):
+        if name == "slow_tool":
+            release.wait(5)
+        return {"ok": True, "tool": name}
+
+    with get_assistant_session(tmp_path / "assistant.db") as assistant_db:
+        outcomes = execute_tool_calls(
+            [ToolInvocation("slow_tool", {}), ToolInvocation("fast_tool", {})],
+            run=fake_run,
+            sessions={"assistant_db": assistant_db},
+            deadline=time.monotonic() + 0.2,
+        )
+    release.set()
+
+    assert outcomes[0].timed_out is True
+    assert outcomes[0].payload["ok"] is False
+    assert outcomes[1].payload == {"ok": True, "tool": "fast_tool"}
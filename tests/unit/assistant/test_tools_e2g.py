@@ -53,3 +53,32 @@ def test_e2g_tools_can_search_and_fetch_hits(db_session, omics_session):
     assert hit["experiment_run_id"] == run.id
     assert hit["gene_symbol"] == "KRAS"
     assert hit["peptideprint_preview"] == "PEP_A__PEP_B"
+
+
+def test_e2g_gene_in_project_matches_on_gene_group(db_session, omics_session):
+    project = Project(id=2, prj_AddedBy="test", prj_ProjectTitle="Project 2")
+    experiment = Experiment(id=200, project_id=2, record_no="200", exp_Name="Experiment 200")
+    run = ExperimentRun(experiment_id=200, run_no=1, search_no=1, label="0")
+    db_session.add_all([project, experiment, run])
+    db_session.flush()
+
+    omics_session.add_all(
+        [
+            E2G(experiment_run_id=run.id, gene="7157", geneidtype="entrezid", gene_group="entrezid:7157"),
+            E2G(experiment_run_id=run.id, gene="7157", geneidtype="GeneID", label="1"),
+            E2G(experiment_run_id=run.id, gene="672", geneidtype="GeneID", gene_group="entrezid:672"),
+        ]
+    )
+    omics_session.commit()
+
+    payload = run_tool(
+        name="e2g_gene_in_project",
+        args={"project_id": 2, "gene_id": 7157},
+        core_db=db_session,
+        schedule_db=None,
+        omics_db=omics_session,
+        user=None,
+        api_schema=None,
+    )
+    assert payload["ok"] is True
+    assert payload["result"]["count"] == 2
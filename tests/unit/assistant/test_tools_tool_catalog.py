@@ -138,3 +138,46 @@ def test_assistant_list_tools_reports_code_tools_unavailable_for_non_allowlisted
     unavailable = payload["result"].get("unavailable_tools") or []
     repo_search = next(item for item in unavailable if item.get("name") == "repo_search")
     assert "Code tools are unavailable" in str(repo_search.get("unavailable_reason") or "")
+
+
+def test_tool_registry_covers_every_spec_and_records_call_stats(db_session):
+    from ispec.assistant import tools
+
+    assert set(tools.openai_tool_names_all()) <= set(tools.TOOL_REGISTRY)
+    handled = {name for name, entry in tools.TOOL_REGISTRY.items() if entry.handler is not None}
+    assert handled == set(tools.TOOL_REGISTRY) - {"projects"}
+    assert tools.TOOL_REGISTRY["create_project_comment"].writes is True
+    assert tools.TOOL_REGISTRY["get_project"].writes is False
+
+    tools.reset_tool_stats()
+    run_tool(name="count_all_projects", args={}, core_db=db_session)
+    run_tool(name="get_project", args={"id": 999999}, core_db=db_session)
+    run_tool(name="no_such_tool", args={}, core_db=db_session)
+
+    stats = tools.tool_stats()
+    assert set(stats) == {"count_all_projects", "get_project"}
+    assert stats["count_all_projects"]["calls"] == 1
+    assert stats["count_all_projects"]["errors"] == 0
+    assert stats["get_project"]["errors"] == 1
+    assert stats["get_project"]["avg_ms"] >= 0
+
+
+def test_openai_tools_for_user_reuses_cached_spec_list_per_user_kind():
+    from ispec.assistant import tools
+
+    def editor(username: str) -> AuthUser:
+        return AuthUser(
+            username=username,
+            password_hash="hash",
+            password_salt="salt",
+            password_iterations=1,
+            role=UserRole.editor,
+            is_active=True,
+        )
+
+    first = tools.openai_tools_for_user(editor("a"))
+    second = tools.openai_tools_for_user(editor("b"))
+    assert first == second
+    assert all(a is b for a, b in zip(first, second))
+    anonymous = {spec["function"]["name"] for spec in tools.openai_tools_for_user(None)}
+    assert "create_project_comment" not in anonymous
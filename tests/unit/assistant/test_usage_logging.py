@@ -5,7 +5,7 @@ from pathlib import Path
 
 import ispec.assistant.classifier_service as classifier_service
 import ispec.assistant.service as service
-from ispec.assistant.usage_logging import record_inference_usage_event
+from ispec.assistant.usage_logging import flush_inference_usage_log, record_inference_usage_event
 
 
 class _DummyResponse:
@@ -32,6 +32,7 @@ def test_record_inference_usage_event_writes_jsonl(tmp_path, monkeypatch):
         observability_context={'surface': 'support_chat', 'session_id': 's1'},
     )
 
+    assert flush_inference_usage_log()
     files = list((log_dir / 'inference-usage').glob('usage-*.jsonl'))
     assert len(files) == 1
     payload = json.loads(files[0].read_text(encoding='utf-8').strip())
@@ -54,7 +55,7 @@ def test_generate_reply_records_usage_event(tmp_path, monkeypatch):
             'usage': {'prompt_tokens': 1, 'completion_tokens': 2, 'total_tokens': 3},
         })
 
-    monkeypatch.setattr(service.requests, 'post', fake_post)
+    monkeypatch.setattr(service.http_client, 'post', fake_post)
 
     reply = service.generate_reply(
         message='Hello',
@@ -64,12 +65,14 @@ def test_generate_reply_records_usage_event(tmp_path, monkeypatch):
     )
     assert reply.ok is True
 
+    assert flush_inference_usage_log()
     files = list((log_dir / 'inference-usage').glob('usage-*.jsonl'))
     assert len(files) == 1
     payload = json.loads(files[0].read_text(encoding='utf-8').strip())
     assert payload['surface'] == 'support_chat'
     assert payload['session_id'] == 'abc'
     assert payload['provider'] == 'vllm'
+    assert isinstance(payload['total_ms'], int)
 
 
 def test_generate_classifier_reply_records_usage_event(tmp_path, monkeypatch):
@@ -88,7 +91,7 @@ def test_generate_classifier_reply_records_usage_event(tmp_path, monkeypatch):
             'usage': {'total_tokens': 4},
         })
 
-    monkeypatch.setattr(classifier_service.requests, 'post', fake_post)
+    monkeypatch.setattr(classifier_service.http_client, 'post', fake_post)
 
     reply = classifier_service.generate_classifier_reply(
         base_generate_reply_fn=service.generate_reply,
@@ -98,9 +101,31 @@ def test_generate_classifier_reply_records_usage_event(tmp_path, monkeypatch):
     )
     assert reply.ok is True
 
+    assert flush_inference_usage_log()
     files = list((log_dir / 'inference-usage').glob('usage-*.jsonl'))
     assert len(files) == 1
     payload = json.loads(files[0].read_text(encoding='utf-8').strip())
     assert payload['surface'] == 'turn_decision'
     assert payload['task'] == 'support_chat'
     assert payload['provider'] == 'classifier_vllm'
+
+
+def test_usage_events_are_written_off_thread_in_batches(tmp_path, monkeypatch):
+    log_dir = tmp_path / 'logs'
+    monkeypatch.setenv('ISPEC_LOG_DIR', str(log_dir))
+    monkeypatch.setenv('ISPEC_INFERENCE_USAGE_LOG_ENABLED', '1')
+
+    for idx in range(5):
+        record_inference_usage_event(
+            provider='vllm',
+            model='test-model',
+            meta={'elapsed_ms': idx},
+            ok=True,
+            observability_context={'surface': 'support_chat'},
+        )
+    assert flush_inference_usage_log()
+
+    files = list((log_dir / 'inference-usage').glob('usage-*.jsonl'))
+    assert len(files) == 1
+    lines = files[0].read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['elapsed_ms'] for line in lines] == [0, 1, 2, 3, 4]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import types
+from datetime import UTC, datetime
+
+from ispec.assistant.usage_report import (
+    LatencyHistogram,
+    UsageLogScanner,
+    build_usage_report,
+    load_usage_summary,
+    usage_summary_path,
+    write_usage_summary,
+)
+from ispec.cli import support as support_cli
+
+UNTIL = datetime(2026, 3, 2, 12, 30, tzinfo=UTC)
+
+
+def _event(ts: str, **fields):
+    return json.dumps({"ts_utc": ts, "provider": "vllm", "model": "m1", "ok": True, **fields})
+
+
+def _write(path, *lines, newline=True):
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("\n".join(lines) + ("\n" if newline else ""))
+
+
+def test_latency_histogram_percentiles_are_close():
+    hist = LatencyHistogram()
+    for value in range(1, 1001):
+        hist.add(value)
+    assert abs(hist.percentile(50) - 500) / 500 < 0.02
+    assert abs(hist.percentile(99) - 990) / 990 < 0.02
+    assert hist.percentile(100) == 1000
+
+    for value in (1.5, 37.0, 812.3, 45_000.0):
+        single = LatencyHistogram()
+        single.add(value)
+        single.add(value * 10)
+        assert abs(single.percentile(50) - value) / value < 0.02
+
+
+def test_build_usage_report_groups_and_windows(tmp_path):
+    _write(
+        tmp_path / "usage-20260301.jsonl",
+        _event("2026-03-01T09:00:00+00:00", surface="support_chat", stage="answer", total_ms=100),
+    )
+    _write(
+        tmp_path / "usage-20260302.jsonl",
+        _event(
+            "2026-03-02T11:05:00+00:00",
+            surface="support_chat",
+            stage="answer",
+            total_ms=2000,
+            usage={"prompt_tokens": 1000, "completion_tokens": 100},
+        ),
+        _event(
+            "2026-03-02T11:10:00+00:00",
+            surface="support_chat",
+            stage="answer",
+            ok=False,
+            elapsed_ms=3000,
+            fallback={"reason": "timeout"},
+        ),
+        _event("2026-03-02T12:01:00+00:00", surface="turn_decision", stage="classify", total_ms=50),
+        "not json",
+    )
+
+    report = build_usage_report(log_dir=tmp_path, until=UNTIL, hours=6, group_by="surface,stage")
+
+    assert report["files"] == 1
+    assert report["skipped"] == 1
+    assert report["totals"]["calls"] == 3
+    chat, decision = report["groups"]
+    assert (chat["surface"], chat["stage"], chat["calls"]) == ("support_chat", "answer", 2)
+    assert chat["errors"] == 1 and chat["error_rate"] == 0.5
+    assert chat["fallbacks"] == 1
+    assert chat["latency_ms"]["max"] == 3000
+    assert chat["prompt_tokens_per_second"] == 500.0
+    assert chat["completion_tokens_per_second"] == 50.0
+    assert decision["surface"] == "turn_decision"
+    assert [item["bucket"] for item in report["series"]] == ["2026-03-02T11:00", "2026-03-02T12:00"]
+
+    daily = build_usage_report(log_dir=tmp_path, until=UNTIL, hours=48, bucket="day")
+    assert [(item["bucket"], item["calls"]) for item in daily["series"]] == [("2026-03-01", 1), ("2026-03-02", 3)]
+
+
+def test_scanner_only_reads_appended_lines(tmp_path):
+    path = tmp_path / "usage-20260302.jsonl"
+    _write(path, _event("2026-03-02T10:00:00+00:00", total_ms=10))
+    _write(path, '{"ts_utc": "2026-03-02T10:00:01', newline=False)
+    scanner = UsageLogScanner()
+
+    first = build_usage_report(log_dir=tmp_path, until=UNTIL, scanner=scanner)
+    assert first["totals"]["calls"] == 1
+
+    _write(path, '+00:00", "ok": true, "total_ms": 20}', _event("2026-03-02T10:00:02+00:00", total_ms=30))
+    second = build_usage_report(log_dir=tmp_path, until=UNTIL, scanner=scanner)
+    assert second["totals"]["calls"] == 3
+    assert second["totals"]["latency_ms"]["max"] == 30
+
+
+def test_usage_summary_roundtrip_and_cli(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("ISPEC_INFERENCE_USAGE_LOG_DIR", str(tmp_path))
+    assert load_usage_summary() is None
+    _write(
+        tmp_path / "usage-20260302.jsonl",
+        _event("2026-03-02T11:00:00+00:00", surface="support_chat", stage="answer", total_ms=120),
+    )
+
+    args = types.SimpleNamespace(
+        subcommand="usage-report",
+        hours=24,
+        since=None,
+        until=UNTIL.isoformat(),
+        group_by="surface,stage,model",
+        bucket="hour",
+        log_dir=None,
+        write_summary=True,
+        json=False,
+    )
+    support_cli.dispatch(args)
+    out = capsys.readouterr().out
+    assert "calls=1" in out
+    assert "support_chat" in out
+
+    summary = load_usage_summary()
+    assert summary is not None
+    assert summary["totals"]["calls"] == 1
+    assert summary["groups_total"] == 1
+    assert load_usage_summary() is summary
+
+    report = build_usage_report(until=UNTIL)
+    report["totals"]["calls"] = 99
+    write_usage_summary(report, usage_summary_path())
+    assert load_usage_summary()["totals"]["calls"] == 99
@@ -65,6 +65,7 @@ def test_register_subcommands_parses_import_e2g_command():
     assert args.create_missing_experiments is True
     assert args.skip_imported is True
     assert args.store_metadata is True
+    assert args.workers == 1
 
 
 def test_register_subcommands_parses_import_psm_command():
@@ -273,6 +274,9 @@ def test_dispatch_archive_agent_logs_calls_helper(monkeypatch):
             archive_events=True,
             archive_commands=False,
             archive_journal_mode="DELETE",
+            compress_json=True,
+            vacuum_pages=64,
+            vacuum=True,
         )
     )
     archive_mock.assert_called_once_with(
@@ -287,6 +291,9 @@ def test_dispatch_archive_agent_logs_calls_helper(monkeypatch):
         archive_events=True,
         archive_commands=False,
         archive_journal_mode="DELETE",
+        compress_json=True,
+        vacuum_pages=64,
+        vacuum=True,
     )
 
 
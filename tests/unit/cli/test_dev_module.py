@@ -0,0 +1,30 @@
+from ispec.cli.dev import import_time_report, parse_importtime
+
+
+_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        300 |     ispec.config.paths
+import time:       500 |        800 |   ispec.config
+import time:       200 |       1000 | ispec.cli.main
+import time:        50 |         50 | json
+"""
+
+
+def test_parse_importtime_reads_nesting_depth():
+    rows = parse_importtime(_SAMPLE)
+    assert [(row["module"], row["depth"]) for row in rows] == [
+        ("_io", 1),
+        ("ispec.config.paths", 2),
+        ("ispec.config", 1),
+        ("ispec.cli.main", 0),
+        ("json", 0),
+    ]
+
+
+def test_import_time_report_totals_top_level_imports():
+    report = import_time_report(parse_importtime(_SAMPLE), top=2)
+    assert report["total_ms"] == 1.1
+    assert report["modules"] == 5
+    assert [row["module"] for row in report["slowest_self"]] == ["ispec.config", "ispec.config.paths"]
+    assert report["heaviest_ispec"][0] == {"module": "ispec.cli.main", "cumulative_ms": 1.0}
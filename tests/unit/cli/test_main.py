@@ -1,3 +1,5 @@
+import os
+import subprocess
 import sys
 import types
 from pathlib import Path
@@ -98,3 +100,26 @@ def test_logging_show_path(monkeypatch, capsys):
     monkeypatch.setattr(sys, "argv", ["ispec", "logging", "show-path"])
     main()
     assert capsys.readouterr().out.strip() == str(path.resolve())
+
+
+def test_only_the_selected_command_module_is_imported():
+    code = (
+        "import sys\n"
+        "sys.argv = ['ispec', 'logging', '--help']\n"
+        "from ispec.cli.main import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "loaded = [m for m in ('ispec.cli.logging', 'ispec.cli.supervisor', 'ispec.cli.db', 'ispec.db.models') if m in sys.modules]\n"
+        "print(','.join(loaded), file=sys.stderr)\n"
+    )
+    src = str(Path(__file__).resolve().parents[3] / "src")
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": src},
+        check=True,
+    )
+    assert proc.stderr.strip().splitlines()[-1] == "ispec.cli.logging"
@@ -1,3 +1,5 @@
+from sqlalchemy import text
+
 from ispec.db import connect
 
 
@@ -27,3 +29,21 @@ def test_get_db_path_returns_str(tmp_path, monkeypatch):
     assert isinstance(uri, str)
     assert uri.startswith("sqlite:///")
 
+
+
+def test_get_session_reuses_engine_and_initializes_once(tmp_path):
+    db_file = tmp_path / "shared.db"
+    for _ in range(3):
+        with connect.get_session(db_file) as session:
+            session.execute(text("SELECT COUNT(*) FROM project")).scalar()
+
+    uri = "sqlite:///" + str(db_file)
+    stats = connect.engine_stats()["engines"][uri]
+    assert stats["initializations"] == 1
+    assert stats["sessions"] == 3
+    assert connect.get_engine(db_file) is connect.get_engine(db_file)
+
+    db_file.unlink()
+    with connect.get_session(db_file) as session:
+        assert session.execute(text("SELECT COUNT(*) FROM project")).scalar() == 0
+    assert connect.engine_stats()["engines"][uri]["initializations"] == 2
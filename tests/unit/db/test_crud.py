@@ -1,5 +1,7 @@
 # test_crud.py
 
+import json
+
 import pytest
 
 from ispec.db.models import Person, Project, ProjectPerson
@@ -262,3 +264,211 @@ def test_link_person_to_project_invalid_person(db_session):
 #     link = ProjectPerson(conn)
 #     with pytest.raises(ValueError):
 #         link_id = link.insert({"person_id": 98, "project_id": project_id})
+
+
+def test_e2g_bulk_upsert_counts_and_merges_metadata(omics_session):
+    from ispec.db.crud import E2GCRUD
+    from ispec.omics.models import E2G
+
+    crud = E2GCRUD()
+    first = crud.bulk_upsert(
+        omics_session,
+        [
+            {
+                "experiment_run_id": 1,
+                "gene": "123",
+                "geneidtype": "GeneID",
+                "psms": 3,
+                "metadata_json": '{"a":1}',
+            },
+            {"experiment_run_id": 1, "gene": "456", "geneidtype": "GeneID", "psms": 1},
+            {"experiment_run_id": 1, "gene": "", "geneidtype": "GeneID"},
+        ],
+    )
+    assert first == {"inserted": 2, "updated": 0}
+
+    second = crud.bulk_upsert(
+        omics_session,
+        [
+            {
+                "experiment_run_id": 1,
+                "gene": "123",
+                "geneidtype": "GeneID",
+                "psms": 5,
+                "metadata_json": '{"b":2}',
+            },
+            {"experiment_run_id": 1, "gene": "456", "geneidtype": "GeneID", "psms": 1},
+            {"experiment_run_id": 1, "gene": "123", "geneidtype": "GeneID", "label": "2"},
+        ],
+    )
+    assert second == {"inserted": 1, "updated": 1}
+
+    row = (
+        omics_session.query(E2G)
+        .filter(E2G.gene == "123", E2G.label == "0")
+        .one()
+    )
+    assert row.psms == 5
+    assert json.loads(row.metadata_json) == {"a": 1, "b": 2}
+    assert omics_session.query(E2G).count() == 3
+
+
+def test_e2g_bulk_upsert_reuses_key_index_across_batches(omics_session, monkeypatch):
+    from ispec.db.crud import E2GCRUD
+    from ispec.omics.models import E2G
+
+    crud = E2GCRUD()
+    loads = []
+    load_key_index = crud._load_key_index
+    monkeypatch.setattr(
+        crud,
+        "_load_key_index",
+        lambda *args, **kwargs: loads.append(kwargs["exp_run_id"]) or load_key_index(*args, **kwargs),
+    )
+    key_indexes: dict = {}
+    first = crud.bulk_upsert(
+        omics_session,
+        [{"experiment_run_id": 5, "gene": "123", "geneidtype": "GeneID", "psms": 1}],
+        key_indexes=key_indexes,
+    )
+    second = crud.bulk_upsert(
+        omics_session,
+        [
+            {"experiment_run_id": 5, "gene": "123", "geneidtype": "GeneID", "psms": 4},
+            {"experiment_run_id": 5, "gene": "456", "geneidtype": "GeneID", "psms": 2},
+        ],
+        key_indexes=key_indexes,
+    )
+
+    assert first == {"inserted": 1, "updated": 0}
+    assert second == {"inserted": 1, "updated": 1}
+    assert loads == [5]
+    rows = omics_session.query(E2G).order_by(E2G.gene).all()
+    assert [(row.gene, row.psms) for row in rows] == [("123", 4), ("456", 2)]
+
+
+def test_e2g_insert_conflict_merges_metadata_like_update_path(omics_session):
+    from ispec.db.crud import E2GCRUD, _merge_metadata_json
+    from ispec.omics.models import E2G
+
+    existing = '{"a":1,"nested":{"x":1,"y":2},"flag":true}'
+    incoming = '{"nested":{"x":null},"a":null,"list":[1,false]}'
+    crud = E2GCRUD()
+    crud.bulk_upsert(
+        omics_session,
+        [{"experiment_run_id": 3, "gene": "123", "geneidtype": "GeneID", "metadata_json": existing}],
+    )
+
+    # A row another writer inserted after the key index was loaded.
+    row = {
+        "experiment_run_id": 3,
+        "gene": "123",
+        "geneidtype": "GeneID",
+        "label": "0",
+        "metadata_json": incoming,
+    }
+    crud._flush_inserts(omics_session, [row], update_fields=("metadata_json",))
+    omics_session.commit()
+
+    stored = omics_session.query(E2G).filter(E2G.experiment_run_id == 3).one()
+    assert stored.metadata_json == _merge_metadata_json(existing, incoming)
+    assert json.loads(stored.metadata_json) == {
+        "a": None,
+        "nested": {"x": None},
+        "flag": True,
+        "list": [1, False],
+    }
+
+
+def test_e2g_bulk_upsert_collapses_duplicates_within_batch(omics_session):
+    from ispec.db.crud import E2GCRUD
+    from ispec.omics.models import E2G
+
+    crud = E2GCRUD()
+    result = crud.bulk_upsert(
+        omics_session,
+        [
+            {"experiment_run_id": 7, "gene": "123", "geneidtype": "GeneID", "psms": 1},
+            {"experiment_run_id": 7, "gene": "123", "geneidtype": "GeneID", "psms": 2},
+        ],
+    )
+    assert result == {"inserted": 1, "updated": 1}
+    assert [row.psms for row in omics_session.query(E2G).all()] == [2]
+
+
+def test_e2g_bulk_upsert_matches_equivalent_identifiers(omics_session, tmp_path):
+    from ispec.db.crud import E2GCRUD
+    from ispec.genomics.identifiers import GeneNormalizer
+    from ispec.omics.models import E2G
+
+    mapping = tmp_path / "genes.tsv"
+    mapping.write_text("entrezid\tsymbol\n7157\tTP53\n", encoding="utf-8")
+
+    crud = E2GCRUD()
+    crud._normalizer = GeneNormalizer(mapping, index_dir=tmp_path / "index")
+    crud.bulk_upsert(
+        omics_session,
+        [{"experiment_run_id": 7, "gene": "7157", "geneidtype": "entrezid", "psms": 1}],
+    )
+    result = crud.bulk_upsert(
+        omics_session,
+        [{"experiment_run_id": 7, "gene": "TP53", "geneidtype": "symbol", "psms": 5}],
+    )
+    assert result == {"inserted": 0, "updated": 1}
+    assert [(row.gene, row.psms) for row in omics_session.query(E2G).all()] == [("7157", 5)]
+
+
+def test_e2g_gene_group_backfill_and_duplicate_check(omics_session):
+    from ispec.db.crud import E2GCRUD
+    from ispec.omics.models import E2G
+
+    omics_session.add_all(
+        [
+            E2G(experiment_run_id=3, gene="123", geneidtype="GeneID", label="0"),
+            E2G(experiment_run_id=3, gene="KRAS", geneidtype="Symbol", label="0"),
+        ]
+    )
+    omics_session.commit()
+
+    crud = E2GCRUD()
+    assert crud.backfill_gene_groups(omics_session, batch_size=1) == {"scanned": 2, "updated": 2}
+    assert crud.backfill_gene_groups(omics_session) == {"scanned": 0, "updated": 0}
+    assert sorted(row.gene_group for row in omics_session.query(E2G).all()) == [
+        "entrezid:123",
+        "symbol:KRAS",
+    ]
+
+    # "entrez" folds onto the same group as the stored "GeneID" row.
+    duplicate = {"experiment_run_id": 3, "gene": "123", "geneidtype": "entrez", "label": "0"}
+    assert crud.validate_input(omics_session, duplicate) is None
+    fresh = crud.validate_input(omics_session, {**duplicate, "gene": "456"})
+    assert fresh["gene_group"] == "entrezid:456"
+
+
+def test_e2g_duplicate_check_skips_legacy_fallback_once_run_is_keyed(omics_session):
+    from sqlalchemy import event
+
+    from ispec.db.crud import E2GCRUD
+    from ispec.omics.models import E2G
+
+    omics_session.add(E2G(experiment_run_id=4, gene="KRAS", geneidtype="Symbol", label="0"))
+    omics_session.commit()
+    crud = E2GCRUD()
+
+    # Before the backfill the unkeyed row is still found through its equivalents.
+    legacy_duplicate = {"experiment_run_id": 4, "gene": "KRAS", "geneidtype": "Symbol", "label": "0"}
+    assert crud.validate_input(omics_session, legacy_duplicate) is None
+    crud.backfill_gene_groups(omics_session)
+
+    statements: list[str] = []
+    engine = omics_session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        for gene in ("A1", "A2", "A3"):
+            record = {"experiment_run_id": 4, "gene": gene, "geneidtype": "symbol", "label": "0"}
+            assert crud.validate_input(omics_session, record) is not None
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    # One existence check for the run, then a single gene_group lookup per record.
+    assert sum("gene_group IS NULL" in sql for sql in statements) == 1
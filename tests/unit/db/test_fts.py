@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from ispec.db import fts
+from ispec.db.crud import PersonCRUD, ProjectCRUD
+from ispec.db.models import Person, Project
+
+
+def _titles(db_session, predicate) -> list[str]:
+    rows = db_session.query(Project).filter(predicate).order_by(Project.id).all()
+    return [row.prj_ProjectTitle for row in rows]
+
+
+def test_match_expression_quotes_tokens_as_prefixes():
+    assert fts.match_expression('  kin* OR "ase ') == '"kin"* "OR"* "ase"*'
+    assert fts.match_expression(" -- ") is None
+
+
+def test_search_uses_fts_index_and_triggers_keep_it_in_sync(db_session):
+    db_session.add_all(
+        [
+            Project(prj_AddedBy="t", prj_ProjectTitle="Kinase phosphoproteomics"),
+            Project(prj_AddedBy="t", prj_ProjectTitle="Membrane lipids"),
+        ]
+    )
+    db_session.commit()
+    crud = ProjectCRUD()
+
+    # No index yet: substring LIKE search.
+    assert not fts.has_search_index(db_session, Project)
+    assert _titles(db_session, crud.search_predicate("nase", session=db_session)) == [
+        "Kinase phosphoproteomics"
+    ]
+
+    summary = fts.rebuild_search_indexes(db_session.get_bind())
+    assert summary["project"]["rows"] == 2
+    assert fts.has_search_index(db_session, Project)
+    assert _titles(db_session, crud.search_predicate("phospho kin", session=db_session)) == [
+        "Kinase phosphoproteomics"
+    ]
+    # Operators in user input are treated as plain tokens.
+    assert _titles(db_session, crud.search_predicate('mem" OR "kin', session=db_session)) == []
+
+    project = db_session.query(Project).filter(Project.prj_ProjectTitle.like("Membrane%")).one()
+    project.prj_ProjectTitle = "Glycan membrane atlas"
+    db_session.add(Project(prj_AddedBy="t", prj_ProjectTitle="Glycan survey"))
+    db_session.commit()
+    assert _titles(db_session, crud.search_predicate("glyc", session=db_session)) == [
+        "Glycan membrane atlas",
+        "Glycan survey",
+    ]
+    assert _titles(db_session, crud.search_predicate("lipids", session=db_session)) == []
+
+    db_session.delete(project)
+    db_session.commit()
+    assert _titles(db_session, crud.search_predicate("glycan", session=db_session)) == [
+        "Glycan survey"
+    ]
+
+
+def test_list_options_ranks_fts_matches(db_session):
+    db_session.add_all(
+        [
+            Person(ppl_AddedBy="t", ppl_Name_First="Ann", ppl_Name_Last="Smith", ppl_Email="x@lab.org"),
+            Person(ppl_AddedBy="t", ppl_Name_First="Smithers", ppl_Name_Last="Smith", ppl_Email="smith@lab.org"),
+            Person(ppl_AddedBy="t", ppl_Name_First="Bob", ppl_Name_Last="Jones", ppl_Email="b@lab.org"),
+        ]
+    )
+    db_session.commit()
+    fts.rebuild_search_indexes(db_session.get_bind(), tables=["person"])
+
+    options = PersonCRUD().list_options(db_session, q="smi")
+    assert len(options) == 2
+    # The row matching "smi" in three columns ranks ahead of the one-column match.
+    assert "Smithers" in options[0]["label"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from ispec.genomics import identifiers
+from ispec.genomics.identifiers import GeneNormalizer
+
+
+def _write_mapping(path: Path) -> Path:
+    path.write_text(
+        "entrezid\tensembl\tsymbol\tsynonyms\n"
+        "7157\tENSG00000141510\tTP53\tP53|LFS1\n"
+        "672\tENSG00000012048\tBRCA1\t\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_equivalents_returns_cached_group_tuple(tmp_path):
+    mapping = _write_mapping(tmp_path / "genes.tsv")
+    norm = GeneNormalizer(mapping, index_dir=tmp_path / "index")
+
+    pairs = norm.equivalents("P53", "Symbol")
+    assert pairs == (
+        ("entrezid", "7157"),
+        ("ensembl", "ENSG00000141510"),
+        ("symbol", "TP53"),
+        ("symbol", "P53"),
+        ("symbol", "LFS1"),
+    )
+    assert norm.equivalents("7157", "entrezid") is pairs
+    assert norm.equivalents("NOPE", "symbol") == (("symbol", "NOPE"),)
+
+
+def test_compiled_index_is_persisted_and_reloaded(tmp_path, monkeypatch):
+    mapping = _write_mapping(tmp_path / "genes.tsv")
+    index_dir = tmp_path / "index"
+    genes = ["672", "TP53", "x"]
+    types = ["entrezid", "symbol", "symbol"]
+
+    expected = GeneNormalizer(mapping, index_dir=index_dir).equivalents_many(genes, types)
+    assert expected[0] == (
+        ("entrezid", "672"),
+        ("ensembl", "ENSG00000012048"),
+        ("symbol", "BRCA1"),
+    )
+    assert expected[2] == (("symbol", "x"),)
+    assert len(list(index_dir.glob("*.npz"))) == 1
+
+    # A second process-equivalent instance loads the index instead of compiling.
+    def _no_compile(*args, **kwargs):
+        raise AssertionError("mapping should not be re-parsed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(identifiers._EquivalenceIndex, "compile", classmethod(_no_compile))
+        reloaded = GeneNormalizer(mapping, index_dir=index_dir)
+        assert reloaded.equivalents_many(genes, "symbol")[1] == expected[1]
+        assert reloaded.equivalents_many(genes, types) == expected
+
+    # Editing the mapping changes its hash, so a fresh index is compiled.
+    with mapping.open("a", encoding="utf-8") as handle:
+        handle.write("999\t\tNEW1\t\n")
+    fresh = GeneNormalizer(mapping, index_dir=index_dir)
+    assert fresh.equivalents("NEW1", "symbol")[0] == ("entrezid", "999")
+    assert len(list(index_dir.glob("*.npz"))) == 2
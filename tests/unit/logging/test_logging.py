@@ -1,6 +1,9 @@
 """Tests for logging utilities."""
 
 import logging
+import os
+
+import pytest
 
 from ispec.logging import get_logger, reset_logger
 
@@ -31,3 +34,79 @@ def test_reset_logger_allows_reconfiguration(tmp_path):
     # Ensure the old file did not receive the new message
     assert "second message" not in log1.read_text()
 
+
+def test_file_loggers_share_one_background_writer(tmp_path, monkeypatch):
+    from ispec.logging import flush_log_writers
+    from ispec.logging.writers import AsyncFileHandler
+
+    monkeypatch.delenv("ISPEC_LOG_ASYNC", raising=False)
+    log_file = tmp_path / "shared.log"
+    first = get_logger("test.async.first", log_file=log_file, console=False)
+    second = get_logger("test.async.second", log_file=log_file, console=False, fmt="%(name)s|%(message)s")
+    try:
+        (first_handler,) = first.handlers
+        (second_handler,) = second.handlers
+        assert isinstance(first_handler, AsyncFileHandler)
+        assert first_handler.writer is second_handler.writer
+
+        first.info("from %s", "first")
+        second.info("from %s", "second")
+        assert flush_log_writers()
+
+        lines = log_file.read_text().splitlines()
+        assert lines[0].endswith("[test.async.first] from first")
+        assert lines[1] == "test.async.second|from second"
+    finally:
+        reset_logger("test.async.first")
+        reset_logger("test.async.second")
+    assert first_handler.writer.handler.stream is None
+
+
+def test_shared_log_file_warns_on_conflicting_mode(tmp_path, monkeypatch, caplog):
+    monkeypatch.delenv("ISPEC_LOG_ASYNC", raising=False)
+    log_file = tmp_path / "mode.log"
+    get_logger("test.mode.append", log_file=log_file, console=False)
+    try:
+        ispec_logger = logging.getLogger("ispec")
+        # Alembic's fileConfig disables loggers that exist when migrations run.
+        monkeypatch.setattr(ispec_logger, "disabled", False)
+        ispec_logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.WARNING, logger="ispec"):
+                get_logger("test.mode.write", log_file=log_file, console=False, filemode="w")
+        finally:
+            ispec_logger.removeHandler(caplog.handler)
+        assert "already open with mode 'a'" in caplog.text
+    finally:
+        reset_logger("test.mode.append")
+        reset_logger("test.mode.write")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_forked_child_writes_through_a_fresh_listener(tmp_path, monkeypatch):
+    from ispec.logging import flush_log_writers
+
+    monkeypatch.delenv("ISPEC_LOG_ASYNC", raising=False)
+    log_file = tmp_path / "fork.log"
+    logger = get_logger("test.async.fork", log_file=log_file, console=False)
+    try:
+        logger.info("parent")
+        assert flush_log_writers()
+        pid = os.fork()
+        if pid == 0:
+            logger.info("child")
+            os._exit(0 if flush_log_writers() else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert [line.rsplit(" ", 1)[-1] for line in log_file.read_text().splitlines()] == ["parent", "child"]
+    finally:
+        reset_logger("test.async.fork")
+
+
+def test_log_async_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("ISPEC_LOG_ASYNC", "0")
+    logger = get_logger("test.sync", log_file=tmp_path / "sync.log", console=False)
+    try:
+        assert type(logger.handlers[0]) is logging.FileHandler
+    finally:
+        reset_logger("test.sync")
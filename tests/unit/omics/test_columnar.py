@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import math
+
+from ispec.db.models import Experiment, ExperimentRun, Project
+from ispec.omics.columnar import e2g_matrix, read_partition, write_e2g_partitions
+from ispec.omics.models import E2G
+
+
+def _seed_project(db_session, omics_session):
+    db_session.add_all(
+        [
+            Project(id=1, prj_AddedBy="test", prj_ProjectTitle="Project 1"),
+            Experiment(id=10, project_id=1, record_no="10"),
+        ]
+    )
+    db_session.flush()
+    runs = [
+        ExperimentRun(experiment_id=10, run_no=1, search_no=1, label="0"),
+        ExperimentRun(experiment_id=10, run_no=2, search_no=1, label="0"),
+    ]
+    db_session.add_all(runs)
+    db_session.commit()
+    for run, values in zip(runs, ((1.0, 2.0), (3.0, None))):
+        for gene, value in zip(("100", "200"), values):
+            omics_session.add(
+                E2G(experiment_run_id=run.id, gene=gene, geneidtype="GeneID", label="0", iBAQ_dstrAdj=value)
+            )
+    omics_session.commit()
+    return runs
+
+
+def test_e2g_matrix_falls_back_to_sqlite_without_sidecar(db_session, omics_session, monkeypatch):
+    monkeypatch.delenv("ISPEC_OMICS_COLUMNAR_DIR", raising=False)
+    runs = _seed_project(db_session, omics_session)
+
+    frame = e2g_matrix(db_session, omics_session, project_id=1)
+
+    assert frame.attrs["sources"] == {"sidecar": 0, "sqlite": 2}
+    assert list(frame.columns) == [runs[0].id, runs[1].id]
+    assert frame.loc["100", runs[1].id] == 3.0
+    assert math.isnan(frame.loc["200", runs[1].id])
+
+
+def test_e2g_matrix_reads_fresh_partitions_and_skips_stale(db_session, omics_session, tmp_path):
+    runs = _seed_project(db_session, omics_session)
+    sidecar = tmp_path / "columnar"
+
+    written = write_e2g_partitions(omics_session, [r.id for r in runs], sidecar_dir=sidecar)
+    assert len(written) == 2
+    part = read_partition(sidecar, "e2g", runs[0].id)
+    assert part is not None and list(part.columns["gene"]) == ["100", "200"]
+
+    frame = e2g_matrix(db_session, omics_session, project_id=1, sidecar_dir=sidecar)
+    assert frame.attrs["sources"] == {"sidecar": 2, "sqlite": 0}
+    assert frame.loc["200", runs[0].id] == 2.0
+
+    omics_session.add(
+        E2G(experiment_run_id=runs[0].id, gene="300", geneidtype="GeneID", label="0", iBAQ_dstrAdj=9.0)
+    )
+    omics_session.commit()
+
+    frame = e2g_matrix(db_session, omics_session, project_id=1, sidecar_dir=sidecar)
+    assert frame.attrs["sources"] == {"sidecar": 1, "sqlite": 1}
+    assert frame.loc["300", runs[0].id] == 9.0
+
+
+def test_import_e2g_tsv_writes_sidecar_partition_when_enabled(db_session, omics_session, tmp_path, monkeypatch):
+    from ispec.omics.e2g_import import import_e2g_tsv
+
+    sidecar = tmp_path / "columnar"
+    monkeypatch.setenv("ISPEC_OMICS_COLUMNAR_DIR", str(sidecar))
+    path = tmp_path / "700_1_1_labelnone_e2g_QUANT.tsv"
+    path.write_text(
+        "EXPRecNo\tEXPRunNo\tEXPSearchNo\tLabelFLAG\tGeneID\tiBAQ_dstrAdj\n700\t1\t1\t0\t5\t0.25\n",
+        encoding="utf-8",
+    )
+
+    res = import_e2g_tsv(core_session=db_session, omics_session=omics_session, path=path, kind="quant")
+
+    part = read_partition(sidecar, "e2g", res.experiment_run_id)
+    assert part is not None
+    assert part.fingerprint["rows"] == 1
+    assert float(part.columns["iBAQ_dstrAdj"][0]) == 0.25
@@ -5,7 +5,7 @@ import json
 from pathlib import Path
 
 from ispec.db.models import Experiment, ExperimentRun, Project
-from ispec.omics.models import E2G
+from ispec.omics.models import E2G, OmicsImport
 from ispec.omics.e2g_import import import_e2g_files, import_e2g_tsv
 
 
@@ -417,3 +417,111 @@ def test_import_e2g_force_reimport_clears_once_per_run(db_session, omics_session
     meta = json.loads(row.metadata_json or "{}")
     assert meta.get("qual", {}).get("source") == "QUAL"
     assert meta.get("quant", {}).get("source") == "QUANT"
+
+
+def test_import_e2g_files_parallel_parse_matches_serial_results(db_session, omics_session, tmp_path):
+    quant_paths = []
+    for run_no in (1, 2, 3):
+        path = tmp_path / f"500_{run_no}_1_labelnone_e2g_QUANT.tsv"
+        _write_tsv(
+            path,
+            fieldnames=["EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG", "GeneID", "iBAQ_dstrAdj"],
+            rows=[
+                {
+                    "EXPRecNo": "500",
+                    "EXPRunNo": str(run_no),
+                    "EXPSearchNo": "1",
+                    "LabelFLAG": "0",
+                    "GeneID": str(gene_id),
+                    "iBAQ_dstrAdj": str(run_no * gene_id),
+                }
+                for gene_id in (10, 20)
+            ],
+        )
+        quant_paths.append(path)
+    missing = tmp_path / "500_9_1_labelnone_e2g_QUANT.tsv"
+
+    summary = import_e2g_files(
+        core_session=db_session,
+        omics_session=omics_session,
+        quant_paths=[*quant_paths, missing],
+        workers=2,
+    )
+
+    assert [Path(entry["path"]).name for entry in summary["files"]] == [p.name for p in quant_paths]
+    assert summary["inserted"] == 6
+    assert len(summary["errors"]) == 1
+    assert "FileNotFoundError" in summary["errors"][0]
+    throughput = summary["throughput"]
+    assert throughput["workers"] == 2
+    assert throughput["parse"]["files"] == 3
+    assert throughput["parse"]["rows"] == 6
+    assert throughput["write"]["rows"] == 6
+    assert omics_session.query(E2G).filter(E2G.iBAQ_dstrAdj == 60.0).count() == 1
+
+
+def test_import_e2g_tsv_streams_in_batches(db_session, omics_session, tmp_path):
+    path = tmp_path / "600_1_1_labelnone_e2g_QUAL.tsv"
+    _write_tsv(
+        path,
+        fieldnames=["EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG", "GeneID", "PSMs"],
+        rows=[
+            {"EXPRecNo": "600", "EXPRunNo": "1", "EXPSearchNo": "1", "LabelFLAG": "0", "GeneID": gene, "PSMs": psms}
+            for gene, psms in (("1", "1"), ("2", "2"), ("1", "5"))
+        ],
+    )
+
+    res = import_e2g_tsv(
+        core_session=db_session,
+        omics_session=omics_session,
+        path=path,
+        kind="qual",
+        batch_size=1,
+    )
+
+    assert res.rows == 3
+    assert (res.inserted, res.updated) == (2, 1)
+    assert omics_session.query(E2G).filter_by(gene="1").one().psms == 5
+
+
+def test_import_e2g_tsv_failed_file_keeps_nothing_and_retry_imports(db_session, omics_session, tmp_path):
+    path = tmp_path / "700_1_1_labelnone_e2g_QUAL.tsv"
+    rows = [
+        {"EXPRecNo": "700", "EXPRunNo": "1", "EXPSearchNo": "1", "LabelFLAG": "0", "GeneID": str(gene), "PSMs": "1"}
+        for gene in range(1000, 1600)
+    ]
+    _write_tsv(path, fieldnames=list(rows[0]), rows=rows)
+    good = path.read_bytes()
+    # A bad UTF-8 byte in the last row fails the file after many batches were written.
+    path.write_bytes(good.replace(b"\t1599\t", b"\t15\xff9\t"))
+
+    try:
+        import_e2g_tsv(
+            core_session=db_session,
+            omics_session=omics_session,
+            path=path,
+            kind="qual",
+            batch_size=5,
+        )
+    except UnicodeDecodeError:
+        pass
+    else:
+        raise AssertionError("expected the corrupt file to fail")
+
+    assert omics_session.query(E2G).count() == 0
+    assert omics_session.query(OmicsImport).count() == 0
+
+    path.write_bytes(good)
+    retry = import_e2g_tsv(
+        core_session=db_session,
+        omics_session=omics_session,
+        path=path,
+        kind="qual",
+        batch_size=5,
+    )
+
+    assert retry.skipped is False
+    assert retry.inserted == 600
+    assert omics_session.query(E2G).count() == 600
+    marker = omics_session.query(OmicsImport).one()
+    assert (marker.experiment_run_id, marker.kind, marker.rows) == (retry.experiment_run_id, "qual", 600)
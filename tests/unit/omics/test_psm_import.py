@@ -6,7 +6,7 @@ from pathlib import Path
 
 from ispec.db.models import Experiment, ExperimentRun
 from ispec.omics.models import PSM
-from ispec.omics.psm_import import import_psm_file
+from ispec.omics.psm_import import import_psm_file, import_psm_files
 
 
 def _write_delimited(path: Path, *, fieldnames: list[str], rows: list[dict[str, str]]) -> None:
@@ -163,3 +163,169 @@ def test_import_psm_file_skips_then_force_reimports(db_session, omics_session, t
         .one()
     )
     assert row.score == 14.5
+
+
+def test_import_psm_files_parallel_parse_reports_throughput(db_session, omics_session, tmp_path):
+    paths = []
+    for run_no in (1, 2):
+        path = tmp_path / f"run{run_no}_psm.tsv"
+        _write_delimited(
+            path,
+            fieldnames=["EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG", "ScanNumber", "Peptide"],
+            rows=[
+                {
+                    "EXPRecNo": "902",
+                    "EXPRunNo": str(run_no),
+                    "EXPSearchNo": "1",
+                    "LabelFLAG": "0",
+                    "ScanNumber": str(scan),
+                    "Peptide": "PEPTIDEK",
+                }
+                for scan in (1, 2, 3)
+            ],
+        )
+        paths.append(path)
+
+    summary = import_psm_files(
+        core_session=db_session,
+        omics_session=omics_session,
+        paths=paths,
+        workers=2,
+    )
+
+    assert summary["errors"] == []
+    assert summary["inserted"] == 6
+    assert [Path(entry["path"]).name for entry in summary["files"]] == ["run1_psm.tsv", "run2_psm.tsv"]
+    assert summary["throughput"]["parse"]["rows"] == 6
+    assert summary["throughput"]["write"]["files"] == 2
+    assert omics_session.query(PSM).count() == 6
+
+
+def test_import_psm_file_streams_in_batches_across_runs(db_session, omics_session, tmp_path):
+    psm_path = tmp_path / "multi_psm.tsv"
+    _write_delimited(
+        psm_path,
+        fieldnames=["EXPRecNo", "EXPRunNo", "EXPSearchNo", "LabelFLAG", "ScanNumber", "Peptide"],
+        rows=[
+            {
+                "EXPRecNo": "903",
+                "EXPRunNo": str(1 + scan % 2),
+                "EXPSearchNo": "1",
+                "LabelFLAG": "0",
+                "ScanNumber": str(scan),
+                "Peptide": "PEPTIDEK" if scan != 4 else "",
+            }
+            for scan in range(5)
+        ],
+    )
+
+    result = import_psm_file(
+        core_session=db_session,
+        omics_session=omics_session,
+        path=psm_path,
+        batch_size=2,
+    )
+
+    assert result.rows == 5
+    assert result.inserted == 4
+    assert len(result.experiment_run_ids) == 2
+    assert omics_session.query(PSM).count() == 4
+
+
+def test_import_psm_file_failed_force_reimport_keeps_previous_rows(
+    db_session, omics_session, tmp_path, monkeypatch
+):
+    from ispec.omics import psm_import
+
+    experiment = Experiment(id=905, project_id=None, record_no="905")
+    run = ExperimentRun(experiment_id=905, run_no=1, search_no=1, label="0")
+    db_session.add_all([experiment, run])
+    db_session.commit()
+    db_session.refresh(run)
+
+    path = tmp_path / "run5_psm.tsv"
+    fieldnames = ["ScanNumber", "Peptide", "Charge", "Score"]
+    _write_delimited(
+        path,
+        fieldnames=fieldnames,
+        rows=[{"ScanNumber": str(scan), "Peptide": "PEPK", "Charge": "2", "Score": "1.0"} for scan in range(50)],
+    )
+    import_psm_file(core_session=db_session, omics_session=omics_session, path=path, experiment_run_id=int(run.id))
+
+    _write_delimited(
+        path,
+        fieldnames=fieldnames,
+        rows=[{"ScanNumber": str(scan), "Peptide": "PEPK", "Charge": "2", "Score": "2.0"} for scan in range(50)],
+    )
+    iter_batches = psm_import._iter_psm_entry_batches
+
+    def failing_batches(*args, **kwargs):
+        for index, batch in enumerate(iter_batches(*args, **kwargs)):
+            if index == 6:
+                raise OSError("disk went away")
+            yield batch
+
+    monkeypatch.setattr(psm_import, "_iter_psm_entry_batches", failing_batches)
+    try:
+        import_psm_file(
+            core_session=db_session,
+            omics_session=omics_session,
+            path=path,
+            experiment_run_id=int(run.id),
+            force=True,
+            batch_size=5,
+        )
+    except OSError:
+        pass
+    else:
+        raise AssertionError("expected the interrupted import to fail")
+    monkeypatch.setattr(psm_import, "_iter_psm_entry_batches", iter_batches)
+
+    scores = [score for (score,) in omics_session.query(PSM.score).filter_by(experiment_run_id=run.id)]
+    assert len(scores) == 50
+    assert set(scores) == {1.0}
+
+    skipped = import_psm_file(
+        core_session=db_session, omics_session=omics_session, path=path, experiment_run_id=int(run.id)
+    )
+    assert skipped.skipped is True
+
+    retry = import_psm_file(
+        core_session=db_session,
+        omics_session=omics_session,
+        path=path,
+        experiment_run_id=int(run.id),
+        force=True,
+        batch_size=5,
+    )
+    assert retry.inserted == 50
+    scores = [score for (score,) in omics_session.query(PSM.score).filter_by(experiment_run_id=run.id)]
+    assert set(scores) == {2.0}
+
+
+def test_import_psm_file_retries_a_run_left_without_a_marker(db_session, omics_session, tmp_path):
+    from ispec.omics.models import OmicsImport
+
+    experiment = Experiment(id=906, project_id=None, record_no="906")
+    run = ExperimentRun(experiment_id=906, run_no=1, search_no=1, label="0")
+    db_session.add_all([experiment, run])
+    db_session.commit()
+    db_session.refresh(run)
+
+    # Rows from an import that never finished: no completion marker.
+    omics_session.add(PSM(experiment_run_id=int(run.id), scan_number=1, peptide="PEPK", charge=2))
+    omics_session.commit()
+
+    path = tmp_path / "run6_psm.tsv"
+    _write_delimited(
+        path,
+        fieldnames=["ScanNumber", "Peptide", "Charge"],
+        rows=[{"ScanNumber": str(scan), "Peptide": "PEPK", "Charge": "2"} for scan in (1, 2, 3)],
+    )
+    result = import_psm_file(
+        core_session=db_session, omics_session=omics_session, path=path, experiment_run_id=int(run.id)
+    )
+
+    assert result.skipped is False
+    assert (result.inserted, result.updated) == (2, 0)
+    assert omics_session.query(OmicsImport).filter_by(experiment_run_id=run.id, kind="psm").one().rows == 3
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from ispec.omics.tabular import iter_column_batches, sniff_delimiter
+
+
+def test_iter_column_batches_yields_fixed_size_column_blocks(tmp_path):
+    path = tmp_path / "table.tsv"
+    path.write_text("A\tB\n1\tx\n\n2\ty\n3\n", encoding="utf-8")
+
+    batches = list(iter_column_batches(path, batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert batches[0].columns == {"A": ["1", "2"], "B": ["x", "y"]}
+    assert batches[1].start_row == 2
+    assert list(batches[1].rows()) == [{"A": "3", "B": None}]
+
+
+def test_iter_column_batches_usecols_and_comma_sniffing(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text("A,B,C\n1,2,3\n4,5,6\n", encoding="utf-8")
+
+    assert sniff_delimiter(path) == ","
+    (batch,) = iter_column_batches(path, usecols=["C", "missing"])
+    assert batch.fieldnames == ("C",)
+    assert batch.column("C") == ["3", "6"]
+    assert batch.column("missing") == [None, None]
@@ -41,3 +41,26 @@ def test_load_bound_prompt_enriches_version_and_observability_fields(tmp_path, m
     assert context["prompt_family"] == "assistant.loader.example"
     assert context["prompt_version_num"] == 1
     assert context["prompt_binding"].endswith(":_loader_example_prompt")
+
+
+def test_render_prompt_serves_repeat_renders_from_memory(tmp_path, monkeypatch):
+    prompt_root = tmp_path / "prompts"
+    prompt_root.mkdir()
+    prompt_path = prompt_root / "assistant.loader.example.md"
+    prompt_path.write_text("+++\ntitle = \"Loader Example\"\n+++\nStatic body\n", encoding="utf-8")
+    monkeypatch.setenv("ISPEC_PROMPTS_DB_PATH", str(tmp_path / "prompts.db"))
+    monkeypatch.setenv("ISPEC_PROMPT_RECHECK_SECONDS", "60")
+    sync_prompts(prompt_root=prompt_root, source_root=tmp_path)
+    _PROMPT_SOURCE_CACHE.clear()
+    monkeypatch.setattr(prompt_loader, "resolve_prompt_root", lambda: prompt_root)
+
+    first = load_bound_prompt(_loader_example_prompt)
+    assert first.version.version_num == 1
+
+    def _no_io(*args, **kwargs):
+        raise AssertionError("render touched the filesystem or prompts.db")
+
+    monkeypatch.setattr(prompt_loader, "parse_prompt_file", _no_io)
+    monkeypatch.setattr("ispec.prompt.connect._load_version_map", _no_io)
+    monkeypatch.setattr("ispec.prompt.bindings.inspect.getsourcelines", _no_io)
+    assert load_bound_prompt(_loader_example_prompt) is first
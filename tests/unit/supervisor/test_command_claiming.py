@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from ispec.agent.connect import get_agent_session
+from ispec.agent.models import AgentCommand
+
+
+def _seed(agent_db_path, *priorities: int) -> list[int]:
+    ids: list[int] = []
+    with get_agent_session(agent_db_path) as db:
+        for priority in priorities:
+            row = AgentCommand(command_type="noop", status="queued", priority=priority, payload_json={"p": priority})
+            db.add(row)
+            db.flush()
+            ids.append(int(row.id))
+        db.commit()
+    return ids
+
+
+def test_claim_commands_leases_batch_in_priority_order(tmp_path, monkeypatch):
+    agent_db_path = tmp_path / "agent.db"
+    monkeypatch.setenv("ISPEC_AGENT_DB_PATH", str(agent_db_path))
+
+    from ispec.supervisor import loop as supervisor_loop
+
+    low, high, mid, extra = _seed(agent_db_path, 0, 5, 1, 0)
+
+    first = supervisor_loop._claim_commands(agent_id="a", run_id="r1", limit=3, reserve=True)
+    assert [cmd.id for cmd in first] == [high, mid, low]
+    assert [cmd.attempts for cmd in first] == [0, 0, 0]
+    second = supervisor_loop._claim_commands(agent_id="a", run_id="r2", limit=3)
+    assert [cmd.id for cmd in second] == [extra]
+    assert [cmd.attempts for cmd in second] == [1]
+    assert supervisor_loop._claim_commands(agent_id="a", run_id="r2", limit=3) == []
+
+    with get_agent_session(agent_db_path) as db:
+        rows = {row.id: row for row in db.query(AgentCommand).all()}
+        assert {rows[i].claimed_by_run_id for i in (low, high, mid)} == {"r1"}
+        # Reserved, not started: still queued with no start time.
+        assert {(rows[i].status, rows[i].started_at) for i in (low, high, mid)} == {("queued", None)}
+        assert all(row.lease_expires_at is not None for row in rows.values())
+        assert (rows[extra].status, rows[extra].attempts) == ("running", 1)
+
+    started = supervisor_loop._start_reserved_command(command_id=high, run_id="r1")
+    assert (started.id, started.attempts, started.priority) == (high, 1, 5)
+    assert supervisor_loop._start_reserved_command(command_id=mid, run_id="r2") is None
+
+    assert supervisor_loop._release_claimed_commands(command_ids=[low, extra], run_id="r1") == 1
+    supervisor_loop._finish_command(command_id=high, ok=True, result={"ok": True}, error=None)
+
+    with get_agent_session(agent_db_path) as db:
+        released = db.get(AgentCommand, low)
+        assert (released.status, released.attempts, released.lease_expires_at, released.claimed_by_run_id) == (
+            "queued",
+            0,
+            None,
+            None,
+        )
+        assert db.get(AgentCommand, extra).status == "running"  # leased by another run
+        done = db.get(AgentCommand, high)
+        assert (done.status, done.attempts, done.lease_expires_at) == ("succeeded", 1, None)
+
+
+def test_processor_buffers_claims_and_releases_on_stop(tmp_path, monkeypatch):
+    agent_db_path = tmp_path / "agent.db"
+    monkeypatch.setenv("ISPEC_AGENT_DB_PATH", str(agent_db_path))
+    monkeypatch.setenv("ISPEC_SUPERVISOR_CLAIM_BATCH_SIZE", "3")
+
+    from ispec.agent.models import AgentRun
+    from ispec.supervisor import loop as supervisor_loop
+
+    with get_agent_session(agent_db_path) as db:
+        db.add(AgentRun(run_id="run-1", agent_id="agent-1", config_json={}, state_json={}, summary_json={}))
+        db.commit()
+    ids = _seed(agent_db_path, 0, 0, 0, 0)
+
+    processor = supervisor_loop._SupervisorCommandProcessor(agent_id="agent-1", run_id="run-1", broker=None)
+    assert processor.tick() is True
+    assert processor.tick() is True
+
+    stats = processor.queue_stats()
+    assert stats["claim_queries"] == 1
+    assert stats["claimed"] == 3
+    assert stats["finished"] == 2
+    assert stats["buffered"] == 1
+
+    with get_agent_session(agent_db_path) as db:
+        buffered = db.get(AgentCommand, ids[2])
+        assert (buffered.status, buffered.started_at, buffered.attempts) == ("queued", None, 0)
+
+    processor.stop()
+    assert processor.queue_stats()["released"] == 1
+    with get_agent_session(agent_db_path) as db:
+        statuses = [db.get(AgentCommand, command_id).status for command_id in ids]
+    # Unknown command types fail; the buffered lease went back to the queue.
+    assert statuses == ["failed", "failed", "queued", "queued"]
+
+
+def test_processor_serves_higher_priority_work_before_its_buffer(tmp_path, monkeypatch):
+    agent_db_path = tmp_path / "agent.db"
+    monkeypatch.setenv("ISPEC_AGENT_DB_PATH", str(agent_db_path))
+    monkeypatch.setenv("ISPEC_SUPERVISOR_CLAIM_BATCH_SIZE", "3")
+
+    from ispec.agent.models import AgentRun
+    from ispec.supervisor import loop as supervisor_loop
+
+    with get_agent_session(agent_db_path) as db:
+        db.add(AgentRun(run_id="run-1", agent_id="agent-1", config_json={}, state_json={}, summary_json={}))
+        db.commit()
+    first, second, third = _seed(agent_db_path, 0, 0, 0)
+
+    processor = supervisor_loop._SupervisorCommandProcessor(agent_id="agent-1", run_id="run-1", broker=None)
+    assert processor.tick() is True
+    assert processor.queue_stats()["buffered"] == 2
+
+    (urgent,) = _seed(agent_db_path, 9)
+    assert processor.tick() is True
+
+    with get_agent_session(agent_db_path) as db:
+        statuses = {command_id: db.get(AgentCommand, command_id).status for command_id in (first, second, third, urgent)}
+    assert statuses == {first: "failed", second: "queued", third: "queued", urgent: "failed"}
+    assert processor.queue_stats()["released"] == 2
+    processor.stop()
+
+
+def test_processor_claims_and_starts_one_command_by_default(tmp_path, monkeypatch):
+    agent_db_path = tmp_path / "agent.db"
+    monkeypatch.setenv("ISPEC_AGENT_DB_PATH", str(agent_db_path))
+    monkeypatch.delenv("ISPEC_SUPERVISOR_CLAIM_BATCH_SIZE", raising=False)
+
+    from ispec.agent.models import AgentRun
+    from ispec.supervisor import loop as supervisor_loop
+
+    with get_agent_session(agent_db_path) as db:
+        db.add(AgentRun(run_id="run-1", agent_id="agent-1", config_json={}, state_json={}, summary_json={}))
+        db.commit()
+    ids = _seed(agent_db_path, 0, 0)
+
+    processor = supervisor_loop._SupervisorCommandProcessor(agent_id="agent-1", run_id="run-1", broker=None)
+    assert processor.tick() is True
+
+    stats = processor.queue_stats()
+    assert (stats["batch_size"], stats["claimed"], stats["buffered"]) == (1, 1, 0)
+    with get_agent_session(agent_db_path) as db:
+        untouched = db.get(AgentCommand, ids[1])
+        assert (untouched.status, untouched.claimed_by_run_id) == ("queued", None)
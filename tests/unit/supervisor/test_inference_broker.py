@@ -100,3 +100,164 @@ def test_supervisor_inference_broker_processes_commands_while_inflight(tmp_path,
 
     processor.stop()
 
+
+
+def test_inference_broker_lanes_isolate_background_and_supersede(monkeypatch) -> None:
+    import threading
+
+    import ispec.supervisor.inference_broker as broker_mod
+    from ispec.supervisor.inference_broker import InferenceRequest
+
+    release = threading.Event()
+
+    def fake_generate_reply(*, messages=None, stage=None, **_) -> AssistantReply:
+        if stage == "slow":
+            release.wait(timeout=5.0)
+        return AssistantReply(content=str(stage), provider="test", model=None, meta={}, ok=True, error=None)
+
+    monkeypatch.setattr(broker_mod, "generate_reply", fake_generate_reply)
+
+    broker = InferenceBroker(lanes={"interactive": 1, "background": 1})
+    broker.start()
+    try:
+        slow = broker.submit(command_id=1, request=InferenceRequest(messages=[], stage="slow"), lane="background")
+        queued = broker.submit(
+            command_id=2,
+            request=InferenceRequest(messages=[], stage="old"),
+            lane="background",
+            supersede_key="digest",
+        )
+        fast = broker.submit(command_id=3, request=InferenceRequest(messages=[], stage="fast"), lane="interactive")
+        newer = broker.submit(
+            command_id=4,
+            request=InferenceRequest(messages=[], stage="new"),
+            lane="background",
+            supersede_key="digest",
+        )
+
+        results = {}
+        deadline = time.monotonic() + 5.0
+        while len(results) < 2 and time.monotonic() < deadline:
+            for result in broker.drain_results():
+                results[result.job_id] = result
+            time.sleep(0.01)
+        # The interactive job finished while the background lane is still busy,
+        # and the superseded queued job was cancelled without running.
+        assert results[fast].reply.content == "fast"
+        assert results[queued].cancelled is True
+        stats = broker.stats()
+        assert stats["background"]["running"] == 1
+        assert stats["background"]["queued"] == 1
+        assert stats["background"]["cancelled"] == 1
+
+        release.set()
+        deadline = time.monotonic() + 5.0
+        while len(results) < 4 and time.monotonic() < deadline:
+            for result in broker.drain_results():
+                results[result.job_id] = result
+            time.sleep(0.01)
+        assert results[slow].cancelled is False
+        assert results[newer].reply.content == "new"
+        assert broker.stats()["background"]["completed"] == 2
+    finally:
+        release.set()
+        broker.stop()
+
+
+def test_parse_lane_spec_clamps_and_keeps_defaults() -> None:
+    from ispec.supervisor.inference_broker import parse_lane_spec
+
+    assert parse_lane_spec(None) == {"interactive": 1, "background": 1}
+    assert parse_lane_spec("interactive=3, background=0, bogus, extra=x") == {"interactive": 3, "background": 1}
+    assert parse_lane_spec("background=99")["background"] == 16
+
+
+def test_parse_lane_spec_ignores_unknown_lane_names(caplog, monkeypatch) -> None:
+    from ispec.supervisor import inference_broker
+    from ispec.supervisor.inference_broker import parse_lane_spec
+
+    # Alembic's fileConfig disables loggers that exist when migrations run.
+    monkeypatch.setattr(inference_broker.logger, "disabled", False)
+    inference_broker.logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level("WARNING", logger=inference_broker.logger.name):
+            lanes = parse_lane_spec("interactve=4,background=2")
+    finally:
+        inference_broker.logger.removeHandler(caplog.handler)
+
+    assert lanes == {"interactive": 1, "background": 2}
+    assert "interactve" in caplog.text
+
+
+def test_superseded_inference_finishes_ok_with_flag(tmp_path, monkeypatch) -> None:
+    agent_db_path = tmp_path / "agent.db"
+    monkeypatch.setenv("ISPEC_AGENT_DB_PATH", str(agent_db_path))
+
+    from ispec.agent.commands import COMMAND_BUILD_SUPPORT_DIGEST
+    from ispec.agent.connect import get_agent_session
+    from ispec.supervisor import loop as supervisor_loop
+    from ispec.supervisor.inference_broker import InferenceResult
+
+    with get_agent_session(agent_db_path) as agent_db:
+        agent_db.add(
+            AgentRun(
+                run_id="run-1",
+                agent_id="agent-1",
+                kind="supervisor",
+                status="running",
+                created_at=utcnow(),
+                updated_at=utcnow(),
+                config_json={},
+                state_json={"checks": {}},
+                summary_json={},
+            )
+        )
+        agent_db.commit()
+
+    cmd_id = _enqueue_command(command_type=COMMAND_BUILD_SUPPORT_DIGEST, payload={"cursor_review_id": 7}, priority=0)
+    (cmd,) = supervisor_loop._claim_commands(agent_id="agent-1", run_id="run-1")
+    assert cmd.id == cmd_id
+    assert supervisor_loop._inference_supersede_key(cmd) == f"{COMMAND_BUILD_SUPPORT_DIGEST}:7"
+
+    class _Broker:
+        def poll_result(self):
+            return InferenceResult(
+                job_id="job-1",
+                command_id=int(cmd_id),
+                reply=AssistantReply(content="", provider="test", model=None, meta=None, ok=False, error="superseded"),
+                cancelled=True,
+            )
+
+    def _task():
+        yield None
+        raise AssertionError("a superseded task must not resume")
+
+    task = _task()
+    next(task)
+    processor = _SupervisorCommandProcessor(agent_id="agent-1", run_id="run-1", broker=_Broker())
+    processor._track_inflight(
+        supervisor_loop._InflightInference(
+            cmd=cmd, task=task, step_started=utcnow(), step_monotonic=time.monotonic(), job_id="job-1"
+        )
+    )
+
+    assert processor._poll_inflight_result() is True
+
+    with get_agent_session(agent_db_path) as agent_db:
+        row = agent_db.get(AgentCommand, int(cmd_id))
+        assert row.status == "succeeded"
+        assert row.error is None
+        assert row.result_json["superseded"] is True
+
+
+def test_digest_supersede_key_is_scoped_to_the_review_cursor() -> None:
+    from ispec.agent.commands import COMMAND_BUILD_SUPPORT_DIGEST
+    from ispec.supervisor.loop import ClaimedCommand, _inference_supersede_key
+
+    def key(payload):
+        cmd = ClaimedCommand(id=1, command_type=COMMAND_BUILD_SUPPORT_DIGEST, payload=payload, attempts=1, max_attempts=3)
+        return _inference_supersede_key(cmd)
+
+    assert key({"cursor_review_id": 5}) == key({"from_review_id": 5})
+    assert key({"cursor_review_id": 5}) != key({"cursor_review_id": 6})
+    assert key({}) == f"{COMMAND_BUILD_SUPPORT_DIGEST}:0"